@@ -1,12 +1,18 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2019 - 2021 Gemeente Amsterdam
+# Copyright (C) 2019 - 2022 Gemeente Amsterdam
 from django.conf import settings
 
 from signals.apps.signals import workflow
 
 SIGNALS_API_MAX_UPLOAD_SIZE = 20*1024*1024  # 20MB = 20*1024*1024
 SIGNALS_API_ATLAS_SEARCH_URL = settings.DATAPUNT_API_URL + 'atlas/search'
-SIGNALS_API_PDOK_API_URL = 'https://geodata.nationaalgeoregister.nl'
+SIGNALS_API_PDOK_API_URL = settings.PDOK_API_URL
+
+# Address validation cache, see signals.apps.api.validation.address.cache
+SIGNALS_API_ADDRESS_CACHE_TTL = 30 * 24 * 60 * 60  # Seconds a found address is cached
+SIGNALS_API_ADDRESS_CACHE_NEGATIVE_TTL = 24 * 60 * 60  # Seconds an address that could not be found is cached
+SIGNALS_API_ADDRESS_CACHE_LRU_SIZE = 10000  # Number of addresses cached in memory per process
+SIGNALS_API_ADDRESS_GEOCODE_MAX_WORKERS = 4  # Maximum number of concurrent requests to the address validation API
 
 SIGNALS_API_CLOSED_STATES = frozenset([
     workflow.AFGEHANDELD,
@@ -20,5 +26,17 @@ SIGNAL_API_STATE_OPEN_DISPLAY = 'Open'
 
 SIGNAL_CONTEXT_GEOGRAPHY_RADIUS = 50  # Radius in meters
 SIGNAL_CONTEXT_GEOGRAPHY_CREATED_DELTA_WEEKS = 12  # Created gte X weeks ago
+SIGNAL_CONTEXT_REPORTER_CACHE_TTL = 15 * 60  # Seconds, changes to the Signals of the reporter invalidate it before that
 
 SIGNALS_API_GEO_PAGINATE_BY = 4000
+
+# Vector tiles (MVT) of the geography endpoints, see signals.apps.services.domain.mvt
+SIGNALS_API_MVT_EXTENT = 4096  # Size of a tile in tile coordinates
+SIGNALS_API_MVT_BUFFER = 64  # Buffer around a tile in tile coordinates
+SIGNALS_API_MVT_MAX_ZOOM = 22
+SIGNALS_API_MVT_FEATURES_MIN_ZOOM = 15  # Below this zoom level Signals are clustered
+SIGNALS_API_MVT_CLUSTER_GRID_SIZE = 32  # Number of cluster cells along the side of a tile
+
+SIGNALS_API_PUBLIC_GEOGRAPHY_CACHE_TTL = 5 * 60  # Seconds, changes to Signals invalidate the cache before that
+SIGNALS_API_AREA_GEOGRAPHY_CACHE_TTL = 60 * 60  # Seconds, loading or changing Areas invalidates the cache before that
+SIGNALS_API_AREA_GEOGRAPHY_MAX_ZOOM = 22
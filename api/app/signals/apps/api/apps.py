@@ -6,3 +6,6 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     name = 'signals.apps.api'
     verbose_name = 'REST API App'
+
+    def ready(self):
+        import signals.apps.api.signal_receivers  # noqa
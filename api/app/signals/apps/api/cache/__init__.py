@@ -0,0 +1,9 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from signals.apps.api.cache.filter_choices import FilterChoicesCache
+from signals.apps.api.cache.public_geography import PublicGeographyCache
+
+__all__ = [
+    'FilterChoicesCache',
+    'PublicGeographyCache',
+]
@@ -0,0 +1,49 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+Server side cache of the geography endpoints of the Areas.
+
+Responses are cached per normalized set of the query parameters the response depends on (filters, zoom/tolerance and
+page). The entries are keyed
+by the version of the Areas (see AreaIndexService), which is replaced whenever Areas are loaded or changed. An ETag,
+derived from the content, is stored with every entry so clients can be answered with a 304 straight from the cache.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.http import quote_etag
+
+from signals.apps.api.app_settings import SIGNALS_API_AREA_GEOGRAPHY_CACHE_TTL
+from signals.apps.api.cache.utils import get_request_digest
+from signals.apps.services.domain.area_index import AreaIndexService
+
+# Query parameters of the geography endpoint: the filters (see AreaFilterSet), zoom/tolerance and pagination
+AREA_GEOGRAPHY_PARAMS = ('code', 'type_code', 'zoom', 'tolerance', 'geopage', 'page_size')
+
+
+class AreaGeographyCache:
+    @staticmethod
+    def get_key(request):
+        """
+        Cache key for the request, only the query parameters the response depends on are used (see
+        get_request_digest).
+        """
+        digest = get_request_digest(request, AREA_GEOGRAPHY_PARAMS)
+        return f'signals.api.area_geography.{AreaIndexService.get_version()}.{digest}'
+
+    @staticmethod
+    def get(key):
+        """
+        :returns: tuple of the ETag, data and headers or None
+        """
+        return cache.get(key)
+
+    @staticmethod
+    def set(key, data, headers):
+        serialized = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        etag = quote_etag(hashlib.sha256(serialized).hexdigest())
+        entry = (etag, data, headers)
+        cache.set(key, entry, timeout=SIGNALS_API_AREA_GEOGRAPHY_CACHE_TTL)
+        return entry
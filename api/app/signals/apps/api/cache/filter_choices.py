@@ -0,0 +1,68 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+In-process cache of the choices used by the filters (see signals.apps.api.filters.utils).
+
+The choices are built once per process and shared by all requests and threads. All entries share a version stamp, kept
+in the Django cache, that is replaced whenever one of the models the choices are built from changes (see
+signals.apps.api.signal_receivers), so every process sharing the Django cache rebuilds its choices on the next lookup.
+The choices are also rebuilt after FILTER_CHOICES_TIMEOUT seconds, which limits how long processes that do not share
+the Django cache (the default per-process cache) use outdated choices.
+"""
+import functools
+import threading
+import uuid
+from time import monotonic
+
+from django.core.cache import cache
+
+FILTER_CHOICES_VERSION_CACHE_KEY = 'signals.api.filter_choices.version'
+FILTER_CHOICES_TIMEOUT = 60
+
+
+class FilterChoicesCache:
+    _choices = {}  # name -> (version, built at, choices)
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_version():
+        version = cache.get(FILTER_CHOICES_VERSION_CACHE_KEY)
+        if version is None:
+            cache.add(FILTER_CHOICES_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+            version = cache.get(FILTER_CHOICES_VERSION_CACHE_KEY)
+        return version
+
+    @classmethod
+    def invalidate(cls):
+        cache.set(FILTER_CHOICES_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+        with cls._lock:
+            cls._choices.clear()
+
+    @staticmethod
+    def _is_outdated(entry, version):
+        return entry is None or entry[0] != version or monotonic() - entry[1] > FILTER_CHOICES_TIMEOUT
+
+    @classmethod
+    def get(cls, name, build):
+        """
+        The cached choices, `build` is called (once, also with concurrent lookups) when they are missing or outdated.
+        """
+        version = cls.get_version()
+        entry = cls._choices.get(name)
+        if cls._is_outdated(entry, version):
+            with cls._lock:
+                entry = cls._choices.get(name)
+                if cls._is_outdated(entry, version):
+                    entry = (version, monotonic(), tuple(build()))
+                    cls._choices[name] = entry
+        return list(entry[2])  # A copy, callers are free to change the list
+
+    @classmethod
+    def cached(cls, func):
+        """
+        Decorator for a function that builds choices from the database.
+        """
+        @functools.wraps(func)
+        def wrapper():
+            return cls.get(func.__qualname__, func)
+        return wrapper
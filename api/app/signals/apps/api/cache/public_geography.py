@@ -0,0 +1,91 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+Server side cache of the public geography endpoints (GeoJSON and vector tiles).
+
+Responses are cached per normalized set of the query parameters the response depends on (filters and page). All
+entries share a version that is replaced whenever a change could alter the public map, see
+signals.apps.api.signal_receivers. An ETag, derived from the content, is stored with every entry so polling clients can
+be answered with a 304 straight from the cache.
+"""
+import hashlib
+import json
+import uuid
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.http import quote_etag
+
+from signals.apps.api.app_settings import SIGNALS_API_PUBLIC_GEOGRAPHY_CACHE_TTL
+from signals.apps.api.cache.utils import get_request_digest
+from signals.apps.signals.workflow import (
+    AFGEHANDELD,
+    AFGEHANDELD_EXTERN,
+    GEANNULEERD,
+    VERZOEK_TOT_HEROPENEN
+)
+
+PUBLIC_GEOGRAPHY_CACHE_VERSION_KEY = 'signals.api.public_geography.version'
+
+# Query parameters of the geography endpoint: the filters (see PublicSignalGeographyFilter), grouping, ordering and
+# pagination (see LinkHeaderPaginationForQuerysets)
+PUBLIC_GEOGRAPHY_PARAMS = ('bbox', 'lat', 'lon', 'maincategory_slug', 'category_slug', 'group_by', 'ordering',
+                           'geopage', 'page_size', 'pagination', 'cursor', 'count')
+# The bbox of a vector tile is determined by its path
+PUBLIC_GEOGRAPHY_TILE_PARAMS = ('maincategory_slug', 'category_slug')
+
+# Signals in these states are not shown on the public map (see PublicSignalViewSet.geography)
+PUBLIC_GEOGRAPHY_EXCLUDED_STATES = frozenset([AFGEHANDELD, AFGEHANDELD_EXTERN, GEANNULEERD, VERZOEK_TOT_HEROPENEN])
+
+
+class PublicGeographyCache:
+    @staticmethod
+    def get_version():
+        version = cache.get(PUBLIC_GEOGRAPHY_CACHE_VERSION_KEY)
+        if version is None:
+            cache.add(PUBLIC_GEOGRAPHY_CACHE_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+            version = cache.get(PUBLIC_GEOGRAPHY_CACHE_VERSION_KEY)
+        return version
+
+    @staticmethod
+    def invalidate():
+        cache.set(PUBLIC_GEOGRAPHY_CACHE_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+    @staticmethod
+    def get_key(request, params=PUBLIC_GEOGRAPHY_PARAMS):
+        """
+        Cache key for the request, only the given query parameters are used (see get_request_digest).
+        """
+        digest = get_request_digest(request, params)
+        return f'signals.api.public_geography.{PublicGeographyCache.get_version()}.{digest}'
+
+    @staticmethod
+    def get(key):
+        """
+        :returns: tuple of the ETag, data and headers or None
+        """
+        return cache.get(key)
+
+    @staticmethod
+    def set(key, data, headers):
+        """
+        :param data: JSON serializable data or bytes (e.g. a vector tile)
+        """
+        if isinstance(data, bytes):
+            serialized = data
+        else:
+            serialized = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        etag = quote_etag(hashlib.sha256(serialized).hexdigest())
+        entry = (etag, data, headers)
+        cache.set(key, entry, timeout=SIGNALS_API_PUBLIC_GEOGRAPHY_CACHE_TTL)
+        return entry
+
+    @staticmethod
+    def is_visible(signal):
+        """
+        Is the Signal (in its current state) shown on the public map.
+        """
+        return (signal.status is not None
+                and signal.status.state not in PUBLIC_GEOGRAPHY_EXCLUDED_STATES
+                and signal.category_assignment is not None
+                and signal.category_assignment.category.is_public_accessible)
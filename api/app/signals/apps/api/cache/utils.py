@@ -0,0 +1,25 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+import hashlib
+import json
+
+
+def get_request_digest(request, params):
+    """
+    Digest of the path and of the given query parameters of the request, used in the key of cached responses.
+
+    Only the query parameters that change the response are used, so other parameters cannot be used to create new
+    cache entries. Whitespace, empty and duplicate values and the order of the parameters (and of their values) do not
+    matter.
+
+    :param request: DRF request
+    :param params: names of the query parameters the response depends on
+    """
+    normalized = []
+    for name in sorted(set(params)):
+        values = sorted({value.strip() for value in request.query_params.getlist(name)} - {''})
+        if values:
+            normalized.append((name, values))
+
+    serialized = json.dumps([request.build_absolute_uri(request.path), normalized], separators=(',', ':'))
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
@@ -1,5 +1,6 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2020 - 2021 Gemeente Amsterdam
+# Copyright (C) 2020 - 2022 Gemeente Amsterdam
+from signals.apps.api.cache import FilterChoicesCache
 from signals.apps.signals.models import (
     STADSDELEN,
     Area,
@@ -13,23 +14,28 @@ from signals.apps.signals.models import (
 )
 from signals.apps.signals.workflow import STATUS_CHOICES
 
-# Helper functions to to determine available choices used for filtering
+# Helper functions to to determine available choices used for filtering, the choices that are read from the database
+# are cached until one of the underlying models changes (see FilterChoicesCache)
 
 
+@FilterChoicesCache.cached
 def area_code_choices():
     return [(area.code, area.code) for area in Area.objects.only('code').all().distinct()]
 
 
+@FilterChoicesCache.cached
 def area_type_code_choices():
     return [(area_type.code, area_type.code) for area_type in AreaType.objects.only('code').all().distinct()]
 
 
+@FilterChoicesCache.cached
 def area_type_choices():
     return [
         ('null', 'null'),
     ] + [(c, f'{n} ({c})') for c, n in AreaType.objects.values_list('code', 'name')]
 
 
+@FilterChoicesCache.cached
 def area_choices():
     return [
         ('null', 'null'),
@@ -41,6 +47,7 @@ boolean_false_choices = [(False, 'False'), ('false', 'false'), ('False', 'False'
 boolean_choices = boolean_true_choices + boolean_false_choices
 
 
+@FilterChoicesCache.cached
 def buurt_choices():
     return [(c, f'{n} ({c})') for c, n in Buurt.objects.values_list('vollcode', 'naam')]
 
@@ -49,6 +56,7 @@ def contact_details_choices():
     return (('none', 'none'), ('email', 'email'), ('phone', 'phone'), )
 
 
+@FilterChoicesCache.cached
 def department_choices():
     return [
         ('null', 'null'),
@@ -86,6 +94,7 @@ def status_choices():
     return [(c, f'{n} ({c})') for c, n in STATUS_CHOICES]
 
 
+@FilterChoicesCache.cached
 def source_choices():
     return [(choice, f'{choice}') for choice in Source.objects.order_by('name').values_list('name', flat=True).distinct()]  # noqa
 
@@ -105,5 +114,6 @@ def _get_parent_category_queryset():
     return Category.objects.filter(parent__isnull=True)
 
 
+@FilterChoicesCache.cached
 def category_choices():
     return [(category.id, f'{category.name}') for category in Category.objects.all()]
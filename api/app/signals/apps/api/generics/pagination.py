@@ -1,9 +1,225 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2020 - 2021 Gemeente Amsterdam
+# Copyright (C) 2020 - 2022 Gemeente Amsterdam
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from datetime import datetime
+
+from datapunt_api.pagination import HALPagination
+from django.core.exceptions import ImproperlyConfigured
 from django.core.paginator import InvalidPage
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
 from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPaginationMixin:
+    """
+    Opt-in keyset (cursor) pagination for paginators that paginate on page number by default.
+
+    Requested with `?pagination=cursor`, the queryset is then paginated on the values of its active ordering (with the
+    primary key as tiebreaker) instead of with an OFFSET, so every page costs the same no matter how deep a client
+    pages. The total number of results (`COUNT(*)`) is only determined when requested with `?count=true`.
+
+    The cursor is an opaque token that encodes the ordering and the ordering values of the first or last result of
+    the current page, a cursor created for another ordering is rejected.
+
+    Note: PostgreSQL sorts NULL values last in ascending and first in descending order, the keyset conditions follow
+    that behaviour.
+    """
+    pagination_query_param = 'pagination'
+    pagination_query_value = 'cursor'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    keyset = False
+    count = None
+
+    def is_keyset_requested(self, request):
+        return request.query_params.get(self.pagination_query_param) == self.pagination_query_value
+
+    def is_count_requested(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() in ('1', 'true')
+
+    def paginate_queryset_on_keyset(self, queryset, request):
+        """
+        Returns the (unevaluated) queryset filtered on the cursor and ordered on the keyset, the caller takes the
+        page from it (one result more than the page size tells whether there is a next or previous page).
+        """
+        self.keyset = True
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self._get_keyset_ordering(queryset)
+        self.count = queryset.count() if self.is_count_requested(request) else None
+
+        direction, values = self._decode_cursor(request)
+        self.cursor_direction = direction
+        self.has_cursor = values is not None
+
+        reverse = direction == 'previous'
+        queryset = queryset.annotate(**{
+            f'keyset_{i}': F(field.lstrip('-')) for i, field in enumerate(self.ordering)
+        })
+        if values is not None:
+            queryset = queryset.filter(self._get_keyset_filter(values, reverse))
+
+        return queryset.order_by(*[
+            self._get_order_by(f'keyset_{i}', field.startswith('-') != reverse)
+            for i, field in enumerate(self.ordering)
+        ])
+
+    def set_keyset_page(self, keys):
+        """
+        Determine the cursors of the next and previous page from the ordering values of the results of the page (in
+        the order the page queryset returned them).
+        """
+        has_more = len(keys) > self.page_size
+        keys = list(keys[:self.page_size])
+        if self.cursor_direction == 'previous':
+            keys.reverse()
+
+        self.next_cursor = None
+        self.previous_cursor = None
+        if keys:
+            if self.cursor_direction == 'next':
+                has_next, has_previous = has_more, self.has_cursor
+            else:
+                has_next, has_previous = True, has_more
+
+            if has_next:
+                self.next_cursor = self._encode_cursor('next', keys[-1])
+            if has_previous:
+                self.previous_cursor = self._encode_cursor('previous', keys[0])
+        return keys
+
+    def get_keyset_page(self, queryset):
+        """
+        Evaluate the page of the keyset queryset and return its objects.
+        """
+        objects = list(queryset[:self.page_size + 1])
+        keys = [[getattr(obj, f'keyset_{i}') for i in range(len(self.ordering))] for obj in objects]
+
+        page_size = len(self.set_keyset_page(keys))
+        if self.cursor_direction == 'previous':
+            return list(reversed(objects[:page_size]))
+        return objects[:page_size]
+
+    def get_keyset_page_queryset(self, queryset):
+        """
+        The (unevaluated) page of the keyset queryset, used to aggregate the page in the database. Only the ordering
+        values of the page are fetched to determine the cursors.
+        """
+        keys = queryset.values_list(*[f'keyset_{i}' for i in range(len(self.ordering))])[:self.page_size + 1]
+        self.set_keyset_page([list(key) for key in keys])
+        return queryset[:self.page_size]
+
+    def get_keyset_links(self):
+        self_link = self.request.build_absolute_uri()
+        if self_link.endswith('.api'):
+            self_link = self_link[:-4]
+        self_link = remove_query_param(self_link, self.page_query_param)
+
+        def _link(cursor):
+            return replace_query_param(self_link, self.cursor_query_param, cursor) if cursor else None
+
+        return self_link, _link(self.next_cursor), _link(self.previous_cursor)
+
+    def _get_keyset_ordering(self, queryset):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if any(not isinstance(field, str) for field in ordering):
+            raise ImproperlyConfigured('Keyset pagination only supports ordering on field names')
+
+        pk_fields = ('id', 'pk', queryset.model._meta.pk.name)
+        for i, field in enumerate(ordering):
+            if field.lstrip('-') in pk_fields:
+                return ordering[:i + 1]  # The primary key is unique, further ordering has no effect
+
+        descending = bool(ordering) and ordering[0].startswith('-')
+        return ordering + ['-pk' if descending else 'pk']
+
+    @staticmethod
+    def _get_order_by(name, descending):
+        return F(name).desc() if descending else F(name).asc()
+
+    def _get_keyset_filter(self, values, reverse):
+        """
+        Results that come after the given ordering values, or before them when reversed.
+        """
+        conditions = Q(pk__in=[])
+        preceding_equal = Q()
+        for i, (field, value) in enumerate(zip(self.ordering, values)):
+            name = f'keyset_{i}'
+            descending = field.startswith('-') != reverse
+
+            if value is None:
+                after = Q(**{f'{name}__isnull': False}) if descending else None
+                equal = Q(**{f'{name}__isnull': True})
+            else:
+                after = Q(**{f'{name}__lt': value}) if descending else (Q(**{f'{name}__gt': value}) |
+                                                                        Q(**{f'{name}__isnull': True}))
+                equal = Q(**{name: value})
+
+            if after is not None:
+                conditions |= preceding_equal & after
+            preceding_equal &= equal
+        return conditions
+
+    def _encode_cursor(self, direction, values):
+        data = {
+            'd': direction,
+            'o': self.ordering,
+            'v': [{'dt': value.isoformat()} if isinstance(value, datetime) else value for value in values],
+        }
+        return urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode('utf-8')).decode('ascii')
+
+    def _decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return 'next', None
+
+        try:
+            data = json.loads(urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            direction, ordering, values = data['d'], data['o'], data['v']
+            values = [parse_datetime(value['dt']) if isinstance(value, dict) else value for value in values]
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if direction not in ('next', 'previous') or ordering != self.ordering or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return direction, values
+
+
+class HALKeysetPagination(KeysetPaginationMixin, HALPagination):
+    """
+    HALPagination with an opt-in keyset (cursor) mode, see KeysetPaginationMixin.
+
+    In keyset mode the response keeps the HAL format, the "count" is only present when requested.
+    """
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_keyset_requested(request):
+            return super().paginate_queryset(queryset, request, view=view)
+        return self.get_keyset_page(self.paginate_queryset_on_keyset(queryset, request))
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+
+        self_link, next_link, previous_link = self.get_keyset_links()
+        response = OrderedDict([
+            ('_links', OrderedDict([
+                ('self', dict(href=self_link)),
+                ('next', dict(href=next_link)),
+                ('previous', dict(href=previous_link)),
+            ])),
+        ])
+        if self.count is not None:
+            response['count'] = self.count
+        response['results'] = data
+        return Response(response)
 
 
 class LinkHeaderPagination(PageNumberPagination):
@@ -38,12 +254,19 @@ class LinkHeaderPagination(PageNumberPagination):
         return Response(data, headers=self.get_pagination_headers())
 
 
-class LinkHeaderPaginationForQuerysets(LinkHeaderPagination):
+class LinkHeaderPaginationForQuerysets(KeysetPaginationMixin, LinkHeaderPagination):
+    """
+    Supports the opt-in keyset (cursor) mode of KeysetPaginationMixin, the "X-Total-Count" header is then only present
+    when the count is requested.
+    """
     def paginate_queryset(self, queryset, request, view=None):
         """
         Paginate a queryset if required, either returning a
         page object, or `None` if pagination is not configured for this view.
         """
+        if self.is_keyset_requested(request):
+            return self.get_keyset_page_queryset(self.paginate_queryset_on_keyset(queryset, request))
+
         # Note copied from rest_framework.pagination.PageNumberPagination, but
         # adapted to not return a list - this is needed to paginate in DB and
         # later aggregate in DB (used for map generation).
@@ -68,3 +291,20 @@ class LinkHeaderPaginationForQuerysets(LinkHeaderPagination):
 
         self.request = request
         return self.page.object_list
+
+    def get_pagination_headers(self):
+        if not self.keyset:
+            return super().get_pagination_headers()
+
+        self_link, next_link, previous_link = self.get_keyset_links()
+
+        header_links = [f'<{self_link}>; rel="self"']
+        if next_link:
+            header_links.append(f'<{next_link}>; rel="next"')
+        if previous_link:
+            header_links.append(f'<{previous_link}>; rel="prev"')
+
+        headers = {'Link': ','.join(header_links)}
+        if self.count is not None:
+            headers['X-Total-Count'] = self.count
+        return headers
@@ -1,5 +1,5 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2019 - 2021 Gemeente Amsterdam
+# Copyright (C) 2019 - 2022 Gemeente Amsterdam
 from rest_framework import exceptions
 from rest_framework.permissions import BasePermission, DjangoModelPermissions
 
@@ -52,6 +52,16 @@ class SignalCreateInitialPermission(SIABasePermission):
     }
 
 
+class SignalPDFJobPermission(SIABasePermission):
+    # Generating PDFs does not change anything, only read permissions are needed
+    perms_map = {
+        'GET': ['signals.sia_read'],
+        'OPTIONS': [],
+        'HEAD': [],
+        'POST': ['signals.sia_read'],
+    }
+
+
 class SignalCreateNotePermission(SIABasePermission):
     perms_map = {
         'GET': ['signals.sia_read'],
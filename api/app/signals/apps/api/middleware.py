@@ -1,6 +1,7 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2018 - 2021 Gemeente Amsterdam
+# Copyright (C) 2018 - 2022 Gemeente Amsterdam
 from signals import VERSION
+from signals.apps.services.domain.permissions.signal import SignalPermissionService
 from signals.utils.version import get_version
 
 
@@ -22,3 +23,16 @@ class APIVersionHeaderMiddleware:
         response = self.get_response(request)
         response['X-API-Version'] = get_version(VERSION)
         return response
+
+
+class SignalPermissionCacheMiddleware:
+    """
+    Memoize the department ids used by the Signal permission checks for the duration of a request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with SignalPermissionService.cache_scope():
+            return self.get_response(request)
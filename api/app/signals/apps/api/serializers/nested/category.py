@@ -1,5 +1,5 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2019 - 2021 Gemeente Amsterdam
+# Copyright (C) 2019 - 2022 Gemeente Amsterdam
 from rest_framework import serializers
 
 from signals.apps.api.fields import CategoryHyperlinkedRelatedField
@@ -63,6 +63,13 @@ class _NestedCategoryModelSerializer(SIAModelSerializer):
         return super().validate(attrs=attrs)
 
     def get_departments(self, obj):
+        if hasattr(obj.category, 'responsible_category_departments'):
+            # Prefetched, see PrivateSignalViewSet.queryset
+            return ', '.join(
+                category_department.department.code for category_department in
+                obj.category.responsible_category_departments
+            )
+
         return ', '.join(
             obj.category.departments.filter(categorydepartment__is_responsible=True).values_list('code', flat=True)
         )
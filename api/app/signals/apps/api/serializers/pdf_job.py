@@ -0,0 +1,37 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+
+
+class PDFJobPostSerializer(serializers.Serializer):
+    signal_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=settings.API_PDF_JOB_MAX_SIGNALS
+    )
+
+
+class PDFJobSerializer(serializers.Serializer):
+    _links = serializers.SerializerMethodField()
+    id = serializers.CharField()
+    status = serializers.CharField()
+    signal_ids = serializers.ListField(child=serializers.IntegerField())
+
+    class Meta:
+        fields = (
+            '_links',
+            'id',
+            'status',
+            'signal_ids',
+        )
+
+    def get__links(self, obj):
+        request = self.context.get('request')
+        links = {'self': {'href': reverse('private-signals-pdf-job', kwargs={'job_id': obj['id']}, request=request)}}
+        if obj['status'] == 'done':
+            links['download'] = {
+                'href': reverse('private-signals-pdf-job-download', kwargs={'job_id': obj['id']}, request=request)
+            }
+        return links
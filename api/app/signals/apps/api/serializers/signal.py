@@ -216,6 +216,8 @@ class PrivateSignalSerializerDetail(HALSerializer, AddressValidationMixin):
         )
 
     def get_has_attachments(self, obj):
+        if hasattr(obj, 'attachments_exist'):
+            return obj.attachments_exist  # Annotated, see SignalQuerySet.annotate_serializer_fields
         return obj.attachments.exists()
 
     def update(self, instance, validated_data): # noqa
@@ -398,12 +400,16 @@ class PrivateSignalSerializerList(SignalValidationMixin, HALSerializer):
         }
 
     def get_has_attachments(self, obj):
+        if hasattr(obj, 'attachments_exist'):
+            return obj.attachments_exist  # Annotated, see SignalQuerySet.annotate_serializer_fields
         return obj.attachments.exists()
 
     def get_has_parent(self, obj):
         return obj.parent_id is not None  # True is a parent_id is set, False if not
 
     def get_has_children(self, obj):
+        if hasattr(obj, 'children_exist'):
+            return obj.children_exist  # Annotated, see SignalQuerySet.annotate_serializer_fields
         return obj.children.exists()
 
     def validate(self, attrs):  # noqa C901
@@ -721,4 +727,7 @@ class AbridgedChildSignalSerializer(HALSerializer):
         }
 
     def get_can_view_signal(self, obj):
+        if 'visible_signal_ids' in self.context:
+            # Determined for all Signals at once by the view, with Signal.objects.filter_for_user
+            return obj.pk in self.context['visible_signal_ids']
         return Signal.objects.filter(pk=obj.pk).filter_for_user(self.context['request'].user).exists()
@@ -1,16 +1,12 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2021 Gemeente Amsterdam
+# Copyright (C) 2021 - 2022 Gemeente Amsterdam
 from datapunt_api.rest import HALSerializer
-from django.contrib.gis.db.models.functions import Distance
-from django.db.models import Q
-from django.utils import timezone
 from rest_framework import serializers
 from rest_framework_gis.fields import GeometryField
 from rest_framework_gis.serializers import GeoFeatureModelSerializer
 
-from signals.apps.api import app_settings
 from signals.apps.api.fields import PrivateSignalWithContextLinksField
-from signals.apps.signals import workflow
+from signals.apps.services.domain.signal_context import SignalContextService
 from signals.apps.signals.models import Signal
 
 
@@ -34,11 +30,17 @@ class SignalContextReporterSerializer(serializers.ModelSerializer):
         )
 
     def get_category(self, obj):
-        departments = ', '.join(
-            obj.category_assignment.category.departments.filter(
-                categorydepartment__is_responsible=True
-            ).values_list('code', flat=True)
-        )
+        category = obj.category_assignment.category
+        if hasattr(category, 'responsible_category_departments'):
+            # Prefetched, see SignalContextViewSet.reporter
+            departments = ', '.join(
+                category_department.department.code for category_department in
+                category.responsible_category_departments
+            )
+        else:
+            departments = ', '.join(
+                category.departments.filter(categorydepartment__is_responsible=True).values_list('code', flat=True)
+            )
         return {
             'sub': obj.category_assignment.category.name,
             'sub_slug': obj.category_assignment.category.slug,
@@ -59,9 +61,14 @@ class SignalContextReporterSerializer(serializers.ModelSerializer):
             return {'is_satisfied': latest_feedback.is_satisfied, 'submitted_at': latest_feedback.submitted_at, }
 
     def get_can_view_signal(self, obj):
+        if 'visible_signal_ids' in self.context:
+            # Determined for all Signals at once by the view, with Signal.objects.filter_for_user
+            return obj.pk in self.context['visible_signal_ids']
         return Signal.objects.filter(pk=obj.pk).filter_for_user(self.context['request'].user).exists()
 
     def get_has_children(self, obj):
+        if hasattr(obj, 'children_exist'):
+            return obj.children_exist
         return obj.children.exists()
 
 
@@ -82,43 +89,14 @@ class SignalContextSerializer(HALSerializer):
     def get_near(self, obj):
         if not obj.location:
             return []
-        signals_for_geography_qs = Signal.objects.annotate(
-            distance_from_point=Distance('location__geometrie', obj.location.geometrie),
-        ).filter(
-            (Q(parent__isnull=True) & Q(children__isnull=True)) | Q(parent__isnull=False),
-            distance_from_point__lte=app_settings.SIGNAL_CONTEXT_GEOGRAPHY_RADIUS,
-            category_assignment__category_id=obj.category_assignment.category.pk,
-            created_at__gte=(
-                timezone.now() - timezone.timedelta(weeks=app_settings.SIGNAL_CONTEXT_GEOGRAPHY_CREATED_DELTA_WEEKS)
-            ),
-        ).exclude(pk=obj.pk)
-
         return {
-            'signal_count': signals_for_geography_qs.count(),
+            'signal_count': SignalContextService.get_near_queryset(obj).count(),
         }
 
     def get_reporter(self, obj):
         if not obj.location or not obj.reporter.email:
             return None
-
-        reporter_email = obj.reporter.email
-
-        signals_for_reporter_count = Signal.objects.filter_reporter(
-            email=reporter_email
-        ).filter(parent__isnull=True).count()
-        open_signals_for_reporter_count = Signal.objects.filter_reporter(email=reporter_email).exclude(
-            status__state__in=[workflow.GEANNULEERD, workflow.AFGEHANDELD, workflow.GESPLITST]
-        ).filter(parent__isnull=True).count()
-        # Not filtering parent__isnull=True, as feedback is not requested for child signals.
-        satisfied_count = Signal.objects.reporter_feedback_satisfied_count(email=reporter_email)
-        not_satisfied_count = Signal.objects.reporter_feedback_not_satisfied_count(email=reporter_email)
-
-        return {
-            'signal_count': signals_for_reporter_count,
-            'open_count': open_signals_for_reporter_count,
-            'positive_count': satisfied_count,
-            'negative_count': not_satisfied_count,
-        }
+        return SignalContextService.get_reporter_statistics(obj.reporter.email)
 
 
 class SignalContextGeoSerializer(GeoFeatureModelSerializer):
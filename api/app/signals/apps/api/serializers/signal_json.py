@@ -0,0 +1,259 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+Builds the representation of PrivateSignalSerializerList in the database, see PrivateSignalViewSet.list.
+
+The result has the same shape and values as the serializer (apart from the precision of the coordinates of the
+location), the keys keep the order of the serializer. The links are built from URLs reversed once per request.
+"""
+import json
+import uuid
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.db.models import (
+    BooleanField,
+    Case,
+    CharField,
+    Exists,
+    ExpressionWrapper,
+    F,
+    JSONField,
+    OuterRef,
+    Q,
+    Subquery,
+    TextField,
+    Value,
+    When
+)
+from django.db.models.functions import Cast, Coalesce, Concat
+from django.utils import timezone
+from rest_framework.reverse import reverse
+
+from signals.apps.feedback.models import Feedback
+from signals.apps.signals import workflow
+from signals.apps.signals.models import (
+    Attachment,
+    CategoryDepartment,
+    Note,
+    Signal,
+    SignalDepartments
+)
+from signals.apps.signals.models.aggregates.json_array_agg import JSONArrayAgg
+from signals.apps.signals.models.functions.asgeojson import AsGeoJSON
+from signals.apps.signals.models.functions.isoformat import ISOFormat
+from signals.apps.signals.models.functions.json_build_object import JSONBuildObject
+
+# Used when the json_agg of a subquery has no rows
+EMPTY_JSON_ARRAY_TEMPLATE = "COALESCE((%(subquery)s), '[]'::json)"
+
+
+class PrivateSignalListJSONBuilder:
+    def __init__(self, request):
+        self.request = request
+        self.tz_name = timezone.get_current_timezone_name()
+        self.can_view_contact_details = request.user.has_perm('signals.sia_can_view_contact_details')
+
+    def get_representations(self, signal_ids):
+        """
+        The representations of the given Signals in the given order, in a single query.
+        """
+        representations = dict(Signal.objects.filter(pk__in=signal_ids).annotate(
+            representation=Cast(self.get_expression(), output_field=TextField())
+        ).values_list('pk', 'representation'))
+        return [
+            self.to_representation(representations[signal_id]) for signal_id in signal_ids
+            if signal_id in representations  # Deleted in the meantime
+        ]
+
+    def to_representation(self, representation):
+        """
+        Fields without a value are left out by the serializer, the database can only set them to null.
+        """
+        data = json.loads(representation)
+        if data['directing_departments'] is None:
+            del data['directing_departments']
+        if data['category'] is not None and data['category']['main'] is None:
+            del data['category']['main']
+            del data['category']['main_slug']
+        return data
+
+    def get_expression(self):
+        return JSONBuildObject(
+            _links=JSONBuildObject(
+                self=JSONBuildObject(href=self._url('private-signals-detail', pk=Cast('pk', TextField()))),
+            ),
+            _display=Concat(
+                Cast('pk', TextField()),
+                Value(' - '),
+                Case(When(status__isnull=True, then=Value('')), default=Coalesce('status__state', Value('None'))),
+                Value(' - '),
+                Case(When(location__isnull=True, then=Value('')),
+                     default=Coalesce('location__buurt_code', Value('None'))),
+                Value(' - '),
+                ISOFormat('created_at', self.tz_name),
+                output_field=TextField()
+            ),
+            id='pk',
+            id_display=Concat(Value(settings.SIGNAL_ID_DISPLAY_PREFIX or ''), Cast('pk', TextField()),
+                              output_field=TextField()),
+            signal_id='uuid',
+            source='source',
+            text='text',
+            text_extra='text_extra',
+            status=self._nullable('status', self._status()),
+            location=self._nullable('location', self._location()),
+            category=self._nullable('category_assignment', self._category()),
+            reporter=self._nullable('reporter', self._reporter()),
+            priority=self._nullable('priority', JSONBuildObject(
+                priority='priority__priority',
+                created_by='priority__created_by',
+            )),
+            type=self._nullable('type_assignment', JSONBuildObject(
+                code='type_assignment__name',
+                created_at=self._datetime('type_assignment__created_at'),
+                created_by='type_assignment__created_by',
+            )),
+            created_at=self._datetime('created_at'),
+            updated_at=self._datetime('updated_at'),
+            incident_date_start=self._datetime('incident_date_start'),
+            incident_date_end=self._datetime('incident_date_end'),
+            operational_date=self._datetime('operational_date'),
+            has_attachments=Exists(Attachment.objects.filter(_signal_id=OuterRef('pk'))),
+            extra_properties='extra_properties',
+            notes=Subquery(Note.objects.filter(
+                _signal_id=OuterRef('pk')
+            ).order_by().values('_signal_id').annotate(
+                notes=JSONArrayAgg(JSONBuildObject(text='text', created_by='created_by'), ordering=('-created_at', ))
+            ).values('notes'), template=EMPTY_JSON_ARRAY_TEMPLATE, output_field=JSONField()),
+            directing_departments=self._nullable('directing_departments_assignment',
+                                                 self._departments('directing_departments_assignment_id')),
+            routing_departments=self._nullable('routing_assignment', self._departments('routing_assignment_id')),
+            has_parent=ExpressionWrapper(Q(parent__isnull=False), output_field=BooleanField()),
+            has_children=Exists(Signal.objects.filter(parent_id=OuterRef('pk'))),
+            assigned_user_email='user_assignment__user__email',
+        )
+
+    def _url(self, viewname, **kwargs):
+        """
+        The URL of the view with the given kwargs as expressions, the URL is reversed once with placeholders.
+        """
+        placeholders = {name: uuid.uuid4().hex for name in kwargs}
+        url = reverse(viewname, kwargs=placeholders, request=self.request)
+
+        parts = []
+        for name, placeholder in sorted(placeholders.items(), key=lambda item: url.index(item[1])):
+            prefix, url = url.split(placeholder, 1)
+            parts.extend((Value(prefix), kwargs[name]))
+        parts.append(Value(url))
+        return Concat(*parts, output_field=TextField())
+
+    def _datetime(self, field):
+        return ISOFormat(field, self.tz_name, utc_z=True)
+
+    @staticmethod
+    def _nullable(relation, expression):
+        return Case(When(**{f'{relation}__isnull': True}, then=Value(None)), default=expression,
+                    output_field=JSONField())
+
+    def _status(self):
+        return JSONBuildObject(
+            text='status__text',
+            user='status__user',
+            state='status__state',
+            state_display=Case(
+                *[When(status__state=value, then=Value(str(label))) for value, label in workflow.STATUS_CHOICES],
+                default=F('status__state'),
+                output_field=CharField()
+            ),
+            target_api='status__target_api',
+            extra_properties='status__extra_properties',
+            send_email='status__send_email',
+            created_at=self._datetime('status__created_at'),
+        )
+
+    def _location(self):
+        return JSONBuildObject(
+            id='location__id',
+            stadsdeel='location__stadsdeel',
+            buurt_code='location__buurt_code',
+            area_type_code='location__area_type_code',
+            area_code='location__area_code',
+            area_name='location__area_name',
+            address='location__address',
+            address_text='location__address_text',
+            geometrie=AsGeoJSON('location__geometrie'),
+            extra_properties='location__extra_properties',
+            created_by='location__created_by',
+            bag_validated='location__bag_validated',
+        )
+
+    def _category(self):
+        category_url = Case(
+            When(category_assignment__category__parent__isnull=True, then=self._url(
+                'public-maincategory-detail',
+                slug=F('category_assignment__category__slug')
+            )),
+            default=self._url(
+                'public-subcategory-detail',
+                parent_lookup_parent__slug=F('category_assignment__category__parent__slug'),
+                slug=F('category_assignment__category__slug')
+            ),
+            output_field=TextField()
+        )
+        departments = Subquery(CategoryDepartment.objects.filter(
+            category_id=OuterRef('category_assignment__category_id'), is_responsible=True
+        ).order_by().values('category_id').annotate(
+            codes=StringAgg('department__code', delimiter=', ', ordering=('department__name', ))
+        ).values('codes'), output_field=TextField())
+
+        return JSONBuildObject(
+            sub='category_assignment__category__name',
+            sub_slug='category_assignment__category__slug',
+            main='category_assignment__category__parent__name',
+            main_slug='category_assignment__category__parent__slug',
+            category_url=category_url,
+            departments=Coalesce(departments, Value(''), output_field=TextField()),
+            created_by='category_assignment__created_by',
+            text='category_assignment__text',
+            deadline=self._datetime('category_assignment__deadline'),
+            deadline_factor_3=self._datetime('category_assignment__deadline_factor_3'),
+        )
+
+    def _reporter(self):
+        if self.can_view_contact_details:
+            email, phone = Coalesce('reporter__email', Value('')), Coalesce('reporter__phone', Value(''))
+        else:
+            email, phone = [
+                Case(When(Q(**{f'{field}__isnull': True}) | Q(**{field: ''}), then=Value('')), default=Value('*****'),
+                     output_field=CharField())
+                for field in ('reporter__email', 'reporter__phone')
+            ]
+
+        if settings.FEATURE_FLAGS.get('REPORTER_MAIL_CONTACT_FEEDBACK_ALLOWS_CONTACT_ENABLED', True):
+            # See Signal.allows_contact, of the Signal of the reporter
+            allows_contact = Coalesce(Subquery(Feedback.objects.filter(
+                _signal_id=OuterRef('reporter___signal_id'), submitted_at__isnull=False
+            ).order_by('-submitted_at').values('allows_contact')[:1]), Value(True), output_field=BooleanField())
+        else:
+            allows_contact = Value(True, output_field=BooleanField())
+
+        return JSONBuildObject(
+            email=email,
+            phone=phone,
+            sharing_allowed='reporter__sharing_allowed',
+            allows_contact=allows_contact,
+        )
+
+    @staticmethod
+    def _departments(assignment_field):
+        return Subquery(SignalDepartments.departments.through.objects.filter(
+            signaldepartments_id=OuterRef(assignment_field)
+        ).order_by().values('signaldepartments_id').annotate(
+            departments=JSONArrayAgg(JSONBuildObject(
+                id='department_id',
+                code='department__code',
+                name='department__name',
+                is_intern='department__is_intern',
+            ), ordering=('department__name', ))
+        ).values('departments'), template=EMPTY_JSON_ARRAY_TEMPLATE, output_field=JSONField())
@@ -0,0 +1,59 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from signals.apps.api.cache import FilterChoicesCache, PublicGeographyCache
+from signals.apps.api.cache.public_geography import PUBLIC_GEOGRAPHY_EXCLUDED_STATES
+from signals.apps.signals.managers import update_category_assignment, update_location, update_status
+from signals.apps.signals.models import Area, AreaType, Buurt, Category, Department, Signal, Source
+
+
+@receiver(update_status, dispatch_uid='api_public_geography_update_status')
+def public_geography_update_status_handler(sender, signal_obj, status, prev_status, **kwargs):
+    # Only a status change from or to one of the excluded states changes the public map
+    was_excluded = prev_status is None or prev_status.state in PUBLIC_GEOGRAPHY_EXCLUDED_STATES
+    if was_excluded != (status.state in PUBLIC_GEOGRAPHY_EXCLUDED_STATES):
+        PublicGeographyCache.invalidate()
+
+
+@receiver(update_category_assignment, dispatch_uid='api_public_geography_update_category_assignment')
+def public_geography_update_category_assignment_handler(sender, signal_obj, **kwargs):
+    PublicGeographyCache.invalidate()
+
+
+@receiver(update_location, dispatch_uid='api_public_geography_update_location')
+def public_geography_update_location_handler(sender, signal_obj, **kwargs):
+    if PublicGeographyCache.is_visible(signal_obj):
+        PublicGeographyCache.invalidate()
+
+
+def _invalidate_now_and_on_commit():
+    # Invalidate right away and again after the commit, so other processes cannot cache the uncommitted state
+    PublicGeographyCache.invalidate()
+    transaction.on_commit(PublicGeographyCache.invalidate)
+
+
+@receiver(post_save, sender=Signal, dispatch_uid='api_public_geography_signal_created')
+def public_geography_signal_created_handler(sender, instance, created, **kwargs):
+    if created:
+        _invalidate_now_and_on_commit()
+
+
+@receiver(post_delete, sender=Signal, dispatch_uid='api_public_geography_signal_deleted')
+@receiver([post_save, post_delete], sender=Category, dispatch_uid='api_public_geography_category_changed')
+def public_geography_invalidate_handler(sender, instance, **kwargs):
+    _invalidate_now_and_on_commit()
+
+
+@receiver([post_save, post_delete], sender=Area, dispatch_uid='api_filter_choices_area_changed')
+@receiver([post_save, post_delete], sender=AreaType, dispatch_uid='api_filter_choices_area_type_changed')
+@receiver([post_save, post_delete], sender=Buurt, dispatch_uid='api_filter_choices_buurt_changed')
+@receiver([post_save, post_delete], sender=Category, dispatch_uid='api_filter_choices_category_changed')
+@receiver([post_save, post_delete], sender=Department, dispatch_uid='api_filter_choices_department_changed')
+@receiver([post_save, post_delete], sender=Source, dispatch_uid='api_filter_choices_source_changed')
+def filter_choices_invalidate_handler(sender, instance, **kwargs):
+    # Invalidate right away and again after the commit, so other processes cannot cache the uncommitted state
+    FilterChoicesCache.invalidate()
+    transaction.on_commit(FilterChoicesCache.invalidate)
@@ -0,0 +1,114 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from django.test import TestCase
+from django.utils import timezone
+from freezegun import freeze_time
+from requests.exceptions import ConnectionError
+from requests_mock.mocker import Mocker
+
+from signals.apps.api.app_settings import (
+    SIGNALS_API_ADDRESS_CACHE_NEGATIVE_TTL,
+    SIGNALS_API_ADDRESS_CACHE_TTL
+)
+from signals.apps.api.validation.address.cache import AddressGeocodeService
+from signals.apps.api.validation.address.pdok import PDOKAddressValidation
+from signals.apps.signals.models import AddressCache
+
+
+def _pdok_response(straatnaam, huisnummer, lon, lat):
+    # Same format as the PDOK stand-in in the "msb" folder of this project
+    return {'response': {'numFound': 1, 'start': 0, 'docs': [{
+        'bron': 'BAG',
+        'type': 'adres',
+        'straatnaam': straatnaam,
+        'huisnummer': huisnummer,
+        'postcode': '3011AD',
+        'woonplaatsnaam': 'Rotterdam',
+        'centroide_ll': f'POINT({lon} {lat})',
+    }]}}
+
+
+@Mocker()
+class TestAddressGeocodeService(TestCase):
+    url = PDOKAddressValidation.address_validation_url
+    coolsingel = {'openbare_ruimte': 'COOLSINGEL', 'huisnummer': '4', 'woonplaats': 'Rotterdam'}
+    unknown = {'openbare_ruimte': 'Onbekende straat', 'huisnummer': '1', 'woonplaats': 'Rotterdam'}
+
+    def setUp(self):
+        AddressGeocodeService.lru.clear()
+        self.addCleanup(AddressGeocodeService.lru.clear)
+
+    def _register(self, mocker):
+        mocker.get(self.url, json={'response': {'numFound': 0, 'start': 0, 'docs': []}})
+        mocker.get(f'{self.url}?q=COOLSINGEL+4', json=_pdok_response('Coolsingel', 4, 4.4787, 51.9237))
+
+    def test_normalize(self, mocker):
+        self.assertEqual(
+            AddressGeocodeService.cache_key(AddressGeocodeService.normalize(self.coolsingel)),
+            AddressGeocodeService.cache_key(AddressGeocodeService.normalize(
+                {'openbare_ruimte': ' Coolsingel ', 'huisnummer': 4, 'woonplaats': 'ROTTERDAM'})),
+        )
+
+    def test_geocode_deduplicates_batch(self, mocker):
+        self._register(mocker)
+
+        results = AddressGeocodeService.geocode([self.coolsingel, self.unknown, dict(self.coolsingel)] * 10)
+
+        self.assertEqual(mocker.call_count, 2)
+        self.assertEqual(len(results), 30)
+        self.assertEqual(results[0]['address']['openbare_ruimte'], 'Coolsingel')
+        self.assertEqual(results[0]['geometrie'], [4.4787, 51.9237])
+        self.assertIsNone(results[1])
+        self.assertEqual(results[2], results[0])
+        self.assertEqual(AddressCache.objects.count(), 2)
+
+    def test_geocode_in_memory_cache(self, mocker):
+        self._register(mocker)
+        AddressGeocodeService.geocode([self.coolsingel, self.unknown])
+
+        with self.assertNumQueries(0):
+            results = AddressGeocodeService.geocode([self.coolsingel, self.unknown])
+
+        self.assertEqual(mocker.call_count, 2)
+        self.assertEqual(results[0]['address']['openbare_ruimte'], 'Coolsingel')
+        self.assertIsNone(results[1])
+
+    def test_geocode_database_cache(self, mocker):
+        self._register(mocker)
+        AddressGeocodeService.geocode([self.coolsingel, self.unknown])
+        AddressGeocodeService.lru.clear()  # e.g. another process
+
+        with self.assertNumQueries(1):
+            results = AddressGeocodeService.geocode([self.coolsingel, self.unknown])
+
+        self.assertEqual(mocker.call_count, 2)
+        self.assertEqual(results[0]['address']['openbare_ruimte'], 'Coolsingel')
+        self.assertIsNone(results[1])
+
+    def test_geocode_ttl(self, mocker):
+        self._register(mocker)
+        now = timezone.now()
+        with freeze_time(now):
+            AddressGeocodeService.geocode([self.coolsingel, self.unknown])
+
+        # The negative entry expires first
+        with freeze_time(now + timezone.timedelta(seconds=SIGNALS_API_ADDRESS_CACHE_NEGATIVE_TTL + 1)):
+            AddressGeocodeService.geocode([self.coolsingel, self.unknown])
+        self.assertEqual(mocker.call_count, 3)
+
+        with freeze_time(now + timezone.timedelta(seconds=SIGNALS_API_ADDRESS_CACHE_TTL + 1)):
+            AddressGeocodeService.geocode([self.coolsingel, self.unknown])
+        self.assertEqual(mocker.call_count, 5)
+        self.assertEqual(AddressCache.objects.count(), 2)
+
+    def test_geocode_unavailable_is_not_cached(self, mocker):
+        mocker.get(self.url, exc=ConnectionError)
+
+        results = AddressGeocodeService.geocode([self.coolsingel])
+
+        self.assertEqual(results, [None])
+        self.assertEqual(AddressCache.objects.count(), 0)
+
+        self._register(mocker)
+        results = AddressGeocodeService.geocode([self.coolsingel])
+        self.assertEqual(results[0]['address']['openbare_ruimte'], 'Coolsingel')
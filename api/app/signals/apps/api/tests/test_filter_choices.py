@@ -0,0 +1,113 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+import re
+from time import monotonic
+from unittest import mock
+
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from signals.apps.api.cache import FilterChoicesCache
+from signals.apps.api.cache.filter_choices import FILTER_CHOICES_TIMEOUT
+from signals.apps.api.filters.utils import (
+    area_choices,
+    category_choices,
+    department_choices,
+    source_choices
+)
+from signals.apps.signals.factories import (
+    AreaFactory,
+    CategoryFactory,
+    DepartmentFactory,
+    SignalFactory,
+    SourceFactory
+)
+from signals.apps.signals.models import Source
+from signals.test.utils import SIAReadWriteUserMixin, SignalsBaseApiTestCase
+
+# A select of a whole table that choices are built from
+CHOICES_QUERY_PATTERN = re.compile(
+    r'FROM "(signals_area|signals_areatype|buurt_simple|signals_category|signals_department|signals_source)"'
+    r'(?!.*\bWHERE\b)'
+)
+
+
+class TestFilterChoicesCache(TestCase):
+    def setUp(self):
+        self.addCleanup(FilterChoicesCache.invalidate)
+
+    def test_cached(self):
+        CategoryFactory.create()
+        DepartmentFactory.create()
+        expected = category_choices()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(category_choices(), expected)
+
+    def test_timeout(self):
+        choices = source_choices()
+
+        # Created without sending signals, like a change made by another process that does not share the Django cache
+        Source.objects.bulk_create([Source(name='Bron A'), Source(name='Bron B')])
+        self.assertEqual(source_choices(), choices)
+
+        later = monotonic() + FILTER_CHOICES_TIMEOUT + 1
+        with mock.patch('signals.apps.api.cache.filter_choices.monotonic', return_value=later):
+            self.assertEqual(len(source_choices()), len(choices) + 2)
+
+    def test_copy(self):
+        department_choices().append(('changed', 'changed'))
+
+        self.assertNotIn(('changed', 'changed'), department_choices())
+
+    def test_invalidated_on_save_and_delete(self):
+        area = AreaFactory.create()
+        self.assertIn(area.code, [code for code, _ in area_choices()])
+
+        area.delete()
+        self.assertNotIn(area.code, [code for code, _ in area_choices()])
+
+        source = SourceFactory.create()
+        self.assertIn(source.name, [name for name, _ in source_choices()])
+
+        department = DepartmentFactory.create()
+        self.assertIn(department.code, [code for code, _ in department_choices()])
+
+        department.code = 'NEW'
+        department.save()
+        self.assertIn('NEW', [code for code, _ in department_choices()])
+
+
+class TestFilterChoicesQueryCount(SIAReadWriteUserMixin, SignalsBaseApiTestCase):
+    list_endpoint = '/signals/v1/private/signals/'
+
+    def setUp(self):
+        self.addCleanup(FilterChoicesCache.invalidate)
+
+        SourceFactory.create(name='online')
+        SignalFactory.create_batch(2)
+        self.sia_read_write_user.user_permissions.add(Permission.objects.get(codename='sia_can_view_all_categories'))
+        self.client.force_authenticate(user=self.sia_read_write_user)
+
+    def _get(self, params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.list_endpoint, params)
+        self.assertEqual(response.status_code, 200)
+        return context.captured_queries
+
+    def test_list_query_count(self):
+        params = {'area_code': 'null', 'directing_department': 'null', 'source': 'online', 'page_size': 10}
+        self._get(params)  # Warm the choices cache
+
+        queries = self._get(params)
+        self.assertEqual([query['sql'] for query in queries if CHOICES_QUERY_PATTERN.search(query['sql'])], [])
+
+        # The number of queries per request does not change with the number of choices
+        AreaFactory.create_batch(5)
+        DepartmentFactory.create_batch(5)
+        SourceFactory.create_batch(5)
+        self._get(params)
+
+        self.assertEqual(len(self._get(params)), len(queries))
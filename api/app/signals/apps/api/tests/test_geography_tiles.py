@@ -0,0 +1,84 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from django.contrib.auth.models import Permission
+from django.contrib.gis.geos import Point
+
+from signals.apps.services.domain.mvt import MVTService
+from signals.apps.signals.factories import CategoryFactory, ParentCategoryFactory, SignalFactory
+from signals.apps.signals.tests.valid_locations import STADHUIS
+from signals.apps.signals.workflow import AFGEHANDELD
+from signals.test.utils import SIAReadWriteUserMixin, SignalsBaseApiTestCase
+
+
+class TestGeographyTiles(SIAReadWriteUserMixin, SignalsBaseApiTestCase):
+    private_endpoint = '/signals/v1/private/signals/geography/tiles/{}/{}/{}.mvt'
+    public_endpoint = '/signals/v1/public/signals/geography/tiles/{}/{}/{}.mvt'
+
+    def setUp(self):
+        parent_category = ParentCategoryFactory.create()
+        self.category = CategoryFactory.create(parent=parent_category, is_public_accessible=True)
+        self.signal = SignalFactory.create(location__geometrie=Point(STADHUIS['lon'], STADHUIS['lat']),
+                                           location__buurt_code=STADHUIS['buurt_code'],
+                                           category_assignment__category=self.category)
+
+        self.sia_read_write_user.user_permissions.add(Permission.objects.get(codename='sia_can_view_all_categories'))
+
+    def _tile_url(self, endpoint, z, lon=STADHUIS['lon'], lat=STADHUIS['lat']):
+        return endpoint.format(*MVTService.get_tile_for_point(lon, lat, z))
+
+    def test_private_tiles(self):
+        self.client.force_authenticate(user=self.sia_read_write_user)
+
+        for z in (10, 17):  # Clustered and individual features
+            response = self.client.get(self._tile_url(self.private_endpoint, z))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], MVTService.content_type)
+            self.assertTrue(response.content)
+
+        # A tile on the other side of the world
+        url = self._tile_url(self.private_endpoint, 17, lon=-STADHUIS['lon'], lat=-STADHUIS['lat'])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+
+    def test_private_tiles_filters(self):
+        self.client.force_authenticate(user=self.sia_read_write_user)
+        url = self._tile_url(self.private_endpoint, 17)
+
+        response = self.client.get(f'{url}?status={AFGEHANDELD}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+
+    def test_private_tiles_unauthenticated(self):
+        response = self.client.get(self._tile_url(self.private_endpoint, 17))
+        self.assertEqual(response.status_code, 401)
+
+    def test_invalid_tile(self):
+        self.client.force_authenticate(user=self.sia_read_write_user)
+
+        self.assertEqual(self.client.get(self.private_endpoint.format(2, 4, 0)).status_code, 404)
+        self.assertEqual(self.client.get(self.public_endpoint.format(2, 4, 0)).status_code, 404)
+
+    def test_public_tiles(self):
+        for z in (10, 17):
+            response = self.client.get(self._tile_url(self.public_endpoint, z))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], MVTService.content_type)
+            self.assertTrue(response.content)
+
+    def test_public_tiles_exclude_non_public_categories(self):
+        self.category.is_public_accessible = False
+        self.category.save()
+
+        response = self.client.get(self._tile_url(self.public_endpoint, 17))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+
+    def test_public_tiles_etag(self):
+        url = self._tile_url(self.public_endpoint, 17)
+
+        response = self.client.get(url)
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
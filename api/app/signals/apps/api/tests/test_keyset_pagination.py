@@ -0,0 +1,119 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from freezegun import freeze_time
+
+from signals.apps.signals.factories import SignalFactoryValidLocation
+from signals.test.utils import SIAReadWriteUserMixin, SignalsBaseApiTestCase
+
+
+class TestPrivateSignalKeysetPagination(SIAReadWriteUserMixin, SignalsBaseApiTestCase):
+    list_endpoint = '/signals/v1/private/signals/'
+    geo_list_endpoint = '/signals/v1/private/signals/geography'
+
+    def setUp(self):
+        now = timezone.now()
+        self.signals = []
+        for i in range(5):
+            with freeze_time(now - timezone.timedelta(hours=i)):
+                self.signals.append(SignalFactoryValidLocation.create(user_assignment=None))
+        # Two Signals with the same created_at, the primary key breaks the tie
+        with freeze_time(now - timezone.timedelta(hours=2)):
+            self.signals.append(SignalFactoryValidLocation.create(user_assignment=None))
+
+        self.sia_read_write_user.user_permissions.add(Permission.objects.get(codename='sia_can_view_all_categories'))
+        self.client.force_authenticate(user=self.sia_read_write_user)
+
+    def _walk(self, url, reverse=False):
+        """
+        Follow the next (or previous) links, returns the ids of the results per page.
+        """
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            pages.append([result['id'] for result in data['results']])
+            url = data['_links']['previous' if reverse else 'next']['href']
+        return pages, data
+
+    def test_walk_all_pages(self):
+        pages, _ = self._walk(f'{self.list_endpoint}?pagination=cursor&page_size=2')
+
+        expected = [signal.id for signal in sorted(self.signals, key=lambda s: (s.created_at, s.id), reverse=True)]
+        self.assertEqual([len(page) for page in pages], [2, 2, 2])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_walk_back(self):
+        forward, last_page = self._walk(f'{self.list_endpoint}?pagination=cursor&page_size=2')
+        backward, _ = self._walk(last_page['_links']['self']['href'], reverse=True)
+
+        self.assertEqual(backward, list(reversed(forward)))
+
+    def test_ordering(self):
+        # Every Signal exactly once, also when ordering on fields with duplicate or NULL values
+        expected = sorted(signal.id for signal in self.signals)
+        for ordering in ('id', '-id', 'created_at', 'address', 'assigned_user_email', '-assigned_user_email'):
+            pages, _ = self._walk(f'{self.list_endpoint}?ordering={ordering}&pagination=cursor&page_size=4')
+            self.assertEqual(sorted(sum(pages, [])), expected, ordering)
+
+        pages, _ = self._walk(f'{self.list_endpoint}?ordering=-id&pagination=cursor&page_size=4')
+        self.assertEqual(sum(pages, []), list(reversed(expected)))
+
+    def test_count_only_when_requested(self):
+        response = self.client.get(f'{self.list_endpoint}?pagination=cursor&page_size=2')
+        self.assertNotIn('count', response.json())
+
+        response = self.client.get(f'{self.list_endpoint}?pagination=cursor&page_size=2&count=true')
+        self.assertEqual(response.json()['count'], len(self.signals))
+
+    def test_no_count_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'{self.list_endpoint}?pagination=cursor&page_size=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([query for query in queries if 'COUNT(' in query['sql'].upper()])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(f'{self.list_endpoint}?pagination=cursor&cursor=invalid')
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_for_other_ordering(self):
+        response = self.client.get(f'{self.list_endpoint}?pagination=cursor&page_size=2')
+        next_link = response.json()['_links']['next']['href']
+
+        response = self.client.get(f'{next_link}&ordering=id')
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_number_pagination_unchanged(self):
+        response = self.client.get(f'{self.list_endpoint}?page_size=2&page=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], len(self.signals))
+
+    def test_geography(self):
+        url = f'{self.geo_list_endpoint}?pagination=cursor&page_size=4'
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['features']), 4)
+        self.assertFalse(response.has_header('X-Total-Count'))
+
+        links = dict(
+            (rel.strip()[5:-1], link.strip()[1:-1]) for link, rel in
+            (link.split(';') for link in response['Link'].split(','))
+        )
+        self.assertIn('next', links)
+        self.assertNotIn('prev', links)
+
+        response = self.client.get(f'{links["next"]}&count=true')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['features']), 2)
+        self.assertEqual(response['X-Total-Count'], str(len(self.signals)))
+        self.assertNotIn('rel="next"', response['Link'])
+        self.assertIn('rel="prev"', response['Link'])
+
+        ids = {feature['properties']['id'] for feature in response.json()['features']}
+        first_page = self.client.get(url).json()['features']
+        self.assertFalse(ids & {feature['properties']['id'] for feature in first_page})
@@ -1,9 +1,12 @@
 # SPDX-License-Identifier: MPL-2.0
 # Copyright (C) 2018 - 2022 Gemeente Amsterdam
+from unittest import mock
 
 from django.contrib.auth.models import Permission
 
+from signals.apps.services.domain.pdf_jobs import PDFSummaryJobService
 from signals.apps.signals.factories import CategoryFactory, DepartmentFactory, SignalFactory
+from signals.apps.users.factories import UserFactory
 from signals.test.utils import SIAReadWriteUserMixin, SignalsBaseApiTestCase
 
 
@@ -68,3 +71,71 @@ class TestPDFPermissions(SIAReadWriteUserMixin, SignalsBaseApiTestCase):
         url = self.pdf_endpoint.format(self.signal.pk)
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
+
+
+class TestPDFJobs(SIAReadWriteUserMixin, SignalsBaseApiTestCase):
+    jobs_endpoint = '/signals/v1/private/signals/pdf/jobs'
+    job_endpoint = '/signals/v1/private/signals/pdf/jobs/{}'
+
+    def setUp(self):
+        self.department = DepartmentFactory.create()
+        self.category = CategoryFactory.create(departments=[self.department])
+        self.signal = SignalFactory.create(category_assignment__category=self.category)
+        self.other_signal = SignalFactory.create(category_assignment__category=self.category)
+        self.invisible_signal = SignalFactory.create()
+
+        self.sia_read_write_user.profile.departments.add(self.department)
+        self.client.force_authenticate(user=self.sia_read_write_user)
+
+    def test_create_and_download(self):
+        # Celery tasks run eagerly in the tests, the PDF is generated right away
+        response = self.client.post(self.jobs_endpoint, data={
+            'signal_ids': [self.signal.pk, self.other_signal.pk, self.invisible_signal.pk]
+        }, format='json')
+        self.assertEqual(response.status_code, 202)
+
+        job_id = response.json()['id']
+        self.assertEqual(response.json()['signal_ids'], sorted([self.signal.pk, self.other_signal.pk]))
+
+        response = self.client.get(self.job_endpoint.format(job_id))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], PDFSummaryJobService.DONE)
+        self.assertIn('download', response.json()['_links'])
+
+        response = self.client.get(response.json()['_links']['download']['href'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get('Content-Type'), 'application/pdf')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+    @mock.patch('signals.apps.api.views.signals.private.signals.generate_pdf_summary')
+    def test_pending(self, patched):
+        response = self.client.post(self.jobs_endpoint, data={'signal_ids': [self.signal.pk]}, format='json')
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()['id']
+        patched.delay.assert_called_once_with(job_id, self.sia_read_write_user.pk)
+
+        response = self.client.get(self.job_endpoint.format(job_id))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], PDFSummaryJobService.PENDING)
+        self.assertNotIn('download', response.json()['_links'])
+
+        response = self.client.get(self.job_endpoint.format(job_id) + '/download')
+        self.assertEqual(response.status_code, 404)
+
+    def test_no_visible_signals(self):
+        response = self.client.post(self.jobs_endpoint, data={'signal_ids': [self.invisible_signal.pk]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(self.jobs_endpoint, data={'signal_ids': []}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_job_of_other_user(self):
+        job = PDFSummaryJobService.create([self.signal.pk], UserFactory.create())
+
+        response = self.client.get(self.job_endpoint.format(job['id']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_not_logged_in(self):
+        self.client.logout()
+        response = self.client.post(self.jobs_endpoint, data={'signal_ids': [self.signal.pk]}, format='json')
+        self.assertEqual(response.status_code, 401)
@@ -31,13 +31,21 @@ from signals.apps.signals.factories import (
     DepartmentFactory,
     ParentCategoryFactory,
     ServiceLevelObjectiveFactory,
+    SignalDepartmentsFactory,
     SignalFactory,
     SignalFactoryValidLocation,
     SignalFactoryWithImage,
     SourceFactory
 )
 from signals.apps.signals.factories.category_departments import CategoryDepartmentFactory
-from signals.apps.signals.models import STADSDEEL_CENTRUM, Attachment, Note, Signal, SignalUser
+from signals.apps.signals.models import (
+    STADSDEEL_CENTRUM,
+    Attachment,
+    Note,
+    Signal,
+    SignalDepartments,
+    SignalUser
+)
 from signals.apps.signals.tests.attachment_helpers import (
     add_image_attachments,
     add_non_image_attachments,
@@ -2659,6 +2667,44 @@ class TestSignalChildrenEndpoint(SIAReadWriteUserMixin, SignalsBaseApiTestCase):
                 # The currently logged in User should NOT have permissions to view the second child
                 self.assertFalse(item['can_view_signal'])
 
+    def test_shows_children_can_view_same_as_filter_for_user(self):
+        """
+        The "can_view_signal" of the children matches the Signals the user can see in the list (filter_for_user), also
+        for children in a category the department of the user is only responsible for and for routed children
+        """
+        parent_category = ParentCategoryFactory.create()
+        child_category_1 = CategoryFactory.create(parent=parent_category)
+        child_category_2 = CategoryFactory.create(parent=parent_category)
+
+        department = DepartmentFactory.create()
+        CategoryDepartmentFactory.create(category=child_category_1, department=department, is_responsible=True,
+                                         can_view=False)
+
+        self.sia_read_write_user.profile.departments.add(department)
+        self.client.force_authenticate(user=self.sia_read_write_user)
+
+        parent_signal = SignalFactory.create(category_assignment__category=child_category_1)
+        SignalFactory.create(parent=parent_signal, category_assignment__category=child_category_1)
+        SignalFactory.create(parent=parent_signal, category_assignment__category=child_category_2)
+        routed_child = SignalFactory.create(parent=parent_signal, category_assignment__category=child_category_2)
+        routed_child.routing_assignment = SignalDepartmentsFactory.create(
+            _signal=routed_child, relation_type=SignalDepartments.REL_ROUTING, departments=[department]
+        )
+        routed_child.save()
+
+        response = self.client.get(self.child_endpoint.format(pk=parent_signal.pk))
+        self.assertEqual(response.status_code, 200)
+
+        visible_ids = set(Signal.objects.filter_for_user(self.sia_read_write_user).filter(
+            parent=parent_signal
+        ).values_list('pk', flat=True))
+        self.assertEqual(len(visible_ids), 2)
+
+        response_json = response.json()
+        self.assertEqual(response_json['count'], 3)
+        for item in response_json['results']:
+            self.assertEqual(item['can_view_signal'], item['id'] in visible_ids)
+
 
 class TestSignalEndpointRouting(SIAReadWriteUserMixin, SIAReadUserMixin, SignalsBaseApiTestCase):
     def setUp(self):
@@ -0,0 +1,155 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from datetime import datetime
+
+from django.contrib.auth.models import Permission
+from django.test import override_settings
+from django.utils import timezone
+from freezegun import freeze_time
+
+from signals.apps.feedback.factories import FeedbackFactory
+from signals.apps.signals import workflow
+from signals.apps.signals.factories import (
+    AttachmentFactory,
+    CategoryFactory,
+    DepartmentFactory,
+    NoteFactory,
+    ParentCategoryFactory,
+    SignalDepartmentsFactory,
+    SignalFactory,
+    SignalFactoryValidLocation
+)
+from signals.apps.signals.models import CategoryDepartment, SignalDepartments
+from signals.apps.users.factories import UserFactory
+from signals.test.utils import QueryBudgetMixin, SIAReadWriteUserMixin, SignalsBaseApiTestCase
+
+
+class TestPrivateSignalListDatabaseRepresentation(QueryBudgetMixin, SIAReadWriteUserMixin, SignalsBaseApiTestCase):
+    """
+    The list rendered in the database (`?representation=database`) is the same as the list rendered by the
+    PrivateSignalSerializerList.
+    """
+    list_endpoint = '/signals/v1/private/signals/'
+
+    def setUp(self):
+        self.department = DepartmentFactory.create(code='ABC', name='Department ABC')
+        self.other_department = DepartmentFactory.create(code='DEF', name='Department DEF')
+
+        self.category = CategoryFactory.create()
+        CategoryDepartment.objects.create(category=self.category, department=self.department, is_responsible=True)
+        CategoryDepartment.objects.create(category=self.category, department=self.other_department,
+                                          is_responsible=True)
+
+        self.user = self.sia_read_write_user
+        self.user.user_permissions.add(Permission.objects.get(codename='sia_can_view_all_categories'))
+        self.client.force_authenticate(user=self.user)
+
+    def _create_signals(self, n=1):
+        for _ in range(n):
+            signal = SignalFactoryValidLocation.create(
+                category_assignment__category=self.category,
+                user_assignment__user=UserFactory.create(),
+                extra_properties=[{'id': 'question', 'label': 'Question?', 'answer': 'Answer'}],
+            )
+            signal.directing_departments_assignment = SignalDepartmentsFactory.create(
+                _signal=signal, relation_type=SignalDepartments.REL_DIRECTING, departments=[self.department]
+            )
+            signal.routing_assignment = SignalDepartmentsFactory.create(
+                _signal=signal, relation_type=SignalDepartments.REL_ROUTING,
+                departments=[self.department, self.other_department]
+            )
+            signal.save()
+
+            AttachmentFactory.create(_signal=signal)
+            NoteFactory.create_batch(2, _signal=signal)
+            FeedbackFactory.create(_signal=signal, submitted_at=timezone.now(), allows_contact=False)
+            SignalFactory.create(parent=signal, reporter__email='', reporter__phone=None)
+
+    def _get_results(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    @staticmethod
+    def _normalize(results):
+        """
+        The coordinates are compared with the precision of the database
+        """
+        for result in results:
+            if result.get('location') and result['location'].get('geometrie'):
+                geometrie = result['location']['geometrie']
+                geometrie['coordinates'] = [round(coordinate, 7) for coordinate in geometrie['coordinates']]
+        return results
+
+    def assertSameRepresentation(self, url):
+        separator = '&' if '?' in url else '?'
+        expected = self._get_results(url)
+        actual = self._get_results(f'{url}{separator}representation=database')
+
+        self.assertEqual(list(actual.keys()), list(expected.keys()))
+        self.assertEqual(actual.get('count'), expected.get('count'))
+
+        expected_results = self._normalize(expected['results'])
+        actual_results = self._normalize(actual['results'])
+        self.assertEqual([result['id'] for result in actual_results], [result['id'] for result in expected_results])
+        for actual_result, expected_result in zip(actual_results, expected_results):
+            self.assertEqual(actual_result, expected_result)
+            self.assertEqual(list(actual_result.keys()), list(expected_result.keys()))
+        return expected, actual
+
+    def test_same_representation(self):
+        self._create_signals(2)
+
+        # A Signal without most of its relations, in a main category
+        signal = SignalFactory.create(category_assignment__category=ParentCategoryFactory.create(),
+                                      user_assignment=None, location=None, priority=None, type_assignment=None)
+        self.assertIsNone(signal.location)
+
+        expected, _ = self.assertSameRepresentation(f'{self.list_endpoint}?page_size=100')
+        self.assertEqual(len(expected['results']), 5)
+
+    def test_same_representation_contact_details(self):
+        self.user.user_permissions.add(Permission.objects.get(codename='sia_can_view_contact_details'))
+        self._create_signals(2)
+
+        self.assertSameRepresentation(f'{self.list_endpoint}?page_size=100')
+
+    @override_settings(FEATURE_FLAGS={'REPORTER_MAIL_CONTACT_FEEDBACK_ALLOWS_CONTACT_ENABLED': False})
+    def test_same_representation_allows_contact_disabled(self):
+        self._create_signals(1)
+
+        _, actual = self.assertSameRepresentation(f'{self.list_endpoint}?page_size=100')
+        self.assertTrue(all(result['reporter']['allows_contact'] for result in actual['results']))
+
+    def test_same_representation_datetimes(self):
+        # Whole seconds, a datetime in summer and in winter time
+        for created_at in (datetime(2022, 1, 1, 12, 0, 0, tzinfo=timezone.utc),
+                           datetime(2022, 7, 1, 12, 0, 0, 123000, tzinfo=timezone.utc),
+                           datetime(2022, 3, 27, 0, 59, 59, 999999, tzinfo=timezone.utc)):
+            with freeze_time(created_at):
+                SignalFactory.create(incident_date_end=None, status__state=workflow.AFGEHANDELD)
+
+        self.assertSameRepresentation(f'{self.list_endpoint}?page_size=100')
+
+    def test_same_representation_pages(self):
+        self._create_signals(3)
+
+        self.assertSameRepresentation(f'{self.list_endpoint}?page_size=2&page=2')
+        self.assertSameRepresentation(f'{self.list_endpoint}?page_size=2&ordering=id')
+        self.assertSameRepresentation(f'{self.list_endpoint}?page_size=2&ordering=created_at&count=true')
+
+        url, pages = f'{self.list_endpoint}?pagination=cursor&page_size=2', 0
+        while url:
+            expected, _ = self.assertSameRepresentation(url)
+            url, pages = expected['_links']['next']['href'], pages + 1
+        self.assertEqual(pages, 3)
+
+    def test_same_representation_filtered(self):
+        self._create_signals(2)
+
+        self.assertSameRepresentation(f'{self.list_endpoint}?has_changed_children=false&ordering=-created_at')
+        self.assertSameRepresentation(f'{self.list_endpoint}?status={workflow.GEMELD}&ordering=id')
+
+    def test_query_budget(self):
+        self.assertQueryBudget(f'{self.list_endpoint}?page_size=100&representation=database', self._create_signals,
+                               budget=10)
@@ -1,10 +1,15 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2020 - 2021 Gemeente Amsterdam
+# Copyright (C) 2020 - 2022 Gemeente Amsterdam
+import json
 import os
 
+from django.contrib.gis.geos import GEOSGeometry, MultiPolygon, Point
 from rest_framework import status
 
+from signals.apps.api.serializers.area import AreaGeoSerializer
+from signals.apps.services.domain.area_geometry import AreaGeometryService
 from signals.apps.signals.factories import AreaFactory, AreaTypeFactory
+from signals.apps.signals.models import Area, SimplifiedAreaGeometry
 from signals.test.utils import SIAReadWriteUserMixin, SignalsBaseApiTestCase
 
 THIS_DIR = os.path.dirname(__file__)
@@ -75,6 +80,82 @@ class TestPublicAreaEndpoint(SIAReadWriteUserMixin, SignalsBaseApiTestCase):
         data = response.json()
         self.assertEqual(1, len(data['features']))
 
+    def test_get_geography_list_same_as_serializer(self):
+        response = self.client.get(f'{self.list_endpoint}geography/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        expected = AreaGeoSerializer(Area.objects.all(), many=True).data
+        features = response.json()['features']
+        self.assertEqual(len(features), len(expected['features']))
+        for feature, expected_feature in zip(features, expected['features']):
+            self.assertEqual(feature['type'], expected_feature['type'])
+            self.assertEqual(feature['properties'], json.loads(json.dumps(expected_feature['properties'])))
+            self.assertTrue(GEOSGeometry(json.dumps(feature['geometry'])).equals_exact(
+                GEOSGeometry(json.dumps(expected_feature['geometry'])), tolerance=1e-8
+            ))
+
+    def test_get_geography_list_zoom(self):
+        area = AreaFactory.create(
+            _type=self.area_types[0],
+            geometry=MultiPolygon(Point(4.9000607, 52.3675707, srid=4326).buffer(0.01, quadsegs=64), srid=4326)
+        )
+        url = f'{self.list_endpoint}geography/?code={area.code}'
+
+        # Without simplified geometries the full resolution geometry is used
+        response = self.client.get(f'{url}&zoom=10')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        geometry = GEOSGeometry(json.dumps(response.json()['features'][0]['geometry']))
+        self.assertEqual(geometry.num_points, area.geometry.num_points)
+
+        AreaGeometryService.generate([area])
+        area.save()  # Areas changed, the cached responses are no longer used
+
+        response = self.client.get(f'{url}&zoom=10')
+        geometry = GEOSGeometry(json.dumps(response.json()['features'][0]['geometry']))
+        simplified = SimplifiedAreaGeometry.objects.get(area=area, tolerance=0.001)
+        self.assertEqual(geometry.num_points, simplified.geometry.num_points)
+        self.assertLess(geometry.num_points, area.geometry.num_points)
+
+        response = self.client.get(f'{url}&tolerance=0.0001')
+        geometry = GEOSGeometry(json.dumps(response.json()['features'][0]['geometry']))
+        simplified = SimplifiedAreaGeometry.objects.get(area=area, tolerance=0.00008)
+        self.assertEqual(geometry.num_points, simplified.geometry.num_points)
+
+        response = self.client.get(f'{url}&zoom=20')
+        geometry = GEOSGeometry(json.dumps(response.json()['features'][0]['geometry']))
+        self.assertEqual(geometry.num_points, area.geometry.num_points)
+
+    def test_get_geography_list_invalid_zoom(self):
+        for query in ['zoom=abc', 'zoom=-1', 'zoom=23', 'tolerance=abc', 'tolerance=-1']:
+            response = self.client.get(f'{self.list_endpoint}geography/?{query}')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+
+    def test_get_geography_list_etag(self):
+        response = self.client.get(f'{self.list_endpoint}geography/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(f'{self.list_endpoint}geography/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Changed Areas give another response
+        AreaFactory.create(_type=self.area_types[0])
+        response = self.client.get(f'{self.list_endpoint}geography/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(26, len(response.json()['features']))
+
+    def test_get_geography_list_cache_key_ignores_other_parameters(self):
+        type_code = self.area_types[0].code
+        response = self.client.get(f'{self.list_endpoint}geography/?type_code={type_code}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(f'{self.list_endpoint}geography/?unknown=1&type_code={type_code}&code=')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(5, len(response.json()['features']))
+
     def test_get_detail(self):
         response = self.client.get(f'{self.list_endpoint}{self.areas[self.area_types[0].code][0].id}')
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
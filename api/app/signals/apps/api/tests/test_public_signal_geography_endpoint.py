@@ -3,6 +3,8 @@
 from datetime import timedelta
 
 from django.contrib.gis.geos import Point
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from freezegun import freeze_time
 
@@ -12,10 +14,12 @@ from signals.apps.signals.factories import (
     SignalFactory,
     SignalFactoryValidLocation
 )
+from signals.apps.signals.models import Signal
 from signals.apps.signals.tests.valid_locations import ARENA, STADHUIS
 from signals.apps.signals.workflow import (
     AFGEHANDELD,
     AFGEHANDELD_EXTERN,
+    BEHANDELING,
     GEANNULEERD,
     GEMELD,
     VERZOEK_TOT_HEROPENEN
@@ -420,3 +424,88 @@ class TestPublicSignalViewSet(SignalsBaseApiTestCase):
         self.assertEqual(200, response.status_code)
         data = response.json()
         self.assertEqual(None, data['features'])
+
+    def _get_geography_queries(self, url, **extra):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, **extra)
+        return response, [query['sql'] for query in queries if 'signals_signal' in query['sql']]
+
+    def test_geography_is_cached(self):
+        parent_category = ParentCategoryFactory.create()
+        child_category = CategoryFactory.create(parent=parent_category, is_public_accessible=True)
+        SignalFactoryValidLocation.create_batch(2, category_assignment__category=child_category)
+        url = (f'{self.geography_endpoint}/?bbox=4.700000,52.200000,5.000000,52.500000'
+               f'&category_slug={child_category.slug}')
+
+        response, queries = self._get_geography_queries(url)
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(queries)
+
+        # Same filters in a different order
+        response_cached, queries = self._get_geography_queries(
+            f'{self.geography_endpoint}/?category_slug={child_category.slug}'
+            f'&bbox=4.700000,52.200000,5.000000,52.500000')
+        self.assertEqual(200, response_cached.status_code)
+        self.assertEqual([], queries)
+        self.assertEqual(response.json(), response_cached.json())
+        self.assertEqual(response.headers['ETag'], response_cached.headers['ETag'])
+        self.assertEqual(response.headers['X-Total-Count'], response_cached.headers['X-Total-Count'])
+
+    def test_geography_cache_key_ignores_other_parameters(self):
+        parent_category = ParentCategoryFactory.create()
+        child_category = CategoryFactory.create(parent=parent_category, is_public_accessible=True)
+        SignalFactoryValidLocation.create(category_assignment__category=child_category)
+        url = (f'{self.geography_endpoint}/?bbox=4.700000,52.200000,5.000000,52.500000'
+               f'&category_slug={child_category.slug}')
+
+        response = self.client.get(url)
+        self.assertEqual(200, response.status_code)
+
+        # Parameters the response does not depend on, and empty or duplicate values, use the same cache entry
+        response, queries = self._get_geography_queries(
+            f'{url}&category_slug={child_category.slug}&maincategory_slug=&unknown=1&_=1650000000')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([], queries)
+
+    def test_geography_etag(self):
+        parent_category = ParentCategoryFactory.create()
+        child_category = CategoryFactory.create(parent=parent_category, is_public_accessible=True)
+        SignalFactoryValidLocation.create(category_assignment__category=child_category)
+        url = (f'{self.geography_endpoint}/?bbox=4.700000,52.200000,5.000000,52.500000'
+               f'&category_slug={child_category.slug}')
+
+        response = self.client.get(url)
+        etag = response.headers['ETag']
+
+        response, queries = self._get_geography_queries(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(etag, response.headers['ETag'])
+        self.assertEqual([], queries)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='"outdated"')
+        self.assertEqual(200, response.status_code)
+
+    def test_geography_cache_invalidation(self):
+        parent_category = ParentCategoryFactory.create()
+        child_category = CategoryFactory.create(parent=parent_category, is_public_accessible=True)
+        signal = SignalFactoryValidLocation.create(category_assignment__category=child_category)
+        url = (f'{self.geography_endpoint}/?bbox=4.700000,52.200000,5.000000,52.500000'
+               f'&category_slug={child_category.slug}')
+
+        response = self.client.get(url)
+        self.assertEqual(1, len(response.json()['features']))
+        etag = response.headers['ETag']
+
+        # A status change within the "open" states does not change the public map
+        with self.captureOnCommitCallbacks(execute=True):
+            Signal.actions.update_status({'state': BEHANDELING, 'text': 'In behandeling'}, signal)
+        response, queries = self._get_geography_queries(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, response.status_code)
+        self.assertEqual([], queries)
+
+        signal.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            Signal.actions.update_status({'state': AFGEHANDELD, 'text': 'Afgehandeld'}, signal)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+        self.assertIsNone(response.json()['features'])
@@ -0,0 +1,161 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from django.contrib.auth.models import Permission
+from django.utils import timezone
+
+from signals.apps.feedback.factories import FeedbackFactory
+from signals.apps.signals.factories import (
+    AttachmentFactory,
+    CategoryFactory,
+    DepartmentFactory,
+    NoteFactory,
+    SignalDepartmentsFactory,
+    SignalFactory,
+    SignalFactoryValidLocation
+)
+from signals.apps.signals.models import CategoryDepartment, Signal, SignalDepartments
+from signals.apps.users.factories import UserFactory
+from signals.test.utils import QueryBudgetMixin, SIAReadWriteUserMixin, SignalsBaseApiTestCase
+
+
+class TestPrivateSignalListQueryBudget(QueryBudgetMixin, SIAReadWriteUserMixin, SignalsBaseApiTestCase):
+    list_endpoint = '/signals/v1/private/signals/'
+    budget = 30
+
+    def setUp(self):
+        self.department = DepartmentFactory.create(code='ABC', name='Department ABC')
+        self.other_department = DepartmentFactory.create(code='DEF', name='Department DEF')
+
+        self.category = CategoryFactory.create()
+        CategoryDepartment.objects.create(category=self.category, department=self.department, is_responsible=True)
+        CategoryDepartment.objects.create(category=self.category, department=self.other_department, can_view=True)
+
+        self.assigned_user = UserFactory.create(email='assigned@example.com')
+
+        self.user = self.sia_read_write_user
+        self.user.profile.departments.add(self.department)
+        self.client.force_authenticate(user=self.user)
+
+    def _create_signals(self, n):
+        """
+        Signals with all relations used by the list serializer: a child Signal, attachments, notes, submitted
+        feedback, directing and routing departments and an assigned user.
+        """
+        for _ in range(n):
+            signal = SignalFactoryValidLocation.create(
+                category_assignment__category=self.category,
+                user_assignment__user=self.assigned_user,
+            )
+            signal.directing_departments_assignment = SignalDepartmentsFactory.create(
+                _signal=signal, relation_type=SignalDepartments.REL_DIRECTING, departments=[self.department]
+            )
+            signal.routing_assignment = SignalDepartmentsFactory.create(
+                _signal=signal, relation_type=SignalDepartments.REL_ROUTING, departments=[self.other_department]
+            )
+            signal.save()
+
+            AttachmentFactory.create(_signal=signal)
+            NoteFactory.create(_signal=signal)
+            FeedbackFactory.create(_signal=signal, submitted_at=timezone.now(), allows_contact=False)
+            SignalFactory.create(parent=signal, category_assignment__category=self.category)
+
+    def test_list(self):
+        self.assertQueryBudget(f'{self.list_endpoint}?page_size=100', self._create_signals, budget=self.budget)
+
+    def test_list_cursor_pagination(self):
+        self.assertQueryBudget(f'{self.list_endpoint}?pagination=cursor&page_size=100', self._create_signals,
+                               budget=self.budget)
+
+    def test_list_all_categories(self):
+        self.user.user_permissions.add(Permission.objects.get(codename='sia_can_view_all_categories'))
+        self.assertQueryBudget(f'{self.list_endpoint}?page_size=100', self._create_signals, budget=self.budget)
+
+    def test_list_values(self):
+        """
+        The annotated and prefetched values are the same as the values queried per Signal
+        """
+        self._create_signals(1)
+
+        response = self.client.get(f'{self.list_endpoint}?page_size=100')
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 2)
+
+        parent = next(result for result in results if result['has_children'])
+        self.assertTrue(parent['has_attachments'])
+        self.assertFalse(parent['has_parent'])
+        self.assertEqual(parent['category']['departments'], 'ABC')
+        self.assertFalse(parent['reporter']['allows_contact'])
+        self.assertEqual(parent['assigned_user_email'], 'assigned@example.com')
+        self.assertEqual([department['code'] for department in parent['directing_departments']], ['ABC'])
+        self.assertEqual([department['code'] for department in parent['routing_departments']], ['DEF'])
+
+        child = next(result for result in results if not result['has_children'])
+        self.assertFalse(child['has_attachments'])
+        self.assertTrue(child['has_parent'])
+        self.assertEqual(child['category']['departments'], 'ABC')
+        self.assertTrue(child['reporter']['allows_contact'])
+        self.assertIsNone(child['assigned_user_email'])
+
+        # The detail endpoint uses the same queryset
+        response = self.client.get(f'{self.list_endpoint}{parent["id"]}')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['has_attachments'])
+        self.assertEqual(response.json()['category']['departments'], 'ABC')
+
+
+class TestSignalContextQueryBudget(QueryBudgetMixin, SIAReadWriteUserMixin, SignalsBaseApiTestCase):
+    email = 'context-reporter@example.com'
+    budget = 20
+
+    def setUp(self):
+        self.department = DepartmentFactory.create(code='ABC', name='Department ABC')
+        self.category = CategoryFactory.create()
+        CategoryDepartment.objects.create(category=self.category, department=self.department, is_responsible=True,
+                                          can_view=True)
+        self.other_category = CategoryFactory.create()
+
+        self.signal = SignalFactoryValidLocation.create(category_assignment__category=self.category,
+                                                        reporter__email=self.email)
+
+        self.user = self.sia_read_write_user
+        self.user.profile.departments.add(self.department)
+        self.client.force_authenticate(user=self.user)
+
+    def _create_signals(self, n):
+        """
+        Signals of the same reporter, half of them in a category the user cannot view
+        """
+        for i in range(n):
+            signal = SignalFactoryValidLocation.create(
+                category_assignment__category=self.category if i % 2 else self.other_category,
+                reporter__email=self.email,
+            )
+            FeedbackFactory.create(_signal=signal, submitted_at=timezone.now(), is_satisfied=bool(i % 2))
+            SignalFactory.create(parent=signal, reporter__email=self.email)
+
+    def test_context(self):
+        self.assertQueryBudget(f'/signals/v1/private/signals/{self.signal.pk}/context/', self._create_signals,
+                               budget=self.budget)
+
+    def test_context_reporter(self):
+        self.assertQueryBudget(f'/signals/v1/private/signals/{self.signal.pk}/context/reporter/?page_size=100',
+                               self._create_signals, budget=self.budget)
+
+    def test_context_reporter_values(self):
+        self._create_signals(2)
+
+        response = self.client.get(f'/signals/v1/private/signals/{self.signal.pk}/context/reporter/?page_size=100')
+        self.assertEqual(response.status_code, 200)
+
+        results = {result['id']: result for result in response.json()['results']}
+        self.assertEqual(len(results), 3)
+        for signal in Signal.objects.filter(pk__in=results.keys()).select_related('category_assignment'):
+            result = results[signal.pk]
+            can_view = signal.category_assignment.category_id == self.category.pk
+            self.assertEqual(result['can_view_signal'], can_view)
+            self.assertEqual(result['category']['departments'], 'ABC' if can_view else '')
+            self.assertEqual(result['has_children'], signal.children.exists())
+            if signal.pk != self.signal.pk:
+                self.assertEqual(result['feedback']['is_satisfied'], can_view)
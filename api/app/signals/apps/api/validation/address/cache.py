@@ -0,0 +1,176 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+Cached, batched address validation (geocoding).
+
+- addresses are keyed on their normalized form, so "Coolsingel 4" and " COOLSINGEL  4 " share a cache entry
+- lookups go through an in-process LRU first and the `AddressCache` table second, only misses hit the remote API
+- addresses that cannot be found are cached as well (negative caching), with a shorter TTL
+- a batch is deduplicated and its misses are resolved concurrently with a bounded number of workers
+- an unavailable address validation API is never cached, the next batch tries again
+"""
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.utils import timezone
+
+from signals.apps.api.app_settings import (
+    SIGNALS_API_ADDRESS_CACHE_LRU_SIZE,
+    SIGNALS_API_ADDRESS_CACHE_NEGATIVE_TTL,
+    SIGNALS_API_ADDRESS_CACHE_TTL,
+    SIGNALS_API_ADDRESS_GEOCODE_MAX_WORKERS
+)
+from signals.apps.api.validation.address.base import (
+    AddressValidationUnavailableException,
+    NoResultsException
+)
+from signals.apps.api.validation.address.pdok import PDOKAddressValidation
+from signals.apps.signals.models import AddressCache
+
+logger = logging.getLogger(__name__)
+
+ADDRESS_KEYS = ('openbare_ruimte', 'huisnummer', 'huisletter', 'huisnummer_toevoeging', 'postcode', 'woonplaats')
+
+
+class AddressLRUCache:
+    """
+    Thread-safe in-process LRU of cache key -> (result, expires_at).
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, result, expires_at):
+        with self._lock:
+            self._entries[key] = (result, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class AddressGeocodeService:
+    lru = AddressLRUCache(SIGNALS_API_ADDRESS_CACHE_LRU_SIZE)
+
+    @staticmethod
+    def normalize(address):
+        normalized = {}
+        for key in ADDRESS_KEYS:
+            value = ' '.join(str(address.get(key) or '').split()).lower()
+            normalized[key] = value.replace(' ', '') if key == 'postcode' else value
+        return normalized
+
+    @staticmethod
+    def cache_key(normalized_address):
+        serialized = json.dumps(normalized_address, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def geocode(addresses, address_validation=None, max_workers=SIGNALS_API_ADDRESS_GEOCODE_MAX_WORKERS):
+        """
+        Validate a batch of addresses.
+
+        :param addresses: list of address dicts (openbare_ruimte, huisnummer, ..., woonplaats)
+        :param address_validation: instance used for remote lookups, must implement `geocode` (Default: PDOK)
+        :param max_workers: maximum number of concurrent remote lookups
+        :returns: list of {"address": ..., "geometrie": [lon, lat]} or None (not found or unavailable), in the order
+                  of the given addresses
+        """
+        now = timezone.now()
+
+        normalized = {}
+        originals = {}  # Remote lookups use the address as given, the first one wins for duplicates
+        keys = []
+        for address in addresses:
+            normalized_address = AddressGeocodeService.normalize(address)
+            key = AddressGeocodeService.cache_key(normalized_address)
+            normalized.setdefault(key, normalized_address)
+            originals.setdefault(key, address)
+            keys.append(key)
+
+        results = {}
+        for key in normalized.keys():
+            entry = AddressGeocodeService.lru.get(key, now)
+            if entry is not None:
+                results[key] = entry[0]
+
+        db_entries = {}
+        if len(results) < len(normalized):
+            for cached in AddressCache.objects.filter(key__in=normalized.keys() - results.keys()):
+                db_entries[cached.key] = cached
+                if cached.expires_at > now:
+                    results[cached.key] = cached.result
+                    AddressGeocodeService.lru.set(cached.key, cached.result, cached.expires_at)
+
+        misses = [key for key in normalized.keys() if key not in results]
+        if misses:
+            resolved = AddressGeocodeService._resolve(
+                {key: originals[key] for key in misses}, address_validation or PDOKAddressValidation(), max_workers)
+            AddressGeocodeService._store(resolved, normalized, db_entries, now)
+            results.update(resolved)
+
+        return [results.get(key) for key in keys]
+
+    @staticmethod
+    def _resolve(addresses, address_validation, max_workers):
+        """
+        Remote lookups for the given addresses, addresses for which the lookup failed are left out.
+        """
+        def _geocode(address):
+            try:
+                return address_validation.geocode(address)
+            except NoResultsException:
+                return None
+
+        resolved = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(addresses)))) as executor:
+            futures = {key: executor.submit(_geocode, address) for key, address in addresses.items()}
+            for key, future in futures.items():
+                try:
+                    resolved[key] = future.result()
+                except AddressValidationUnavailableException:
+                    logger.warning('Address validation unavailable', exc_info=True)
+        return resolved
+
+    @staticmethod
+    def _store(resolved, normalized, db_entries, now):
+        to_create = []
+        to_update = []
+        for key, result in resolved.items():
+            ttl = SIGNALS_API_ADDRESS_CACHE_TTL if result else SIGNALS_API_ADDRESS_CACHE_NEGATIVE_TTL
+            expires_at = now + timezone.timedelta(seconds=ttl)
+            AddressGeocodeService.lru.set(key, result, expires_at)
+
+            if key in db_entries:
+                cached = db_entries[key]
+                cached.result = result
+                cached.expires_at = expires_at
+                cached.updated_at = now  # bulk_update does not touch the auto_now field
+                to_update.append(cached)
+            else:
+                to_create.append(AddressCache(key=key, address=normalized[key], result=result, expires_at=expires_at))
+
+        if to_update:
+            AddressCache.objects.bulk_update(to_update, fields=['result', 'expires_at', 'updated_at'])
+        if to_create:
+            # Another process could have resolved the same address in the meantime
+            AddressCache.objects.bulk_create(to_create, ignore_conflicts=True)
@@ -1,5 +1,6 @@
 # SPDX-License-Identifier: MPL-2.0
 # Copyright (C) 2020 - 2021 Gemeente Amsterdam
+from django.contrib.gis.geos import GEOSException, GEOSGeometry
 from django.http import QueryDict
 from requests import get
 from requests.exceptions import RequestException
@@ -7,13 +8,15 @@ from requests.exceptions import RequestException
 from signals.apps.api.app_settings import SIGNALS_API_PDOK_API_URL
 from signals.apps.api.validation.address.base import (
     AddressValidationUnavailableException,
-    BaseAddressValidation
+    BaseAddressValidation,
+    NoResultsException
 )
 from signals.settings import DEFAULT_PDOK_MUNICIPALITIES
 
 
 class PDOKAddressValidation(BaseAddressValidation):
     address_validation_url = f'{SIGNALS_API_PDOK_API_URL}/locatieserver/v3/suggest'
+    timeout = 10  # Seconds
 
     def _search_result_to_address(self, result):
         mapping = {
@@ -62,10 +65,22 @@ class PDOKAddressValidation(BaseAddressValidation):
     def _search(self, address, lon=None, lat=None, *args, **kwargs):
         try:
             query_params = self._pdok_request_query_params(address=address, lon=lon, lat=lat)
-            print(address)
-            response = get(f'{self.address_validation_url}?{query_params.urlencode()}')
-            print(response.json())
+            response = get(f'{self.address_validation_url}?{query_params.urlencode()}', timeout=self.timeout)
             response.raise_for_status()
         except RequestException as e:
             raise AddressValidationUnavailableException(e)
         return response.json()["response"]["docs"]
+
+    def geocode(self, address, lon=None, lat=None):
+        """
+        Validate the address and return it together with its coordinates (WGS84, as [lon, lat]).
+        """
+        results = self._search(address, lon=lon, lat=lat)
+        if len(results) == 0:
+            raise NoResultsException()
+
+        try:
+            geometrie = list(GEOSGeometry(results[0]['centroide_ll']).coords)
+        except (KeyError, ValueError, GEOSException):
+            geometrie = None
+        return {'address': self._search_result_to_address(results[0]), 'geometrie': geometrie}
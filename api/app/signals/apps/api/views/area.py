@@ -1,16 +1,26 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2020 - 2021 Gemeente Amsterdam
+# Copyright (C) 2020 - 2022 Gemeente Amsterdam
 from datapunt_api.pagination import HALPagination
 from datapunt_api.rest import DatapuntViewSet
+from django.contrib.gis.db.models import MultiPolygonField
+from django.db.models import CharField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, JSONObject
 from django.http import Http404
+from django.utils.http import parse_etags
 from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
+from signals.apps.api.app_settings import SIGNALS_API_AREA_GEOGRAPHY_MAX_ZOOM
+from signals.apps.api.cache.area_geography import AreaGeographyCache
 from signals.apps.api.filters import AreaFilterSet
 from signals.apps.api.generics.pagination import LinkHeaderPagination
-from signals.apps.api.serializers.area import AreaGeoSerializer, AreaSerializer
-from signals.apps.signals.models import Area
+from signals.apps.api.serializers.area import AreaSerializer
+from signals.apps.services.domain.area_geometry import AreaGeometryService
+from signals.apps.signals.models import Area, SimplifiedAreaGeometry
+from signals.apps.signals.models.functions.asgeojson import AsGeoJSON
 from signals.auth.backend import AuthBackend
 
 
@@ -36,16 +46,79 @@ class PublicAreasViewSet(DatapuntViewSet):
 
     @action(detail=False, url_path=r'geography/?$')
     def geography(self, request):
-        filtered_qs = self.filter_queryset(self.get_queryset())
+        """
+        GeoJSON of the Areas, generated in the database.
 
+        The geometries can be simplified for drawing them at a given zoom level (`zoom`) or with a given maximum
+        deviation in degrees (`tolerance`), see AreaGeometryService. Responses are cached (see AreaGeographyCache) and
+        carry an ETag, a request with a matching If-None-Match header gets a 304 response.
+        """
+        key = AreaGeographyCache.get_key(request)
+        entry = AreaGeographyCache.get(key)
+        if entry is None:
+            entry = AreaGeographyCache.set(key, *self._get_geography(request))
+        etag, feature_collection, headers = entry
+
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return Response(feature_collection, headers={**headers, 'ETag': etag})
+
+    @staticmethod
+    def _get_tolerance(request):
+        zoom = request.query_params.get('zoom')
+        tolerance = request.query_params.get('tolerance')
+        try:
+            zoom = None if zoom is None else int(zoom)
+            tolerance = None if tolerance is None else float(tolerance)
+        except ValueError:
+            raise ValidationError('zoom must be an integer and tolerance a number')
+
+        if zoom is not None and not 0 <= zoom <= SIGNALS_API_AREA_GEOGRAPHY_MAX_ZOOM:
+            raise ValidationError(f'zoom must be between 0 and {SIGNALS_API_AREA_GEOGRAPHY_MAX_ZOOM}')
+        if tolerance is not None and tolerance < 0:
+            raise ValidationError('tolerance must not be negative')
+
+        return AreaGeometryService.get_tolerance(zoom=zoom, tolerance=tolerance)
+
+    def _get_geography(self, request):
+        geometry = 'geometry'
+        tolerance = self._get_tolerance(request)
+        if tolerance is not None:
+            # Areas without a simplified geometry are drawn at full resolution
+            geometry = Coalesce(
+                Subquery(SimplifiedAreaGeometry.objects.filter(
+                    area=OuterRef('pk'), tolerance=tolerance
+                ).values('geometry')[:1]),
+                'geometry',
+                output_field=MultiPolygonField()
+            )
+
+        # Transform the output of the query to GeoJSON in the database, same output as the AreaGeoSerializer
+        features_qs = self.filter_queryset(self.get_queryset()).annotate(
+            feature=JSONObject(
+                type=Value('Feature', output_field=CharField()),
+                geometry=AsGeoJSON(geometry),
+                properties=JSONObject(
+                    name='name',
+                    code='code',
+                    type=JSONObject(
+                        name='_type__name',
+                        code='_type__code',
+                    ),
+                ),
+            )
+        ).values_list('feature', flat=True)
+
+        headers = {}
         paginator = LinkHeaderPagination(page_query_param='geopage')
-        page = paginator.paginate_queryset(filtered_qs, self.request, view=self)
+        page = paginator.paginate_queryset(features_qs, self.request, view=self)
         if page is not None:
-            serializer = AreaGeoSerializer(page, many=True)
-            return paginator.get_paginated_response(serializer.data)
+            features = list(page)
+            headers = paginator.get_pagination_headers()
+        else:
+            features = list(features_qs)
 
-        serializer = AreaGeoSerializer(filtered_qs, many=True)
-        return Response(serializer.data)
+        return {'type': 'FeatureCollection', 'features': features}, headers
 
 
 class PrivateAreasViewSet(PublicAreasViewSet):
@@ -3,14 +3,11 @@
 import logging
 
 from datapunt_api.rest import HALPagination
-from django.contrib.gis.db.models.functions import Distance
-from django.db.models import Q
-from django.utils import timezone
+from django.db.models import Exists, OuterRef, Prefetch
 from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
-from signals.apps.api import app_settings
 from signals.apps.api.generics import mixins
 from signals.apps.api.generics.pagination import LinkHeaderPagination
 from signals.apps.api.generics.permissions import SIAPermissions
@@ -19,7 +16,9 @@ from signals.apps.api.serializers import (
     SignalContextReporterSerializer,
     SignalContextSerializer
 )
-from signals.apps.signals.models import Signal
+from signals.apps.services.domain.permissions.signal import SignalPermissionService
+from signals.apps.services.domain.signal_context import SignalContextService
+from signals.apps.signals.models import CategoryDepartment, Signal
 from signals.auth.backend import AuthBackend
 
 logger = logging.getLogger(__name__)
@@ -40,16 +39,7 @@ class SignalContextViewSet(mixins.RetrieveModelMixin, GenericViewSet):
     def near(self, request, pk=None):
         signal = self.get_object()
 
-        signals_for_geography_qs = Signal.objects.annotate(
-            distance_from_point=Distance('location__geometrie', signal.location.geometrie),
-        ).filter(
-            (Q(parent__isnull=True) & Q(children__isnull=True)) | Q(parent__isnull=False),
-            distance_from_point__lte=app_settings.SIGNAL_CONTEXT_GEOGRAPHY_RADIUS,
-            category_assignment__category_id=signal.category_assignment.category.pk,
-            created_at__gte=(
-                timezone.now() - timezone.timedelta(weeks=app_settings.SIGNAL_CONTEXT_GEOGRAPHY_CREATED_DELTA_WEEKS)
-            ),
-        ).exclude(pk=signal.pk)
+        signals_for_geography_qs = SignalContextService.get_near_queryset(signal)
 
         paginator = LinkHeaderPagination(page_query_param='geopage', page_size=4000)
         page = paginator.paginate_queryset(signals_for_geography_qs, self.request, view=self)
@@ -66,10 +56,19 @@ class SignalContextViewSet(mixins.RetrieveModelMixin, GenericViewSet):
             signals_for_reporter_qs = Signal.objects.select_related(
                 'category_assignment',
                 'category_assignment__category',
+                'category_assignment__category__parent',
                 'status',
             ).prefetch_related(
                 'feedback',
-                'category_assignment__category__departments'
+                Prefetch(
+                    'category_assignment__category__categorydepartment_set',
+                    queryset=CategoryDepartment.objects.filter(
+                        is_responsible=True
+                    ).select_related('department').order_by('department__name'),
+                    to_attr='responsible_category_departments'
+                ),
+            ).annotate(
+                children_exist=Exists(Signal.objects.filter(parent_id=OuterRef('pk')))
             ).filter(
                 parent__isnull=True
             ).filter_reporter(
@@ -79,10 +78,14 @@ class SignalContextViewSet(mixins.RetrieveModelMixin, GenericViewSet):
             raise NotFound(detail=f'Signal {pk} has no reporter contact detail.')
 
         page = self.paginate_queryset(signals_for_reporter_qs)
+        signals = page if page is not None else list(signals_for_reporter_qs)
+
+        context = self.get_serializer_context()
+        context['visible_signal_ids'] = {
+            visible.pk for visible in SignalPermissionService.filter_visible(request.user, signals)
+        }
+        serializer = SignalContextReporterSerializer(signals, many=True, context=context)
+
         if page is not None:
-            serializer = SignalContextReporterSerializer(page, many=True, context=self.get_serializer_context())
             return self.get_paginated_response(serializer.data)
-
-        serializer = SignalContextReporterSerializer(signals_for_reporter_qs, many=True,
-                                                     context=self.get_serializer_context())
         return Response(serializer.data)
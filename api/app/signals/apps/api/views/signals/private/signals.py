@@ -1,28 +1,28 @@
 # SPDX-License-Identifier: MPL-2.0
 # Copyright (C) 2019 - 2022 Gemeente Amsterdam, Vereniging van Nederlandse Gemeenten
-from ast import arg
-from datetime import datetime
-import json
 import logging
-import requests
 
 from datapunt_api.rest import DatapuntViewSet, HALPagination
-from django.db.models import CharField, Value
-from django.db.models.functions import JSONObject
-from django.http import HttpResponse
+from django.db.models import CharField, F, Prefetch, Value
+from django.db.models.functions import Cast, JSONObject
+from django.http import FileResponse, HttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
 from rest_framework.decorators import action
-from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 from rest_framework.response import Response
 
 from signals.apps.api.app_settings import SIGNALS_API_GEO_PAGINATE_BY
 from signals.apps.api.filters import SignalFilterSet
 from signals.apps.api.generics import mixins
 from signals.apps.api.generics.filters import FieldMappingOrderingFilter
-from signals.apps.api.generics.pagination import LinkHeaderPaginationForQuerysets
+from signals.apps.api.generics.pagination import (
+    HALKeysetPagination,
+    LinkHeaderPaginationForQuerysets
+)
 from signals.apps.api.generics.permissions import (
     SignalCreateInitialPermission,
+    SignalPDFJobPermission,
     SignalViewObjectPermission
 )
 from signals.apps.api.serializers import (
@@ -35,13 +35,19 @@ from signals.apps.api.serializers.email_preview import (
     EmailPreviewPostSerializer,
     EmailPreviewSerializer
 )
+from signals.apps.api.serializers.pdf_job import PDFJobPostSerializer, PDFJobSerializer
 from signals.apps.api.serializers.signal_history import HistoryLogHalSerializer
+from signals.apps.api.serializers.signal_json import PrivateSignalListJSONBuilder
 from signals.apps.email_integrations.utils import trigger_mail_action_for_email_preview
 from signals.apps.history.models import Log
+from signals.apps.services.domain.mvt import MVTService
+from signals.apps.services.domain.pdf_jobs import PDFSummaryJobService
 from signals.apps.services.domain.pdf_summary import PDFSummaryService
-from signals.apps.signals.models import Signal
+from signals.apps.services.domain.permissions.signal import SignalPermissionService
+from signals.apps.signals.models import CategoryDepartment, Signal
 from signals.apps.signals.models.aggregates.json_agg import JSONAgg
 from signals.apps.signals.models.functions.asgeojson import AsGeoJSON
+from signals.apps.signals.tasks import generate_pdf_summary
 from signals.auth.backend import AuthBackend
 
 logger = logging.getLogger(__name__)
@@ -58,14 +64,27 @@ class PrivateSignalViewSet(mixins.CreateModelMixin, mixins.UpdateModelMixin, Dat
         'priority',
         'parent',
         'type_assignment',
+        'directing_departments_assignment',
+        'routing_assignment',
+        'user_assignment__user',
     ).prefetch_related(
-        'category_assignment__category__departments',
+        # The departments responsible for the category, see _NestedCategoryModelSerializer.get_departments
+        Prefetch(
+            'category_assignment__category__categorydepartment_set',
+            queryset=CategoryDepartment.objects.filter(
+                is_responsible=True
+            ).select_related('department').order_by('department__name'),
+            to_attr='responsible_category_departments'
+        ),
+        # The Signal of the reporter is used for allows_contact, see _NestedReporterModelSerializer
+        Prefetch('reporter___signal', queryset=Signal.objects.only('pk').annotate_serializer_fields()),
+        'directing_departments_assignment__departments',
+        'routing_assignment__departments',
         'children',
         'attachments',
         'notes',
         'signal_departments',
-        'user_assignment',
-    ).all()
+    ).annotate_serializer_fields()
 
     # Geography queryset to reduce the complexity of the query
     geography_queryset = Signal.objects.select_related(
@@ -81,7 +100,7 @@ class PrivateSignalViewSet(mixins.CreateModelMixin, mixins.UpdateModelMixin, Dat
     serializer_class = PrivateSignalSerializerList
     serializer_detail_class = PrivateSignalSerializerDetail
 
-    pagination_class = HALPagination
+    pagination_class = HALKeysetPagination
 
     authentication_classes = (AuthBackend,)
     permission_classes = (SignalCreateInitialPermission,)
@@ -120,6 +139,10 @@ class PrivateSignalViewSet(mixins.CreateModelMixin, mixins.UpdateModelMixin, Dat
 
     http_method_names = ['get', 'post', 'patch', 'head', 'options', 'trace']
 
+    # Opt-in rendering of the list in the database, see the list method
+    representation_query_param = 'representation'
+    database_representation = 'database'
+
     def get_queryset(self, *args, **kwargs):
         if self._is_request_to_detail_endpoint():
             return super().get_queryset(*args, **kwargs)
@@ -127,6 +150,24 @@ class PrivateSignalViewSet(mixins.CreateModelMixin, mixins.UpdateModelMixin, Dat
             qs = super().get_queryset(*args, **kwargs)
             return qs.filter_for_user(user=self.request.user)
 
+    def list(self, request, *args, **kwargs):
+        """
+        With `?representation=database` the results are rendered in the database (see PrivateSignalListJSONBuilder)
+        instead of by the PrivateSignalSerializerList, with the same filters, ordering and pagination. The response has
+        the same shape as the default response.
+        """
+        if request.query_params.get(self.representation_query_param) != self.database_representation:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(Signal.objects.filter_for_user(user=request.user)).only('pk')
+        page = self.paginate_queryset(queryset)
+        signal_ids = [signal.pk for signal in (page if page is not None else queryset)]
+
+        data = PrivateSignalListJSONBuilder(request).get_representations(signal_ids)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
     def check_object_permissions(self, request, obj):
         for permission_class in self.object_permission_classes:
             permission = permission_class()
@@ -186,6 +227,9 @@ class PrivateSignalViewSet(mixins.CreateModelMixin, mixins.UpdateModelMixin, Dat
         annotating/aggregating the result in the database. This way we keep all the benefits of the SignalFilterSet and
         the 'filter_for_user' functionality AND gain all the performance by skipping DRF and letting the database
         generate the GeoJSON.
+
+        Clients walking all pages should use the keyset (cursor) mode of the paginator (`?pagination=cursor`), see
+        KeysetPaginationMixin.
         """
         # Annotate Signal queryset with GeoJSON features and filter it according
         # to "Signalen" project access rules:
@@ -217,6 +261,24 @@ class PrivateSignalViewSet(mixins.CreateModelMixin, mixins.UpdateModelMixin, Dat
 
         return Response(feature_collection, headers=headers)
 
+    @action(detail=False, url_path=r'geography/tiles/(?P<z>[0-9]+)/(?P<x>[0-9]+)/(?P<y>[0-9]+)\.mvt',
+            filterset_class=SignalFilterSet)
+    def geography_tiles(self, request, z, x, y):
+        """
+        Mapbox Vector Tile (z/x/y) of the Signals on the map, using the same filters and access rules as the geography
+        endpoint. At low zoom levels Signals are clustered, see MVTService.
+        """
+        z, x, y = int(z), int(x), int(y)
+        if not MVTService.is_valid_tile(z, x, y):
+            raise NotFound('Tile does not exist')
+
+        queryset = self.filter_queryset(self.geography_queryset.filter_for_user(user=request.user))
+        tile = MVTService.get_tile(queryset, z, x, y, properties={
+            'id': F('id'),
+            'created_at': Cast('created_at', output_field=CharField()),
+        })
+        return HttpResponse(tile, content_type=MVTService.content_type)
+
     @action(detail=True, url_path=r'children/?$')
     def children(self, request, pk=None):
         """Show abridged version of child signals for a given parent signal."""
@@ -239,12 +301,16 @@ class PrivateSignalViewSet(mixins.CreateModelMixin, mixins.UpdateModelMixin, Dat
         paginator = HALPagination()
         child_qs = signal.children.all()
         page = paginator.paginate_queryset(child_qs, self.request, view=self)
+        children = page if page is not None else list(child_qs)
+
+        context = self.get_serializer_context()
+        context['visible_signal_ids'] = {
+            visible.pk for visible in SignalPermissionService.filter_visible(request.user, children)
+        }
+        serializer = AbridgedChildSignalSerializer(children, many=True, context=context)
 
         if page is not None:
-            serializer = AbridgedChildSignalSerializer(page, many=True, context=self.get_serializer_context())
             return paginator.get_paginated_response(serializer.data)
-
-        serializer = AbridgedChildSignalSerializer(child_qs, many=True, context=self.get_serializer_context())
         return Response(serializer.data)
 
     @action(detail=True, url_path=r'email/preview/?$', methods=['POST', ], serializer_class=EmailPreviewPostSerializer,
@@ -283,6 +349,49 @@ class PrivateSignalViewSet(mixins.CreateModelMixin, mixins.UpdateModelMixin, Dat
             'Content-Disposition': f'attachment;filename="{pdf_filename}"'
         })
 
+    @action(detail=False, url_path=r'pdf/jobs/?$', methods=['POST'], url_name='pdf-jobs',
+            permission_classes=(SignalPDFJobPermission, ), filterset_class=None)
+    def pdf_jobs(self, request, *args, **kwargs):
+        """
+        Generate a single PDF with the summaries of the given Signals in the background, for example for printing.
+        Signals the user is not allowed to view are left out. The PDF can be downloaded when the job is done.
+        """
+        post_serializer = PDFJobPostSerializer(data=request.data)
+        post_serializer.is_valid(raise_exception=True)
+
+        signal_ids = list(Signal.objects.filter_for_user(user=request.user).filter(
+            pk__in=post_serializer.validated_data['signal_ids']
+        ).values_list('pk', flat=True))
+        if not signal_ids:
+            raise ValidationError({'signal_ids': ['No Signals found']})
+
+        job = PDFSummaryJobService.create(signal_ids, request.user)
+        generate_pdf_summary.delay(job['id'], request.user.pk)
+
+        serializer = PDFJobSerializer(job, context=self.get_serializer_context())
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, url_path=r'pdf/jobs/(?P<job_id>[0-9a-f]{32})/?$', methods=['GET'], url_name='pdf-job',
+            permission_classes=(SignalPDFJobPermission, ), filterset_class=None)
+    def pdf_job(self, request, job_id, *args, **kwargs):
+        job = PDFSummaryJobService.get(job_id, request.user)
+        if job is None:
+            raise NotFound('PDF job does not exist')
+
+        serializer = PDFJobSerializer(job, context=self.get_serializer_context())
+        return Response(serializer.data)
+
+    @action(detail=False, url_path=r'pdf/jobs/(?P<job_id>[0-9a-f]{32})/download/?$', methods=['GET'],
+            url_name='pdf-job-download', permission_classes=(SignalPDFJobPermission, ), filterset_class=None)
+    def pdf_job_download(self, request, job_id, *args, **kwargs):
+        job = PDFSummaryJobService.get(job_id, request.user)
+        if job is None or job['status'] != PDFSummaryJobService.DONE:
+            raise NotFound('PDF is not available')
+
+        # Streamed from the storage
+        return FileResponse(PDFSummaryJobService.open_pdf(job_id, request.user), content_type='application/pdf',
+                            as_attachment=True, filename=f'signals-{job_id}.pdf')
+
     def create(self, request, *args, **kwargs):
         if isinstance(request.data, (list, )):
             serializer = self.get_serializer(data=request.data, many=True)
@@ -294,34 +403,3 @@ class PrivateSignalViewSet(mixins.CreateModelMixin, mixins.UpdateModelMixin, Dat
 
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
-
-    def list(self, request, *args, **kwargs):
-        from rest_framework.exceptions import ValidationError
-        from django.conf import settings
-        from signals.apps.msb.models import Melding
-        data = requests.get(f"{settings.MSB_API_URL}/api/")
-        # mapped_data = map_msb_list_item_on_signal(data.json())
-        mapped_data = data.json()
-        save_signals = True
-        if save_signals:
-            for msbm in mapped_data:
-                # m = Melding()
-
-                # m.msb_list_item = json.dumps(msbm)
-                # m.msb_id = msbm["id"]
-                try:
-                    m, created = Melding.objects.get_or_create(msb_id=msbm["id"])
-                    # print(m.msb_list_item)
-                    # print(json.dumps(msbm))
-                    if m.msb_list_item != json.dumps(msbm):
-                        m.msb_list_item = json.dumps(msbm)
-
-                        m.save()
-                    # print(created)
-                    # print(m.signal)
-                except ValidationError:
-                    pass
-            return super().list(request, *args, **kwargs)
-        paginator = HALPagination()
-        page = paginator.paginate_queryset(mapped_data, self.request, view=self)
-        return paginator.get_paginated_response(mapped_data)
\ No newline at end of file
@@ -2,29 +2,31 @@
 # Copyright (C) 2019 - 2022 Gemeente Amsterdam, Vereniging van Nederlandse Gemeenten
 from django.db.models import CharField, Min, Q, Value
 from django.db.models.expressions import Case, When
-from django.db.models.functions import JSONObject
-from django.http import Http404
+from django.db.models.functions import Cast, JSONObject
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import OrderingFilter
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
 from signals.apps.api.app_settings import SIGNALS_API_GEO_PAGINATE_BY
+from signals.apps.api.cache import PublicGeographyCache
+from signals.apps.api.cache.public_geography import (
+    PUBLIC_GEOGRAPHY_EXCLUDED_STATES,
+    PUBLIC_GEOGRAPHY_TILE_PARAMS
+)
 from signals.apps.api.filters.signal import PublicSignalGeographyFilter
 from signals.apps.api.generics.pagination import LinkHeaderPaginationForQuerysets
 from signals.apps.api.serializers import PublicSignalCreateSerializer, PublicSignalSerializerDetail
+from signals.apps.services.domain.mvt import MVTService
 from signals.apps.signals.models import Signal
 from signals.apps.signals.models.aggregates.json_agg import JSONAgg
 from signals.apps.signals.models.functions.asgeojson import AsGeoJSON
-from signals.apps.signals.workflow import (
-    AFGEHANDELD,
-    AFGEHANDELD_EXTERN,
-    GEANNULEERD,
-    VERZOEK_TOT_HEROPENEN
-)
 from signals.throttling import PostOnlyNoUserRateThrottle
 
 
@@ -71,7 +73,21 @@ class PublicSignalViewSet(GenericViewSet):
         """
         Returns a GeoJSON of all Signal's that are in an "Open" state and in a publicly available category.
         Additional filtering can be done by adding query parameters.
+
+        Responses are cached (see PublicGeographyCache) and carry an ETag, a request with a matching If-None-Match
+        header gets a 304 response.
         """
+        key = PublicGeographyCache.get_key(request)
+        entry = PublicGeographyCache.get(key)
+        if entry is None:
+            entry = PublicGeographyCache.set(key, *self._get_geography(request))
+        etag, feature_collection, headers = entry
+
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return Response(feature_collection, headers={**headers, 'ETag': etag})
+
+    def _get_geography(self, request):
         qs = self.get_queryset()
 
         if request.query_params.get('group_by', '').lower() == 'category':
@@ -87,33 +103,18 @@ class PublicSignalViewSet(GenericViewSet):
                     geometry=AsGeoJSON('location__geometrie'),
                     properties=JSONObject(
                         category=JSONObject(
-                            # Return the category public_name. If the public_name is empty, return the category name
-                            # name=Coalesce('category_assignment__category__public_name',
-                            #               'category_assignment__category__name'),
-                            name=Case(
-                                When(category_assignment__category__public_name__exact='',
-                                     then='category_assignment__category__name'),
-                                When(category_assignment__category__public_name__isnull=True,
-                                     then='category_assignment__category__name'),
-                                default='category_assignment__category__public_name',
-                                output_field=CharField(),
-                            )
+                            name=self._category_name_expression()
                         ),
                         # Creation date of the Signal
                         created_at='created_at',
                     ),
                 )
             )
-        ).exclude(
-            # Only signals that are in an "Open" state
-            Q(status__state__in=[AFGEHANDELD, AFGEHANDELD_EXTERN, GEANNULEERD, VERZOEK_TOT_HEROPENEN]) |
-
-            # Only Signal's that are in categories that are publicly accessible
-            Q(category_assignment__category__is_public_accessible=False),
         )
+        queryset = self._exclude_from_public_map(queryset)
 
         # Paginate our queryset and turn it into a GeoJSON feature collection:
-        headers = []
+        headers = {}
         feature_collection = {'type': 'FeatureCollection', 'features': []}
         paginator = LinkHeaderPaginationForQuerysets(page_query_param='geopage', page_size=SIGNALS_API_GEO_PAGINATE_BY)
         page_qs = paginator.paginate_queryset(queryset, self.request, view=self)
@@ -123,4 +124,59 @@ class PublicSignalViewSet(GenericViewSet):
             feature_collection.update(features)
             headers = paginator.get_pagination_headers()
 
-        return Response(feature_collection, headers=headers)
+        return feature_collection, headers
+
+    @action(detail=False, url_path=r'geography/tiles/(?P<z>[0-9]+)/(?P<x>[0-9]+)/(?P<y>[0-9]+)\.mvt', methods=['GET'])
+    def geography_tiles(self, request, z, x, y):
+        """
+        Mapbox Vector Tile (z/x/y) of the Signals on the public map, the same filters as the geography endpoint can be
+        used (the bbox is determined by the tile). At low zoom levels Signals are clustered, see MVTService.
+        """
+        z, x, y = int(z), int(x), int(y)
+        if not MVTService.is_valid_tile(z, x, y):
+            raise Http404
+
+        key = PublicGeographyCache.get_key(request, params=PUBLIC_GEOGRAPHY_TILE_PARAMS)
+        entry = PublicGeographyCache.get(key)
+        if entry is None:
+            entry = PublicGeographyCache.set(key, self._get_tile(request, z, x, y), {})
+        etag, tile, _ = entry
+
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return HttpResponseNotModified(headers={'ETag': etag})
+        return HttpResponse(tile, content_type=MVTService.content_type, headers={'ETag': etag})
+
+    def _get_tile(self, request, z, x, y):
+        params = request.query_params.copy()
+        params['bbox'] = ','.join(str(coordinate) for coordinate in MVTService.get_tile_bbox(z, x, y))
+        params.pop('lon', None)
+        params.pop('lat', None)
+
+        filterset = PublicSignalGeographyFilter(data=params, queryset=self.get_queryset(), request=request)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+
+        return MVTService.get_tile(self._exclude_from_public_map(filterset.qs), z, x, y, properties={
+            'category': self._category_name_expression(),
+            'created_at': Cast('created_at', output_field=CharField()),
+        })
+
+    @staticmethod
+    def _category_name_expression():
+        # Return the category public_name. If the public_name is empty, return the category name
+        return Case(
+            When(category_assignment__category__public_name__exact='', then='category_assignment__category__name'),
+            When(category_assignment__category__public_name__isnull=True, then='category_assignment__category__name'),
+            default='category_assignment__category__public_name',
+            output_field=CharField(),
+        )
+
+    @staticmethod
+    def _exclude_from_public_map(queryset):
+        return queryset.exclude(
+            # Only signals that are in an "Open" state
+            Q(status__state__in=PUBLIC_GEOGRAPHY_EXCLUDED_STATES) |
+
+            # Only Signal's that are in categories that are publicly accessible
+            Q(category_assignment__category__is_public_accessible=False),
+        )
@@ -0,0 +1,68 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+import random
+from timeit import default_timer as timer
+
+from django.contrib.gis.geos import Point
+from django.core.management import BaseCommand, CommandError
+
+from signals.apps.services.domain.area_index import AreaIndexService
+from signals.apps.signals.models import Area
+
+
+class Command(BaseCommand):
+    """
+    Compare the point in area lookups on the loaded Areas (see load_areas) for random points within their extent:
+
+    - unprepared: test the geometry of every Area, like the routing rules did before the index
+    - index: the in-memory Area index (AreaIndexService), as used by the routing rules and `_get_area`
+    - database: the `geometry__contains` query (only with --database, one query per point)
+    """
+    default_points = 10000
+
+    def add_arguments(self, parser):
+        parser.add_argument('--area-type', type=str, required=True, help='Code of the AreaType')
+        parser.add_argument('--points', type=int, default=self.default_points,
+                            help=f'Number of random points (default: {self.default_points})')
+        parser.add_argument('--seed', type=int, default=None, help='Seed for the random points')
+        parser.add_argument('--database', action='store_true', help='Also benchmark the database query')
+
+    def handle(self, *args, **options):
+        queryset = Area.objects.select_related('_type').filter(_type__code=options['area_type']).order_by('code')
+
+        areas = list(queryset)
+        if not areas:
+            raise CommandError('No Areas found, use the load_areas command to load them')
+
+        points = self._random_points(areas, options['points'], options['seed'])
+        self.stdout.write(f'Looking up {len(points)} point(s) in {len(areas)} Area(s)')
+
+        # Not part of the benchmark, built once per thread
+        AreaIndexService.get_index().get_area_type_index(options['area_type'])
+
+        plans = {
+            'unprepared': lambda point: next((area for area in areas if area.geometry.contains(point)), None),
+            'index': lambda point: AreaIndexService.get_area(point, options['area_type']),
+        }
+        if options['database']:
+            plans['database'] = lambda point: queryset.filter(geometry__contains=point).first()
+
+        results = {}
+        for name, lookup in plans.items():
+            start = timer()
+            results[name] = [getattr(lookup(point), 'pk', None) for point in points]
+            elapsed = timer() - start
+            self.stdout.write(f'* {name}: {elapsed * 1000:.2f} ms, '
+                              f'{elapsed / len(points) * 1000000:.1f} µs per point, '
+                              f'{sum(pk is not None for pk in results[name])} point(s) in an Area')
+
+        if any(result != results['unprepared'] for result in results.values()):
+            self.stderr.write('The lookups did not find the same Areas!')
+
+    def _random_points(self, areas, n_points, seed):
+        rng = random.Random(seed)
+        extents = [area.geometry.extent for area in areas]
+        xmin, ymin = min(e[0] for e in extents), min(e[1] for e in extents)
+        xmax, ymax = max(e[2] for e in extents), max(e[3] for e in extents)
+        srid = areas[0].geometry.srid
+        return [Point(rng.uniform(xmin, xmax), rng.uniform(ymin, ymax), srid=srid) for _ in range(n_points)]
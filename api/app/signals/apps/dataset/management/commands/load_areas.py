@@ -1,5 +1,5 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2020 - 2021 Gemeente Amsterdam
+# Copyright (C) 2020 - 2022 Gemeente Amsterdam
 import inspect
 import os
 from tempfile import TemporaryDirectory
@@ -8,6 +8,9 @@ from django.core.management import BaseCommand
 
 from signals.apps.dataset import sources
 from signals.apps.dataset.base import AreaLoader
+from signals.apps.services.domain.area_geometry import AreaGeometryService
+from signals.apps.services.domain.area_index import AreaIndexService
+from signals.apps.signals.models import Area
 
 
 class Command(BaseCommand):
@@ -53,4 +56,9 @@ class Command(BaseCommand):
             loader = data_loaders[type_string](**options)
             loader.load()
 
+        # Simplified geometries for drawing the Areas on a map
+        AreaGeometryService.generate(Area.objects.filter(_type=loader.area_type))
+
+        # The loaders also update the geometries in bulk, which does not send the signals that invalidate the index
+        AreaIndexService.invalidate()
         self.stdout.write('...done.')
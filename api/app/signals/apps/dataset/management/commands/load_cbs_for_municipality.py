@@ -17,6 +17,7 @@ Note:
 from django.core.management import BaseCommand, CommandError
 from django.db import transaction
 
+from signals.apps.services.domain.area_geometry import AreaGeometryService
 from signals.apps.signals.models import Area, AreaType
 
 REQUIRED_DATASETS = {
@@ -121,4 +122,7 @@ class Command(BaseCommand):
             self._copy_areas_to_area_type(to_copy_w, wijk_area_type)
             self._copy_areas_to_area_type(to_copy_b, buurt_area_type)
 
+            # Simplified geometries for drawing the Areas on a map
+            AreaGeometryService.generate(Area.objects.filter(_type__in=[wijk_area_type, buurt_area_type]))
+
             self.stdout.write('Done.')
@@ -0,0 +1,34 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from io import StringIO
+
+from django.contrib.gis import geos
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from signals.apps.services.domain.area_index import AreaIndexService
+from signals.apps.signals.factories import AreaFactory, AreaTypeFactory
+
+
+class TestBenchmarkAreaIndex(TestCase):
+    def setUp(self):
+        self.addCleanup(AreaIndexService.invalidate)
+
+    def test_benchmark(self):
+        geometry = geos.MultiPolygon([geos.Polygon.from_bbox([4.877157, 52.357204, 4.929686, 52.385239])], srid=4326)
+        area_type = AreaTypeFactory.create(code='stadsdeel')
+        AreaFactory.create(geometry=geometry, _type=area_type)
+        AreaFactory.create_batch(3, _type=area_type)
+
+        out, err = StringIO(), StringIO()
+        call_command('benchmark_area_index', '--area-type', 'stadsdeel', '--points', '100', '--seed', '42',
+                     '--database', stdout=out, stderr=err)
+
+        self.assertIn('* unprepared:', out.getvalue())
+        self.assertIn('* index:', out.getvalue())
+        self.assertIn('* database:', out.getvalue())
+        self.assertEqual(err.getvalue(), '')
+
+    def test_no_areas(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_area_index', '--area-type', 'unknown')
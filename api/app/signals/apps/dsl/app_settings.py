@@ -0,0 +1,5 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+
+# Compiled expressions, see signals.apps.dsl.compiler
+DSL_COMPILED_LRU_SIZE = 1024  # Number of compiled expressions kept in memory per process
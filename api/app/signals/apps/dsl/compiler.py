@@ -0,0 +1,216 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+Compiles DSL expressions to a single Python function, instead of walking the tree of evaluators (see
+signals.apps.dsl.evaluators) on every evaluation.
+
+- `and`/`or` become the short-circuiting Python operators
+- comparisons between constants (and `and`/`or` operands that are constant) are folded at compile time
+- the compiled functions are kept in a bounded in-process LRU cache, keyed by the expression. The generated source is
+  never shared through the Django cache, a (shared) cache must not be able to inject code that is executed
+
+The compiled expression gives the same results as the evaluators of the parsed expression.
+"""
+import operator
+import threading
+from collections import OrderedDict
+
+from django.contrib.gis import geos
+
+from signals.apps.dsl.app_settings import DSL_COMPILED_LRU_SIZE
+from signals.apps.dsl.evaluators.equality_evaluator import EqualityEvaluator
+from signals.apps.dsl.evaluators.in_evaluator import InEvaluator
+from signals.apps.dsl.evaluators.logical_evaluator import LogicalEvaluator
+from signals.apps.dsl.evaluators.root_evaluator import RootEvaluator
+from signals.apps.dsl.evaluators.terminal_evaluator import TerminalEvaluator
+from signals.apps.dsl.ExpressionEvaluator import ExpressionEvaluator
+
+OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+
+def _resolve(ctx, ident):
+    if ident in ctx:
+        return ctx[ident]
+    raise Exception("Could not resolve ident: '{}'".format(ident))
+
+
+def _no_value():
+    raise Exception("No value for term evaluator")
+
+
+def _type_error(exp, act):
+    raise Exception("Error: expected: '{exp}', actual: '{act}'".format(exp=exp, act=act))
+
+
+def _in(lhs_val, rhs_val, props):  # noqa C901
+    """
+    Same as the InEvaluator, with the right hand side and its properties already evaluated.
+    """
+    if isinstance(lhs_val, str):
+        if type(rhs_val) is not set:
+            _type_error(exp=type(set), act=type(rhs_val))
+        return lhs_val in rhs_val
+
+    if isinstance(lhs_val, geos.Point):
+        container, key, keys = None, None, []
+        try:
+            for prop in props:
+                container, key = rhs_val, prop() if callable(prop) else prop
+                keys.append(str(key))
+                rhs_val = rhs_val[key]
+        except KeyError:
+            raise Exception("Could not resolve {prop}".format(prop=".".join(keys)))
+        if type(rhs_val) is not geos.MultiPolygon:
+            _type_error(exp=type(geos.MultiPolygon), act=type(rhs_val))
+        if hasattr(container, 'contains_point'):
+            return container.contains_point(key, lhs_val)
+        return rhs_val.contains(lhs_val)
+
+    raise Exception("No 'in' handler for type: '{}'".format('unknown'))
+
+
+class CompiledExpression:
+    """
+    Drop-in replacement of a parsed expression, `evaluate(ctx)` calls the compiled function.
+    """
+    def __init__(self, source, constants):
+        self.source = source
+        self.constants = constants
+
+        namespace = {'_resolve': _resolve, '_no_value': _no_value, '_in': _in, '_c': constants}
+        exec(compile(source, '<dsl>', 'exec'), namespace)
+        self.evaluate = namespace['_expression']
+
+
+class _Node:
+    """
+    Python source of a (sub)expression, `value` is set when the expression is a constant.
+    """
+    NOT_CONSTANT = object()
+
+    def __init__(self, source, value=NOT_CONSTANT):
+        self.source = source
+        self.value = value
+
+    @property
+    def is_constant(self):
+        return self.value is not self.NOT_CONSTANT
+
+
+class ExpressionCompiler:
+    parser = ExpressionEvaluator()
+
+    _functions = OrderedDict()  # expression -> CompiledExpression
+    _lock = threading.Lock()
+
+    def compile(self, code):
+        """
+        :returns: CompiledExpression, raises like ExpressionEvaluator.compile when the expression cannot be parsed
+        """
+        with self._lock:
+            compiled = self._functions.get(code)
+            if compiled is not None:
+                self._functions.move_to_end(code)
+                return compiled
+
+        compiled = CompiledExpression(*self.generate(self.parser.compile(code)))
+        with self._lock:
+            self._functions[code] = compiled
+            while len(self._functions) > DSL_COMPILED_LRU_SIZE:
+                self._functions.popitem(last=False)
+        return compiled
+
+    @classmethod
+    def clear(cls):
+        """
+        Drop the compiled expressions of this process.
+        """
+        with cls._lock:
+            cls._functions.clear()
+
+    def generate(self, model):
+        """
+        :returns: tuple of the source of the `_expression(ctx)` function and the constants it refers to
+        """
+        constants = []
+        node = self._generate(model, constants)
+        source = f'def _expression(ctx):\n    return {node.source}\n'
+        return source, constants
+
+    def _constant(self, value, constants):
+        if value is None or type(value) in (bool, int, float, str):
+            return _Node(repr(value), value)
+
+        constants.append(value)
+        return _Node(f'_c[{len(constants) - 1}]', value)
+
+    def _generate(self, node, constants):  # noqa C901
+        if isinstance(node, RootEvaluator):
+            return self._generate(node.expression, constants)
+
+        if isinstance(node, LogicalEvaluator):
+            operands = [self._generate(operand, constants) for operand in [node.lhs] + list(node.rhs or [])]
+            if len(operands) == 1:
+                return operands[0]
+            return self._generate_logical(node.op, operands)
+
+        if isinstance(node, EqualityEvaluator):
+            if node.op not in OPERATORS:
+                raise Exception("Equality operator: '{}' is not supported".format(node.op))
+
+            lhs, rhs = self._generate(node.lhs, constants), self._generate(node.rhs, constants)
+            if lhs.is_constant and rhs.is_constant:
+                try:
+                    return self._constant(OPERATORS[node.op](lhs.value, rhs.value), constants)
+                except Exception:
+                    pass  # Raise when evaluated, like the evaluator does
+            return _Node(f'({lhs.source} {node.op} {rhs.source})')
+
+        if isinstance(node, InEvaluator):
+            lhs, rhs = self._generate(node.lhs, constants), self._generate(node.rhs, constants)
+            # Properties that are not constant are only evaluated for geometries, like the evaluator does
+            props = [self._generate(prop, constants) for prop in node.rhs_prop or []]
+            props = [prop.source if prop.is_constant else f'lambda: {prop.source}' for prop in props]
+            return _Node(f'_in({lhs.source}, {rhs.source}, ({"".join(f"{prop}, " for prop in props)}))')
+
+        if isinstance(node, TerminalEvaluator):
+            # Same order as TerminalEvaluator.evaluate
+            if node.id_val:
+                return _Node(f'_resolve(ctx, {node.id_val!r})')
+            if node.str_val:
+                return self._constant(node.str_val, constants)
+            if node.time_val:
+                return self._constant(node._convert(node.time_val), constants)
+            if node.numeric_val is not None:
+                return self._constant(node.numeric_val, constants)
+            return _Node('_no_value()')
+
+        raise Exception("Cannot compile: '{}'".format(node.__class__.__name__))
+
+    def _generate_logical(self, op, operands):
+        short_circuit = op == 'or'  # The value that decides the outcome of the whole expression
+
+        remaining = []
+        for operand in operands:
+            if operand.is_constant:
+                if bool(operand.value) is short_circuit:
+                    if not remaining:
+                        return _Node(repr(short_circuit), short_circuit)
+                    # Still evaluate the operands before it, they could raise an exception
+                    remaining.append(_Node(repr(short_circuit), short_circuit))
+                    break
+                continue  # Does not change the outcome
+            remaining.append(operand)
+
+        if not remaining:
+            return _Node(repr(not short_circuit), not short_circuit)
+        if len(remaining) == 1:
+            return _Node(f'bool({remaining[0].source})')
+        return _Node(f'bool({f" {op} ".join(operand.source for operand in remaining)})')
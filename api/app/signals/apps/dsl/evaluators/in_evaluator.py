@@ -1,5 +1,5 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2020 - 2021 Vereniging van Nederlandse Gemeenten, Gemeente Amsterdam
+# Copyright (C) 2020 - 2022 Vereniging van Nederlandse Gemeenten, Gemeente Amsterdam
 from django.contrib.gis import geos
 
 from signals.apps.dsl.evaluators.evaluator import Evaluator
@@ -44,12 +44,17 @@ class InEvaluator(Evaluator):
 
     def _geo_handler(self, ctx, lhs_val):
         rhs_val = self.rhs.evaluate(ctx)
+        container, key = None, None
         if self.rhs_prop and len(self.rhs_prop) > 0:
             try:
                 for prop in self.rhs_prop:
-                    rhs_val = rhs_val[prop.evaluate(ctx)]
+                    container, key = rhs_val, prop.evaluate(ctx)
+                    rhs_val = rhs_val[key]
             except KeyError:
                 raise Exception("Could not resolve {prop}".format(prop=".".join(self.rhs_prop)))
         if type(rhs_val) is not geos.MultiPolygon:
             self._raise_type_error(exp=type(geos.MultiPolygon), act=type(rhs_val))
+        if hasattr(container, 'contains_point'):
+            # Indexed geometries (see signals.apps.services.domain.area_index) answer with a prepared geometry
+            return container.contains_point(key, lhs_val)
         return rhs_val.contains(lhs_val)
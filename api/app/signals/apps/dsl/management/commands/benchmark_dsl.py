@@ -0,0 +1,110 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+import time
+from statistics import median
+from timeit import default_timer as timer
+
+from django.contrib.gis import geos
+from django.core.management import BaseCommand
+
+from signals.apps.dsl.compiler import ExpressionCompiler
+from signals.apps.dsl.ExpressionEvaluator import ExpressionEvaluator
+
+# The expressions of signals.apps.dsl.tests.test_dsl
+EXPRESSIONS = [
+    'testint == 1',
+    'testint != 0',
+    'testint >= 1',
+    'testint < 2',
+    'time == 16:00:00',
+    'time >= 15:00:00',
+    'time <= 16:00:01',
+    'maincat == "dieren"',
+    'maincat != "test"',
+    'listval in list',
+    'maincat in list',
+    'location_1 in area."stadsdeel"."oost"',
+    'location_2 in area."stadsdeel"."oost"',
+    'testint == 0 or testint == 1',
+    'testint == 0 and testint == 1',
+    'testint == 1 and (time > 12:00 and time < 20:00)',
+    'testint == 1 or (time > 12:00 and time < 20:00)',
+    'location_2 in area."stadsdeel"."oost" and (testint > 0 or (testint == 1))',
+    'maincat in list and (time > 12:00 and time < 20:00)',
+    'day == "Thursday"',
+    'testint == 0 or testint == 1 or testint == 2',
+    'testint == 0 and testint == 1 and testint == 2',
+    'testint == 0 and testint == 1 or testint == 2',
+    'testint == 0 or testint == 1 and testint == 2',
+]
+
+
+def get_context():
+    """
+    The context of signals.apps.dsl.tests.test_dsl
+    """
+    poly = geos.Polygon(((0.0, 0.0), (0.0, 50.0), (50.0, 50.0), (50.0, 0.0), (0.0, 0.0)))
+    return {
+        'testint': 1,
+        'location_1': geos.Point(66, 66),
+        'location_2': geos.Point(1, 1),
+        'maincat': 'dieren',
+        'subcat': 'subcat',
+        'time': time.strptime('16:00:00', '%H:%M:%S'),
+        'day': 'Thursday',
+        'area': {
+            'stadsdeel': {
+                'oost': geos.MultiPolygon(poly)
+            }
+        },
+        'listval': 'geo1',
+        'list': set(['geo1', 'geo2'])
+    }
+
+
+class Command(BaseCommand):
+    """
+    Compare the evaluation of the parsed (interpreted) and the compiled DSL expressions.
+    """
+    default_repeat = 5
+    default_number = 1000
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=self.default_repeat,
+                            help=f'Number of runs per expression (default: {self.default_repeat})')
+        parser.add_argument('--number', type=int, default=self.default_number,
+                            help=f'Number of evaluations per run (default: {self.default_number})')
+
+    def handle(self, *args, **options):
+        ctx = get_context()
+        backends = {
+            'interpreted': ExpressionEvaluator(),
+            'compiled': ExpressionCompiler(),
+        }
+
+        totals = dict.fromkeys(backends, 0.0)
+        for expression in EXPRESSIONS:
+            results, timings = {}, {}
+            for name, backend in backends.items():
+                evaluator = backend.compile(expression)
+                results[name] = evaluator.evaluate(ctx)
+                timings[name] = median(self._run(evaluator, ctx, options['number']) for _ in range(options['repeat']))
+                totals[name] += timings[name]
+
+            if results['interpreted'] != results['compiled']:
+                self.stderr.write(f'Different results for: {expression}')
+
+            self.stdout.write(f'{expression}: ' + ', '.join(
+                f'{name} {timing / options["number"] * 1000000:.2f} µs' for name, timing in timings.items()
+            ))
+
+        self.stdout.write(f'Total: interpreted {totals["interpreted"] * 1000:.2f} ms, '
+                          f'compiled {totals["compiled"] * 1000:.2f} ms '
+                          f'({totals["interpreted"] / totals["compiled"]:.1f}x)')
+
+    @staticmethod
+    def _run(evaluator, ctx, number):
+        start = timer()
+        for _ in range(number):
+            evaluator.evaluate(ctx)
+        return timer() - start
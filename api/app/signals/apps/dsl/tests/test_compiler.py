@@ -0,0 +1,74 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from signals.apps.dsl.compiler import ExpressionCompiler
+from signals.apps.dsl.ExpressionEvaluator import ExpressionEvaluator
+from signals.apps.dsl.management.commands.benchmark_dsl import EXPRESSIONS, get_context
+
+
+class TestExpressionCompiler(TestCase):
+    def setUp(self):
+        self.compiler = ExpressionCompiler()
+        self.addCleanup(ExpressionCompiler.clear)
+
+    def test_same_results_as_interpreted(self):
+        ctx = get_context()
+        interpreter = ExpressionEvaluator()
+
+        for expression in EXPRESSIONS:
+            self.assertIs(self.compiler.compile(expression).evaluate(ctx),
+                          interpreter.compile(expression).evaluate(ctx), expression)
+
+    def test_constant_folding(self):
+        self.assertEqual(self.compiler.compile('12:00 < 13:00').source, 'def _expression(ctx):\n    return True\n')
+        self.assertEqual(self.compiler.compile('1 == 2 and testint == 1').source,
+                         'def _expression(ctx):\n    return False\n')
+        self.assertNotIn('2 > 1', self.compiler.compile('testint == 1 and 2 > 1').source)
+
+    def test_errors(self):
+        with self.assertRaises(Exception):
+            self.compiler.compile('testint ==')
+
+        with self.assertRaisesMessage(Exception, "Could not resolve ident: 'unknown'"):
+            self.compiler.compile('unknown == 1').evaluate({})
+
+        # The left hand side is evaluated before the constant
+        with self.assertRaisesMessage(Exception, "Could not resolve ident: 'unknown'"):
+            self.compiler.compile('unknown == 1 and 1 == 2').evaluate({})
+
+    def test_cached(self):
+        compiled = self.compiler.compile('testint == 1')
+        self.assertIs(self.compiler.compile('testint == 1'), compiled)
+
+        with mock.patch.object(ExpressionCompiler.parser, 'compile') as parse:
+            self.assertTrue(self.compiler.compile('testint == 1').evaluate({'testint': 1}))
+        parse.assert_not_called()
+
+    def test_not_shared_through_the_django_cache(self):
+        with mock.patch('django.core.cache.cache.get') as cache_get, \
+                mock.patch('django.core.cache.cache.set') as cache_set:
+            self.compiler.compile('testint == 1')
+
+        cache_get.assert_not_called()
+        cache_set.assert_not_called()
+
+    @mock.patch('signals.apps.dsl.compiler.DSL_COMPILED_LRU_SIZE', 2)
+    def test_bounded(self):
+        for i in range(3):
+            self.compiler.compile(f'testint == {i}')
+
+        self.assertEqual(len(ExpressionCompiler._functions), 2)
+
+
+class TestBenchmarkDsl(TestCase):
+    def test_benchmark(self):
+        out, err = StringIO(), StringIO()
+        call_command('benchmark_dsl', '--repeat', '1', '--number', '10', stdout=out, stderr=err)
+
+        self.assertIn('Total: interpreted', out.getvalue())
+        self.assertEqual(err.getvalue(), '')
@@ -1,5 +1,5 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2020 - 2021 Vereniging van Nederlandse Gemeenten, Gemeente Amsterdam
+# Copyright (C) 2020 - 2022 Vereniging van Nederlandse Gemeenten, Gemeente Amsterdam
 import copy
 import time
 from datetime import datetime
@@ -8,6 +8,7 @@ from django.contrib.gis import geos
 from django.test import TestCase
 from freezegun import freeze_time
 
+from signals.apps.dsl.compiler import ExpressionCompiler
 from signals.apps.dsl.ExpressionEvaluator import ExpressionEvaluator
 
 
@@ -122,3 +123,12 @@ class DslTest(TestCase):
         c.compile('testint == 0 and testint == 1 and testint == 2')
         c.compile('testint == 0 and testint == 1 or testint == 2')
         c.compile('testint == 0 or testint == 1 and testint == 2')
+
+
+class CompiledDslTest(DslTest):
+    """
+    The same tests, evaluated by the compiled expressions
+    """
+    def setUp(self):
+        super().setUp()
+        self.compiler = ExpressionCompiler()
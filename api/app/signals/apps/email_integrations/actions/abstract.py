@@ -2,13 +2,15 @@
 # Copyright (C) 2021 - 2022 Gemeente Amsterdam
 import logging
 from abc import ABC
+from timeit import default_timer as timer
 
 from django.conf import settings
 from django.core.mail import send_mail
-from django.template import Context, Template, loader
+from django.template import loader
 
 from signals.apps.email_integrations.exceptions import URLEncodedCharsFoundInText
 from signals.apps.email_integrations.models import EmailTemplate
+from signals.apps.email_integrations.template_cache import EmailTemplateCache
 from signals.apps.email_integrations.utils import make_email_context
 from signals.apps.signals.models import Signal
 
@@ -69,14 +71,7 @@ class AbstractAction(ABC):
         Renders the subject, text message body and html message body
         """
         try:
-            email_template = EmailTemplate.objects.get(key=self.key)
-
-            rendered_context = {
-                'subject': Template(email_template.title).render(Context(context)),
-                'body': Template(email_template.body).render(Context(context, autoescape=False))
-            }
-
-            subject = Template(email_template.title).render(Context(context, autoescape=False))
+            subject, rendered_context = EmailTemplateCache.get(self.key).render(context)
             message = loader.get_template('email/_base.txt').render(rendered_context)
             html_message = loader.get_template('email/_base.html').render(rendered_context)
         except EmailTemplate.DoesNotExist:
@@ -90,8 +85,9 @@ class AbstractAction(ABC):
 
     def send_mail(self, signal, dry_run=False):
         """
-        Send the email to the reporter
+        Send the email to the reporter, the render and send timings are logged per action
         """
+        start = timer()
         try:
             context = self.get_context(signal, dry_run)
         except URLEncodedCharsFoundInText:
@@ -105,9 +101,15 @@ class AbstractAction(ABC):
             return 0  # No mail sent, return 0. Same behaviour as send_mail()
 
         subject, message, html_message = self.render_mail_data(context)
-        return send_mail(subject=subject, message=message, from_email=self.from_email,
+        rendered = timer()
+
+        sent = send_mail(subject=subject, message=message, from_email=self.from_email,
                          recipient_list=[signal.reporter.email, ], html_message=html_message)
 
+        logger.info(f'{self.__class__.__name__} mail for Signal {signal.id}: '
+                    f'render {(rendered - start) * 1000:.1f} ms, send {(timer() - rendered) * 1000:.1f} ms')
+        return sent
+
     def add_note(self, signal):
         if self.note:
             Signal.actions.create_note({'text': self.note}, signal=signal)
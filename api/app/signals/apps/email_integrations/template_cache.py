@@ -0,0 +1,56 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+Compiled EmailTemplates, so the title and body of an EmailTemplate are not compiled again for every mail.
+
+The compiled template of a key is reused as long as the EmailTemplate was not updated since it was compiled, which
+costs a single lookup of the `updated_at` of the EmailTemplate per mail instead of fetching and compiling it.
+"""
+import threading
+
+from django.template import Context, Template
+
+from signals.apps.email_integrations.models import EmailTemplate
+
+
+class CompiledEmailTemplate:
+    def __init__(self, email_template):
+        self.key = email_template.key
+        self.updated_at = email_template.updated_at
+        self.title = Template(email_template.title)
+        self.body = Template(email_template.body)
+
+    def render(self, context):
+        """
+        :returns: tuple of the subject and the context of the email/_base.txt and email/_base.html templates
+        """
+        rendered_context = {
+            'subject': self.title.render(Context(context)),
+            'body': self.body.render(Context(context, autoescape=False))
+        }
+        subject = self.title.render(Context(context, autoescape=False))
+        return subject, rendered_context
+
+
+class EmailTemplateCache:
+    _templates = {}  # key -> CompiledEmailTemplate
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, key):
+        """
+        :returns: CompiledEmailTemplate, raises EmailTemplate.DoesNotExist when there is no EmailTemplate with the key
+        """
+        updated_at = EmailTemplate.objects.values_list('updated_at', flat=True).get(key=key)
+
+        compiled = cls._templates.get(key)
+        if compiled is None or compiled.updated_at != updated_at:
+            compiled = CompiledEmailTemplate(EmailTemplate.objects.get(key=key))
+            with cls._lock:
+                cls._templates[key] = compiled
+        return compiled
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._templates.clear()
@@ -0,0 +1,51 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from unittest import mock
+
+from django.test import TestCase
+
+from signals.apps.email_integrations.models import EmailTemplate
+from signals.apps.email_integrations.template_cache import CompiledEmailTemplate, EmailTemplateCache
+
+
+class TestEmailTemplateCache(TestCase):
+    def setUp(self):
+        self.addCleanup(EmailTemplateCache.clear)
+
+        self.email_template = EmailTemplate.objects.create(key=EmailTemplate.SIGNAL_CREATED,
+                                                           title='Uw melding {{ formatted_signal_id }}',
+                                                           body='{{ text }} & {{ ORGANIZATION_NAME }}')
+
+    def test_render(self):
+        subject, rendered_context = EmailTemplateCache.get(EmailTemplate.SIGNAL_CREATED).render({
+            'formatted_signal_id': 'SIG-1 <b>', 'text': 'Text <b>', 'ORGANIZATION_NAME': 'Gemeente'
+        })
+
+        self.assertEqual(subject, 'Uw melding SIG-1 <b>')
+        self.assertEqual(rendered_context, {'subject': 'Uw melding SIG-1 &lt;b&gt;',
+                                            'body': 'Text <b> & Gemeente'})
+
+    def test_compiled_once(self):
+        compiled = EmailTemplateCache.get(EmailTemplate.SIGNAL_CREATED)
+
+        with mock.patch('signals.apps.email_integrations.template_cache.Template') as template, \
+                self.assertNumQueries(1):  # Only the updated_at of the EmailTemplate
+            self.assertIs(EmailTemplateCache.get(EmailTemplate.SIGNAL_CREATED), compiled)
+        template.assert_not_called()
+
+    def test_compiled_again_when_updated(self):
+        compiled = EmailTemplateCache.get(EmailTemplate.SIGNAL_CREATED)
+
+        self.email_template.title = 'Changed {{ formatted_signal_id }}'
+        self.email_template.save()
+
+        recompiled = EmailTemplateCache.get(EmailTemplate.SIGNAL_CREATED)
+        self.assertIsNot(recompiled, compiled)
+        self.assertIsInstance(recompiled, CompiledEmailTemplate)
+        self.assertEqual(recompiled.render({'formatted_signal_id': 'SIG-1'})[0], 'Changed SIG-1')
+
+    def test_does_not_exist(self):
+        self.email_template.delete()
+
+        with self.assertRaises(EmailTemplate.DoesNotExist):
+            EmailTemplateCache.get(EmailTemplate.SIGNAL_CREATED)
@@ -1,12 +1,14 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2018 - 2021 Gemeente Amsterdam
+# Copyright (C) 2018 - 2022 Gemeente Amsterdam
 from unittest import mock
 
+from django.contrib.auth import get_user_model
 from django.core.exceptions import ImproperlyConfigured
 from django.db import Error
 from django.test import TestCase, override_settings
 
 from signals.apps.signals.factories import SignalFactory
+from signals.auth.metrics import auth_cache_metrics
 
 
 class TestHealthEndpoints(TestCase):
@@ -47,3 +49,28 @@ class TestHealthEndpoints(TestCase):
     def test_status_data_lookup_error(self):
         with self.assertRaises(ImproperlyConfigured):
             self.client.get('/status/data')
+
+    def test_status_auth_cache(self):
+        auth_cache_metrics.reset()
+        self.addCleanup(auth_cache_metrics.reset)
+        auth_cache_metrics.hit('token')
+        auth_cache_metrics.miss('user')
+        self.client.force_login(get_user_model().objects.create(username='staff@example.com', is_staff=True))
+
+        response = self.client.get('/status/auth-cache')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'token': {'hits': 1, 'misses': 0, 'hit_rate': 1.0},
+            'user': {'hits': 0, 'misses': 1, 'hit_rate': 0.0},
+        })
+
+    def test_status_auth_cache_not_public(self):
+        response = self.client.get('/status/auth-cache')
+
+        self.assertEqual(response.status_code, 302)  # Redirected to the login of the Django admin
+
+        self.client.force_login(get_user_model().objects.create(username='user@example.com', is_staff=False))
+        response = self.client.get('/status/auth-cache')
+
+        self.assertEqual(response.status_code, 302)
@@ -1,5 +1,5 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2018 - 2021 Gemeente Amsterdam
+# Copyright (C) 2018 - 2022 Gemeente Amsterdam
 from django.urls import path
 
 from signals.apps.health import views
@@ -7,4 +7,5 @@ from signals.apps.health import views
 urlpatterns = [
     path('health', views.health),
     path('data', views.check_data),
+    path('auth-cache', views.auth_cache),
 ]
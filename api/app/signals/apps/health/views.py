@@ -1,12 +1,15 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2018 - 2021 Gemeente Amsterdam
+# Copyright (C) 2018 - 2022 Gemeente Amsterdam
 import logging
 
 from django.apps import apps
 from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.core.exceptions import ImproperlyConfigured
 from django.db import Error, connection
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
+
+from signals.auth.metrics import auth_cache_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -36,3 +39,12 @@ def check_data(request):
         return HttpResponse('Too few items in the database!!!', content_type='text/plain', status=500)
 
     return HttpResponse(f'Data OK {count} {health_check_model.__name__}', content_type='text/plain', status=200)
+
+
+@staff_member_required
+def auth_cache(request):
+    """
+    Hit rates of the authentication caches of the process that handles the request, only for staff members (logged in
+    to the Django admin)
+    """
+    return JsonResponse(auth_cache_metrics.as_dict())
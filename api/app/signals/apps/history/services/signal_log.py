@@ -1,6 +1,7 @@
 # SPDX-License-Identifier: MPL-2.0
 # Copyright (C) 2021 - 2022 Gemeente Amsterdam
 from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
 
 from signals.apps.feedback.models import Feedback, _get_description_of_receive_feedback
 from signals.apps.history.models import Log
@@ -83,6 +84,28 @@ class SignalLogService:
             _signal=category_assignment._signal,
         )
 
+    @staticmethod
+    def log_update_category_assignments(category_assignments: list) -> None:
+        """
+        Bulk variant of log_update_category_assignment for Signals that are re-assigned to their category, the Service
+        Level Objective is only logged for the first category of a Signal and is therefore not logged.
+        """
+        if not settings.FEATURE_FLAGS.get('SIGNAL_HISTORY_LOG_ENABLED', False):
+            return
+
+        content_type = ContentType.objects.get_for_model(CategoryAssignment)
+        Log.objects.bulk_create([
+            Log(
+                content_type=content_type,
+                object_pk=str(category_assignment.pk),
+                action=Log.ACTION_UPDATE,
+                extra=category_assignment.category.name,
+                created_by=category_assignment.created_by,
+                created_at=category_assignment.created_at,
+                _signal_id=category_assignment._signal_id,
+            ) for category_assignment in category_assignments
+        ])
+
     @staticmethod
     def log_update_location(location: Location) -> None:
         if not settings.FEATURE_FLAGS.get('SIGNAL_HISTORY_LOG_ENABLED', False):
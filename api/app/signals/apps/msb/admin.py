@@ -1,13 +1,21 @@
 # SPDX-License-Identifier: MPL-2.0
 # Copyright (C) 2022 Gemeente Amsterdam
 from django.contrib import admin
-from django.db import transaction
 
-from signals.apps.msb.models import Melding
-from signals.apps.signals.models import Status
+from signals.apps.msb.models import Melding, Onderwerp
 
 
 class MeldingAdmin(admin.ModelAdmin):
     pass
 
-admin.site.register(Melding, MeldingAdmin)
\ No newline at end of file
+
+admin.site.register(Melding, MeldingAdmin)
+
+
+class OnderwerpAdmin(admin.ModelAdmin):
+    list_display = ('msb_id', 'omschrijving', 'category')
+    search_fields = ('msb_id', 'omschrijving')
+    raw_id_fields = ('category',)
+
+
+admin.site.register(Onderwerp, OnderwerpAdmin)
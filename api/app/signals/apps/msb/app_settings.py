@@ -0,0 +1,13 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+Settings for the MSB (Meldingen Systeem Buitenruimte) synchronisation.
+"""
+MSB_SYNC_REQUEST_TIMEOUT = 30  # Seconds to wait for the MSB feed before giving up
+MSB_SYNC_BATCH_SIZE = 500  # Number of Meldingen looked up, created or updated per query
+
+# Signals created from MSB meldingen
+MSB_SIGNAL_SOURCE = 'MSB'
+MSB_WOONPLAATS = 'Rotterdam'
+MSB_FALLBACK_CATEGORY_SLUG = 'overig'
+MSB_FALLBACK_PARENT_CATEGORY_SLUG = 'overig'
@@ -0,0 +1,7 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+class MSBMaterializeException(Exception):
+    """
+    Exception to be raised when MSB items cannot be turned into Signals
+    """
+    pass
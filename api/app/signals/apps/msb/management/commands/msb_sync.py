@@ -0,0 +1,32 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from timeit import default_timer as timer
+
+from django.core.management import BaseCommand
+
+from signals.apps.msb.app_settings import MSB_SYNC_BATCH_SIZE
+from signals.apps.msb.services import MSBSyncService
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument('--url', type=str, dest='url', help='Base URL of the MSB API, defaults to MSB_API_URL')
+        parser.add_argument('--batch-size', type=int, dest='batch_size', default=MSB_SYNC_BATCH_SIZE,
+                            help=f'Number of meldingen handled per query (default: {MSB_SYNC_BATCH_SIZE})')
+
+    def handle(self, *args, **options):
+        start = timer()
+        self.stdout.write('Synchronise MSB meldingen')
+
+        items = MSBSyncService.fetch(url=options['url'])
+        metrics = MSBSyncService.sync(items=items, batch_size=options['batch_size'])
+
+        metrics_dict = metrics.as_dict()
+        for batch in metrics_dict.pop('batches'):
+            self.stdout.write(f'* Materialized batch: {", ".join(f"{k}: {v}" for k, v in batch.items())}')
+        for key, value in metrics_dict.items():
+            self.stdout.write(f'* {key}: {value}')
+
+        stop = timer()
+        self.stdout.write(f'Time: {stop - start:.2f} second(s)')
+        self.stdout.write('Done!')
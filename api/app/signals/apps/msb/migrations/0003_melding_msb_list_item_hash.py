@@ -0,0 +1,18 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('msb', '0002_auto_20221020_1121'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='melding',
+            name='msb_list_item_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+    ]
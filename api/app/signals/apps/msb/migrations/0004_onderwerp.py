@@ -0,0 +1,32 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('signals', '0162_signal_user_HISTORY'),
+        ('msb', '0003_melding_msb_list_item_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Onderwerp',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('msb_id', models.CharField(max_length=255, unique=True)),
+                ('omschrijving', models.CharField(blank=True, max_length=255)),
+                ('category', models.ForeignKey(limit_choices_to={'parent__isnull': False},
+                                               on_delete=django.db.models.deletion.CASCADE, related_name='+',
+                                               to='signals.category')),
+            ],
+            options={
+                'verbose_name_plural': 'Onderwerpen',
+                'ordering': ('msb_id',),
+            },
+        ),
+    ]
@@ -9,13 +9,33 @@ from django.utils import timezone
 from pytz import utc
 
 from signals.apps.signals.managers import SignalManager
-from signals.apps.signals.models import Signal
+from signals.apps.signals.models import Category, Signal
 from signals.apps.signals.models.mixins import CreatedUpdatedModel
 from signals.apps.signals.querysets import SignalQuerySet
-from signals.apps.api.validation.address.pdok import PDOKAddressValidation
 import json
 
 
+class Onderwerp(CreatedUpdatedModel):
+    """
+    Explicit mapping of an MSB onderwerp onto a sub category, onderwerpen that are not mapped are matched on slug.
+    """
+    msb_id = models.CharField(max_length=255, unique=True)
+    omschrijving = models.CharField(max_length=255, blank=True)
+    category = models.ForeignKey(
+        to=Category,
+        on_delete=models.CASCADE,
+        related_name='+',
+        limit_choices_to={'parent__isnull': False},
+    )
+
+    class Meta:
+        ordering = ('msb_id',)
+        verbose_name_plural = 'Onderwerpen'
+
+    def __str__(self):
+        return f'{self.msb_id} - {self.omschrijving}'
+
+
 class Melding(CreatedUpdatedModel):
     msb_id = models.PositiveBigIntegerField(unique=True)
     signal = models.OneToOneField(
@@ -23,19 +43,18 @@ class Melding(CreatedUpdatedModel):
         on_delete=models.CASCADE,
     )
     msb_list_item = models.TextField(null=True, blank=True)
+    msb_list_item_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
     msb_item = models.TextField(null=True, blank=True)
     uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
 
     def set_signal_location(self):
-        data = json.loads(self.msb_list_item)
-        address = {
-            'openbare_ruimte': data["locatie"]["adres"]["straatNaam"], 
-            'huisnummer': data["locatie"]["adres"]["huisnummer"],
-            'woonplaats': "Rotterdam",
-        }
-        location_validator = PDOKAddressValidation()
-        validated_address = location_validator.validate_address(address=address)
-        print(validated_address)
+        """
+        Location from the RD coordinates in the MSB item, the address is only geocoded (cached) when these are missing.
+        """
+        from signals.apps.msb.services.materialize import MSBMaterializeService
+
+        location_data, = MSBMaterializeService.resolve_locations([json.loads(self.msb_list_item)])
+        Signal.actions.update_location(location_data, self.signal)
 
     def update_signal(self):
         # location
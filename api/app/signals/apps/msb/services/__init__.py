@@ -0,0 +1,11 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from signals.apps.msb.services.categories import MSBCategoryResolverService
+from signals.apps.msb.services.materialize import MSBMaterializeService
+from signals.apps.msb.services.sync import MSBSyncService
+
+__all__ = [
+    'MSBCategoryResolverService',
+    'MSBMaterializeService',
+    'MSBSyncService',
+]
@@ -0,0 +1,65 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+Resolve MSB onderwerpen to sub categories.
+
+An onderwerp is resolved, in order, by the explicit mapping in the `Onderwerp` table, by the slug of its
+"omschrijving" and finally to the fallback category. The mapping and the category tree are kept in memory, so resolving
+a whole feed costs no queries once both are loaded.
+"""
+import threading
+
+from signals.apps.msb.app_settings import (
+    MSB_FALLBACK_CATEGORY_SLUG,
+    MSB_FALLBACK_PARENT_CATEGORY_SLUG
+)
+from signals.apps.msb.exceptions import MSBMaterializeException
+from signals.apps.msb.models import Onderwerp
+from signals.apps.services.domain.categories import CategoryResolverService
+
+
+class MSBCategoryResolverService:
+    _mapping = None
+    _index = None  # The CategoryIndex the mapping was loaded with
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_mapping(cls):
+        """
+        MSB onderwerp id -> Category, reloaded whenever the category index is rebuilt (changes to the Onderwerp table
+        invalidate the category index as well, see signals.apps.msb.signals, and the index is rebuilt after
+        CATEGORY_INDEX_TIMEOUT seconds).
+        """
+        index = CategoryResolverService.get_index()
+        if cls._index is not index:
+            with cls._lock:
+                if cls._index is not index:
+                    cls._mapping = {
+                        msb_id: index.by_pk[category_id]
+                        for msb_id, category_id in Onderwerp.objects.values_list('msb_id', 'category_id')
+                        if category_id in index.by_pk
+                    }
+                    cls._index = index
+        return cls._mapping
+
+    @classmethod
+    def resolve(cls, onderwerpen):
+        """
+        Resolve MSB onderwerpen to sub categories.
+
+        :param onderwerpen: list of MSB onderwerpen ({"id": ..., "omschrijving": ...})
+        :returns: list of Categories in the order of the given onderwerpen
+        """
+        mapping = cls.get_mapping()
+        by_slug = CategoryResolverService.resolve(
+            [onderwerp.get('omschrijving') for onderwerp in onderwerpen],
+            fallback_slug=MSB_FALLBACK_CATEGORY_SLUG,
+            fallback_parent_slug=MSB_FALLBACK_PARENT_CATEGORY_SLUG,
+        )
+
+        categories = [
+            mapping.get(str(onderwerp.get('id')), category) for onderwerp, category in zip(onderwerpen, by_slug)
+        ]
+        if None in categories:
+            raise MSBMaterializeException(f'Fallback category "{MSB_FALLBACK_CATEGORY_SLUG}" does not exist')
+        return categories
@@ -0,0 +1,310 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+Turn MSB items into Signals in bulk.
+
+A batch of MSB items is materialized with a constant number of queries: categories (from memory), SLO's, areas and
+(when an item has no coordinates) addresses are resolved for the whole batch at once and every related model
+(Location, Status, CategoryAssignment, Reporter, Priority and Type) is inserted with a single `bulk_create`. The
+`create_initial` Django signal is sent for every created Signal once the transaction is committed, just like
+`SignalManager.create_initial` does. Malformed items and items for which no location can be determined are logged and
+skipped, so they do not block the rest of the batch.
+"""
+import logging
+from timeit import default_timer as timer
+
+from django.contrib.gis.gdal import CoordTransform, SpatialReference
+from django.contrib.gis.geos import Point
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from signals.apps.api.validation.address.cache import AddressGeocodeService
+from signals.apps.msb.app_settings import MSB_SIGNAL_SOURCE, MSB_WOONPLAATS
+from signals.apps.msb.services.categories import MSBCategoryResolverService
+from signals.apps.services.domain.deadlines import DeadlineCalculationService
+from signals.apps.signals import workflow
+from signals.apps.signals.managers import SignalManager, create_initial, send_signals
+from signals.apps.signals.models import (
+    CategoryAssignment,
+    Location,
+    Priority,
+    Reporter,
+    ServiceLevelObjective,
+    Signal,
+    Status,
+    Type
+)
+from signals.apps.signals.utils.location import AddressFormatter, _get_areas, _get_stadsdeel_codes
+from signals.settings import DEFAULT_SIGNAL_AREA_TYPE
+
+logger = logging.getLogger(__name__)
+
+MSB_STATUS_TO_STATE = {
+    'Nieuw': workflow.GEMELD,
+    'Doorverwezen gekregen': workflow.AFWACHTING,
+    'Inbehandeling': workflow.BEHANDELING,
+    'Heropend': workflow.HEROPEND,
+    'Afgehandeld': workflow.AFGEHANDELD,
+}
+
+
+class MSBMaterializeService:
+    def __init__(self):
+        self.timings = []  # Timings (in seconds) of every materialized batch
+
+    @staticmethod
+    def parse_datetime(value):
+        parsed = parse_datetime(value)
+        if parsed is not None and timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    @staticmethod
+    def validate(item):
+        """
+        :returns: the reason the MSB item cannot be turned into a Signal, None for a valid item
+        """
+        if not isinstance(item.get('onderwerp'), dict):
+            return 'has no onderwerp'
+
+        try:
+            created_at = MSBMaterializeService.parse_datetime(item.get('datumMelding') or '')
+        except (TypeError, ValueError):
+            created_at = None
+        if created_at is None:
+            return 'has no valid datumMelding'
+
+        location = item.get('locatie') or {}
+        if not isinstance(location, dict):
+            return 'has no valid locatie'
+        if any(location.get(key) and not isinstance(location[key], (int, float)) for key in ('x', 'y')):
+            return 'has no valid coordinates'
+        return None
+
+    @staticmethod
+    def _resolve_categories(items):
+        """
+        Sub categories for all items, see MSBCategoryResolverService.
+        """
+        return MSBCategoryResolverService.resolve([item['onderwerp'] for item in items])
+
+    @staticmethod
+    def _get_address(item):
+        address = (item.get('locatie') or {}).get('adres')
+        if not address:
+            return None
+        return {
+            'openbare_ruimte': address.get('straatNaam', ''),
+            'huisnummer': address.get('huisnummer', ''),
+            'woonplaats': MSB_WOONPLAATS,
+        }
+
+    @staticmethod
+    def _resolve_geometries(items, addresses):
+        """
+        Geometry (WGS84) for all items. The RD coordinates in the MSB item are used when present, only the addresses
+        of items without coordinates are geocoded (as a single batch, see AddressGeocodeService).
+
+        :returns: tuple of the geometries (None for items without a location) and the validated addresses (None for
+                  items that were not geocoded)
+        """
+        rd_to_wgs84 = CoordTransform(SpatialReference(28992), SpatialReference(4326))
+
+        geometries = [None] * len(items)
+        validated_addresses = [None] * len(items)
+        to_geocode = []
+        for i, (item, address) in enumerate(zip(items, addresses)):
+            location = item.get('locatie') or {}
+            if location.get('x') and location.get('y'):
+                geometries[i] = Point(location['x'], location['y'], srid=28992)
+                geometries[i].transform(rd_to_wgs84)
+            elif address:
+                to_geocode.append(i)
+
+        if to_geocode:
+            results = AddressGeocodeService.geocode([addresses[i] for i in to_geocode])
+            for i, result in zip(to_geocode, results):
+                if result and result['geometrie']:
+                    geometries[i] = Point(*result['geometrie'], srid=4326)
+                    validated_addresses[i] = result['address']
+        return geometries, validated_addresses
+
+    @staticmethod
+    def resolve_locations(items):
+        """
+        Location data for all items, based on the RD coordinates and address in the MSB item. None for the items of
+        which the location could not be determined.
+        """
+        addresses = [MSBMaterializeService._get_address(item) for item in items]
+        geometries, validated_addresses = MSBMaterializeService._resolve_geometries(items, addresses)
+
+        located = [i for i, geometry in enumerate(geometries) if geometry is not None]
+        located_geometries = [geometries[i] for i in located]
+        stadsdelen = _get_stadsdeel_codes(located_geometries)
+        areas = (_get_areas(located_geometries, DEFAULT_SIGNAL_AREA_TYPE) if DEFAULT_SIGNAL_AREA_TYPE
+                 else [None] * len(located))
+
+        locations = [None] * len(items)
+        for i, stadsdeel, area in zip(located, stadsdelen, areas):
+            address, validated_address, geometry = addresses[i], validated_addresses[i], geometries[i]
+            location_data = {'geometrie': geometry, 'stadsdeel': stadsdeel, 'address': address}
+            if validated_address:
+                # Same as the AddressValidationMixin, the original address is kept in the extra properties
+                location_data.update({
+                    'address': validated_address,
+                    'extra_properties': {'original_address': address},
+                    'bag_validated': True,
+                })
+            if area:
+                location_data.update({
+                    'area_type_code': DEFAULT_SIGNAL_AREA_TYPE,
+                    'area_code': area.code,
+                    'area_name': area.name,
+                })
+            locations[i] = location_data
+        return locations
+
+    @staticmethod
+    def _resolve_slos(categories):
+        """
+        The current ServiceLevelObjective per category.
+        """
+        slos = {}
+        for slo in ServiceLevelObjective.objects.filter(category__in=set(categories)).order_by('created_at'):
+            slos[slo.category_id] = slo  # Ordered by created_at so the latest one wins
+        return slos
+
+    @staticmethod
+    def _get_deadlines(created_at, slo):
+        if slo is None:
+            return None, None
+        return (
+            DeadlineCalculationService.get_deadline(created_at, slo.n_days, slo.use_calendar_days, 1),
+            DeadlineCalculationService.get_deadline(created_at, slo.n_days, slo.use_calendar_days, 3),
+        )
+
+    def materialize(self, items):
+        """
+        Create a Signal, with all related objects, for every given MSB item.
+
+        :param items: list of MSB list items
+        :returns: list of Signals in the same order as the given items, None for the skipped items (malformed or
+                  without location)
+        """
+        valid = []
+        for i, item in enumerate(items):
+            error = self.validate(item)
+            if error is None:
+                valid.append(i)
+            else:
+                logger.warning(f'MSB item {item.get("id")} {error}, skipped')
+
+        result = [None] * len(items)
+        for i, signal in zip(valid, self._materialize([items[i] for i in valid])):
+            result[i] = signal
+        return result
+
+    def _materialize(self, items):
+        if not items:
+            return []
+
+        timings = {'size': len(items)}
+        start = timer()
+
+        categories = self._resolve_categories(items)
+        slos = self._resolve_slos(categories)
+        timings['categories'] = timer() - start
+
+        checkpoint = timer()
+        locations = self.resolve_locations(items)
+        timings['locations'] = timer() - checkpoint
+
+        located = []
+        for i, (item, location) in enumerate(zip(items, locations)):
+            if location is None:
+                logger.warning(f'No location could be determined for MSB item {item.get("id")}, skipped')
+            else:
+                located.append(i)
+
+        checkpoint = timer()
+        signals = []
+        if located:
+            with transaction.atomic():
+                signals = self._bulk_create([items[i] for i in located], [categories[i] for i in located], slos,
+                                            [locations[i] for i in located])
+
+                transaction.on_commit(lambda: send_signals([
+                    (create_initial, {'sender': SignalManager, 'signal_obj': signal}) for signal in signals
+                ]))
+        timings['insert'] = timer() - checkpoint
+        timings['total'] = timer() - start
+
+        self.timings.append(timings)
+        logger.info(f'Materialized {len(signals)} MSB items in {timings["total"]:.3f} second(s)')
+
+        result = [None] * len(items)
+        for i, signal in zip(located, signals):
+            result[i] = signal
+        return result
+
+    def _bulk_create(self, items, categories, slos, locations):
+        created_at = [self.parse_datetime(item['datumMelding']) for item in items]
+
+        signals = Signal.objects.bulk_create([
+            Signal(
+                text=item.get('omschrijving') or item['onderwerp'].get('omschrijving') or '',
+                incident_date_start=date,
+                source=MSB_SIGNAL_SOURCE,
+            )
+            for item, date in zip(items, created_at)
+        ])
+
+        location_objs = Location.objects.bulk_create([
+            Location(
+                _signal=signal,
+                address_text=AddressFormatter(address=data['address']).format('O hlT p W') if data['address'] else '',
+                **data
+            )
+            for signal, data in zip(signals, locations)
+        ])
+        status_objs = Status.objects.bulk_create([
+            Status(_signal=signal, state=MSB_STATUS_TO_STATE.get(item.get('status'), workflow.GEMELD),
+                   text=item.get('status'))
+            for signal, item in zip(signals, items)
+        ])
+
+        category_assignments = []
+        for signal, category, date in zip(signals, categories, created_at):
+            deadline, deadline_factor_3 = self._get_deadlines(date, slos.get(category.pk))
+            category_assignments.append(CategoryAssignment(
+                _signal=signal,
+                category=category,
+                deadline=deadline,
+                deadline_factor_3=deadline_factor_3,
+                stored_handling_message=category.handling_message,
+            ))
+        category_assignments = CategoryAssignment.objects.bulk_create(category_assignments)
+
+        reporters = Reporter.objects.bulk_create([Reporter(_signal=signal, sharing_allowed=True) for signal in signals])
+        priorities = Priority.objects.bulk_create([
+            Priority(_signal=signal, priority=Priority.PRIORITY_HIGH if item.get('spoed') else Priority.PRIORITY_NORMAL)
+            for signal, item in zip(signals, items)
+        ])
+        types = Type.objects.bulk_create([Type(_signal=signal) for signal in signals])
+
+        # Set the dependent model instances on the Signals, `created_at` is set to "now" on insert so it is backdated
+        # to the MSB registration date in the same query
+        for signal, date, location, status, category_assignment, reporter, priority, signal_type in zip(
+                signals, created_at, location_objs, status_objs, category_assignments, reporters, priorities, types):
+            signal.created_at = date
+            signal.location = location
+            signal.status = status
+            signal.category_assignment = category_assignment
+            signal.reporter = reporter
+            signal.priority = priority
+            signal.type_assignment = signal_type
+
+        Signal.objects.bulk_update(signals, fields=['created_at', 'location', 'status', 'category_assignment',
+                                                    'reporter', 'priority', 'type_assignment'])
+        return signals
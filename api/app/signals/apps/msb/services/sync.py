@@ -0,0 +1,165 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+Incremental synchronisation of the MSB meldingen feed.
+
+Every item in the feed is hashed and compared to the hash of the stored `Melding.msb_list_item`. Only new and
+changed items are written to the database, in bulk, so the cost of a sync depends on the number of changes in the
+feed instead of its size.
+
+A new item becomes a Signal (see MSBMaterializeService). For a changed item only the stored MSB item is updated, its
+Signal is left as is: changes in the MSB feed (e.g. a new status) are not applied to the Signals.
+"""
+import hashlib
+import json
+import logging
+from timeit import default_timer as timer
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from signals.apps.msb.app_settings import MSB_SYNC_BATCH_SIZE, MSB_SYNC_REQUEST_TIMEOUT
+from signals.apps.msb.models import Melding
+from signals.apps.msb.services.materialize import MSBMaterializeService
+
+logger = logging.getLogger(__name__)
+
+
+class MSBSyncMetrics:
+    """
+    Counters collected during a single sync run.
+    """
+    def __init__(self):
+        self.seen = 0
+        self.created = 0
+        self.changed = 0
+        self.unchanged = 0
+        self.skipped = 0
+        self.duration = 0.0
+        self.batches = []  # Timings of the materialized batches, see MSBMaterializeService
+
+    def as_dict(self):
+        return {
+            'seen': self.seen,
+            'created': self.created,
+            'changed': self.changed,
+            'unchanged': self.unchanged,
+            'skipped': self.skipped,
+            'duration': round(self.duration, 3),
+            'batches': [{key: round(value, 3) for key, value in batch.items()} for batch in self.batches],
+        }
+
+    def __str__(self):
+        return ', '.join(f'{key}: {value}' for key, value in self.as_dict().items() if key != 'batches')
+
+
+class MSBSyncService:
+    @staticmethod
+    def content_hash(item):
+        """
+        SHA-256 of the canonical JSON representation of an MSB item, key order does not influence the hash.
+        """
+        serialized = json.dumps(item, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def fetch(url=None, timeout=MSB_SYNC_REQUEST_TIMEOUT):
+        """
+        Retrieve the list of meldingen from the MSB API (or the stand-in found in the "msb" folder of this project).
+        """
+        response = requests.get(f'{url or settings.MSB_API_URL}/api/', timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    @staticmethod
+    def sync(items=None, batch_size=MSB_SYNC_BATCH_SIZE):
+        """
+        Store new and changed MSB items, when no items are given the MSB feed is fetched.
+
+        :param items: list of MSB list items (Default: None)
+        :param batch_size: number of items handled per query (Default: MSB_SYNC_BATCH_SIZE)
+        :returns: MSBSyncMetrics
+        """
+        start = timer()
+        metrics = MSBSyncMetrics()
+        materializer = MSBMaterializeService()
+
+        if items is None:
+            items = MSBSyncService.fetch()
+
+        payloads = {}
+        for item in items:
+            if not item.get('id'):
+                logger.warning('MSB item without an id, skipped')
+                metrics.skipped += 1
+                continue
+            payloads[int(item['id'])] = item  # The feed could contain duplicates, the last one wins
+        metrics.seen = len(payloads)
+
+        msb_ids = list(payloads.keys())
+        for offset in range(0, len(msb_ids), batch_size):
+            batch = {msb_id: payloads[msb_id] for msb_id in msb_ids[offset:offset + batch_size]}
+            MSBSyncService._sync_batch(batch, metrics, materializer)
+
+        metrics.batches = materializer.timings
+        metrics.duration = timer() - start
+        logger.info(f'MSB sync done, {metrics}')
+        return metrics
+
+    @staticmethod
+    def _sync_batch(payloads, metrics, materializer):
+        hashes = {msb_id: MSBSyncService.content_hash(item) for msb_id, item in payloads.items()}
+
+        existing = list(Melding.objects.filter(msb_id__in=payloads.keys()).only('id', 'msb_id', 'msb_list_item_hash'))
+
+        now = timezone.now()
+        changed = []
+        for melding in existing:
+            if melding.msb_list_item_hash == hashes[melding.msb_id]:
+                continue
+
+            # Only the stored MSB item is updated, the changes are not applied to the Signal of the Melding
+            melding.msb_list_item = json.dumps(payloads[melding.msb_id])
+            melding.msb_list_item_hash = hashes[melding.msb_id]
+            melding.updated_at = now  # bulk_update does not touch the auto_now field
+            changed.append(melding)
+
+        new_ids = set(payloads.keys()) - {melding.msb_id for melding in existing}
+
+        skipped = 0
+        if changed or new_ids:
+            with transaction.atomic():
+                if changed:
+                    Melding.objects.bulk_update(changed, fields=['msb_list_item', 'msb_list_item_hash', 'updated_at'])
+                if new_ids:
+                    skipped = MSBSyncService._create_meldingen(
+                        {msb_id: payloads[msb_id] for msb_id in new_ids}, hashes, materializer)
+
+        metrics.created += len(new_ids) - skipped
+        metrics.skipped += skipped
+        metrics.changed += len(changed)
+        metrics.unchanged += len(existing) - len(changed)
+
+    @staticmethod
+    def _create_meldingen(payloads, hashes, materializer):
+        """
+        Create a Melding, and the Signal it belongs to, for every given MSB item. The items that could not be turned
+        into a Signal are skipped, they are tried again on the next sync.
+
+        :returns: number of skipped items
+        """
+        msb_ids = list(payloads.keys())
+        signals = materializer.materialize([payloads[msb_id] for msb_id in msb_ids])
+
+        Melding.objects.bulk_create([
+            Melding(
+                msb_id=msb_id,
+                signal=signal,
+                msb_list_item=json.dumps(payloads[msb_id]),
+                msb_list_item_hash=hashes[msb_id],
+            )
+            for msb_id, signal in zip(msb_ids, signals) if signal is not None
+        ])
+        return sum(signal is None for signal in signals)
@@ -0,0 +1,23 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+Periodic tasks for the MSB synchronisation
+"""
+import logging
+
+from signals.apps.msb.services import MSBSyncService
+from signals.celery import app
+
+logger = logging.getLogger(__name__)
+
+
+@app.task
+def sync_meldingen():
+    """Celery task to synchronise the MSB meldingen feed.
+
+    This task is scheduled in Celery beat to run periodically (see the MSB_SYNC_INTERVAL setting).
+
+    :returns: dict with the sync metrics
+    """
+    metrics = MSBSyncService.sync()
+    return metrics.as_dict()
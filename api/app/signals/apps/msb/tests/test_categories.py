@@ -0,0 +1,76 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from time import monotonic
+from unittest import mock
+
+from django.test import TestCase
+
+from signals.apps.msb.exceptions import MSBMaterializeException
+from signals.apps.msb.mock_data import meldingen
+from signals.apps.msb.models import Onderwerp
+from signals.apps.msb.services import MSBCategoryResolverService
+from signals.apps.msb.utils import map_msb_list_item_on_signal
+from signals.apps.services.domain.categories import CATEGORY_INDEX_TIMEOUT, CategoryResolverService
+from signals.apps.signals.factories import CategoryFactory, ParentCategoryFactory
+from signals.apps.signals.models import Category
+
+
+class TestMSBCategoryResolverService(TestCase):
+    def setUp(self):
+        CategoryResolverService.invalidate()
+        self.addCleanup(CategoryResolverService.invalidate)  # The index outlives the rolled back test transaction
+
+        self.parent = ParentCategoryFactory.create(name='MSB hoofdcategorie')
+        self.category = CategoryFactory.create(name='MSB onderwerp', parent=self.parent)
+        self.mapped_category = CategoryFactory.create(name='Gemapt MSB onderwerp', parent=self.parent)
+
+    def test_resolve(self):
+        Onderwerp.objects.create(msb_id='2002', omschrijving='Iets anders', category=self.mapped_category)
+
+        resolved = MSBCategoryResolverService.resolve([
+            {'id': '1001', 'omschrijving': 'MSB onderwerp'},  # Matched on slug
+            {'id': '2002', 'omschrijving': 'Iets anders'},  # Explicitly mapped
+            {'id': '2002', 'omschrijving': 'MSB onderwerp'},  # The explicit mapping wins
+            {'id': '3003', 'omschrijving': 'Onbekend MSB onderwerp'},  # Fallback
+        ])
+
+        self.assertEqual(resolved[:3], [self.category, self.mapped_category, self.mapped_category])
+        self.assertEqual(resolved[3].slug, 'overig')
+
+    def test_mapping_is_reloaded_on_change(self):
+        onderwerp = {'id': '2002', 'omschrijving': 'Iets anders'}
+        self.assertEqual(MSBCategoryResolverService.resolve([onderwerp])[0].slug, 'overig')
+
+        mapping = Onderwerp.objects.create(msb_id='2002', category=self.mapped_category)
+        self.assertEqual(MSBCategoryResolverService.resolve([onderwerp]), [self.mapped_category])
+
+        mapping.delete()
+        self.assertEqual(MSBCategoryResolverService.resolve([onderwerp])[0].slug, 'overig')
+
+    def test_mapping_is_reloaded_after_timeout(self):
+        onderwerp = {'id': '2002', 'omschrijving': 'Iets anders'}
+        self.assertEqual(MSBCategoryResolverService.resolve([onderwerp])[0].slug, 'overig')
+
+        # Created without sending signals, like a change made by another process that does not share the Django cache
+        Onderwerp.objects.bulk_create([Onderwerp(msb_id='2002', category=self.mapped_category)])
+        self.assertEqual(MSBCategoryResolverService.resolve([onderwerp])[0].slug, 'overig')
+
+        later = monotonic() + CATEGORY_INDEX_TIMEOUT + 1
+        with mock.patch('signals.apps.services.domain.categories.monotonic', return_value=later):
+            self.assertEqual(MSBCategoryResolverService.resolve([onderwerp]), [self.mapped_category])
+
+    def test_missing_fallback(self):
+        Category.objects.filter(slug='overig', parent__isnull=False).delete()
+
+        with self.assertRaises(MSBMaterializeException):
+            MSBCategoryResolverService.resolve([{'id': '3003', 'omschrijving': 'Onbekend MSB onderwerp'}])
+
+    def test_query_count_does_not_depend_on_the_number_of_items(self):
+        items = meldingen()
+
+        with self.assertNumQueries(2):  # The category tree and the MSB onderwerp mapping
+            map_msb_list_item_on_signal(items[:1])
+        with self.assertNumQueries(0):
+            signal_data = map_msb_list_item_on_signal(items)
+
+        self.assertEqual(len(signal_data), len(items))
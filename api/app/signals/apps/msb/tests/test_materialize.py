@@ -0,0 +1,171 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+import copy
+import json
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from requests_mock.mocker import Mocker
+
+from signals.apps.api.validation.address.cache import AddressGeocodeService
+from signals.apps.api.validation.address.pdok import PDOKAddressValidation
+from signals.apps.msb.mock_data import meldingen
+from signals.apps.msb.models import Melding
+from signals.apps.msb.services.materialize import MSBMaterializeService
+from signals.apps.services.domain.categories import CategoryResolverService
+from signals.apps.signals import workflow
+from signals.apps.signals.factories import (
+    CategoryFactory,
+    ParentCategoryFactory,
+    ServiceLevelObjectiveFactory
+)
+from signals.apps.signals.models import Priority, Signal, Type
+
+
+class TestMSBMaterializeService(TestCase):
+    def setUp(self):
+        self.items = meldingen()
+        self.addCleanup(CategoryResolverService.invalidate)
+
+    def test_materialize(self):
+        item = self.items[0]
+
+        signal, = MSBMaterializeService().materialize([item])
+        signal = Signal.objects.get(pk=signal.pk)
+
+        self.assertEqual(timezone.localtime(signal.created_at).strftime('%Y-%m-%dT%H:%M:%S'), item['datumMelding'])
+        self.assertEqual(signal.text, item['onderwerp']['omschrijving'])
+        self.assertEqual(signal.status.state, workflow.GEMELD)
+        self.assertEqual(signal.status.text, item['status'])
+        self.assertEqual(signal.priority.priority, Priority.PRIORITY_NORMAL)
+        self.assertEqual(signal.type_assignment.name, Type.SIGNAL)
+        self.assertTrue(signal.reporter.is_anonymous)
+        self.assertEqual(signal.location.address['openbare_ruimte'], item['locatie']['adres']['straatNaam'])
+        self.assertTrue(signal.location.address_text.startswith('COOLSINGEL 4'))
+        self.assertAlmostEqual(signal.location.geometrie.x, 4.47, places=1)
+        self.assertAlmostEqual(signal.location.geometrie.y, 51.92, places=1)
+
+    def test_materialize_category(self):
+        parent = ParentCategoryFactory.create(name='MSB hoofdcategorie')
+        category = CategoryFactory.create(name='MSB onderwerp', parent=parent)
+        ServiceLevelObjectiveFactory.create(category=category, n_days=2, use_calendar_days=True)
+
+        items = [
+            dict(copy.deepcopy(self.items[1]), onderwerp={'id': '1001', 'omschrijving': 'MSB onderwerp'}),
+            dict(copy.deepcopy(self.items[2]), onderwerp={'id': '1002', 'omschrijving': 'Onbekend MSB onderwerp'}),
+        ]
+        item_with_category, item_without_category = MSBMaterializeService().materialize(items)
+
+        self.assertEqual(item_with_category.category_assignment.category, category)
+        self.assertEqual(item_with_category.category_assignment.deadline,
+                         item_with_category.created_at + timezone.timedelta(days=2))
+        self.assertEqual(item_without_category.category_assignment.category.slug, 'overig')
+
+    @Mocker()
+    def test_materialize_uses_coordinates(self, mocker):
+        MSBMaterializeService().materialize(self.items[:10])
+
+        self.assertEqual(mocker.call_count, 0)
+
+    @Mocker()
+    def test_materialize_geocodes_items_without_coordinates(self, mocker):
+        AddressGeocodeService.lru.clear()
+        self.addCleanup(AddressGeocodeService.lru.clear)
+        mocker.get(PDOKAddressValidation.address_validation_url, json={'response': {'numFound': 1, 'docs': [{
+            'straatnaam': 'Coolsingel',
+            'huisnummer': 4,
+            'woonplaatsnaam': 'Rotterdam',
+            'centroide_ll': 'POINT(4.4787 51.9237)',
+        }]}})
+
+        items = [copy.deepcopy(self.items[0]) for _ in range(3)]
+        for i, item in enumerate(items):
+            item['id'] = i
+            del item['locatie']['x'], item['locatie']['y']
+
+        signals = MSBMaterializeService().materialize(items)
+
+        self.assertEqual(mocker.call_count, 1)  # The same address in the whole batch
+        for signal in signals:
+            self.assertTrue(signal.location.bag_validated)
+            self.assertEqual(signal.location.address['openbare_ruimte'], 'Coolsingel')
+            self.assertEqual(signal.location.extra_properties['original_address']['openbare_ruimte'], 'COOLSINGEL')
+            self.assertAlmostEqual(signal.location.geometrie.x, 4.4787)
+
+    @Mocker()
+    def test_materialize_skips_items_without_location(self, mocker):
+        AddressGeocodeService.lru.clear()
+        self.addCleanup(AddressGeocodeService.lru.clear)
+        mocker.get(PDOKAddressValidation.address_validation_url, json={'response': {'numFound': 0, 'docs': []}})
+
+        items = copy.deepcopy(self.items[:3])
+        del items[1]['locatie']['x'], items[1]['locatie']['y']
+
+        with self.assertLogs('signals.apps.msb.services.materialize', level='WARNING'):
+            signals = MSBMaterializeService().materialize(items)
+
+        self.assertIsNone(signals[1])
+        self.assertIsNotNone(signals[0])
+        self.assertIsNotNone(signals[2])
+        self.assertEqual(Signal.objects.count(), 2)
+
+    def test_materialize_skips_malformed_items(self):
+        items = copy.deepcopy(self.items[:6])
+        del items[1]['onderwerp']
+        items[2]['datumMelding'] = 'gisteren'
+        items[3]['locatie']['x'] = 'onbekend'
+        del items[4]['status'], items[4]['spoed']
+
+        with self.assertLogs('signals.apps.msb.services.materialize', level='WARNING') as logs:
+            signals = MSBMaterializeService().materialize(items)
+
+        self.assertEqual(len(logs.records), 3)
+        self.assertEqual([signal is not None for signal in signals], [True, False, False, False, True, True])
+        self.assertEqual(Signal.objects.count(), 3)
+
+        # Missing optional fields get their defaults
+        self.assertEqual(signals[4].status.state, workflow.GEMELD)
+        self.assertEqual(signals[4].priority.priority, Priority.PRIORITY_NORMAL)
+
+    def test_materialize_spoed(self):
+        item = dict(copy.deepcopy(self.items[0]), spoed=True)
+
+        signal, = MSBMaterializeService().materialize([item])
+
+        self.assertEqual(signal.priority.priority, Priority.PRIORITY_HIGH)
+
+    def test_query_count_does_not_depend_on_batch_size(self):
+        with CaptureQueriesContext(connection) as small_batch:
+            MSBMaterializeService().materialize(self.items[:2])
+        with CaptureQueriesContext(connection) as large_batch:
+            MSBMaterializeService().materialize(self.items[2:])
+
+        self.assertEqual(len(small_batch), len(large_batch))
+
+    def test_timings(self):
+        service = MSBMaterializeService()
+        service.materialize(self.items[:5])
+        service.materialize(self.items[5:10])
+
+        self.assertEqual(len(service.timings), 2)
+        for timings in service.timings:
+            self.assertEqual(timings['size'], 5)
+            self.assertEqual(set(timings.keys()), {'size', 'categories', 'locations', 'insert', 'total'})
+
+    @mock.patch('signals.apps.signals.managers.create_initial.send_robust')
+    def test_create_initial_sent_once_per_signal(self, patched_send_robust):
+        with self.captureOnCommitCallbacks(execute=True):
+            signals = MSBMaterializeService().materialize(self.items[:3])
+
+        self.assertEqual(patched_send_robust.call_count, 3)
+        self.assertEqual([call.kwargs['signal_obj'] for call in patched_send_robust.call_args_list], signals)
+
+    def test_melding_save_uses_materialize(self):
+        melding = Melding(msb_id=self.items[0]['id'], msb_list_item=json.dumps(self.items[0]))
+        melding.save()
+
+        self.assertEqual(Signal.objects.count(), 1)
+        self.assertEqual(melding.signal.status.text, self.items[0]['status'])
@@ -0,0 +1,144 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+import copy
+import json
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from requests_mock.mocker import Mocker
+
+from signals.apps.api.validation.address.pdok import PDOKAddressValidation
+from signals.apps.msb.mock_data import meldingen
+from signals.apps.msb.models import Melding
+from signals.apps.msb.services import MSBSyncService
+from signals.apps.msb.tasks import sync_meldingen
+from signals.apps.signals.models import Signal
+
+
+class TestMSBSyncService(TestCase):
+    """
+    The MSB feed is mocked with the same data the stand-in in the "msb" folder of this project serves.
+    """
+    def setUp(self):
+        self.items = meldingen()
+
+    def test_content_hash_ignores_key_order(self):
+        item = self.items[0]
+        reversed_item = dict(reversed(list(item.items())))
+
+        self.assertEqual(MSBSyncService.content_hash(item), MSBSyncService.content_hash(reversed_item))
+
+        changed_item = copy.deepcopy(item)
+        changed_item['status'] = 'Afgehandeld'
+        self.assertNotEqual(MSBSyncService.content_hash(item), MSBSyncService.content_hash(changed_item))
+
+    def test_initial_sync(self):
+        metrics = MSBSyncService.sync(items=self.items, batch_size=10)
+
+        self.assertEqual(metrics.seen, len(self.items))
+        self.assertEqual(metrics.created, len(self.items))
+        self.assertEqual(metrics.changed, 0)
+        self.assertEqual(metrics.unchanged, 0)
+        self.assertEqual(Melding.objects.count(), len(self.items))
+        self.assertEqual(Signal.objects.count(), len(self.items))
+
+        melding = Melding.objects.get(msb_id=self.items[0]['id'])
+        self.assertEqual(json.loads(melding.msb_list_item), self.items[0])
+        self.assertEqual(melding.msb_list_item_hash, MSBSyncService.content_hash(self.items[0]))
+        self.assertEqual(timezone.localtime(melding.signal.created_at).strftime('%Y-%m-%dT%H:%M:%S'),
+                         self.items[0]['datumMelding'])
+
+    def test_incremental_sync(self):
+        MSBSyncService.sync(items=self.items)
+
+        changed_items = copy.deepcopy(self.items)
+        changed_items[0]['status'] = 'Afgehandeld'
+        changed_items.append(dict(copy.deepcopy(self.items[1]), id=9999999))
+
+        metrics = MSBSyncService.sync(items=changed_items)
+
+        self.assertEqual(metrics.seen, len(self.items) + 1)
+        self.assertEqual(metrics.created, 1)
+        self.assertEqual(metrics.changed, 1)
+        self.assertEqual(metrics.unchanged, len(self.items) - 1)
+        self.assertEqual(len(metrics.batches), 1)
+
+        melding = Melding.objects.get(msb_id=self.items[0]['id'])
+        self.assertEqual(json.loads(melding.msb_list_item)['status'], 'Afgehandeld')
+        self.assertTrue(Melding.objects.filter(msb_id=9999999).exists())
+
+    def test_query_count_does_not_depend_on_the_number_of_changes(self):
+        MSBSyncService.sync(items=self.items[:20])
+
+        def _changed_feed(n):
+            items = copy.deepcopy(self.items[:20])
+            for item in items[:n]:
+                item['status'] = 'Inbehandeling'
+            return items + self.items[20:20 + n]
+
+        with CaptureQueriesContext(connection) as few_changes:
+            MSBSyncService.sync(items=_changed_feed(1))
+        with CaptureQueriesContext(connection) as many_changes:
+            MSBSyncService.sync(items=_changed_feed(10))
+
+        self.assertEqual(len(few_changes), len(many_changes))
+
+    def test_sync_without_changes(self):
+        MSBSyncService.sync(items=self.items)
+
+        with self.assertNumQueries(1):
+            metrics = MSBSyncService.sync(items=self.items)
+
+        self.assertEqual(metrics.created, 0)
+        self.assertEqual(metrics.changed, 0)
+        self.assertEqual(metrics.unchanged, len(self.items))
+
+    def test_sync_skips_items_without_id(self):
+        metrics = MSBSyncService.sync(items=[{'spoed': False}] + self.items[:2])
+
+        self.assertEqual(metrics.skipped, 1)
+        self.assertEqual(metrics.created, 2)
+
+    @Mocker()
+    def test_sync_skips_items_without_location(self, mocker):
+        mocker.get(PDOKAddressValidation.address_validation_url, json={'response': {'numFound': 0, 'docs': []}})
+
+        items = copy.deepcopy(self.items[:3])
+        del items[0]['locatie']['x'], items[0]['locatie']['y'], items[0]['locatie']['adres']
+
+        metrics = MSBSyncService.sync(items=items)
+
+        self.assertEqual(metrics.skipped, 1)
+        self.assertEqual(metrics.created, 2)
+        self.assertFalse(Melding.objects.filter(msb_id=items[0]['id']).exists())
+
+        # The skipped item is tried again on the next sync
+        metrics = MSBSyncService.sync(items=items)
+
+        self.assertEqual(metrics.skipped, 1)
+        self.assertEqual(metrics.unchanged, 2)
+
+    @Mocker()
+    def test_sync_task(self, mocker):
+        mocker.get(f'{settings.MSB_API_URL}/api/', json=self.items)
+
+        result = sync_meldingen()
+
+        self.assertEqual(result['seen'], len(self.items))
+        self.assertEqual(result['created'], len(self.items))
+        self.assertIn('duration', result)
+
+    @Mocker()
+    def test_management_command(self, mocker):
+        mocker.get('http://msb:8001/api/', json=self.items)
+
+        out = StringIO()
+        call_command('msb_sync', '--url', 'http://msb:8001', stdout=out)
+
+        self.assertIn(f'* created: {len(self.items)}', out.getvalue())
+        self.assertEqual(Melding.objects.count(), len(self.items))
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from django.utils.text import slugify
-from signals.apps.signals.models.category import Category
+from signals.apps.msb.services.categories import MSBCategoryResolverService
 from signals.apps.api.serializers.nested import _NestedCategoryModelSerializer
 
 class OnderwerpSerializer(serializers.Serializer):
@@ -45,11 +45,8 @@ def map_msb_list_item_on_signal(msb_item_list):
     msb_data = []
     if msb_item_list_serializer.is_valid():
         msb_data = msb_item_list_serializer.data
-    def get_sub_category(sub_slug):
-        sub_category = Category.objects.filter(slug=sub_slug, parent__isnull=False).first()
-        if not sub_category:
-            sub_category = Category.objects.filter(slug="overig", parent__isnull=False).first()
-        return sub_category
+    # All onderwerpen are resolved at once, from memory
+    sub_categories = MSBCategoryResolverService.resolve([m["onderwerp"] for m in msb_data])
     def get_location():
         pass
 
@@ -57,13 +54,13 @@ def map_msb_list_item_on_signal(msb_item_list):
         "assigned_user_email": None,
         "category": {
             # "sub_category": get_sub_category(slugify(m["onderwerp"]["omschrijving"])).get_absolute_url(),
-            "category_url": get_sub_category(slugify(m["onderwerp"]["omschrijving"])).get_absolute_url(),
+            "category_url": sub_category.get_absolute_url(),
             "created_by": "todo@example.com",
             "departments": "",
             "deadline": None,
             "deadline_factor_3": None,
-            "main": get_sub_category(slugify(m["onderwerp"]["omschrijving"])).parent.name,
-            "main_slug": get_sub_category(slugify(m["onderwerp"]["omschrijving"])).parent.slug,
+            "main": sub_category.parent.name,
+            "main_slug": sub_category.parent.slug,
             "sub": m["onderwerp"]["omschrijving"],
             "sub_slug": slugify(m["onderwerp"]["omschrijving"]),
             "text": None,
@@ -89,5 +86,5 @@ def map_msb_list_item_on_signal(msb_item_list):
         "text": "originele melding tekst",
         "priority": {"priority":"normal"},
         "reporter": {"sharing_allowed":True},
-    } for m in msb_data]
+    } for m, sub_category in zip(msb_data, sub_categories)]
     return signal_data
@@ -1,9 +1,10 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2021 Gemeente Amsterdam
+# Copyright (C) 2021 - 2022 Gemeente Amsterdam
 
 # App settings
 MAX_QUESTIONS = 50
 SESSION_DURATION = 2 * 60 * 60  # Two hours default
+QUESTION_GRAPH_CACHE_SIZE = 256  # Number of compiled QuestionGraphs kept in memory per process
 
 
 # ReactionRequestService settings
@@ -1,8 +1,12 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2021 Gemeente Amsterdam
+# Copyright (C) 2021 - 2022 Gemeente Amsterdam
 from django.apps import AppConfig
 
 
 class QuestionnairesConfig(AppConfig):
     name = 'signals.apps.questionnaires'
     verbose_name = 'Questionnaires'
+
+    def ready(self):
+        # Import Django signals to connect receiver functions.
+        import signals.apps.questionnaires.signal_receivers  # noqa
@@ -3,11 +3,159 @@
 """
 QuestionGraph service contains functionality that deals with QuestionGraph
 structure (reachable questions and the like).
+
+The structure of a QuestionGraph is compiled once into an immutable
+CompiledQuestionGraph and shared by all sessions (and requests) of that graph
+within a process. A compiled graph is used until the version stamp of its
+QuestionGraph is replaced, which happens whenever the QuestionGraph or one of
+its Edges, Questions or Choices changes (see signal_receivers), or until it is
+older than QUESTION_GRAPH_TIMEOUT seconds (for processes that do not share the
+Django cache).
 """
+import threading
+import uuid
+from collections import OrderedDict
+from time import monotonic
+from types import MappingProxyType
+
 import networkx
+from django.core.cache import cache
+from django.db.models import Q
+
+from signals.apps.questionnaires.app_settings import MAX_QUESTIONS, QUESTION_GRAPH_CACHE_SIZE
+from signals.apps.questionnaires.models import Edge, QuestionGraph
+
+QUESTION_GRAPH_VERSION_CACHE_KEY = 'signals.questionnaires.question_graph.{graph_id}.version'
+QUESTION_GRAPH_TIMEOUT = 60
+
+
+class CompiledQuestionGraph:
+    """
+    Immutable representation of the structure of a QuestionGraph.
+
+    The outgoing edges of every question are kept as (choice payload, next
+    question id) tuples, sorted in the order the rules are matched. The
+    questions reachable from the first question and the reachable endpoints
+    (questions without outgoing edges) are precomputed.
+    """
+    def __init__(self, q_graph, edges, questions_by_id):
+        self.graph_id = q_graph.id
+        self.first_question_id = q_graph.first_question_id
+        self.edges = tuple(edges)
+        self.questions_by_id = MappingProxyType(questions_by_id)
+
+        out_edges = {}
+        for edge in sorted(self.edges, key=lambda edge: (edge.order, edge.id)):
+            choice_payload = None if edge.choice is None else edge.choice.payload
+            out_edges.setdefault(edge.question_id, []).append((choice_payload, edge.next_question_id))
+        self.out_edges = MappingProxyType({question_id: tuple(edges) for question_id, edges in out_edges.items()})
+
+        self.reachable_ids = frozenset(self._get_reachable_ids(self.first_question_id))
+        self.endpoint_ids = frozenset(
+            question_id for question_id in self.reachable_ids if not self.out_edges.get(question_id)
+        )
+
+    def _get_reachable_ids(self, first_question_id):
+        if first_question_id is None:
+            return set()
+
+        reachable = {first_question_id}
+        stack = [first_question_id]
+        while stack:
+            for _, next_id in self.out_edges.get(stack.pop(), ()):
+                if next_id not in reachable:
+                    reachable.add(next_id)
+                    stack.append(next_id)
+        return reachable
+
+    def __contains__(self, question_id):
+        return question_id in self.questions_by_id
+
+    def out_degree(self, question_id):
+        return len(self.out_edges.get(question_id, ()))
+
+    def get_next_question_id(self, question_id, answer_payload):
+        """
+        Id of the next question given the answer payload, the first matching rule wins. None if no rule matches.
+        """
+        for choice_payload, next_id in self.out_edges.get(question_id, ()):
+            if choice_payload is None or choice_payload == answer_payload:
+                return next_id
+        return None
+
+
+class QuestionGraphCache:
+    """
+    Bounded per process cache of the compiled QuestionGraphs, keyed by graph id and checked against the version stamp
+    of the graph in the Django cache. Compiled graphs older than QUESTION_GRAPH_TIMEOUT seconds are compiled again.
+    """
+    _graphs = OrderedDict()  # graph id -> (version, compiled at, CompiledQuestionGraph)
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_version(graph_id):
+        key = QUESTION_GRAPH_VERSION_CACHE_KEY.format(graph_id=graph_id)
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+            version = cache.get(key)
+        return version
+
+    @staticmethod
+    def invalidate(graph_ids):
+        cache.set_many({
+            QUESTION_GRAPH_VERSION_CACHE_KEY.format(graph_id=graph_id): uuid.uuid4().hex for graph_id in graph_ids
+        }, timeout=None)
+
+    @classmethod
+    def invalidate_question(cls, question_id):
+        """
+        Invalidate the QuestionGraphs the question is part of.
+        """
+        graph_ids = set(Edge.objects.filter(
+            Q(question_id=question_id) | Q(next_question_id=question_id)
+        ).values_list('graph_id', flat=True))
+        graph_ids.update(QuestionGraph.objects.filter(first_question_id=question_id).values_list('id', flat=True))
+        cls.invalidate(graph_ids)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._graphs.clear()
+
+    @classmethod
+    def get(cls, q_graph):
+        version = cls.get_version(q_graph.id)
+        with cls._lock:
+            entry = cls._graphs.get(q_graph.id)
+            if entry is not None and entry[0] == version and monotonic() - entry[1] <= QUESTION_GRAPH_TIMEOUT:
+                cls._graphs.move_to_end(q_graph.id)
+                return entry[2]
+
+        compiled = cls.compile(q_graph)
+        with cls._lock:
+            cls._graphs[q_graph.id] = (version, monotonic(), compiled)
+            cls._graphs.move_to_end(q_graph.id)
+            while len(cls._graphs) > QUESTION_GRAPH_CACHE_SIZE:
+                cls._graphs.popitem(last=False)
+        return compiled
 
-from signals.apps.questionnaires.app_settings import MAX_QUESTIONS
-from signals.apps.questionnaires.models import Edge, Question
+    @staticmethod
+    def compile(q_graph):
+        edges = QuestionGraphService._get_edges(q_graph)
+
+        questions_by_id = {}
+        for edge in edges:
+            questions_by_id.setdefault(edge.question_id, edge.question)
+            questions_by_id.setdefault(edge.next_question_id, edge.next_question)
+        if q_graph.first_question_id and q_graph.first_question_id not in questions_by_id:
+            questions_by_id[q_graph.first_question_id] = q_graph.first_question
+
+        if len(questions_by_id) > MAX_QUESTIONS:
+            msg = f'Question graph {q_graph.name} contains too many questions.'
+            raise Exception(msg)
+
+        return CompiledQuestionGraph(q_graph, edges, questions_by_id)
 
 
 class QuestionGraphService:
@@ -16,22 +164,28 @@ class QuestionGraphService:
 
     def refresh_from_db(self):
         """
-        Retrieve all QuestionGraph data, cache it.
+        Retrieve the compiled QuestionGraph (shared by all sessions of the graph), cache it.
         """
-        # Retrieve all relevant edges, questions and answers
-        self._edges = self._get_edges(self._q_graph)
-        self._nx_graph = self._build_nx_graph(self._q_graph, self._edges)
-        self._questions = self._get_all_questions(self._nx_graph)
+        self._graph = QuestionGraphCache.get(self._q_graph)
+        self._edges = list(self._graph.edges)
+        self._questions = list(self._graph.questions_by_id.values())
 
         # setup caches for quick access
         self._edges_by_id = {e.id: e for e in self._edges}
-        self._questions_by_id = {q.id: q for q in self._questions}
+        self._questions_by_id = dict(self._graph.questions_by_id)
+
+        self._reachable_questions_by_id = {
+            q.id: q for q in self._questions if q.id in self._graph.reachable_ids
+        }
+        self._endpoint_questions_by_id = {
+            q.id: q for q in self._questions if q.id in self._graph.endpoint_ids
+        }
 
-        self._reachable_questions_by_id = self._get_reachable_questions(self._nx_graph, self._q_graph)
-        self._endpoint_questions_by_id = self._get_endpoint_questions(
-            self._nx_graph, self._questions_by_id, self._reachable_questions_by_id)
+        # The networkx graph is only built when asked for (visualization)
+        self.__dict__.pop('_nx_graph', None)
 
-    def _get_edges(self, q_graph):
+    @staticmethod
+    def _get_edges(q_graph):
         """
         List of Edge instances decsribing QuestionGraph structure.
         """
@@ -81,35 +235,6 @@ class QuestionGraphService:
 
         return nx_graph
 
-    @staticmethod
-    def _get_reachable_questions(nx_graph, q_graph):
-        """
-        Grab questions linked to QuestionGraph reachable from first_question.
-        """
-        reachable = networkx.descendants(nx_graph, q_graph.first_question.id)
-        reachable.add(q_graph.first_question.id)
-
-        return {q.id: q for q in Question.objects.filter(id__in=reachable)}
-
-    @staticmethod
-    def _get_endpoint_questions(nx_graph, questions_by_id, reachable_questions_by_id):
-        """
-        Get endpoint questions in QuestionGraph.
-        """
-        endpoint_questions_by_id = {}
-        for question_id, out_degree in nx_graph.out_degree():
-            if out_degree == 0 and question_id in reachable_questions_by_id:
-                endpoint_questions_by_id[question_id] = questions_by_id[question_id]
-
-        return endpoint_questions_by_id
-
-    @staticmethod
-    def _get_all_questions(nx_graph):
-        """
-        Grab questions linked to QuestionGraph.
-        """
-        return list(Question.objects.filter(id__in=nx_graph.nodes()))
-
     @property
     def endpoint_questions(self):
         """
@@ -119,13 +244,24 @@ class QuestionGraphService:
             self.refresh_from_db()
         return self._endpoint_questions_by_id
 
+    @property
+    def graph(self):
+        """
+        CompiledQuestionGraph instance representing QuestionGraph.
+        """
+        if not hasattr(self, '_graph'):
+            self.refresh_from_db()
+        return self._graph
+
     @property
     def nx_graph(self):
         """
         networkx.MultiDigraph instance representing QuestionGraph.
         """
-        if not hasattr(self, '_nx_graph'):
+        if not hasattr(self, '_edges'):
             self.refresh_from_db()
+        if not hasattr(self, '_nx_graph'):
+            self._nx_graph = self._build_nx_graph(self._q_graph, self._edges)
         return self._nx_graph
 
     @property
@@ -50,8 +50,8 @@ class SessionService:
         # case if all decision points have a default branch that gets selected
         # without an answer being provided).
         reachable, unanswered, answered, can_freeze = self._get_reachable_questions_and_answers(
-            self.question_graph_service._nx_graph,
-            self.question_graph_service._q_graph.first_question,
+            self.question_graph_service._graph,
+            self.question_graph_service._questions_by_id.get(self.question_graph_service._graph.first_question_id),
             self.question_graph_service._questions_by_id,
             self._answers_by_question_id
         )
@@ -79,25 +79,18 @@ class SessionService:
         )
 
     @staticmethod
-    def _get_next_question(nx_graph, questions_by_id, question, answer_payload):
+    def _get_next_question(graph, questions_by_id, question, answer_payload):
         """
-        Get next_question given question graph, current question, and answer.
+        Get next_question given (compiled) question graph, current question, and answer.
         """
-        # Retrieve outgoing edges, sort them so that the correct next_question
-        # is selected (i.e. the match rules in correct order).
-        out_edges = list(nx_graph.out_edges(question.id, data=True))
-        out_edges.sort(key=lambda edge: (edge[2]['order'], edge[2]['edge_id']))
-
-        # Try to match answer payload, retrieve correct question.
-        for _, next_id, data in out_edges:
-            choice_payload = data['choice_payload']
-            if choice_payload is None or choice_payload == answer_payload:
-                return questions_by_id[next_id]
-
-        return None
+        # The outgoing edges of the compiled graph are already sorted so that
+        # the correct next_question is selected (i.e. the match rules in
+        # correct order).
+        next_id = graph.get_next_question_id(question.id, answer_payload)
+        return None if next_id is None else questions_by_id[next_id]
 
     @staticmethod
-    def _get_reachable_questions_and_answers(nx_graph, first_question, questions_by_id, answers_by_id):
+    def _get_reachable_questions_and_answers(graph, first_question, questions_by_id, answers_by_id):
         """
         Given (partially?) answered graph determine answers and questions along
         current path.
@@ -129,13 +122,13 @@ class SessionService:
 
             previous_question = question
             answer_payload = None if answer is None else answer.payload
-            question = SessionService._get_next_question(nx_graph, questions_by_id, question, answer_payload)
+            question = SessionService._get_next_question(graph, questions_by_id, question, answer_payload)
 
         # Finally we want to know whether session under consideration can be
         # frozen meaningfully (i.e. a path through it is fully answered and the
         # data can be made available for further processing).
         can_freeze = False
-        if nx_graph.out_degree(previous_question.id) == 0 and not unanswered_by_id:
+        if graph.out_degree(previous_question.id) == 0 and not unanswered_by_id:
             # Endpoint reached (no outgoing edges) and no unanswered required questions.
             can_freeze = True
 
@@ -147,7 +140,7 @@ class SessionService:
         """
         # TODO: consider removing when next_rules is removed from public API.
         return SessionService._get_next_question(
-            self.question_graph_service._nx_graph,
+            self.question_graph_service._graph,
             self.question_graph_service._questions_by_id,
             question,
             answer.payload
@@ -205,11 +198,11 @@ class SessionService:
         """
         Answer a question, update session.started_at if needed.
         """
-        if not hasattr(self, '_nx_graph'):
-            self.refresh_from_db()
+        # The session could have been answered or frozen in the meantime
+        self.refresh_from_db()
 
         # Check that question is actually part of relevant questionnaire:
-        if question.id not in self.question_graph_service._nx_graph.nodes():
+        if question.id not in self.question_graph_service._graph:
             msg = f'Question (id={question.id}) not in questionnaire (id={self.session.questionnaire.id})!'
             raise django_validation_error(msg)
 
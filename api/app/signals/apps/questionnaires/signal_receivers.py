@@ -0,0 +1,49 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from signals.apps.questionnaires.models import Choice, Edge, Question, QuestionGraph
+from signals.apps.questionnaires.services.question_graph import QuestionGraphCache
+
+
+def _invalidate(graph_ids):
+    # Invalidate right away for this process and again after the commit, so other processes cannot cache the
+    # uncommitted state
+    QuestionGraphCache.invalidate(graph_ids)
+    transaction.on_commit(lambda: QuestionGraphCache.invalidate(graph_ids))
+
+
+def _invalidate_question(question_id):
+    QuestionGraphCache.invalidate_question(question_id)
+    transaction.on_commit(lambda: QuestionGraphCache.invalidate_question(question_id))
+
+
+@receiver([post_save, post_delete], sender=QuestionGraph, dispatch_uid='questionnaires_question_graph_changed')
+def question_graph_changed_handler(sender, instance, **kwargs):
+    _invalidate([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Edge, dispatch_uid='questionnaires_edge_changed')
+def edge_changed_handler(sender, instance, **kwargs):
+    _invalidate([instance.graph_id])
+
+
+@receiver(post_save, sender=Question, dispatch_uid='questionnaires_question_saved')
+def question_saved_handler(sender, instance, created, **kwargs):
+    if not created:  # A new question is not part of a QuestionGraph yet
+        _invalidate_question(instance.pk)
+
+
+@receiver(pre_delete, sender=Question, dispatch_uid='questionnaires_question_deleted')
+def question_deleted_handler(sender, instance, **kwargs):
+    # Before the delete, the first_question of the QuestionGraphs is set to NULL without sending any signals
+    graph_ids = list(QuestionGraph.objects.filter(first_question_id=instance.pk).values_list('id', flat=True))
+    if graph_ids:
+        _invalidate(graph_ids)
+
+
+@receiver([post_save, post_delete], sender=Choice, dispatch_uid='questionnaires_choice_changed')
+def choice_changed_handler(sender, instance, **kwargs):
+    _invalidate_question(instance.question_id)
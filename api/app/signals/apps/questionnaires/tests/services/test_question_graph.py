@@ -1,9 +1,24 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2021 Gemeente Amsterdam
+# Copyright (C) 2021 - 2022 Gemeente Amsterdam
+from time import monotonic
+from unittest import mock
+
 from django.test import TestCase
 from networkx import MultiDiGraph
 
-from signals.apps.questionnaires.services.question_graph import QuestionGraphService
+from signals.apps.questionnaires.factories import (
+    ChoiceFactory,
+    EdgeFactory,
+    QuestionFactory,
+    QuestionGraphFactory
+)
+from signals.apps.questionnaires.models import Question
+from signals.apps.questionnaires.services.question_graph import (
+    QUESTION_GRAPH_TIMEOUT,
+    CompiledQuestionGraph,
+    QuestionGraphCache,
+    QuestionGraphService
+)
 from signals.apps.questionnaires.tests.test_models import create_diamond_plus
 
 
@@ -24,25 +39,40 @@ class TestQuestionGraphService(TestCase):
         self.assertIsInstance(nx_graph, MultiDiGraph)
         self.assertEqual(len(nx_graph.nodes), 7)
 
-    def test_get_all_questions(self):
+    def test_compile_all_questions(self):
         q_graph = create_diamond_plus()
-        service = QuestionGraphService(q_graph)
-        edges = service._get_edges(q_graph)
-        nx_graph = service._build_nx_graph(q_graph, edges)
 
-        questions = service._get_all_questions(nx_graph)
-        self.assertEqual(len(questions), 7)
-        self.assertEqual({q.analysis_key for q in questions}, set(f'q{n}' for n in range(1, 8)))
+        graph = QuestionGraphCache.compile(q_graph)
+        self.assertIsInstance(graph, CompiledQuestionGraph)
+        self.assertEqual(len(graph.questions_by_id), 7)
+        self.assertEqual({q.analysis_key for q in graph.questions_by_id.values()}, set(f'q{n}' for n in range(1, 8)))
 
-    def test_get_reachable_questions(self):
+    def test_compile_reachable_questions(self):
         q_graph = create_diamond_plus()
-        service = QuestionGraphService(q_graph)
-        edges = service._get_edges(q_graph)
-        nx_graph = service._build_nx_graph(q_graph, edges)
 
-        questions = service._get_reachable_questions(nx_graph, q_graph)
-        self.assertEqual(len(questions), 5)
-        self.assertEqual({q.analysis_key for q in questions.values()}, set(f'q{n}' for n in range(1, 6)))
+        graph = QuestionGraphCache.compile(q_graph)
+        self.assertEqual(len(graph.reachable_ids), 5)
+        self.assertEqual({graph.questions_by_id[question_id].analysis_key for question_id in graph.reachable_ids},
+                         set(f'q{n}' for n in range(1, 6)))
+        self.assertEqual({graph.questions_by_id[question_id].analysis_key for question_id in graph.endpoint_ids},
+                         {'q5'})
+
+    def test_compile_out_edges_in_order(self):
+        q1 = QuestionFactory.create()
+        q_yes = QuestionFactory.create()
+        q_default = QuestionFactory.create()
+        q_graph = QuestionGraphFactory.create(first_question=q1)
+        EdgeFactory.create(graph=q_graph, question=q1, next_question=q_default, choice=None, order=1)
+        EdgeFactory.create(graph=q_graph, question=q1, next_question=q_yes,
+                           choice=ChoiceFactory.create(question=q1, payload='yes'), order=0)
+
+        graph = QuestionGraphCache.compile(q_graph)
+        self.assertEqual(graph.out_edges[q1.id], (('yes', q_yes.id), (None, q_default.id)))
+        self.assertEqual(graph.get_next_question_id(q1.id, 'yes'), q_yes.id)
+        self.assertEqual(graph.get_next_question_id(q1.id, 'no'), q_default.id)
+        self.assertIsNone(graph.get_next_question_id(q_yes.id, 'yes'))
+        self.assertEqual(graph.reachable_ids, {q1.id, q_yes.id, q_default.id})
+        self.assertEqual(graph.endpoint_ids, {q_yes.id, q_default.id})
 
     def test_refresh_from_db(self):
         q_graph = create_diamond_plus()
@@ -50,8 +80,8 @@ class TestQuestionGraphService(TestCase):
 
         service.refresh_from_db()
         self.assertEqual(len(service._edges), 6)
-        self.assertIsInstance(service._nx_graph, MultiDiGraph)
-        self.assertEqual(len(service._nx_graph.nodes), 7)
+        self.assertIsInstance(service._graph, CompiledQuestionGraph)
+        self.assertEqual(len(service._graph.questions_by_id), 7)
         self.assertEqual(len(service._questions), 7)
         self.assertEqual(len(service._questions_by_id), 7)
 
@@ -88,3 +118,66 @@ class TestQuestionGraphService(TestCase):
         self.assertEqual(len(endpoints_by_id), 1)
         question = list(endpoints_by_id.values())[0]
         self.assertEqual(question.analysis_key, 'q5')
+
+
+class TestQuestionGraphCache(TestCase):
+    def setUp(self):
+        QuestionGraphCache.clear()
+        self.addCleanup(QuestionGraphCache.clear)
+
+    def test_shared_between_services(self):
+        q_graph = create_diamond_plus()
+        graph = QuestionGraphService(q_graph).graph
+
+        with self.assertNumQueries(0):
+            self.assertIs(QuestionGraphService(q_graph).graph, graph)
+
+    def test_invalidated_by_edge_change(self):
+        q_graph = create_diamond_plus()
+        graph = QuestionGraphService(q_graph).graph
+
+        edge = q_graph.edges.get(question=q_graph.first_question, next_question__analysis_key='q2')
+        edge.delete()
+
+        new_graph = QuestionGraphService(q_graph).graph
+        self.assertIsNot(new_graph, graph)
+        self.assertEqual(len(new_graph.edges), 5)
+
+    def test_invalidated_by_choice_change(self):
+        q_graph = create_diamond_plus()
+        q1 = q_graph.first_question
+        choice = ChoiceFactory.create(question=q1, payload='yes')
+        EdgeFactory.create(graph=q_graph, question=q1, next_question=QuestionFactory.create(), choice=choice, order=0)
+        QuestionGraphService(q_graph).graph
+
+        choice.payload = 'no'
+        choice.save()
+
+        graph = QuestionGraphService(q_graph).graph
+        self.assertEqual(graph.out_edges[q1.id][0][0], 'no')
+
+    def test_invalidated_by_question_change(self):
+        q_graph = create_diamond_plus()
+        QuestionGraphService(q_graph).graph
+
+        q1 = q_graph.first_question
+        q1.label = 'Changed'
+        q1.save()
+
+        graph = QuestionGraphService(q_graph).graph
+        self.assertEqual(graph.questions_by_id[q1.id].label, 'Changed')
+
+    def test_timeout(self):
+        q_graph = create_diamond_plus()
+        graph = QuestionGraphService(q_graph).graph
+
+        # Updated without sending signals, like a change made by another process that does not share the Django cache
+        q1 = q_graph.first_question
+        Question.objects.filter(pk=q1.pk).update(label='Changed')
+        self.assertIs(QuestionGraphService(q_graph).graph, graph)
+
+        later = monotonic() + QUESTION_GRAPH_TIMEOUT + 1
+        with mock.patch('signals.apps.questionnaires.services.question_graph.monotonic', return_value=later):
+            new_graph = QuestionGraphService(q_graph).graph
+        self.assertIsNot(new_graph, graph)
+        self.assertEqual(new_graph.questions_by_id[q1.id].label, 'Changed')
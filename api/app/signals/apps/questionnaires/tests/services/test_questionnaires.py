@@ -269,7 +269,7 @@ class TestQuestionnairesService(TestCase):
         session_service.refresh_from_db()
 
         next_q = session_service._get_next_question(
-            session_service.question_graph_service._nx_graph,
+            session_service.question_graph_service._graph,
             session_service.question_graph_service._questions_by_id,
             q_start,
             'ANSWER'
@@ -286,7 +286,7 @@ class TestQuestionnairesService(TestCase):
         session_service.refresh_from_db()
 
         next_q = session_service._get_next_question(
-            session_service.question_graph_service._nx_graph,
+            session_service.question_graph_service._graph,
             session_service.question_graph_service._questions_by_id,
             q_start,
             'ANSWER'
@@ -313,21 +313,21 @@ class TestQuestionnairesService(TestCase):
         session_service.refresh_from_db()
 
         no_choice_question = session_service._get_next_question(
-            session_service.question_graph_service._nx_graph,
+            session_service.question_graph_service._graph,
             session_service.question_graph_service._questions_by_id,
             q_start,
             'ANSWER'
         )
         self.assertIsNone(no_choice_question)  # consider whether this is useful
         yes_question = session_service._get_next_question(
-            session_service.question_graph_service._nx_graph,
+            session_service.question_graph_service._graph,
             session_service.question_graph_service._questions_by_id,
             q_start,
             'yes'
         )
         self.assertEqual(q_yes, yes_question)
         no_question = session_service._get_next_question(
-            session_service.question_graph_service._nx_graph,
+            session_service.question_graph_service._graph,
             session_service.question_graph_service._questions_by_id,
             q_start,
             'no'
@@ -357,21 +357,21 @@ class TestQuestionnairesService(TestCase):
         session_service.refresh_from_db()
 
         no_choice_question = session_service._get_next_question(
-            session_service.question_graph_service._nx_graph,
+            session_service.question_graph_service._graph,
             session_service.question_graph_service._questions_by_id,
             q_start,
             'ANSWER'
         )
         self.assertEqual(no_choice_question, q_default)
         yes_question = session_service._get_next_question(
-            session_service.question_graph_service._nx_graph,
+            session_service.question_graph_service._graph,
             session_service.question_graph_service._questions_by_id,
             q_start,
             'yes'
         )
         self.assertEqual(yes_question, q_yes)
         no_question = session_service._get_next_question(
-            session_service.question_graph_service._nx_graph,
+            session_service.question_graph_service._graph,
             session_service.question_graph_service._questions_by_id,
             q_start,
             'no'
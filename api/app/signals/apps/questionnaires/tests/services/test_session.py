@@ -45,7 +45,7 @@ class TestSessionService(TestCase):
         # and checking we get the other branch.
         a = Answer.objects.create(session=session, question=q_graph.first_question, payload='answer')
         next_question_1 = service._get_next_question(
-            service.question_graph_service._nx_graph,
+            service.question_graph_service._graph,
             service.question_graph_service._questions_by_id,
             q_graph.first_question,
             a.payload
@@ -58,7 +58,7 @@ class TestSessionService(TestCase):
 
         self.assertEqual(list(edge_ids_before), list(edge_ids_after))
         next_question_2 = service._get_next_question(
-            service.question_graph_service._nx_graph,
+            service.question_graph_service._graph,
             service.question_graph_service._questions_by_id,
             q_graph.first_question,
             a.payload
@@ -74,7 +74,7 @@ class TestSessionService(TestCase):
 
         self.assertEqual(list(edge_ids_after), list(new_order))
         next_question_3 = service._get_next_question(
-            service.question_graph_service._nx_graph,
+            service.question_graph_service._graph,
             service.question_graph_service._questions_by_id,
             q_graph.first_question,
             a.payload
@@ -110,7 +110,7 @@ class TestSessionService(TestCase):
             payload='NOT A PREDEFINED CHOICE',  # This is something we should not allow!
         )
         next_question_1 = service._get_next_question(
-            service.question_graph_service._nx_graph,
+            service.question_graph_service._graph,
             service.question_graph_service._questions_by_id,
             q_graph.first_question,
             a1.payload
@@ -123,7 +123,7 @@ class TestSessionService(TestCase):
             payload='q2'
         )
         next_question_2 = service._get_next_question(
-            service.question_graph_service._nx_graph,
+            service.question_graph_service._graph,
             service.question_graph_service._questions_by_id,
             q_graph.first_question,
             a2.payload
@@ -136,7 +136,7 @@ class TestSessionService(TestCase):
             payload='q3'
         )
         next_question_3 = service._get_next_question(
-            service.question_graph_service._nx_graph,
+            service.question_graph_service._graph,
             service.question_graph_service._questions_by_id,
             q_graph.first_question,
             a3.payload
@@ -154,7 +154,7 @@ class TestSessionService(TestCase):
 
         with self.assertRaises(CycleDetected):
             service._get_reachable_questions_and_answers(
-                service.question_graph_service._nx_graph,
+                service.question_graph_service._graph,
                 service.question_graph_service._q_graph.first_question,
                 service.question_graph_service._questions_by_id,
                 answers_by_question_id
@@ -170,7 +170,7 @@ class TestSessionService(TestCase):
         answers_by_question_id = {a.question.id: a for a in answers}
 
         questions_by_id, unanswered_by_id, answers_by_id, can_freeze = service._get_reachable_questions_and_answers(
-            service.question_graph_service._nx_graph,
+            service.question_graph_service._graph,
             service.question_graph_service._q_graph.first_question,
             service.question_graph_service._questions_by_id,
             answers_by_question_id
@@ -197,7 +197,7 @@ class TestSessionService(TestCase):
         answers_by_question_id = {a.question.id: a for a in answers}
 
         questions_by_id, unanswered_by_id, answers_by_id, can_freeze = service._get_reachable_questions_and_answers(
-            service.question_graph_service._nx_graph,
+            service.question_graph_service._graph,
             service.question_graph_service._q_graph.first_question,
             service.question_graph_service._questions_by_id,
             answers_by_question_id
@@ -242,7 +242,7 @@ class TestSessionService(TestCase):
         answers_by_question_id = {a.question.id: a for a in answers}
 
         questions_by_id, unanswered_by_id, answers_by_id, can_freeze = service._get_reachable_questions_and_answers(
-            service.question_graph_service._nx_graph,
+            service.question_graph_service._graph,
             service.question_graph_service._q_graph.first_question,
             service.question_graph_service._questions_by_id,
             answers_by_question_id
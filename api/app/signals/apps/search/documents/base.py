@@ -1,11 +1,13 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2019 - 2021 Gemeente Amsterdam
+# Copyright (C) 2019 - 2022 Gemeente Amsterdam
 import logging
 
 from django.db.models import Case, When
-from elasticsearch.helpers import bulk
+from elasticsearch.helpers import bulk, parallel_bulk
 from elasticsearch_dsl import Document, Index, Search
 
+from signals.apps.search.settings import app_settings
+
 log = logging.getLogger(__name__)
 
 
@@ -53,27 +55,70 @@ class DocumentBase(Document):
             index_instance.delete()
 
     @classmethod
-    def prepare_batch(cls, queryset):
-        for obj in queryset.iterator():
+    def get_indexing_queryset(cls, queryset=None):
+        """
+        The queryset used to create the documents, override to select/prefetch the relations a document needs.
+        """
+        return queryset if queryset is not None else cls().get_queryset()
+
+    @classmethod
+    def iterate_batches(cls, queryset, size):
+        """
+        Stream the queryset in batches ordered on the primary key. Every batch selects the objects after the last
+        primary key of the previous batch (keyset) instead of using an OFFSET, so every batch costs the same no matter
+        how far into the queryset it is.
+        """
+        queryset = queryset.order_by('pk')
+        last_pk = None
+        while True:
+            batch = list((queryset if last_pk is None else queryset.filter(pk__gt=last_pk))[:size])
+            if batch:
+                yield batch
+            if len(batch) < size:
+                return
+            last_pk = batch[-1].pk
+
+    @classmethod
+    def prepare_batch(cls, objects):
+        for obj in objects:
             yield cls().create_document(obj).create_document_dict()
 
     @classmethod
-    def bulk(cls, queryset, size, using=None):
+    def bulk(cls, queryset, size, using=None, workers=None, chunk_size=None):
+        """
+        Index the queryset, the documents of a batch are sent in bulk requests of chunk_size documents. With more than
+        one worker the bulk requests of a batch are sent concurrently.
+
+        :returns: tuple with the number of indexed documents and the number of errors
+        """
         es = cls._get_connection(using)
-        for start in range(0, queryset.count(), size):
-            end = start + size
-            bulk(
-                client=es,
-                actions=cls.prepare_batch(queryset[start:end]),
-                chunk_size=size,
-            )
+        workers = workers or app_settings.BULK_WORKERS
+        chunk_size = chunk_size or app_settings.BULK_CHUNK_SIZE
+
+        indexed, errors = 0, 0
+        for batch in cls.iterate_batches(queryset, size):
+            # The documents are created in this thread, the workers only talk to Elasticsearch
+            actions = list(cls.prepare_batch(batch))
+            if workers > 1:
+                results = parallel_bulk(client=es, actions=actions, thread_count=workers, chunk_size=chunk_size,
+                                        raise_on_error=False)
+                failed = [info for ok, info in results if not ok]
+            else:
+                _, failed = bulk(client=es, actions=actions, chunk_size=chunk_size, raise_on_error=False)
+
+            for info in failed:
+                log.warning(f'Failed to index document: {info}')
+            indexed += len(actions) - len(failed)
+            errors += len(failed)
+        return indexed, errors
 
     @classmethod
-    def index_documents(cls, index=None, using=None, batch=1000, queryset=None):
-        qs = queryset.all() if queryset else cls().get_queryset()
+    def index_documents(cls, index=None, using=None, batch=None, queryset=None, workers=None):
+        qs = cls.get_indexing_queryset(queryset.all() if queryset is not None else None)
+        workers = workers or app_settings.BULK_WORKERS
 
         cls.init(index, using)
-        cls.bulk(qs, batch, using)
+        return cls.bulk(qs, batch or app_settings.BULK_CHUNK_SIZE * workers, using, workers=workers)
 
     @classmethod
     def ping(cls, using=None):
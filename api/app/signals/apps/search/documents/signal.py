@@ -1,5 +1,5 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2019 - 2021 Gemeente Amsterdam
+# Copyright (C) 2019 - 2022 Gemeente Amsterdam
 import logging
 
 from elasticsearch_dsl import Date, InnerDoc, Keyword, Nested, Object, Text
@@ -87,6 +87,23 @@ class SignalDocument(DocumentBase):
             '-updated_at'
         ).all()
 
+    @classmethod
+    def get_indexing_queryset(cls, queryset=None):
+        """
+        Only the relations used by create_document, all fetched with the batch.
+        """
+        queryset = queryset if queryset is not None else cls().get_model().objects.all()
+        return queryset.select_related(
+            'category_assignment',
+            'category_assignment__category',
+            'category_assignment__category__parent',
+            'reporter',
+            'priority',
+            'type_assignment',
+        ).prefetch_related(
+            'category_assignment__category__departments',
+        )
+
     @classmethod
     def create_document(cls, obj):
         category_assignment = None
@@ -110,7 +127,7 @@ class SignalDocument(DocumentBase):
                         'code': department.code,
                         'name': department.name,
                         'is_intern': department.is_intern,
-                    } for department in category_assignment.category.departments.iterator()],
+                    } for department in category_assignment.category.departments.all()],  # Prefetched
                     'parent': {
                         'name': category_assignment.category.parent.name,
                         'slug': category_assignment.category.parent.slug,
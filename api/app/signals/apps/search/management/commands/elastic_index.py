@@ -1,11 +1,12 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2019 - 2021 Gemeente Amsterdam
+# Copyright (C) 2019 - 2022 Gemeente Amsterdam
 from timeit import default_timer as timer
 
 from django.core.management import BaseCommand
 from django.utils import timezone
 
 from signals.apps.search.documents.signal import SignalDocument
+from signals.apps.search.settings import app_settings
 from signals.apps.signals.models import Signal
 
 
@@ -22,6 +23,10 @@ class Command(BaseCommand):
         parser.add_argument('--signal-ids', type=str, dest='signal_ids', help='A set of signals that need re-indexing')
         parser.add_argument('--from-date', type=str, dest='from_date', help='Index all signals from date, format YYYY-MM-DD')  # noqa
         parser.add_argument('--to-date', type=str, dest='to_date', help='Index all signals from date, format YYYY-MM-DD')  # noqa
+        parser.add_argument('--workers', type=int, dest='workers', default=app_settings.BULK_WORKERS,
+                            help=f'Number of concurrent bulk requests (default: {app_settings.BULK_WORKERS})')
+        parser.add_argument('--batch-size', type=int, dest='batch_size',
+                            help='Number of Signals read from the database per batch (default: chunk size x workers)')
 
     def handle(self, *args, **options):
         start = timer()
@@ -39,6 +44,8 @@ class Command(BaseCommand):
 
     def _apply_options(self, **options):
         self._dry_run = options['_dry_run']
+        self._workers = options['workers']
+        self._batch_size = options['batch_size']
         if self._dry_run:
             self.stdout.write('* Dry Run enabled, no changes will be made to the index')
 
@@ -75,7 +82,7 @@ class Command(BaseCommand):
     def _index_documents(self):
         self.stdout.write('* Index all Signals in bulk')
         if not self._dry_run:
-            SignalDocument.index_documents()
+            self._bulk_index()
 
     def _index_signal(self, signal_id):
         self.stdout.write(f'* Index Signal #{signal_id}')
@@ -101,7 +108,7 @@ class Command(BaseCommand):
             self.stderr.write(f'* Signals not found #{", #".join(map(str, ids_diff))}')
         else:
             if not self._dry_run:
-                SignalDocument.index_documents(queryset=signal_qs)
+                self._bulk_index(queryset=signal_qs)
 
     def _index_date_range(self, from_date=None, to_date=None):
         if not from_date and not to_date:
@@ -129,4 +136,9 @@ class Command(BaseCommand):
         self.stdout.write(f'* Indexing Signals in range from {from_date:%Y-%m-%d %H:%M:%S} to '
                           f'{to_date:%Y-%m-%d %H:%M:%S}, found {signal_qs.count()} signals')
         if not self._dry_run:
-            SignalDocument.index_documents(queryset=signal_qs)
+            self._bulk_index(queryset=signal_qs)
+
+    def _bulk_index(self, queryset=None):
+        indexed, errors = SignalDocument.index_documents(queryset=queryset, batch=self._batch_size,
+                                                         workers=self._workers)
+        self.stdout.write(f'* Indexed {indexed} Signal(s), {errors} error(s)')
@@ -0,0 +1,20 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from django.db import models
+
+
+class QueuedSignal(models.Model):
+    """
+    A Signal that changed and still needs to be (re)indexed in Elasticsearch.
+
+    The Signal id is unique, so a burst of changes to the same Signal results in a single entry. The queue is flushed
+    in bulk, see signals.apps.search.tasks.flush_index_queue.
+    """
+    signal_id = models.IntegerField(unique=True)  # Not a foreign key, the Signal may be gone by the time it is indexed
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ('created_at',)
+
+    def __str__(self):
+        return f'Signal #{self.signal_id}'
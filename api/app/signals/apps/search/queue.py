@@ -0,0 +1,36 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from django.db import transaction
+
+from signals.apps.search.models import QueuedSignal
+
+
+class IndexQueueService:
+    """
+    Queue of Signals that need to be (re)indexed, a Signal is queued at most once no matter how often it changes before
+    the queue is flushed.
+    """
+    @staticmethod
+    def enqueue(signal_ids):
+        QueuedSignal.objects.bulk_create([QueuedSignal(signal_id=signal_id) for signal_id in set(signal_ids)],
+                                         ignore_conflicts=True)
+
+    @staticmethod
+    def claim(size):
+        """
+        Remove (at most size) Signals from the queue and return their ids. Queued Signals claimed by another worker at
+        the same time are skipped.
+        """
+        with transaction.atomic():
+            signal_ids = list(QueuedSignal.objects.select_for_update(
+                skip_locked=True
+            ).values_list(
+                'signal_id',
+                flat=True
+            )[:size])
+            QueuedSignal.objects.filter(signal_id__in=signal_ids).delete()
+        return signal_ids
+
+    @staticmethod
+    def has_pending():
+        return QueuedSignal.objects.exists()
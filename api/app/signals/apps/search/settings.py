@@ -1,14 +1,26 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2019 - 2021 Gemeente Amsterdam
+# Copyright (C) 2019 - 2022 Gemeente Amsterdam
 from django.conf import settings
 from django.test.signals import setting_changed
 
 DEFAULTS = dict(
+    # Index changed Signals, disable when no Elasticsearch cluster is used
+    ENABLED=True,
     PAGE_SIZE=100,
     CONNECTION=dict(
         HOST='http://127.0.0.1:9200',
         INDEX='signals',
     ),
+    # Number of documents per bulk request
+    BULK_CHUNK_SIZE=500,
+    # Number of concurrent bulk requests when (re)indexing in bulk
+    BULK_WORKERS=4,
+    # Seconds changes are collected in the index queue before they are indexed in a single bulk request
+    INDEX_QUEUE_INTERVAL=5,
+    # Maximum number of queued Signals indexed per flush of the queue
+    INDEX_QUEUE_FLUSH_SIZE=5000,
+    # Seconds the queue is not flushed after the Elasticsearch cluster could not be reached, changes are still queued
+    INDEX_QUEUE_RETRY_INTERVAL=5 * 60,
 )
 
 
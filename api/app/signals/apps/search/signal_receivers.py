@@ -1,8 +1,9 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2019 - 2021 Gemeente Amsterdam
+# Copyright (C) 2019 - 2022 Gemeente Amsterdam
+from django.db import transaction
 from django.dispatch import receiver
 
-from signals.apps.search.tasks import save_to_elastic
+from signals.apps.search.tasks import queue_for_indexing
 from signals.apps.signals.managers import (
     create_child,
     create_initial,
@@ -20,5 +21,6 @@ from signals.apps.signals.managers import (
            update_priority,
            update_type], dispatch_uid='search_add_to_elastic')
 def add_to_elastic_handler(sender, signal_obj, **kwargs):
-    # Add to elastic
-    save_to_elastic.delay(signal_id=signal_obj.id)
+    # Add to elastic, bursts of changes to the same Signal are coalesced in the index queue
+    signal_id = signal_obj.id
+    transaction.on_commit(lambda: queue_for_indexing([signal_id]))
@@ -1,15 +1,41 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2019 - 2021 Gemeente Amsterdam
+# Copyright (C) 2019 - 2022 Gemeente Amsterdam
 import logging
 
-from elasticsearch import NotFoundError
+from django.core.cache import cache
+from elasticsearch import NotFoundError, TransportError
 
 from signals.apps.search.documents.signal import SignalDocument
+from signals.apps.search.queue import IndexQueueService
+from signals.apps.search.settings import app_settings
 from signals.apps.signals.models import Signal
 from signals.celery import app
 
 log = logging.getLogger(__name__)
 
+INDEX_QUEUE_FLUSH_SCHEDULED_CACHE_KEY = 'signals.search.index_queue.flush_scheduled'
+INDEX_QUEUE_UNREACHABLE_CACHE_KEY = 'signals.search.index_queue.unreachable'
+
+
+def queue_for_indexing(signal_ids):
+    """
+    Queue the Signals for indexing and make sure the queue is flushed within INDEX_QUEUE_INTERVAL seconds. All changes
+    within that interval are indexed with a single flush of the queue.
+
+    Nothing is queued when indexing is disabled. While the Elasticsearch cluster is unreachable the Signals are queued,
+    at most once per Signal, but no flush is scheduled, the periodic flush picks them up once the cluster is back.
+    """
+    if not app_settings.ENABLED:
+        return
+
+    IndexQueueService.enqueue(signal_ids)
+    if cache.get(INDEX_QUEUE_UNREACHABLE_CACHE_KEY):
+        return
+
+    interval = app_settings.INDEX_QUEUE_INTERVAL
+    if cache.add(INDEX_QUEUE_FLUSH_SCHEDULED_CACHE_KEY, True, timeout=interval):
+        flush_index_queue.apply_async(countdown=interval)
+
 
 @app.task
 def save_to_elastic(signal_id):
@@ -46,3 +72,51 @@ def delete_from_elastic(signal):
         signal_document.delete()
     except NotFoundError:
         log.warning(f'Signal {signal.id} not found in Elasticsearch')
+
+
+@app.task
+def flush_index_queue():
+    """
+    Index the queued Signals in bulk, also scheduled periodically to pick up Signals queued while a flush was running.
+
+    When the Elasticsearch cluster cannot be reached the queue is left alone for INDEX_QUEUE_RETRY_INTERVAL seconds.
+    """
+    if not app_settings.ENABLED or cache.get(INDEX_QUEUE_UNREACHABLE_CACHE_KEY):
+        return 0
+
+    # Changes queued from now on schedule a new flush
+    cache.delete(INDEX_QUEUE_FLUSH_SCHEDULED_CACHE_KEY)
+
+    if not IndexQueueService.has_pending() or not _ping_index_queue():
+        return 0
+
+    signal_ids = IndexQueueService.claim(app_settings.INDEX_QUEUE_FLUSH_SIZE)
+    if not signal_ids:
+        return 0
+
+    queryset = SignalDocument.get_indexing_queryset(Signal.objects.filter(id__in=signal_ids))
+    try:
+        indexed, errors = SignalDocument.bulk(queryset, size=len(signal_ids), workers=1)
+    except TransportError:
+        IndexQueueService.enqueue(signal_ids)  # Try again after the retry interval
+        _index_queue_unreachable()
+        return 0
+
+    if errors:
+        log.warning(f'flush_index_queue - {errors} Signal(s) could not be indexed')
+    if IndexQueueService.has_pending():
+        flush_index_queue.delay()
+    return indexed
+
+
+def _ping_index_queue():
+    if SignalDocument.ping():
+        return True
+    _index_queue_unreachable()
+    return False
+
+
+def _index_queue_unreachable():
+    interval = app_settings.INDEX_QUEUE_RETRY_INTERVAL
+    log.warning(f'flush_index_queue - Elastic cluster is unreachable, retrying in {interval} second(s)')
+    cache.set(INDEX_QUEUE_UNREACHABLE_CACHE_KEY, True, timeout=interval)
@@ -0,0 +1,139 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from elasticsearch import TransportError
+
+from signals.apps.search.documents.signal import SignalDocument
+from signals.apps.search.models import QueuedSignal
+from signals.apps.search.queue import IndexQueueService
+from signals.apps.search.tasks import (
+    INDEX_QUEUE_FLUSH_SCHEDULED_CACHE_KEY,
+    INDEX_QUEUE_UNREACHABLE_CACHE_KEY,
+    flush_index_queue,
+    queue_for_indexing
+)
+from signals.apps.signals.factories import CategoryFactory, DepartmentFactory, SignalFactory
+from signals.apps.signals.managers import update_priority
+
+
+class TestBulkIndexing(TestCase):
+    def setUp(self):
+        category = CategoryFactory.create()
+        category.departments.add(*DepartmentFactory.create_batch(2), through_defaults={'is_responsible': True})
+        self.signals = SignalFactory.create_batch(5, category_assignment__category=category)
+
+    def test_iterate_batches(self):
+        queryset = SignalDocument.get_indexing_queryset()
+
+        batches = list(SignalDocument.iterate_batches(queryset, 2))
+
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual([signal.pk for batch in batches for signal in batch], sorted(s.pk for s in self.signals))
+
+    def test_create_documents_without_extra_queries(self):
+        batch, = SignalDocument.iterate_batches(SignalDocument.get_indexing_queryset(), 10)
+
+        with self.assertNumQueries(0):
+            documents = list(SignalDocument.prepare_batch(batch))
+
+        self.assertEqual(len(documents), len(self.signals))
+        self.assertEqual(len(documents[0]['_source']['category_assignment']['category']['departments']), 2)
+
+    @mock.patch('signals.apps.search.documents.base.parallel_bulk')
+    @mock.patch('signals.apps.search.documents.base.bulk')
+    def test_bulk_workers(self, patched_bulk, patched_parallel_bulk):
+        patched_parallel_bulk.side_effect = lambda actions, **kwargs: iter([(True, {})] * len(actions))
+        patched_bulk.side_effect = lambda actions, **kwargs: (len(actions), [])
+        queryset = SignalDocument.get_indexing_queryset()
+
+        self.assertEqual(SignalDocument.bulk(queryset, size=2, workers=4), (5, 0))
+        self.assertEqual(patched_parallel_bulk.call_count, 3)
+        self.assertEqual(patched_parallel_bulk.call_args.kwargs['thread_count'], 4)
+        patched_bulk.assert_not_called()
+
+        self.assertEqual(SignalDocument.bulk(queryset, size=10, workers=1), (5, 0))
+        self.assertEqual(patched_bulk.call_count, 1)
+
+
+class TestIndexQueue(TestCase):
+    def setUp(self):
+        cache.delete_many([INDEX_QUEUE_FLUSH_SCHEDULED_CACHE_KEY, INDEX_QUEUE_UNREACHABLE_CACHE_KEY])
+        self.addCleanup(cache.delete_many, [INDEX_QUEUE_FLUSH_SCHEDULED_CACHE_KEY, INDEX_QUEUE_UNREACHABLE_CACHE_KEY])
+        self.signals = SignalFactory.create_batch(3)
+
+    def test_enqueue_coalesces(self):
+        IndexQueueService.enqueue([self.signals[0].pk, self.signals[0].pk])
+        IndexQueueService.enqueue([self.signals[0].pk, self.signals[1].pk])
+
+        self.assertEqual(sorted(QueuedSignal.objects.values_list('signal_id', flat=True)),
+                         sorted([self.signals[0].pk, self.signals[1].pk]))
+
+    def test_claim(self):
+        IndexQueueService.enqueue([signal.pk for signal in self.signals])
+
+        self.assertEqual(len(IndexQueueService.claim(2)), 2)
+        self.assertEqual(len(IndexQueueService.claim(2)), 1)
+        self.assertFalse(IndexQueueService.has_pending())
+
+    @mock.patch('signals.apps.search.tasks.flush_index_queue.apply_async')
+    def test_changes_are_coalesced(self, patched_apply_async):
+        signal = self.signals[0]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(3):
+                update_priority.send_robust(sender=self.__class__, signal_obj=signal, priority=None,
+                                            prev_priority=None)
+
+        self.assertEqual(list(QueuedSignal.objects.values_list('signal_id', flat=True)), [signal.pk])
+        patched_apply_async.assert_called_once()  # A single flush for the whole burst
+
+    @mock.patch.object(SignalDocument, 'ping', return_value=True)
+    @mock.patch.object(SignalDocument, 'bulk', return_value=(3, 0))
+    def test_flush(self, patched_bulk, patched_ping):
+        queue_for_indexing([signal.pk for signal in self.signals])  # Flushed right away, tasks are eager in tests
+
+        patched_bulk.assert_called_once()
+        queryset = patched_bulk.call_args.args[0]
+        self.assertEqual(sorted(queryset.values_list('pk', flat=True)), sorted(signal.pk for signal in self.signals))
+        self.assertFalse(IndexQueueService.has_pending())
+
+    @mock.patch.object(SignalDocument, 'bulk', return_value=(0, 0))
+    def test_flush_empty_queue(self, patched_bulk):
+        self.assertEqual(flush_index_queue(), 0)
+        patched_bulk.assert_not_called()
+
+    @override_settings(SEARCH={'ENABLED': False})
+    @mock.patch('signals.apps.search.tasks.flush_index_queue.apply_async')
+    def test_disabled(self, patched_apply_async):
+        queue_for_indexing([signal.pk for signal in self.signals])
+
+        self.assertFalse(IndexQueueService.has_pending())
+        patched_apply_async.assert_not_called()
+
+    @mock.patch.object(SignalDocument, 'ping', return_value=False)
+    @mock.patch.object(SignalDocument, 'bulk')
+    def test_flush_unreachable(self, patched_bulk, patched_ping):
+        queue_for_indexing([signal.pk for signal in self.signals])
+
+        patched_bulk.assert_not_called()
+        self.assertEqual(QueuedSignal.objects.count(), 3)  # Left in the queue
+
+        # No new flushes until the retry interval passed, changes are still queued
+        with mock.patch('signals.apps.search.tasks.flush_index_queue.apply_async') as patched_apply_async:
+            queue_for_indexing([SignalFactory.create().pk])
+        patched_apply_async.assert_not_called()
+        self.assertEqual(flush_index_queue(), 0)
+        patched_ping.assert_called_once()
+        self.assertEqual(QueuedSignal.objects.count(), 4)
+
+    @mock.patch.object(SignalDocument, 'ping', return_value=True)
+    @mock.patch.object(SignalDocument, 'bulk', side_effect=TransportError('N/A', 'Connection refused'))
+    def test_flush_transport_error(self, patched_bulk, patched_ping):
+        queue_for_indexing([signal.pk for signal in self.signals])
+
+        patched_bulk.assert_called_once()
+        self.assertEqual(QueuedSignal.objects.count(), 3)  # Queued again
+        self.assertTrue(cache.get(INDEX_QUEUE_UNREACHABLE_CACHE_KEY))
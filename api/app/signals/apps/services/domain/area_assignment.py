@@ -0,0 +1,122 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+(Re-)assigns the Signals to the Areas of an AreaType in bulk, used after loading or changing the Areas (see the
+assign_area management command).
+
+- the Signals are processed in batches ordered by id, every batch is a single statement that joins the locations with
+  the Areas (`ST_Contains`, using the spatial index of the Areas) and inserts a new Location for every Signal whose area
+  changes (`INSERT ... SELECT`), like updating the location of a Signal does
+- every batch is committed on its own, an interrupted run can be resumed after the last processed Signal id
+- Signals that are already assigned to the right Area are left alone, so running it again only changes what changed
+
+When Areas overlap the first Area (ordered by code) containing the location is assigned. The location of a single
+Signal is assigned using the in-memory index of the Areas, see signals.apps.signals.utils.location.
+"""
+from django.db import connection, transaction
+
+from signals.apps.signals.models import Area, Location, Signal
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+class AreaAssignmentResult:
+    def __init__(self, last_signal_id, processed, matched, assigned):
+        self.last_signal_id = last_signal_id  # Resume after this id
+        self.processed = processed  # Signals with a location in the batch
+        self.matched = matched  # Signals with a location within one of the Areas
+        self.assigned = assigned  # Signals that got a new Location
+
+    @property
+    def unmatched(self):
+        return self.processed - self.matched
+
+
+class AreaAssignmentService:
+    @staticmethod
+    def _get_query():
+        qn = connection.ops.quote_name
+
+        # The new Location is a copy of the current Location with the area fields of the matched Area
+        overrides = {
+            'created_at': 'now()',
+            'updated_at': 'now()',
+            'area_type_code': '%(area_type_code)s',
+            'area_code': 'matched.area_code',
+            'area_name': 'matched.area_name',
+        }
+        columns = [field.column for field in Location._meta.concrete_fields if not field.primary_key]
+        select = ', '.join(overrides.get(column, f'l.{qn(column)}') for column in columns)
+
+        return f"""
+            WITH batch AS (
+                SELECT s.id AS signal_id, l.id AS location_id, l.geometrie, l.area_type_code, l.area_code, l.area_name
+                FROM {qn(Signal._meta.db_table)} AS s
+                JOIN {qn(Location._meta.db_table)} AS l ON l.id = s.location_id
+                WHERE s.id > %(after_id)s
+                ORDER BY s.id
+                LIMIT %(batch_size)s
+            ), matched AS (
+                SELECT DISTINCT ON (batch.signal_id)
+                       batch.signal_id, batch.location_id, a.code AS area_code, a.name AS area_name,
+                       (batch.area_type_code IS DISTINCT FROM %(area_type_code)s OR
+                        batch.area_code IS DISTINCT FROM a.code OR
+                        batch.area_name IS DISTINCT FROM a.name) AS changed
+                FROM batch
+                JOIN {qn(Area._meta.db_table)} AS a
+                  ON a._type_id = %(area_type_id)s AND ST_Contains(a.geometry, batch.geometrie)
+                ORDER BY batch.signal_id, a.code
+            ), inserted AS (
+                INSERT INTO {qn(Location._meta.db_table)} ({', '.join(qn(column) for column in columns)})
+                SELECT {select}
+                FROM matched
+                JOIN {qn(Location._meta.db_table)} AS l ON l.id = matched.location_id
+                WHERE matched.changed
+                RETURNING id, _signal_id
+            ), updated AS (
+                UPDATE {qn(Signal._meta.db_table)} AS s
+                SET location_id = inserted.id, updated_at = now()
+                FROM inserted
+                WHERE s.id = inserted._signal_id
+                RETURNING s.id
+            )
+            SELECT (SELECT max(signal_id) FROM batch),
+                   (SELECT count(*) FROM batch),
+                   (SELECT count(*) FROM matched),
+                   (SELECT count(*) FROM updated)
+        """
+
+    @staticmethod
+    def assign_batch(area_type, after_id=0, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Assign the next batch of Signals (with an id larger than `after_id`) to the Areas of the AreaType.
+
+        :returns: AreaAssignmentResult, or None when there are no Signals left
+        """
+        params = {
+            'after_id': after_id,
+            'batch_size': batch_size,
+            'area_type_id': area_type.pk,
+            'area_type_code': area_type.code,
+        }
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(AreaAssignmentService._get_query(), params)
+            last_signal_id, processed, matched, assigned = cursor.fetchone()
+
+        if last_signal_id is None:
+            return None
+        return AreaAssignmentResult(last_signal_id, processed, matched, assigned)
+
+    @staticmethod
+    def assign(area_type, after_id=0, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Assign all Signals (with an id larger than `after_id`) to the Areas of the AreaType, batch by batch.
+
+        :returns: generator of the AreaAssignmentResult of every batch
+        """
+        while True:
+            result = AreaAssignmentService.assign_batch(area_type, after_id=after_id, batch_size=batch_size)
+            if result is None:
+                return
+            yield result
+            after_id = result.last_signal_id
@@ -0,0 +1,68 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+Simplified Area geometries, used when drawing the Areas on a map (see the `geography` endpoint of the Areas).
+
+The geometries are simplified at a fixed set of tolerances (in degrees) when Areas are loaded (see the load_areas
+management command) or changed, and stored as SimplifiedAreaGeometry. Areas without simplified geometries are drawn
+at full resolution. At a given zoom level the largest tolerance smaller than a pixel is used, the difference
+with the full resolution geometry is not visible at that zoom level.
+"""
+from django.contrib.gis.geos import MultiPolygon, Polygon
+from django.db import transaction
+
+from signals.apps.signals.models import Area, SimplifiedAreaGeometry
+
+# Roughly one pixel at zoom level 10, 12, 14 and 16 (in degrees longitude)
+TOLERANCES = (0.001, 0.0003, 0.00008, 0.00002)
+TILE_SIZE = 256
+
+
+class AreaGeometryService:
+    @staticmethod
+    def simplify(geometry, tolerance):
+        """
+        Simplified geometry as a MultiPolygon, the topology of the geometry is preserved.
+        """
+        simplified = geometry.simplify(tolerance, preserve_topology=True)
+        if isinstance(simplified, Polygon):
+            simplified = MultiPolygon(simplified, srid=geometry.srid)
+        if not isinstance(simplified, MultiPolygon) or simplified.empty:
+            return geometry
+        return simplified
+
+    @staticmethod
+    def generate(areas=None):
+        """
+        (Re-)generate the simplified geometries of the given Areas (default: all Areas).
+
+        :param areas: Area queryset or iterable of Areas
+        :returns: number of simplified geometries created
+        """
+        areas = Area.objects.all() if areas is None else areas
+
+        created = 0
+        with transaction.atomic():
+            for area in areas:
+                SimplifiedAreaGeometry.objects.filter(area=area).delete()
+                created += len(SimplifiedAreaGeometry.objects.bulk_create([
+                    SimplifiedAreaGeometry(
+                        area=area,
+                        tolerance=tolerance,
+                        geometry=AreaGeometryService.simplify(area.geometry, tolerance)
+                    ) for tolerance in TOLERANCES
+                ]))
+        return created
+
+    @staticmethod
+    def get_tolerance(zoom=None, tolerance=None):
+        """
+        The precomputed tolerance to use for the given zoom level or requested tolerance. The largest precomputed
+        tolerance that is not larger than the pixel size at the zoom level (or the requested tolerance) is used, None
+        means the full resolution geometries should be used.
+        """
+        if zoom is not None:
+            tolerance = 360 / (TILE_SIZE * 2 ** zoom)
+        if tolerance is None:
+            return None
+        return max((t for t in TOLERANCES if t <= tolerance), default=None)
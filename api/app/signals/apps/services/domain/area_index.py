@@ -0,0 +1,229 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+In-memory spatial index of the Areas, used for the point in area lookups of the routing rules (`location in areas.*`)
+and when determining the Area of a Signal location (see signals.apps.signals.utils.location).
+
+- the Areas are loaded per AreaType, only when an AreaType is used: for the Signal locations only the AreaTypes Signals
+  are assigned to are indexed (see AreaIndexService.is_indexed), the routing rules load the AreaTypes they refer to
+- every AreaType has a static R-tree (Sort-Tile-Recursive bulk loaded) over the bounding boxes of its Areas, so only
+  the Areas whose bounding box contains the point are tested
+- the remaining candidates are tested against prepared geometries
+- the index is invalidated by bumping a version stamp in the Django cache when Areas change (see
+  signals.apps.signals.signal_receivers) or are reloaded (see the load_areas management command), and is reloaded
+  after AREA_INDEX_TIMEOUT seconds for processes that do not share the Django cache
+
+GEOS prepared geometries build their own internal index on first use and are not safe to share between threads,
+therefore every thread builds its own copy of the index.
+"""
+import math
+import threading
+import uuid
+from collections.abc import Mapping
+from time import monotonic
+
+from django.conf import settings
+from django.core.cache import cache
+
+from signals.apps.signals.models import Area, AreaType
+
+AREA_INDEX_VERSION_CACHE_KEY = 'signals.services.area_index.version'
+AREA_INDEX_TIMEOUT = 5 * 60
+
+
+class STRtree:
+    """
+    Static R-tree over the bounding boxes of the given items, the tree cannot be changed after it is built.
+
+    :param items: iterable of (bbox, item) tuples, the bbox as a (xmin, ymin, xmax, ymax) tuple
+    """
+    def __init__(self, items, node_capacity=10):
+        self.node_capacity = node_capacity
+
+        # A node is a (bbox, children, item) tuple, a leaf has no children
+        nodes = [(tuple(bbox), None, item) for bbox, item in items]
+        while len(nodes) > node_capacity:
+            nodes = self._pack(nodes)
+        self.root = nodes
+
+    def _pack(self, nodes):
+        n_parents = math.ceil(len(nodes) / self.node_capacity)
+        slice_size = math.ceil(math.sqrt(n_parents)) * self.node_capacity
+
+        parents = []
+        nodes = sorted(nodes, key=lambda node: node[0][0] + node[0][2])
+        for i in range(0, len(nodes), slice_size):
+            vertical_slice = sorted(nodes[i:i + slice_size], key=lambda node: node[0][1] + node[0][3])
+            for j in range(0, len(vertical_slice), self.node_capacity):
+                children = vertical_slice[j:j + self.node_capacity]
+                bbox = (
+                    min(child[0][0] for child in children),
+                    min(child[0][1] for child in children),
+                    max(child[0][2] for child in children),
+                    max(child[0][3] for child in children),
+                )
+                parents.append((bbox, children, None))
+        return parents
+
+    def query(self, x, y):
+        """
+        The items with a bounding box that contains the given coordinates.
+        """
+        found = []
+        stack = list(self.root)
+        while stack:
+            bbox, children, item = stack.pop()
+            if bbox[0] <= x <= bbox[2] and bbox[1] <= y <= bbox[3]:
+                if children is None:
+                    found.append(item)
+                else:
+                    stack.extend(children)
+        return found
+
+
+class IndexedArea:
+    def __init__(self, position, area):
+        self.position = position  # Position in the default ordering of the Areas
+        self.area = area
+        self.bbox = area.geometry.extent
+        self.prepared = area.geometry.prepared
+
+    def contains(self, point):
+        return (self.bbox[0] <= point.x <= self.bbox[2] and self.bbox[1] <= point.y <= self.bbox[3]
+                and self.prepared.contains(point))
+
+
+def _transform(point, srid):
+    if point.srid and srid and point.srid != srid:
+        return point.transform(srid, clone=True)
+    return point
+
+
+def _query(tree, point):
+    candidates = sorted(tree.query(point.x, point.y), key=lambda indexed_area: indexed_area.position)
+    return [indexed_area.area for indexed_area in candidates if indexed_area.prepared.contains(point)]
+
+
+class AreaTypeIndex(Mapping):
+    """
+    The Areas of a single AreaType, also usable as the Area code -> geometry mapping of the routing rules.
+    """
+    def __init__(self, indexed_areas, srid):
+        self.srid = srid
+        self.indexed_areas = {indexed_area.area.code: indexed_area for indexed_area in indexed_areas}
+        self.tree = STRtree((indexed_area.bbox, indexed_area) for indexed_area in indexed_areas)
+
+    def __getitem__(self, code):
+        return self.indexed_areas[code].area.geometry
+
+    def __iter__(self):
+        return iter(self.indexed_areas)
+
+    def __len__(self):
+        return len(self.indexed_areas)
+
+    def get_areas(self, point):
+        """
+        The Areas that contain the given point, in the default ordering of the Areas.
+        """
+        return _query(self.tree, _transform(point, self.srid))
+
+    def contains_point(self, code, point):
+        """
+        Used by the InEvaluator instead of testing the (unprepared) geometry of the Area.
+        """
+        indexed_area = self.indexed_areas.get(code)
+        return indexed_area is not None and indexed_area.contains(_transform(point, self.srid))
+
+
+class AreaIndex(Mapping):
+    """
+    The AreaTypeIndex of the AreaTypes, each loaded on first use. As a mapping the AreaTypes are looked up by name, like
+    the routing rules refer to them (`location in areas."<area type name>"."<area code>"`).
+    """
+    def __init__(self):
+        self.srid = Area._meta.get_field('geometry').srid
+        self.by_code = {}
+        self._codes_by_name = None
+
+    @property
+    def codes_by_name(self):
+        if self._codes_by_name is None:
+            self._codes_by_name = dict(AreaType.objects.values_list('name', 'code'))
+        return self._codes_by_name
+
+    def get_area_type_index(self, area_type_code):
+        if area_type_code not in self.by_code:
+            areas = Area.objects.select_related('_type').filter(_type__code=area_type_code).order_by('code')
+            indexed_areas = [IndexedArea(position, area) for position, area in enumerate(areas)]
+            self.by_code[area_type_code] = AreaTypeIndex(indexed_areas, self.srid)
+        return self.by_code[area_type_code]
+
+    def __getitem__(self, name):
+        return self.get_area_type_index(self.codes_by_name[name])
+
+    def __iter__(self):
+        return iter(self.codes_by_name)
+
+    def __len__(self):
+        return len(self.codes_by_name)
+
+    def get_area(self, point, area_type_code):
+        """
+        The first Area (in the default ordering) of the AreaType that contains the given point, or None.
+        """
+        areas = self.get_area_type_index(area_type_code).get_areas(point)
+        return areas[0] if areas else None
+
+
+class AreaIndexService:
+    _local = threading.local()
+
+    @staticmethod
+    def get_version():
+        version = cache.get(AREA_INDEX_VERSION_CACHE_KEY)
+        if version is None:
+            cache.add(AREA_INDEX_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+            version = cache.get(AREA_INDEX_VERSION_CACHE_KEY)
+        return version
+
+    @classmethod
+    def invalidate(cls):
+        """
+        Drop the index of all threads and of all processes sharing the Django cache.
+        """
+        cache.set(AREA_INDEX_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+        cls._local.__dict__.clear()
+
+    @staticmethod
+    def is_indexed(area_type_code):
+        """
+        Are the Areas of the AreaType kept in memory for the Signal locations, only the AreaTypes Signals are assigned
+        to are. The Areas of other AreaTypes are looked up in the database.
+        """
+        return area_type_code is not None and area_type_code in (
+            settings.DEFAULT_SIGNAL_AREA_TYPE,
+            getattr(settings, 'API_DETERMINE_STADSDEEL_ENABLED_AREA_TYPE', 'sia-stadsdeel'),
+        )
+
+    @classmethod
+    def get_index(cls):
+        version = cls.get_version()
+        if (getattr(cls._local, 'version', None) != version or
+                monotonic() - cls._local.loaded_at > AREA_INDEX_TIMEOUT):
+            cls._local.index = AreaIndex()
+            cls._local.version = version
+            cls._local.loaded_at = monotonic()
+        return cls._local.index
+
+    @classmethod
+    def get_area(cls, point, area_type_code):
+        """
+        The first Area (in the default ordering) of the AreaType that contains the given point, or None.
+        """
+        return cls.get_index().get_area(point, area_type_code)
+
+    @classmethod
+    def get_areas(cls, points, area_type_code):
+        index = cls.get_index()
+        return [index.get_area(point, area_type_code) for point in points]
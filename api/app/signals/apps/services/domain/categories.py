@@ -0,0 +1,123 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+Resolve (external) category names and slugs to Categories without querying the database for every lookup.
+
+- the category tree is loaded with a single query into an in-memory index, once per process
+- the index is invalidated through the post_save/post_delete signals of the Category model (see
+  signals.apps.signals.signal_receivers)
+- invalidation bumps a version stamp in the Django cache, so other processes sharing that cache rebuild their index on
+  their next lookup
+- the index is also rebuilt after CATEGORY_INDEX_TIMEOUT seconds, for processes that do not share the Django cache (the
+  default per-process cache)
+"""
+import threading
+import uuid
+from time import monotonic
+
+from django.core.cache import cache
+from django.utils.text import slugify
+
+from signals.apps.signals.models import Category
+
+CATEGORY_INDEX_VERSION_CACHE_KEY = 'signals.services.category_resolver.version'
+CATEGORY_INDEX_TIMEOUT = 60
+
+
+class CategoryIndex:
+    """
+    Read-only lookup tables for a snapshot of the category tree.
+    """
+    def __init__(self, categories):
+        self.by_pk = {}
+        self.sub_by_slug = {}
+        self.sub_by_parent_and_slug = {}
+        self.parent_by_slug = {}
+
+        for category in categories:  # Ordered on the default ordering of the Category model
+            self.by_pk[category.pk] = category
+            if category.parent_id is None:
+                self.parent_by_slug.setdefault(category.slug, category)
+            else:
+                self.sub_by_slug.setdefault(category.slug, category)
+                self.sub_by_parent_and_slug[(category.parent.slug, category.slug)] = category
+
+    def get_sub_category(self, slug, parent_slug=None):
+        if parent_slug is not None:
+            return self.sub_by_parent_and_slug.get((parent_slug, slug))
+        return self.sub_by_slug.get(slug)
+
+
+class CategoryResolverService:
+    _index = None
+    _version = None
+    _loaded_at = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _is_outdated(cls, version):
+        return cls._index is None or cls._version != version or monotonic() - cls._loaded_at > CATEGORY_INDEX_TIMEOUT
+
+    @classmethod
+    def get_index(cls):
+        """
+        The CategoryIndex of this process, (re)built when the category tree changed since it was loaded or when it is
+        older than CATEGORY_INDEX_TIMEOUT seconds.
+        """
+        version = cache.get(CATEGORY_INDEX_VERSION_CACHE_KEY)
+        if version is None:
+            version = uuid.uuid4().hex
+            cache.add(CATEGORY_INDEX_VERSION_CACHE_KEY, version, timeout=None)
+            version = cache.get(CATEGORY_INDEX_VERSION_CACHE_KEY, version)
+
+        if cls._is_outdated(version):
+            with cls._lock:
+                if cls._is_outdated(version):
+                    cls._index = CategoryIndex(Category.objects.select_related('parent').all())
+                    cls._version = version
+                    cls._loaded_at = monotonic()
+        return cls._index
+
+    @classmethod
+    def invalidate(cls):
+        """
+        Drop the index of this process and of all processes sharing the Django cache.
+        """
+        cache.set(CATEGORY_INDEX_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+        with cls._lock:
+            cls._index = None
+            cls._version = None
+
+    @classmethod
+    def get_by_pk(cls, pk):
+        return cls.get_index().by_pk.get(pk)
+
+    @classmethod
+    def get_sub_category(cls, slug, parent_slug=None, default=None):
+        """
+        Sub category by slug, optionally restricted to the parent with the given slug.
+        """
+        category = cls.get_index().get_sub_category(slug, parent_slug)
+        return category if category is not None else default
+
+    @classmethod
+    def resolve(cls, names, fallback_slug=None, fallback_parent_slug=None):
+        """
+        Resolve a list of category names (e.g. "Straatverlichting") to sub categories, matched on slug.
+
+        :param names: list of category names
+        :param fallback_slug: slug of the sub category used for names that do not match (Default: None)
+        :param fallback_parent_slug: slug of the parent of the fallback sub category (Default: None)
+        :returns: list of Categories (or None when there is no match and no fallback) in the order of the given names
+        """
+        index = cls.get_index()
+        fallback = None
+        if fallback_slug is not None:
+            fallback = (index.get_sub_category(fallback_slug, fallback_parent_slug)
+                        or index.get_sub_category(fallback_slug))
+
+        resolved = []
+        for name in names:
+            category = index.get_sub_category(slugify(name)) if name else None
+            resolved.append(category if category is not None else fallback)
+        return resolved
@@ -0,0 +1,150 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+Recalculates the deadlines of many Signals at once, for example after the Service Level Objective of a category
+changed or for Signals that have no deadline (see the calculate_deadlines management command).
+
+- the current Service Level Objective is loaded once per category
+- the deadlines are calculated per category from the offsets per weekday (see DeadlineCalculationService.get_deadlines)
+- every batch is locked, read and written with bulk_update in one transaction, either in place on the current
+  CategoryAssignment of the Signals or, to show the recalculation in the history of the Signals, on a new
+  CategoryAssignment to the same category (like re-assigning the category would)
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from signals.apps.history.services import SignalLogService
+from signals.apps.services.domain.deadlines import DeadlineCalculationService
+from signals.apps.signals.models import CategoryAssignment, ServiceLevelObjective, Signal
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class DeadlineRecalculationService:
+    @staticmethod
+    def get_current_slos(category_ids):
+        """
+        The current ServiceLevelObjective per category id, categories without one are left out.
+        """
+        slos = {}
+        for slo in ServiceLevelObjective.objects.filter(category_id__in=set(category_ids)).order_by('created_at'):
+            slos[slo.category_id] = slo  # Ordered by created_at so the latest one wins, like from_signal_and_category
+        return slos
+
+    @staticmethod
+    def calculate(category_assignments, slos):
+        """
+        Set the deadlines of the CategoryAssignments (not saved), using the Signal created_at timestamps.
+
+        :param category_assignments: list of CategoryAssignments with their Signal
+        :param slos: the current ServiceLevelObjective per category id
+        """
+        per_category = defaultdict(list)
+        for category_assignment in category_assignments:
+            per_category[category_assignment.category_id].append(category_assignment)
+
+        for category_id, assignments in per_category.items():
+            slo = slos.get(category_id)
+            if slo is None:
+                for category_assignment in assignments:
+                    category_assignment.deadline, category_assignment.deadline_factor_3 = None, None
+                continue
+
+            created_ats = [category_assignment._signal.created_at for category_assignment in assignments]
+            deadlines = DeadlineCalculationService.get_deadlines(created_ats, slo.n_days, slo.use_calendar_days, 1)
+            deadlines_factor_3 = DeadlineCalculationService.get_deadlines(
+                created_ats, slo.n_days, slo.use_calendar_days, 3)
+            for category_assignment, deadline, deadline_factor_3 in zip(assignments, deadlines, deadlines_factor_3):
+                category_assignment.deadline, category_assignment.deadline_factor_3 = deadline, deadline_factor_3
+
+    @staticmethod
+    def recalculate(signals, batch_size=DEFAULT_BATCH_SIZE, history_text=None):
+        """
+        Recalculate the deadlines of the current CategoryAssignment of the given Signals.
+
+        :param signals: Signal queryset
+        :param batch_size: number of Signals updated per transaction
+        :param history_text: when given a new CategoryAssignment, with this text, is created for every Signal so the
+                             recalculation shows up in its history, otherwise the deadlines are updated in place
+        :returns: number of processed Signals
+        """
+        # Only the current CategoryAssignment of every Signal, its history is neither read nor locked
+        category_assignments = CategoryAssignment.objects.filter(
+            pk__in=signals.order_by().filter(category_assignment__isnull=False).values('category_assignment_id')
+        ).select_related(
+            '_signal', 'category'
+        ).only(
+            'id', '_signal', '_signal__created_at', '_signal__category_assignment', 'category', 'category__name',
+            'category__handling_message'
+        ).order_by('pk')
+
+        # The CategoryAssignments created while re-assigning are not recalculated again
+        last_id = category_assignments.aggregate(last_id=Max('pk'))['last_id'] or 0
+
+        slos, updated, after_id = {}, 0, 0
+        while True:
+            with transaction.atomic():
+                # Lock the batch, so a concurrent (re-)categorization of the Signals waits for this transaction instead
+                # of being reverted by it
+                batch = list(
+                    category_assignments.filter(pk__gt=after_id, pk__lte=last_id).select_for_update(
+                        of=('self', '_signal')
+                    )[:batch_size]
+                )
+                if not batch:
+                    return updated
+                after_id = batch[-1].pk
+
+                # Skip the Signals that were re-categorized concurrently, between selecting the current
+                # CategoryAssignments and acquiring the lock, their new CategoryAssignment already has up-to-date
+                # deadlines
+                batch = [
+                    category_assignment for category_assignment in batch
+                    if category_assignment._signal.category_assignment_id == category_assignment.pk
+                ]
+
+                missing = {category_assignment.category_id for category_assignment in batch} - set(slos)
+                if missing:
+                    slos.update(dict.fromkeys(missing))  # Remember the categories without a ServiceLevelObjective
+                    slos.update(DeadlineRecalculationService.get_current_slos(missing))
+
+                if history_text is None:
+                    DeadlineRecalculationService._update_in_place(batch, slos)
+                else:
+                    DeadlineRecalculationService._reassign(batch, slos, history_text)
+            updated += len(batch)
+
+    @staticmethod
+    def _update_in_place(category_assignments, slos):
+        DeadlineRecalculationService.calculate(category_assignments, slos)
+
+        now = timezone.now()
+        for category_assignment in category_assignments:
+            category_assignment.updated_at = now
+        CategoryAssignment.objects.bulk_update(category_assignments, ['deadline', 'deadline_factor_3', 'updated_at'])
+
+    @staticmethod
+    def _reassign(category_assignments, slos, history_text):
+        new_category_assignments = [
+            CategoryAssignment(
+                _signal=category_assignment._signal,
+                category=category_assignment.category,
+                text=history_text,
+                stored_handling_message=category_assignment.category.handling_message,  # SIG-3555
+            ) for category_assignment in category_assignments
+        ]
+        DeadlineRecalculationService.calculate(new_category_assignments, slos)
+        CategoryAssignment.objects.bulk_create(new_category_assignments)
+
+        now = timezone.now()
+        signals = []
+        for category_assignment in new_category_assignments:
+            signal = category_assignment._signal
+            signal.category_assignment, signal.updated_at = category_assignment, now
+            signals.append(signal)
+        Signal.objects.bulk_update(signals, ['category_assignment', 'updated_at'])
+
+        SignalLogService.log_update_category_assignments(new_category_assignments)
@@ -1,5 +1,5 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2021 Gemeente Amsterdam
+# Copyright (C) 2021 - 2022 Gemeente Amsterdam
 """
 Calculate deadline for solving complaints.
 
@@ -7,6 +7,9 @@ Calculate deadline for solving complaints.
 - supports scaling a deadline with an arbitrary factor (used to find complaints
   that overrun their deadline by a factor of 3)
 - workdays are defined as Monday through Friday, ignoring festivities
+- the deadlines of many complaints with the same Service Level Objective are
+  calculated from the offsets per weekday, which only depend on the Service
+  Level Objective (see get_deadlines)
 """
 from datetime import datetime, time, timedelta
 
@@ -65,13 +68,56 @@ class DeadlineCalculationService:
 
         return deadline
 
+    @staticmethod
+    def get_day_offsets(n_days, use_calendar_days, factor=1):
+        """
+        Get, per weekday of the Signal created_at timestamp (Monday is 0), whether
+        the deadline is counted from midnight and the number of days to add.
+
+        Note:
+        - gives the same deadlines as get_deadline
+        """
+        if use_calendar_days:
+            return [(False, n_days * factor)] * 7
+
+        n_weeks, days_remaining = divmod(n_days * factor, 5)  # 5 days per workweek
+        offsets = []
+        for weekday in range(7):
+            if weekday > 4:
+                # Work starts on Monday at midnight (see get_start)
+                offsets.append((True, 7 - weekday + (n_weeks * 7) + days_remaining))
+            elif weekday + days_remaining > 4:
+                # Deadline would fall in weekend and we have to shift by 2 extra days (see get_end)
+                offsets.append((False, (n_weeks * 7) + days_remaining + 2))
+            else:
+                offsets.append((False, (n_weeks * 7) + days_remaining))
+        return offsets
+
+    @staticmethod
+    def get_deadlines(created_ats, n_days, use_calendar_days, factor=1):
+        """
+        Get the deadlines or delayed deadlines of many Signal created_at
+        timestamps sharing the same Category properties.
+        """
+        offsets = DeadlineCalculationService.get_day_offsets(n_days, use_calendar_days, factor)
+
+        deadlines = []
+        for created_at in created_ats:
+            from_midnight, n_days_offset = offsets[created_at.date().weekday()]
+            start = created_at
+            if from_midnight:
+                start = datetime.combine(created_at.date(), time(0, 0, 0), tzinfo=created_at.tzinfo)
+            deadlines.append(start + timedelta(days=n_days_offset))
+        return deadlines
+
+    @staticmethod
     def from_signal_and_category(signal, category):
         """
         Get deadline and factor 3 delayed deadline for a Signal and a Category.
         """
-        if not category.slo.exists():
-            return None, None
         current_slo = category.slo.order_by('created_at').last()
+        if current_slo is None:
+            return None, None
 
         deadline = DeadlineCalculationService.get_deadline(
             signal.created_at, current_slo.n_days, current_slo.use_calendar_days, 1)
@@ -1,20 +1,19 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2020 - 2021 Vereniging van Nederlandse Gemeenten, Gemeente Amsterdam
+# Copyright (C) 2020 - 2022 Vereniging van Nederlandse Gemeenten, Gemeente Amsterdam
 import time
 
-from signals.apps.dsl.ExpressionEvaluator import ExpressionEvaluator
+from signals.apps.dsl.compiler import ExpressionCompiler
+from signals.apps.services.domain.area_index import AreaIndexService
 from signals.apps.signals.managers import SignalManager
-from signals.apps.signals.models import Area, AreaType, RoutingExpression, Signal
+from signals.apps.signals.models import RoutingExpression, Signal
 
 
 class DslService:
-    compiler = ExpressionEvaluator()
-    _code_cache = {}
+    compiler = ExpressionCompiler()
 
     def _compile(self, code):
-        if code not in self._code_cache:
-            self._code_cache[code] = self.compiler.compile(code)
-        return self._code_cache[code]
+        # The compiler caches the compiled expressions
+        return self.compiler.compile(code)
 
     def evaluate(self, context, code):
         evaluator = self._compile(code)
@@ -30,32 +29,23 @@ class DslService:
 
 # maps signal object to context dictionary
 class SignalContext:
-    _areas = None
-
-    def _init_areas(self):
-        tmp = {}
-        for area_type in AreaType.objects.all():
-            tmp[area_type.name] = {
-                area.code: area.geometry for area in Area.objects.filter(_type=area_type).all()
-            }
-        return tmp
-
     @property
     def areas(self):
-        if not self._areas:
-            self._areas = self._init_areas()
-        return self._areas
+        # The index is refreshed when the Areas change, see AreaIndexService
+        return AreaIndexService.get_index()
 
     def __call__(self, signal: Signal):
-
-        t = signal.incident_date_start.strftime("%H:%M:%S")
+        incident_date_start = signal.incident_date_start
         tmp = {
             'sub': signal.category_assignment.category.name,
             'main': signal.category_assignment.category.parent.name,
             'location': signal.location.geometrie,
             'stadsdeel': signal.location.stadsdeel,
-            'time': time.strptime(t, "%H:%M:%S"),
-            'day': signal.incident_date_start.strftime("%A"),
+            # Same value as time.strptime(incident_date_start.strftime('%H:%M:%S'), '%H:%M:%S'), without formatting and
+            # parsing the time
+            'time': time.struct_time((1900, 1, 1, incident_date_start.hour, incident_date_start.minute,
+                                      incident_date_start.second, 0, 1, -1)),
+            'day': incident_date_start.strftime("%A"),
             'areas': self.areas
         }
 
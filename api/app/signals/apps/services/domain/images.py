@@ -1,15 +1,21 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2021 Gemeente Amsterdam
+# Copyright (C) 2021 - 2022 Gemeente Amsterdam
 import base64
+import hashlib
 import io
 import logging
 import os
 
+from django.conf import settings
+from django.core.cache import cache
 from django.core.files.storage import default_storage
 from PIL import Image, UnidentifiedImageError
 
 logger = logging.getLogger(__name__)
 
+# The file name is part of the key, a replaced file gets a new entry
+IMAGE_CACHE_KEY = 'signals.services.image.{attachment_id}.{max_size}.{digest}'
+
 
 class DataUriImageEncodeService:
     @staticmethod
@@ -26,6 +32,48 @@ class DataUriImageEncodeService:
 
         return image.resize(size=(width, height), resample=Image.LANCZOS).convert('RGB')
 
+    @staticmethod
+    def _get_key(att, max_size):
+        digest = hashlib.sha256(att.file.name.encode('utf-8')).hexdigest()[:16]
+        return IMAGE_CACHE_KEY.format(attachment_id=att.pk, max_size=max_size, digest=digest)
+
+    @staticmethod
+    def get_data_uri(att, max_size):
+        """
+        Read the attached image, resize it and encode it as a JPEG data URI. Returns None if the attachment cannot be
+        opened as an image.
+        """
+        with io.BytesIO() as buffer:
+            try:
+                with default_storage.open(att.file.name) as file:
+                    buffer.write(file.read())
+                    image = Image.open(buffer)
+                    if image.width > max_size or image.height > max_size:
+                        # Let the JPEG decoder scale down while decoding (no-op for other formats), instead of
+                        # decoding the full resolution image
+                        scale = max_size / max(image.width, image.height)
+                        image.draft(None, (int(image.width * scale), int(image.height * scale)))
+            except UnidentifiedImageError:
+                # PIL cannot open the attached file it is probably not an image.
+                msg = f'Cannot open image attachment pk={att.pk}'
+                logger.warning(msg)
+                return None
+            except:  # noqa:E722
+                # Attachment cannot be opened - log the exception.
+                msg = f'Cannot open image attachment pk={att.pk}'
+                logger.warning(msg, exc_info=True)
+                return None
+
+            if image.width > max_size or image.height > max_size:
+                image = DataUriImageEncodeService.resize(image, max_size)
+
+            if image.mode == 'RGBA':
+                image = image.convert('RGB')
+
+            with io.BytesIO() as new_buffer:
+                image.save(new_buffer, format='JPEG')
+                return f'data:image/jpg;base64,{base64.b64encode(new_buffer.getvalue()).decode("utf-8")}'
+
     @staticmethod
     def get_context_data_images(signal, max_size):
         jpg_data_uris = []
@@ -33,38 +81,26 @@ class DataUriImageEncodeService:
         user_emails = []
         att_created_ats = []
 
+        attachments = []
         for att in signal.attachments.all():
             # Attachment is_image property is currently not reliable
             _, ext = os.path.splitext(att.file.name)
             if ext.lower() not in ['.gif', '.jpg', '.jpeg', '.png']:
                 continue  # unsupported image format, or not image format
+            attachments.append(att)
 
-            with io.BytesIO() as buffer:
-                try:
-                    with default_storage.open(att.file.name) as file:
-                        buffer.write(file.read())
-                        image = Image.open(buffer)
-                except UnidentifiedImageError:
-                    # PIL cannot open the attached file it is probably not an image.
-                    msg = f'Cannot open image attachment pk={att.pk}'
-                    logger.warning(msg)
-                    continue
-                except:  # noqa:E722
-                    # Attachment cannot be opened - log the exception.
-                    msg = f'Cannot open image attachment pk={att.pk}'
-                    logger.warning(msg, exc_info=True)
-                    continue
-
-                if image.width > max_size or image.height > max_size:
-                    image = DataUriImageEncodeService.resize(image, max_size)
+        # The resized images are cached, attachments are not changed after they are uploaded
+        keys = {att.pk: DataUriImageEncodeService._get_key(att, max_size) for att in attachments}
+        cached = cache.get_many(keys.values())
 
-                if image.mode == 'RGBA':
-                    image = image.convert('RGB')
-
-                with io.BytesIO() as new_buffer:
-                    new_buffer = io.BytesIO()
-                    image.save(new_buffer, format='JPEG')
-                    encoded = f'data:image/jpg;base64,{base64.b64encode(new_buffer.getvalue()).decode("utf-8")}'
+        encoded_by_key = {}
+        for att in attachments:
+            encoded = cached.get(keys[att.pk])
+            if encoded is None:
+                encoded = DataUriImageEncodeService.get_data_uri(att, max_size)
+                if encoded is None:
+                    continue
+                encoded_by_key[keys[att.pk]] = encoded
 
             att_filename = os.path.basename(att.file.name)
 
@@ -73,4 +109,7 @@ class DataUriImageEncodeService:
             user_emails.append(att.created_by)
             att_created_ats.append(att.created_at)
 
+        if encoded_by_key:
+            cache.set_many(encoded_by_key, timeout=settings.API_PDF_IMAGE_CACHE_TIMEOUT)
+
         return jpg_data_uris, att_filenames, user_emails, att_created_ats
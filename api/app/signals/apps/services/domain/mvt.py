@@ -0,0 +1,129 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+Render Signal querysets as Mapbox Vector Tiles (MVT) in the database.
+
+- tiles are addressed as z/x/y in the Web Mercator (EPSG:3857) tiling scheme used by web maps
+- the (already filtered) Signal queryset is restricted to the tile, so the work done scales with the viewport
+- below SIGNALS_API_MVT_FEATURES_MIN_ZOOM the Signals are clustered on a grid, every cluster is a single point with
+  a "point_count" property; from that zoom level on every Signal is a feature with the requested properties
+"""
+import math
+
+from django.contrib.gis.geos import Polygon
+from django.db import connection
+from django.db.models import F
+
+from signals.apps.api.app_settings import (
+    SIGNALS_API_MVT_BUFFER,
+    SIGNALS_API_MVT_CLUSTER_GRID_SIZE,
+    SIGNALS_API_MVT_EXTENT,
+    SIGNALS_API_MVT_FEATURES_MIN_ZOOM,
+    SIGNALS_API_MVT_MAX_ZOOM
+)
+
+WEB_MERCATOR_HALF_SIZE = 20037508.342789244  # Half the width of the world in EPSG:3857 (meters)
+
+
+class MVTService:
+    content_type = 'application/vnd.mapbox-vector-tile'
+
+    @staticmethod
+    def is_valid_tile(z, x, y):
+        return 0 <= z <= SIGNALS_API_MVT_MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+    @staticmethod
+    def get_tile_for_point(lon, lat, z):
+        """
+        Coordinates (z, x, y) of the tile containing the given WGS84 point.
+        """
+        n = 2 ** z
+        x = int((lon + 180) / 360 * n)
+        y = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+        return z, min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+    @staticmethod
+    def get_tile_bounds(z, x, y):
+        """
+        Bounds (xmin, ymin, xmax, ymax) of the tile in EPSG:3857.
+        """
+        size = 2 * WEB_MERCATOR_HALF_SIZE / 2 ** z
+        xmin = -WEB_MERCATOR_HALF_SIZE + x * size
+        ymax = WEB_MERCATOR_HALF_SIZE - y * size
+        return xmin, ymax - size, xmin + size, ymax
+
+    @staticmethod
+    def get_tile_bbox(z, x, y):
+        """
+        Bounds (min_lon, min_lat, max_lon, max_lat) of the tile, including the buffer, in WGS84.
+        """
+        xmin, ymin, xmax, ymax = MVTService.get_tile_bounds(z, x, y)
+        buffer = (xmax - xmin) * SIGNALS_API_MVT_BUFFER / SIGNALS_API_MVT_EXTENT
+
+        def _to_lon_lat(mx, my):
+            mx = max(-WEB_MERCATOR_HALF_SIZE, min(WEB_MERCATOR_HALF_SIZE, mx))
+            my = max(-WEB_MERCATOR_HALF_SIZE, min(WEB_MERCATOR_HALF_SIZE, my))
+            lon = mx / WEB_MERCATOR_HALF_SIZE * 180
+            lat = math.degrees(2 * math.atan(math.exp(my / WEB_MERCATOR_HALF_SIZE * math.pi)) - math.pi / 2)
+            return lon, lat
+
+        return _to_lon_lat(xmin - buffer, ymin - buffer) + _to_lon_lat(xmax + buffer, ymax + buffer)
+
+    @staticmethod
+    def get_tile(queryset, z, x, y, properties, layer='signals'):
+        """
+        Render the Signals in the queryset that are within the tile.
+
+        :param queryset: filtered Signal queryset
+        :param z, x, y: tile coordinates
+        :param properties: dict of property name -> expression (annotated on the queryset), the expressions must
+                           result in a type supported by MVT (text, number or boolean)
+        :param layer: name of the layer in the tile (Default: signals)
+        :returns: bytes
+        """
+        queryset = queryset.filter(
+            location__geometrie__intersects=Polygon.from_bbox(MVTService.get_tile_bbox(z, x, y))
+        ).order_by()
+
+        if z < SIGNALS_API_MVT_FEATURES_MIN_ZOOM:
+            sql, params = MVTService._get_cluster_sql(queryset, z, x, y)
+        else:
+            sql, params = MVTService._get_features_sql(queryset, z, x, y, properties)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT ST_AsMVT(tile, %s, %s, \'geom\') FROM ({sql}) AS tile WHERE tile.geom IS NOT NULL',
+                           [layer, SIGNALS_API_MVT_EXTENT, *params])
+            row = cursor.fetchone()
+        return bytes(row[0]) if row and row[0] else b''
+
+    @staticmethod
+    def _get_mvt_geom_sql(geometry, z, x, y):
+        return (f'ST_AsMVTGeom({geometry}, ST_MakeEnvelope(%s, %s, %s, %s, 3857), %s, %s, true)',
+                [*MVTService.get_tile_bounds(z, x, y), SIGNALS_API_MVT_EXTENT, SIGNALS_API_MVT_BUFFER])
+
+    @staticmethod
+    def _get_features_sql(queryset, z, x, y, properties):
+        aliases = {f'mvt_property_{i}': name for i, name in enumerate(properties.keys())}
+        queryset = queryset.annotate(
+            mvt_geometry=F('location__geometrie'),
+            **{alias: properties[name] for alias, name in aliases.items()}
+        ).values('mvt_geometry', *aliases.keys())
+        inner_sql, inner_params = queryset.query.sql_with_params()
+
+        geom_sql, geom_params = MVTService._get_mvt_geom_sql('ST_Transform(signals.mvt_geometry, 3857)', z, x, y)
+        columns = ''.join(f', signals.{alias} AS {connection.ops.quote_name(name)}' for alias, name in aliases.items())
+        return f'SELECT {geom_sql} AS geom{columns} FROM ({inner_sql}) AS signals', [*geom_params, *inner_params]
+
+    @staticmethod
+    def _get_cluster_sql(queryset, z, x, y):
+        inner_sql, inner_params = queryset.annotate(
+            mvt_geometry=F('location__geometrie')
+        ).values('mvt_geometry').query.sql_with_params()
+
+        # The grid is global (not relative to the tile) so a cluster does not change between neighbouring tiles
+        cell_size = 2 * WEB_MERCATOR_HALF_SIZE / 2 ** z / SIGNALS_API_MVT_CLUSTER_GRID_SIZE
+        geom_sql, geom_params = MVTService._get_mvt_geom_sql('ST_Centroid(ST_Collect(signals.geom))', z, x, y)
+        sql = (f'SELECT {geom_sql} AS geom, COUNT(*) AS point_count '
+               f'FROM (SELECT ST_Transform(mvt_geometry, 3857) AS geom FROM ({inner_sql}) AS q) AS signals '
+               f'GROUP BY ST_SnapToGrid(signals.geom, %s)')
+        return sql, [*geom_params, *inner_params, cell_size]
@@ -0,0 +1,122 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+Generate PDF summaries in the background (see signals.apps.signals.tasks.generate_pdf_summary) instead of within the
+request, for example to print a batch of Signals.
+
+A job and its PDF are stored in the default storage, so that they can be shared by the web and the Celery workers,
+under the id of the requesting user. The PDF is generated as that user, contact details are redacted according to
+the permissions of the user. Jobs are deleted after `API_PDF_JOB_TIMEOUT` seconds.
+"""
+import json
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from signals.apps.services.domain.pdf_summary import PDFSummaryService
+from signals.apps.signals.models import Signal
+
+logger = logging.getLogger(__name__)
+
+PDF_JOB_DIRECTORY = 'pdf_jobs'
+
+
+class PDFSummaryJobService:
+    PENDING = 'pending'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    @staticmethod
+    def _get_path(user_id, job_id, extension):
+        return f'{PDF_JOB_DIRECTORY}/{user_id}/{job_id}.{extension}'
+
+    @staticmethod
+    def _save(path, content):
+        if default_storage.exists(path):
+            default_storage.delete(path)
+        default_storage.save(path, ContentFile(content))
+
+    @staticmethod
+    def _save_job(user_id, job):
+        path = PDFSummaryJobService._get_path(user_id, job['id'], 'json')
+        PDFSummaryJobService._save(path, json.dumps(job).encode('utf-8'))
+
+    @staticmethod
+    def create(signal_ids, user):
+        """
+        Register a job, the PDF is generated by the `generate_pdf_summary` task.
+        """
+        job = {'id': uuid.uuid4().hex, 'status': PDFSummaryJobService.PENDING, 'signal_ids': sorted(set(signal_ids))}
+        PDFSummaryJobService._save_job(user.pk, job)
+        return job
+
+    @staticmethod
+    def get(job_id, user):
+        """
+        The job of the given user, or None.
+        """
+        path = PDFSummaryJobService._get_path(user.pk, job_id, 'json')
+        if not default_storage.exists(path):
+            return None
+
+        with default_storage.open(path) as file:
+            return json.loads(file.read())
+
+    @staticmethod
+    def open_pdf(job_id, user):
+        """
+        The generated PDF as a file opened for reading, the caller closes it.
+        """
+        return default_storage.open(PDFSummaryJobService._get_path(user.pk, job_id, 'pdf'))
+
+    @staticmethod
+    def run(job_id, user_id):
+        """
+        Generate the PDF of the job.
+        """
+        user = get_user_model().objects.get(pk=user_id)
+        job = PDFSummaryJobService.get(job_id, user)
+        if job is None:
+            logger.warning(f'PDF job {job_id} no longer exists')
+            return None
+
+        try:
+            signals = Signal.objects.filter(pk__in=job['signal_ids']).order_by('pk')
+            pdf = PDFSummaryService.get_pdfs(signals, user)
+            PDFSummaryJobService._save(PDFSummaryJobService._get_path(user.pk, job_id, 'pdf'), pdf)
+            job['status'] = PDFSummaryJobService.DONE
+        except Exception:
+            logger.exception(f'Cannot generate PDF job {job_id}')
+            job['status'] = PDFSummaryJobService.FAILED
+
+        PDFSummaryJobService._save_job(user.pk, job)
+        return job['status']
+
+    @staticmethod
+    def delete_expired():
+        """
+        Delete the jobs (and their PDFs) older than `API_PDF_JOB_TIMEOUT` seconds.
+
+        :returns: number of deleted files
+        """
+        if not default_storage.exists(PDF_JOB_DIRECTORY):
+            return 0
+
+        expired_before = timezone.now() - timedelta(seconds=settings.API_PDF_JOB_TIMEOUT)
+
+        deleted = 0
+        user_directories, _ = default_storage.listdir(PDF_JOB_DIRECTORY)
+        for user_directory in user_directories:
+            _, file_names = default_storage.listdir(f'{PDF_JOB_DIRECTORY}/{user_directory}')
+            for file_name in file_names:
+                path = f'{PDF_JOB_DIRECTORY}/{user_directory}/{file_name}'
+                if default_storage.get_modified_time(path) < expired_before:
+                    default_storage.delete(path)
+                    deleted += 1
+        return deleted
@@ -1,6 +1,7 @@
 # SPDX-License-Identifier: MPL-2.0
 # Copyright (C) 2018 - 2022 Gemeente Amsterdam, Vereniging van Nederlandse Gemeenten
 import base64
+import hashlib
 import io
 import logging
 import os
@@ -11,6 +12,7 @@ import weasyprint
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
 from django.contrib.staticfiles import finders
+from django.core.cache import cache
 from django.core.exceptions import SuspiciousFileOperation
 from django.template.loader import render_to_string
 from django.utils import timezone
@@ -20,6 +22,8 @@ from signals.apps.services.domain.wmts_map_generator import WMTSMapGenerator
 
 logger = logging.getLogger(__name__)
 
+PDF_LOGO_CACHE_KEY = 'signals.services.pdf_logo.{digest}'
+
 
 class PDFSummaryService:
     max_size = settings.API_PDF_RESIZE_IMAGES_TO
@@ -88,6 +92,22 @@ class PDFSummaryService:
             return start + data
         return ''
 
+    @staticmethod
+    def _get_cached_logo_data(logo_url):
+        """
+        Get base64 encoded image data for logo, cached so that the logo is not read or downloaded for every PDF.
+        """
+        if not logo_url:
+            return ''
+
+        key = PDF_LOGO_CACHE_KEY.format(digest=hashlib.sha256(logo_url.encode('utf-8')).hexdigest())
+        data = cache.get(key)
+        if data is None:
+            data = PDFSummaryService._get_logo_data(logo_url)
+            if data:  # A missing logo is retried the next time
+                cache.set(key, data, timeout=settings.API_PDF_LOGO_CACHE_TIMEOUT)
+        return data
+
     @staticmethod
     def _get_contact_details(signal, user, include_contact_details):
         """
@@ -144,7 +164,7 @@ class PDFSummaryService:
         """
         Context data for the PDF HTML template.
         """
-        logo_src = PDFSummaryService._get_logo_data(settings.API_PDF_LOGO_STATIC_FILE)
+        logo_src = PDFSummaryService._get_cached_logo_data(settings.API_PDF_LOGO_STATIC_FILE)
 
         bbox, img_data_uri = PDFSummaryService._get_map_data(signal)
         jpg_data_uris, att_filenames, user_emails, att_created_ats = \
@@ -178,3 +198,15 @@ class PDFSummaryService:
         """
         html = PDFSummaryService._get_html(signal, user, include_contact_details)
         return weasyprint.HTML(string=html).write_pdf()
+
+    @staticmethod
+    def get_pdfs(signals, user, include_contact_details=False):
+        """
+        Get a single PDF with the summaries of the given signals, one after the other (e.g. for bulk printing).
+        """
+        documents = [
+            weasyprint.HTML(string=PDFSummaryService._get_html(signal, user, include_contact_details)).render()
+            for signal in signals
+        ]
+        pages = [page for document in documents for page in document.pages]
+        return documents[0].copy(pages).write_pdf()
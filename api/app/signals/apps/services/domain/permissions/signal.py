@@ -1,12 +1,47 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2021 Gemeente Amsterdam
+# Copyright (C) 2021 - 2022 Gemeente Amsterdam
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from django.conf import settings
-from django.db.models import Q
 
 from signals.apps.services.domain.permissions.base import PermissionService
+from signals.apps.services.domain.permissions.visibility import SignalVisibilityService
+
+_permission_cache = ContextVar('signal_permission_cache', default=None)
+
+
+class SignalPermissionCache:
+    """
+    Department ids memoized for the duration of a cache scope (e.g. a request, see SignalPermissionCacheMiddleware).
+
+    The department ids of a user and of a category are also cached outside the scope, shared by all processes (see
+    SignalVisibilityService), the routing departments of a Signal are not.
+    """
+    def __init__(self):
+        self.user_department_ids = {}  # user pk -> department ids of the user
+        self.category_department_ids = {}  # category pk -> ids of the departments that can view the category
+        self.routing_department_ids = {}  # signal pk -> ids of the departments the signal is routed to
 
 
 class SignalPermissionService(PermissionService):
+    @staticmethod
+    @contextmanager
+    def cache_scope():
+        """
+        Memoize the department ids used by the permission checks within the scope. Outside a scope nothing is
+        memoized.
+        """
+        token = _permission_cache.set(SignalPermissionCache())
+        try:
+            yield
+        finally:
+            _permission_cache.reset(token)
+
+    @staticmethod
+    def _get_cache():
+        return _permission_cache.get() or SignalPermissionCache()
+
     @staticmethod
     def _skip_permission_check(permission):
         """
@@ -17,6 +52,13 @@ class SignalPermissionService(PermissionService):
             return settings.FEATURE_FLAGS[flag]
         return False  # By default the permission check is enabled therefore return False
 
+    @staticmethod
+    def get_department_ids(user):
+        cache = SignalPermissionService._get_cache()
+        if user.pk not in cache.user_department_ids:
+            cache.user_department_ids[user.pk] = set(SignalVisibilityService.get_department_ids(user))
+        return cache.user_department_ids[user.pk]
+
     @staticmethod
     def has_permission_via_department_routing(user, signal):
         if user.is_superuser:
@@ -25,13 +67,9 @@ class SignalPermissionService(PermissionService):
         if SignalPermissionService._skip_permission_check(permission='VIA_DEPARTMENT_ROUTING'):
             return True  # The permission check is disabled therefore this method can return True
 
-        return bool(
-            set(
-                user.profile.departments.values_list(
-                    'pk',
-                    flat=True
-                )
-            ).intersection(
+        cache = SignalPermissionService._get_cache()
+        if signal.pk not in cache.routing_department_ids:
+            cache.routing_department_ids[signal.pk] = set(
                 signal.signal_departments.filter(
                     relation_type='routing',
                 ).values_list(
@@ -39,6 +77,9 @@ class SignalPermissionService(PermissionService):
                     flat=True
                 )
             )
+
+        return bool(
+            SignalPermissionService.get_department_ids(user).intersection(cache.routing_department_ids[signal.pk])
         )
 
     @staticmethod
@@ -49,20 +90,15 @@ class SignalPermissionService(PermissionService):
         if SignalPermissionService._skip_permission_check(permission='VIA_CATEGORY'):
             return True  # The permission check is disabled therefore this method can return True
 
-        return bool(
-            set(
-                user.profile.departments.values_list(
-                    'pk',
-                    flat=True
-                )
-            ).intersection(
-                signal.category_assignment.category.departments.filter(
-                    Q(categorydepartment__can_view=True)
-                ).values_list(
-                    'pk',
-                    flat=True
-                )
+        cache = SignalPermissionService._get_cache()
+        category = signal.category_assignment.category
+        if category.pk not in cache.category_department_ids:
+            cache.category_department_ids[category.pk] = SignalVisibilityService.get_viewing_department_ids(
+                category.pk
             )
+
+        return bool(
+            SignalPermissionService.get_department_ids(user).intersection(cache.category_department_ids[category.pk])
         )
 
     @staticmethod
@@ -75,3 +111,24 @@ class SignalPermissionService(PermissionService):
                 SignalPermissionService.has_permission_via_department_routing(user, signal)
         )
         return has_read_permission and SignalPermissionService.has_permission(user, 'signals.sia_read')
+
+    @staticmethod
+    def filter_visible(user, signals):
+        """
+        The signals the user is allowed to view, selected in one query with the same condition as the list endpoints
+        (see SignalQuerySet.filter_for_user) instead of a permission check per signal.
+
+        :param user: User
+        :param signals: iterable of Signals
+        :returns: list of the visible Signals in the given order
+        """
+        from signals.apps.signals.models import Signal  # noqa, circular import
+
+        signals = list(signals)
+        if not signals:
+            return []
+
+        visible_ids = set(Signal.objects.filter_for_user(user).filter(
+            pk__in=[signal.pk for signal in signals]
+        ).values_list('pk', flat=True))
+        return [signal for signal in signals if signal.pk in visible_ids]
@@ -0,0 +1,149 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+Precomputed visibility of Signals for users that cannot view all categories.
+
+A user can see a Signal when one of the departments of the user is responsible for, or can view, the category of the
+Signal, or when the Signal is routed to one of the departments of the user.
+
+- the department -> visible category ids mapping is loaded with a single query into an in-memory index per process,
+  which is reloaded after SIGNAL_VISIBILITY_INDEX_TIMEOUT seconds (and right away after CategoryDepartment changes, see
+  signals.apps.signals.signal_receivers)
+- the department ids of a user profile are cached in the Django cache for SIGNAL_VISIBILITY_PROFILE_CACHE_TIMEOUT
+  seconds (and dropped right away after changes to the departments of the profile)
+- both are invalidated by bumping a version stamp in the Django cache, so other processes sharing that cache pick up
+  the change on their next lookup, with the default per-process cache the timeouts limit how long other processes
+  use outdated visibility
+- the routing departments differ per Signal and are checked with an EXISTS on the routing assignment, which does not
+  multiply the rows of the Signal queryset like a join through `routing_assignment__departments` does
+"""
+import threading
+import uuid
+from time import monotonic
+
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Q
+
+# Imported from the modules, the SignalQuerySet (imported while loading the models) depends on this service
+from signals.apps.signals.models.category_departments import CategoryDepartment
+from signals.apps.signals.models.signal_departments import SignalDepartments
+
+SIGNAL_VISIBILITY_VERSION_CACHE_KEY = 'signals.services.signal_visibility.version'
+SIGNAL_VISIBILITY_PROFILE_CACHE_KEY = 'signals.services.signal_visibility.{version}.profile.{profile_id}'
+SIGNAL_VISIBILITY_PROFILE_CACHE_TIMEOUT = 30
+SIGNAL_VISIBILITY_INDEX_TIMEOUT = 60
+
+
+class DepartmentVisibilityIndex:
+    """
+    Read-only department id -> visible category ids mapping, and the category id -> ids of the departments that can
+    view the category mapping used by the permission checks of a single Signal (see SignalPermissionService).
+    """
+    def __init__(self, category_departments):
+        self.categories_by_department = {}
+        self.viewing_departments_by_category = {}
+        for department_id, category_id, can_view in category_departments:
+            self.categories_by_department.setdefault(department_id, set()).add(category_id)
+            if can_view:
+                self.viewing_departments_by_category.setdefault(category_id, set()).add(department_id)
+
+    def get_category_ids(self, department_ids):
+        category_ids = set()
+        for department_id in department_ids:
+            category_ids.update(self.categories_by_department.get(department_id, ()))
+        return category_ids
+
+    def get_viewing_department_ids(self, category_id):
+        return self.viewing_departments_by_category.get(category_id, set())
+
+
+class SignalVisibilityService:
+    _index = None
+    _version = None
+    _loaded_at = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_version(cls):
+        version = cache.get(SIGNAL_VISIBILITY_VERSION_CACHE_KEY)
+        if version is None:
+            version = uuid.uuid4().hex
+            cache.add(SIGNAL_VISIBILITY_VERSION_CACHE_KEY, version, timeout=None)
+            version = cache.get(SIGNAL_VISIBILITY_VERSION_CACHE_KEY, version)
+        return version
+
+    @classmethod
+    def invalidate(cls):
+        """
+        Drop the index and the cached profiles of this process and of all processes sharing the Django cache.
+        """
+        cache.set(SIGNAL_VISIBILITY_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+        with cls._lock:
+            cls._index = None
+            cls._version = None
+            cls._loaded_at = None
+
+    @classmethod
+    def invalidate_profile(cls, profile_id):
+        """
+        Drop the cached department ids of a single user profile.
+        """
+        cache.delete(SIGNAL_VISIBILITY_PROFILE_CACHE_KEY.format(version=cls.get_version(), profile_id=profile_id))
+
+    @classmethod
+    def _is_outdated(cls, version):
+        return (cls._index is None or cls._version != version or
+                monotonic() - cls._loaded_at > SIGNAL_VISIBILITY_INDEX_TIMEOUT)
+
+    @classmethod
+    def get_index(cls, version=None):
+        version = version or cls.get_version()
+        if cls._is_outdated(version):
+            with cls._lock:
+                if cls._is_outdated(version):
+                    cls._index = DepartmentVisibilityIndex(CategoryDepartment.objects.filter(
+                        Q(is_responsible=True) | Q(can_view=True)
+                    ).values_list('department_id', 'category_id', 'can_view'))
+                    cls._version = version
+                    cls._loaded_at = monotonic()
+        return cls._index
+
+    @classmethod
+    def get_department_ids(cls, user, version=None):
+        version = version or cls.get_version()
+        key = SIGNAL_VISIBILITY_PROFILE_CACHE_KEY.format(version=version, profile_id=user.profile.pk)
+        department_ids = cache.get(key)
+        if department_ids is None:
+            department_ids = sorted(user.profile.departments.values_list('id', flat=True))
+            cache.set(key, department_ids, timeout=SIGNAL_VISIBILITY_PROFILE_CACHE_TIMEOUT)
+        return department_ids
+
+    @classmethod
+    def get_visible_category_ids(cls, user):
+        version = cls.get_version()
+        return sorted(cls.get_index(version).get_category_ids(cls.get_department_ids(user, version)))
+
+    @classmethod
+    def get_viewing_department_ids(cls, category_id):
+        """
+        Ids of the departments that can view the given category.
+        """
+        return set(cls.get_index().get_viewing_department_ids(category_id))
+
+    @classmethod
+    def make_condition(cls, user):
+        """
+        Q object that selects the Signals visible to the given user, a single `IN` on the category of the Signal plus
+        the routing check.
+        """
+        version = cls.get_version()
+        department_ids = cls.get_department_ids(user, version)
+        category_ids = sorted(cls.get_index(version).get_category_ids(department_ids))
+
+        # Matches the routing_assignment__departments__id__in condition without joining the departments
+
+        routed_to_department = SignalDepartments.departments.through.objects.filter(
+            signaldepartments_id=OuterRef('routing_assignment_id'),
+            department_id__in=department_ids,
+        )
+        return Q(category_assignment__category_id__in=category_ids) | Q(Exists(routed_to_department))
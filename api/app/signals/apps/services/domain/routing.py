@@ -0,0 +1,252 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+Batch variant of SignalDslService.process_routing_rules, used to (re-)route many Signals at once, for example after a
+bulk import or a change of the routing rules.
+
+- the active routing rules are loaded and compiled once per version of the rule set, the version stamp in the Django
+  cache is replaced whenever a routing rule or its expression changes (see signals.apps.signals.signal_receivers),
+  the rules are also reloaded after ROUTING_RULES_TIMEOUT seconds for processes that do not share the Django cache
+- the rules that can no longer be applied (inactive user, user no longer part of the department) are checked once per
+  run instead of once per Signal
+- the contexts are built from a single queryset per batch of Signals
+- the assignments are applied per batch in one transaction, Signals locked by another transaction are skipped
+"""
+import logging
+import threading
+import uuid
+from time import monotonic
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+
+from signals.apps.services.domain.dsl import SignalContext, SignalDslService
+from signals.apps.signals.managers import (
+    send_signals,
+    update_signal_departments,
+    update_user_assignment
+)
+from signals.apps.signals.models import RoutingExpression, Signal
+from signals.apps.users.models import Profile
+
+log = logging.getLogger(__name__)
+
+ROUTING_RULES_VERSION_CACHE_KEY = 'signals.services.routing_rules.version'
+ROUTING_RULES_TIMEOUT = 60
+
+
+class RoutingResult:
+    ROUTED = 'routed'  # The assignments of the rule were applied (or would be applied in a dry-run)
+    UNCHANGED = 'unchanged'  # The Signal already has the assignments of the rule
+    NO_MATCH = 'no_match'  # None of the rules apply to the Signal
+    LOCKED = 'locked'  # The Signal was locked by another transaction and has been skipped
+
+    def __init__(self, signal_id, outcome, rule=None):
+        self.signal_id = signal_id
+        self.outcome = outcome
+        self.rule = rule
+
+    def __str__(self):
+        if self.rule is None:
+            return f'Signal #{self.signal_id}: {self.outcome}'
+
+        user = f', user {self.rule._user.email}' if self.rule._user else ''
+        return (f'Signal #{self.signal_id}: {self.outcome} by rule #{self.rule.pk} "{self.rule._expression.name}" '
+                f'(department {self.rule._department.code}{user})')
+
+
+class BatchRoutingService:
+    dsl_service = SignalDslService()
+    context_func = SignalContext()
+
+    _rules = None
+    _version = None
+    _loaded_at = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_version():
+        version = cache.get(ROUTING_RULES_VERSION_CACHE_KEY)
+        if version is None:
+            cache.add(ROUTING_RULES_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+            version = cache.get(ROUTING_RULES_VERSION_CACHE_KEY)
+        return version
+
+    @classmethod
+    def invalidate(cls):
+        cache.set(ROUTING_RULES_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+        with cls._lock:
+            cls._rules = None
+            cls._version = None
+
+    @classmethod
+    def _is_outdated(cls, version):
+        return cls._rules is None or cls._version != version or monotonic() - cls._loaded_at > ROUTING_RULES_TIMEOUT
+
+    @classmethod
+    def get_rules(cls):
+        """
+        The active routing rules in order, as (RoutingExpression, compiled expression or None) tuples. The compiled
+        expression is None when the expression could not be compiled.
+        """
+        version = cls.get_version()
+        if cls._is_outdated(version):
+            with cls._lock:
+                if cls._is_outdated(version):
+                    cls._rules = [(rule, cls._compile(rule)) for rule in RoutingExpression.objects.select_related(
+                        '_expression', '_department', '_user'
+                    ).filter(
+                        is_active=True, _expression___type__name='routing'
+                    ).order_by('order')]
+                    cls._version = version
+                    cls._loaded_at = monotonic()
+        return cls._rules
+
+    @classmethod
+    def _compile(cls, rule):
+        try:
+            return cls.dsl_service._compile(rule._expression.code)
+        except Exception:
+            return None
+
+    @classmethod
+    def _get_applicable_rules(cls, dry_run):
+        """
+        Rules with an expression that cannot be compiled, an inactive user or a user that is no longer part of the
+        department are deactivated (unless in a dry-run), like SignalDslService.process_routing_rules does.
+        """
+        rules = cls.get_rules()
+
+        user_ids = {rule._user_id for rule, _ in rules if rule._user_id}
+        active_user_ids = set(get_user_model().objects.filter(
+            pk__in=user_ids, is_active=True
+        ).values_list('pk', flat=True))
+        memberships = set(Profile.departments.through.objects.filter(
+            profile__user_id__in=user_ids
+        ).values_list('profile__user_id', 'department_id'))
+
+        applicable, deactivate = [], []
+        for rule, evaluator in rules:
+            if evaluator is None or (rule._user_id and (rule._user_id not in active_user_ids or
+                                                        (rule._user_id, rule._department_id) not in memberships)):
+                deactivate.append(rule)
+            else:
+                applicable.append((rule, evaluator))
+
+        if deactivate and not dry_run:
+            for rule in deactivate:
+                rule.is_active = False
+                rule.save(update_fields=['is_active'])  # Also invalidates the rule set
+
+        return applicable
+
+    @staticmethod
+    def _match(rules, ctx):
+        for rule, evaluator in rules:
+            try:
+                if evaluator.evaluate(ctx):
+                    return rule
+            except Exception:
+                pass  # ignore runtime errors
+        return None
+
+    @staticmethod
+    def _is_unchanged(signal, rule):
+        if not signal.routing_assignment:
+            return False
+
+        department_ids = {department.pk for department in signal.routing_assignment.departments.all()}
+        user_id = signal.user_assignment.user_id if signal.user_assignment else None
+        return department_ids == {rule._department_id} and (not rule._user_id or user_id == rule._user_id)
+
+    @staticmethod
+    def get_queryset(signal_ids):
+        return Signal.objects.filter(pk__in=signal_ids).select_related(
+            'category_assignment__category__parent',
+            'location',
+            'routing_assignment',
+            'user_assignment',
+        ).prefetch_related(
+            'routing_assignment__departments',
+        ).order_by('pk')
+
+    @classmethod
+    def route(cls, signal_ids, dry_run=False, batch_size=500):
+        """
+        Apply the routing rules to the given Signals.
+
+        :param signal_ids: iterable of Signal ids
+        :param dry_run: only report which rule would be applied, nothing is changed
+        :param batch_size: number of Signals per query and transaction
+        :returns: list of RoutingResult, one per Signal found
+        """
+        rules = cls._get_applicable_rules(dry_run)
+
+        signal_ids = sorted(set(signal_ids))
+        results = []
+        for i in range(0, len(signal_ids), batch_size):
+            batch_ids = signal_ids[i:i + batch_size]
+            if dry_run:
+                results.extend(cls._evaluate(rules, cls.get_queryset(batch_ids)))
+            else:
+                results.extend(cls._route_batch(rules, batch_ids))
+        return results
+
+    @classmethod
+    def _evaluate(cls, rules, signals):
+        results = []
+        for signal in signals:
+            rule = cls._match(rules, cls.context_func(signal))
+            if rule is None:
+                results.append(RoutingResult(signal.pk, RoutingResult.NO_MATCH))
+            elif cls._is_unchanged(signal, rule):
+                results.append(RoutingResult(signal.pk, RoutingResult.UNCHANGED, rule))
+            else:
+                results.append(RoutingResult(signal.pk, RoutingResult.ROUTED, rule))
+        return results
+
+    @classmethod
+    def _route_batch(cls, rules, signal_ids):
+        with transaction.atomic():
+            signals = list(cls.get_queryset(signal_ids).select_for_update(skip_locked=True, of=('self', )))
+            results = cls._evaluate(rules, signals)
+
+            locked_ids = set(signal_ids) - {signal.pk for signal in signals}
+            if locked_ids:
+                # Not selected because they are locked, or because they no longer exist
+                locked_ids = set(Signal.objects.filter(pk__in=locked_ids).values_list('pk', flat=True))
+            results.extend(RoutingResult(signal_id, RoutingResult.LOCKED) for signal_id in sorted(locked_ids))
+
+            to_send = []
+            signals_by_id = {signal.pk: signal for signal in signals}
+            for result in results:
+                if result.outcome != RoutingResult.ROUTED:
+                    continue
+
+                signal, rule = signals_by_id[result.signal_id], result.rule
+                signal_departments = Signal.actions._update_routing_departments_no_transaction(
+                    {'departments': [{'id': rule._department_id}]}, signal
+                )
+                to_send.append((update_signal_departments, {
+                    'sender': Signal.actions.__class__,
+                    'signal_obj': signal,
+                    'signal_departments': signal_departments
+                }))
+
+                if rule._user:
+                    user_assignment = Signal.actions._update_user_signal_no_transaction(
+                        {'user_assignment': {'user': {'email': rule._user.email}}}, signal
+                    )
+                    to_send.append((update_user_assignment, {
+                        'sender': Signal.actions.__class__,
+                        'signal_obj': signal,
+                        'user_assignment': user_assignment
+                    }))
+
+            # Send out all Django signals:
+            transaction.on_commit(lambda: send_signals(to_send))
+
+        if locked_ids:
+            log.warning(f'Routing skipped {len(locked_ids)} locked Signal(s)')
+        return results
@@ -0,0 +1,99 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+The context of a Signal shown next to its detail view: the other Signals of the reporter and the Signals nearby (see
+signals.apps.api.views.signals.private.signal_context).
+
+- the statistics of a reporter are counted in a single query with conditional aggregates, and cached per reporter
+  email until a Signal, status, reporter or feedback of that reporter changes (see
+  signals.apps.signals.signal_receivers)
+- the feedback counted for a Signal is its latest feedback, the same feedback as counted by
+  SignalQuerySet.reporter_feedback_count, looked up with a subquery instead of joining and grouping all feedback
+"""
+import hashlib
+
+from django.contrib.gis.db.models.functions import Distance
+from django.core.cache import cache
+from django.db.models import Count, Exists, Max, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from signals.apps.api.app_settings import (
+    SIGNAL_CONTEXT_GEOGRAPHY_CREATED_DELTA_WEEKS,
+    SIGNAL_CONTEXT_GEOGRAPHY_RADIUS,
+    SIGNAL_CONTEXT_REPORTER_CACHE_TTL
+)
+from signals.apps.feedback.models import Feedback
+from signals.apps.signals import workflow
+from signals.apps.signals.models import Signal
+
+SIGNAL_CONTEXT_REPORTER_CACHE_KEY = 'signals.services.signal_context.reporter.{digest}'
+
+# Signals of the reporter in these states are not counted as open
+SIGNAL_CONTEXT_CLOSED_STATES = frozenset([workflow.GEANNULEERD, workflow.AFGEHANDELD, workflow.GESPLITST])
+
+
+class SignalContextService:
+    @staticmethod
+    def _get_reporter_cache_key(email):
+        # The Signals of a reporter are matched case insensitive, see SignalQuerySet.filter_reporter
+        digest = hashlib.sha256(email.lower().encode('utf-8')).hexdigest()
+        return SIGNAL_CONTEXT_REPORTER_CACHE_KEY.format(digest=digest)
+
+    @staticmethod
+    def invalidate_reporter(email):
+        if email:
+            cache.delete(SignalContextService._get_reporter_cache_key(email))
+
+    @staticmethod
+    def _latest_feedback_is_satisfied():
+        """
+        `is_satisfied` of the latest submitted feedback of the Signal, null when the latest feedback has not been
+        submitted (yet).
+        """
+        latest = Feedback.objects.filter(_signal_id=OuterRef('_signal_id')).order_by().values('_signal_id')
+        return Subquery(Feedback.objects.filter(
+            _signal_id=OuterRef('pk'),
+            submitted_at__isnull=False,
+            created_at=Subquery(latest.annotate(max_created_at=Max('created_at')).values('max_created_at')),
+            submitted_at=Subquery(latest.annotate(max_submitted_at=Max('submitted_at')).values('max_submitted_at')),
+        ).order_by().values('is_satisfied')[:1])
+
+    @staticmethod
+    def get_reporter_statistics(email):
+        """
+        The number of (open) Signals of the reporter and the number of Signals the reporter was (not) satisfied with.
+
+        Child Signals are not counted, apart from their feedback (feedback is not requested for child Signals).
+        """
+        key = SignalContextService._get_reporter_cache_key(email)
+        statistics = cache.get(key)
+        if statistics is None:
+            is_parent = Q(parent__isnull=True)
+            statistics = Signal.objects.filter_reporter(
+                email=email
+            ).annotate(
+                latest_feedback_is_satisfied=SignalContextService._latest_feedback_is_satisfied()
+            ).aggregate(
+                signal_count=Count('pk', filter=is_parent),
+                open_count=Count('pk', filter=is_parent & ~Q(status__state__in=SIGNAL_CONTEXT_CLOSED_STATES)),
+                positive_count=Count('pk', filter=Q(latest_feedback_is_satisfied=True)),
+                negative_count=Count('pk', filter=Q(latest_feedback_is_satisfied=False)),
+            )
+            cache.set(key, statistics, timeout=SIGNAL_CONTEXT_REPORTER_CACHE_TTL)
+        return statistics
+
+    @staticmethod
+    def get_near_queryset(signal):
+        """
+        The Signals in the same category created recently near the Signal, parent Signals are left out (their child
+        Signals are included).
+        """
+        return Signal.objects.annotate(
+            distance_from_point=Distance('location__geometrie', signal.location.geometrie),
+        ).filter(
+            (Q(parent__isnull=True) & ~Exists(Signal.objects.filter(parent_id=OuterRef('pk')))) |
+            Q(parent__isnull=False),
+            distance_from_point__lte=SIGNAL_CONTEXT_GEOGRAPHY_RADIUS,
+            category_assignment__category_id=signal.category_assignment.category_id,
+            created_at__gte=timezone.now() - timezone.timedelta(weeks=SIGNAL_CONTEXT_GEOGRAPHY_CREATED_DELTA_WEEKS),
+        ).exclude(pk=signal.pk)
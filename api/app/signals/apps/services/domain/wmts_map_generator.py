@@ -1,12 +1,66 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2020 - 2021 Vereniging van Nederlandse Gemeenten, Gemeente Amsterdam
+# Copyright (C) 2020 - 2022 Vereniging van Nederlandse Gemeenten, Gemeente Amsterdam
+import hashlib
 import io
+import logging
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from math import asinh, modf, pi, radians, tan
 
+from django.conf import settings
+from django.core.cache import cache
 from PIL import Image
 
+logger = logging.getLogger(__name__)
+
 TILE_SIZE = 256
+WMTS_TILE_CACHE_KEY = 'signals.services.wmts_tile.{server}.{zoom}.{x}.{y}'
+
+
+class WMTSTileCache:
+    """
+    Map tiles cached in the Django cache, keyed by tile server and (zoom, x, y). Missing tiles are downloaded
+    concurrently, tiles that could not be downloaded are not cached.
+    """
+    @staticmethod
+    def _get_key(url_template, zoom, x, y):
+        server = hashlib.sha256(url_template.encode('utf-8')).hexdigest()[:16]
+        return WMTS_TILE_CACHE_KEY.format(server=server, zoom=zoom, x=x, y=y)
+
+    @staticmethod
+    def fetch_tile(url_template, zoom, x, y):
+        """
+        Download a single tile, returns the image data or None.
+        """
+        # Both placeholders are in use, see DEFAULT_MAP_TILE_SERVER
+        url = url_template.format(zoom=zoom, z=zoom, x=x, y=y)
+        try:
+            with urllib.request.urlopen(url, timeout=settings.API_PDF_MAP_TILE_TIMEOUT) as response:
+                return response.read()
+        except Exception:
+            logger.warning(f'Cannot download map tile {url}', exc_info=True)
+            return None
+
+    @staticmethod
+    def get_tiles(url_template, zoom, tiles):
+        """
+        :param tiles: iterable of (x, y) tuples
+        :returns: dictionary of (x, y) -> image data or None
+        """
+        keys = {tile: WMTSTileCache._get_key(url_template, zoom, *tile) for tile in tiles}
+        cached = cache.get_many(keys.values())
+
+        result = {tile: cached.get(key) for tile, key in keys.items()}
+        missing = [tile for tile, data in result.items() if data is None]
+        if missing:
+            workers = max(1, min(settings.API_PDF_MAP_TILE_WORKERS, len(missing)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                fetched = executor.map(lambda tile: WMTSTileCache.fetch_tile(url_template, zoom, *tile), missing)
+                result.update(zip(missing, fetched))
+
+            cache.set_many({keys[tile]: result[tile] for tile in missing if result[tile] is not None},
+                           timeout=settings.API_PDF_MAP_TILE_CACHE_TIMEOUT)
+        return result
 
 
 #  https://wiki.openstreetmap.org/wiki/Slippy_map_tilenames#Tile_numbers_to_lon..2Flat._3
@@ -48,15 +102,18 @@ class WMTSMapGenerator:
         ytiles = top + bottom + 1
 
         img = Image.new("RGBA", (xtiles*TILE_SIZE, ytiles*TILE_SIZE), 0)
-        try:
-            for i in range(-left, right + 1, 1):
-                for j in range(-top, bottom + 1, 1):
-                    url = url_template.format(zoom=zoom, x=x+i, y=y+j)
-                    with urllib.request.urlopen(url) as response:
-                        offset = ((i+left) * TILE_SIZE, (j+top) * TILE_SIZE)
-                        img.paste(Image.open(io.BytesIO(response.read())), offset)
-        except Exception:
-            pass  # use empty image in case of errors
+        tiles = WMTSTileCache.get_tiles(url_template, zoom, [
+            (x+i, y+j) for i in range(-left, right + 1, 1) for j in range(-top, bottom + 1, 1)
+        ])
+        for (tile_x, tile_y), data in tiles.items():
+            if data is None:
+                continue  # leave the tile empty in case of errors
+
+            offset = ((tile_x-x+left) * TILE_SIZE, (tile_y-y+top) * TILE_SIZE)
+            try:
+                img.paste(Image.open(io.BytesIO(data)), offset)
+            except Exception:
+                logger.warning(f'Cannot open map tile {zoom}/{tile_x}/{tile_y}', exc_info=True)
 
         return img
 
@@ -0,0 +1,51 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from django.contrib.gis.geos import MultiPolygon, Point
+from django.test import TestCase
+
+from signals.apps.services.domain.area_geometry import TOLERANCES, AreaGeometryService
+from signals.apps.signals.factories import AreaFactory
+from signals.apps.signals.models import SimplifiedAreaGeometry
+
+
+class TestAreaGeometryService(TestCase):
+    def setUp(self):
+        # A circle with many vertices around the city hall of Amsterdam
+        self.area = AreaFactory.create(
+            geometry=MultiPolygon(Point(4.9000607, 52.3675707, srid=4326).buffer(0.01, quadsegs=64), srid=4326)
+        )
+
+    def test_generate(self):
+        self.assertEqual(AreaGeometryService.generate([self.area]), len(TOLERANCES))
+        self.assertEqual(AreaGeometryService.generate([self.area]), len(TOLERANCES))  # replaced, not added
+
+        simplified = {s.tolerance: s.geometry for s in SimplifiedAreaGeometry.objects.filter(area=self.area)}
+        self.assertEqual(set(simplified.keys()), set(TOLERANCES))
+
+        n_points = self.area.geometry.num_points
+        for tolerance, geometry in simplified.items():
+            self.assertIsInstance(geometry, MultiPolygon)
+            self.assertLess(geometry.num_points, n_points)
+            # Deviates at most the tolerance from the original geometry
+            self.assertTrue(self.area.geometry.buffer(tolerance * 1.01).contains(geometry))
+            self.assertTrue(geometry.buffer(tolerance * 1.01).contains(self.area.geometry))
+
+    def test_regenerated_when_area_changes(self):
+        AreaGeometryService.generate([self.area])
+
+        self.area.geometry = MultiPolygon(Point(5.0, 52.0, srid=4326).buffer(0.01, quadsegs=64), srid=4326)
+        self.area.save()
+
+        for simplified in SimplifiedAreaGeometry.objects.filter(area=self.area):
+            self.assertTrue(simplified.geometry.intersects(Point(5.0, 52.0, srid=4326)))
+
+    def test_get_tolerance(self):
+        self.assertIsNone(AreaGeometryService.get_tolerance())
+        self.assertEqual(AreaGeometryService.get_tolerance(zoom=0), max(TOLERANCES))
+        self.assertEqual(AreaGeometryService.get_tolerance(zoom=10), 0.001)
+        self.assertEqual(AreaGeometryService.get_tolerance(zoom=14), 0.00008)
+        self.assertIsNone(AreaGeometryService.get_tolerance(zoom=18))
+
+        self.assertEqual(AreaGeometryService.get_tolerance(tolerance=1), max(TOLERANCES))
+        self.assertEqual(AreaGeometryService.get_tolerance(tolerance=0.0005), 0.0003)
+        self.assertIsNone(AreaGeometryService.get_tolerance(tolerance=0))
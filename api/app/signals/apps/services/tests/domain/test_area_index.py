@@ -0,0 +1,125 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+import random
+from time import monotonic
+from unittest import mock
+
+from django.contrib.gis import geos
+from django.test import TestCase, override_settings
+
+from signals.apps.services.domain.area_index import AREA_INDEX_TIMEOUT, AreaIndexService, STRtree
+from signals.apps.signals.factories import AreaFactory, AreaTypeFactory
+from signals.apps.signals.models import Area
+from signals.apps.signals.utils.location import _get_area, _get_areas
+
+
+def _square(xmin, ymin, size):
+    return geos.MultiPolygon([geos.Polygon.from_bbox([xmin, ymin, xmin + size, ymin + size])], srid=4326)
+
+
+class TestSTRtree(TestCase):
+    def test_query(self):
+        rng = random.Random(42)
+        boxes = []
+        for i in range(500):
+            x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+            boxes.append(((x, y, x + rng.uniform(0, 10), y + rng.uniform(0, 10)), i))
+        tree = STRtree(boxes)
+
+        for _ in range(100):
+            x, y = rng.uniform(0, 110), rng.uniform(0, 110)
+            expected = {i for (xmin, ymin, xmax, ymax), i in boxes if xmin <= x <= xmax and ymin <= y <= ymax}
+            self.assertEqual(set(tree.query(x, y)), expected)
+
+    def test_empty(self):
+        self.assertEqual(STRtree([]).query(0, 0), [])
+
+
+@override_settings(DEFAULT_SIGNAL_AREA_TYPE='buurt', API_DETERMINE_STADSDEEL_ENABLED_AREA_TYPE='stadsdeel')
+class TestAreaIndexService(TestCase):
+    def setUp(self):
+        self.addCleanup(AreaIndexService.invalidate)
+
+        self.stadsdeel = AreaTypeFactory.create(code='stadsdeel', name='Stadsdeel')
+        self.buurt = AreaTypeFactory.create(code='buurt', name='Buurt')
+
+        # A grid of 4 x 4 buurten in 2 stadsdelen
+        self.west = AreaFactory.create(_type=self.stadsdeel, code='west', geometry=_square(4.80, 52.30, 0.04))
+        self.oost = AreaFactory.create(_type=self.stadsdeel, code='oost', geometry=_square(4.84, 52.30, 0.04))
+        for i in range(4):
+            for j in range(4):
+                AreaFactory.create(_type=self.buurt, code=f'b{i}{j}',
+                                   geometry=_square(4.80 + i * 0.02, 52.30 + j * 0.02, 0.02))
+
+    def test_same_areas_as_database(self):
+        rng = random.Random(42)
+        points = [geos.Point(rng.uniform(4.79, 4.89), rng.uniform(52.29, 52.39), srid=4326) for _ in range(50)]
+
+        for area_type in (None, 'stadsdeel', 'buurt'):
+            queryset = Area.objects.all()
+            if area_type:
+                queryset = queryset.filter(_type__code=area_type)
+
+            expected = [queryset.filter(geometry__contains=point).first() for point in points]
+            self.assertEqual([_get_area(point, area_type) for point in points], expected)
+            self.assertEqual(_get_areas(points, area_type), expected)
+
+    def test_unknown_area_type(self):
+        self.assertIsNone(_get_area(geos.Point(4.81, 52.31, srid=4326), 'unknown'))
+
+    def test_cached(self):
+        _get_area(geos.Point(4.85, 52.31, srid=4326), 'stadsdeel')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(_get_area(geos.Point(4.81, 52.31, srid=4326), 'stadsdeel'), self.west)
+
+    def test_only_used_area_types_are_loaded(self):
+        _get_area(geos.Point(4.81, 52.31, srid=4326), 'stadsdeel')
+
+        self.assertEqual(set(AreaIndexService.get_index().by_code), {'stadsdeel'})
+
+    @override_settings(DEFAULT_SIGNAL_AREA_TYPE='district')
+    def test_area_type_not_indexed(self):
+        point = geos.Point(4.81, 52.31, srid=4326)
+
+        for _ in range(2):
+            with self.assertNumQueries(1):  # Looked up in the database
+                self.assertEqual(_get_area(point, 'buurt').code, 'b00')
+        self.assertEqual(AreaIndexService.get_index().by_code, {})
+
+        points = [point, geos.Point(4.87, 52.37, srid=4326), geos.Point(4.95, 52.31, srid=4326)]
+        with self.assertNumQueries(1):  # All geometries in one query
+            areas = _get_areas(points, 'buurt')
+        self.assertEqual([area.code if area else None for area in areas], ['b00', 'b33', None])
+        self.assertEqual(_get_areas([], 'buurt'), [])
+
+    def test_timeout(self):
+        point = geos.Point(4.95, 52.31, srid=4326)
+        self.assertIsNone(_get_area(point, 'stadsdeel'))
+
+        # Changed without sending signals, like a change made by another process that does not share the Django cache
+        Area.objects.filter(pk=self.oost.pk).update(geometry=_square(4.84, 52.30, 0.2))
+        self.assertIsNone(_get_area(point, 'stadsdeel'))
+
+        later = monotonic() + AREA_INDEX_TIMEOUT + 1
+        with mock.patch('signals.apps.services.domain.area_index.monotonic', return_value=later):
+            self.assertEqual(_get_area(point, 'stadsdeel'), self.oost)
+
+    def test_contains_point(self):
+        index = AreaIndexService.get_index()
+
+        self.assertTrue(index['Stadsdeel'].contains_point('west', geos.Point(4.81, 52.31, srid=4326)))
+        self.assertFalse(index['Stadsdeel'].contains_point('oost', geos.Point(4.81, 52.31, srid=4326)))
+        self.assertFalse(index['Stadsdeel'].contains_point('unknown', geos.Point(4.81, 52.31, srid=4326)))
+        self.assertEqual(index['Stadsdeel']['west'], self.west.geometry)
+
+    def test_invalidated_on_save_and_delete(self):
+        point = geos.Point(4.95, 52.31, srid=4326)
+        self.assertIsNone(_get_area(point, 'stadsdeel'))
+
+        self.oost.geometry = _square(4.84, 52.30, 0.2)
+        self.oost.save()
+        self.assertEqual(_get_area(point, 'stadsdeel'), self.oost)
+
+        self.oost.delete()
+        self.assertIsNone(_get_area(point, 'stadsdeel'))
@@ -0,0 +1,64 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from time import monotonic
+from unittest import mock
+
+from django.test import TestCase
+
+from signals.apps.services.domain.categories import CATEGORY_INDEX_TIMEOUT, CategoryResolverService
+from signals.apps.signals.factories import CategoryFactory, ParentCategoryFactory
+from signals.apps.signals.models import Category
+
+
+class TestCategoryResolverService(TestCase):
+    def setUp(self):
+        CategoryResolverService.invalidate()
+        self.addCleanup(CategoryResolverService.invalidate)  # The index outlives the rolled back test transaction
+
+        self.parent = ParentCategoryFactory.create(name='Resolver hoofdcategorie')
+        self.category = CategoryFactory.create(name='Resolver subcategorie', parent=self.parent)
+
+    def test_resolve(self):
+        resolved = CategoryResolverService.resolve(['Resolver subcategorie', 'Onbekend', None])
+
+        self.assertEqual(resolved, [self.category, None, None])
+
+    def test_resolve_fallback(self):
+        resolved = CategoryResolverService.resolve(['Onbekend'], fallback_slug='overig', fallback_parent_slug='overig')
+
+        self.assertEqual(resolved[0].slug, 'overig')
+        self.assertEqual(resolved[0].parent.slug, 'overig')
+
+    def test_index_is_loaded_once(self):
+        with self.assertNumQueries(1):
+            CategoryResolverService.resolve(['Resolver subcategorie'])
+        with self.assertNumQueries(0):
+            CategoryResolverService.resolve(['Resolver subcategorie'] * 100)
+            CategoryResolverService.get_sub_category('resolver-subcategorie', parent_slug='resolver-hoofdcategorie')
+            CategoryResolverService.get_by_pk(self.category.pk)
+
+    def test_invalidated_on_save_and_delete(self):
+        CategoryResolverService.get_index()
+
+        category = CategoryFactory.create(name='Nieuwe subcategorie', parent=self.parent)
+        self.assertEqual(CategoryResolverService.get_sub_category('nieuwe-subcategorie'), category)
+
+        category.name = 'Hernoemde subcategorie'
+        category.save()
+        self.assertEqual(CategoryResolverService.get_sub_category('nieuwe-subcategorie').name,
+                         'Hernoemde subcategorie')
+
+        self.category.delete()
+        self.assertIsNone(CategoryResolverService.get_sub_category('resolver-subcategorie'))
+
+    def test_timeout(self):
+        CategoryResolverService.get_index()
+
+        # Updated without sending signals, like a change made by another process that does not share the Django cache
+        Category.objects.filter(pk=self.category.pk).update(slug='verplaatste-subcategorie')
+        self.assertEqual(CategoryResolverService.get_sub_category('resolver-subcategorie'), self.category)
+
+        later = monotonic() + CATEGORY_INDEX_TIMEOUT + 1
+        with mock.patch('signals.apps.services.domain.categories.monotonic', return_value=later):
+            self.assertIsNone(CategoryResolverService.get_sub_category('resolver-subcategorie'))
+            self.assertEqual(CategoryResolverService.get_sub_category('verplaatste-subcategorie'), self.category)
@@ -0,0 +1,114 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from datetime import datetime, timedelta
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from freezegun import freeze_time
+
+from signals.apps.history.models import Log
+from signals.apps.services.domain.deadline_recalculation import DeadlineRecalculationService
+from signals.apps.services.domain.deadlines import DeadlineCalculationService
+from signals.apps.signals.factories import (
+    CategoryFactory,
+    ServiceLevelObjectiveFactory,
+    SignalFactory
+)
+from signals.apps.signals.models import CategoryAssignment, Signal
+
+
+class TestDeadlineRecalculationService(TestCase):
+    def setUp(self):
+        self.category = CategoryFactory.create()
+        self.category_without_slo = CategoryFactory.create()
+
+        start = datetime(2021, 2, 15, 12, 0, 0, tzinfo=timezone.utc)  # A monday
+        self.signals = []
+        for i in range(7):
+            with freeze_time(start + timedelta(days=i)):
+                self.signals.append(SignalFactory.create(category_assignment__category=self.category))
+        self.signal_without_slo = SignalFactory.create(category_assignment__category=self.category_without_slo)
+
+        # The Service Level Objective changes after the Signals were created
+        ServiceLevelObjectiveFactory.create(category=self.category, n_days=5, use_calendar_days=True)
+        self.slo = ServiceLevelObjectiveFactory.create(category=self.category, n_days=3, use_calendar_days=False)
+
+    def assertDeadlines(self, signal):
+        signal.refresh_from_db()
+        self.assertEqual(
+            (signal.category_assignment.deadline, signal.category_assignment.deadline_factor_3),
+            DeadlineCalculationService.from_signal_and_category(signal, signal.category_assignment.category)
+        )
+
+    def test_recalculate(self):
+        n_category_assignments = CategoryAssignment.objects.count()
+
+        with self.assertNumQueries(9):
+            # Select the last id, then in a transaction (savepoint, ..., release) lock and select the first batch, its
+            # Service Level Objectives and update the batch, and in a transaction lock and select the next (empty) batch
+            updated = DeadlineRecalculationService.recalculate(Signal.objects.all(), batch_size=100)
+        self.assertEqual(updated, 8)
+        self.assertEqual(CategoryAssignment.objects.count(), n_category_assignments)
+
+        for signal in self.signals:
+            self.assertDeadlines(signal)
+            self.assertIsNotNone(signal.category_assignment.deadline)
+
+        self.signal_without_slo.refresh_from_db()
+        self.assertIsNone(self.signal_without_slo.category_assignment.deadline)
+        self.assertIsNone(self.signal_without_slo.category_assignment.deadline_factor_3)
+
+    def test_recalculate_locks_batches(self):
+        with CaptureQueriesContext(connection) as context:
+            DeadlineRecalculationService.recalculate(Signal.objects.all(), batch_size=100)
+
+        batch_queries = [query['sql'] for query in context.captured_queries if 'LIMIT 100' in query['sql']]
+        self.assertEqual(len(batch_queries), 2)
+        for sql in batch_queries:
+            self.assertIn('FOR UPDATE OF', sql)
+
+    def test_recalculate_current_category_assignments_only(self):
+        signal = self.signals[0]
+        previous = signal.category_assignment
+        Signal.actions.update_category_assignment({'category': self.category_without_slo}, signal)
+
+        updated = DeadlineRecalculationService.recalculate(Signal.objects.filter(pk=signal.pk), batch_size=100)
+        self.assertEqual(updated, 1)
+
+        # The previous CategoryAssignment is left alone
+        updated_at = previous.updated_at
+        previous.refresh_from_db()
+        self.assertEqual(previous.updated_at, updated_at)
+
+    def test_recalculate_batches(self):
+        updated = DeadlineRecalculationService.recalculate(
+            Signal.objects.filter(category_assignment__category=self.category), batch_size=2)
+        self.assertEqual(updated, 7)
+
+        for signal in self.signals:
+            self.assertDeadlines(signal)
+
+    @override_settings(FEATURE_FLAGS={'SIGNAL_HISTORY_LOG_ENABLED': True})
+    def test_recalculate_history(self):
+        previous = {signal.pk: signal.category_assignment_id for signal in self.signals}
+
+        updated = DeadlineRecalculationService.recalculate(
+            Signal.objects.filter(category_assignment__category=self.category), batch_size=3, history_text='Herberekend'
+        )
+        self.assertEqual(updated, 7)
+
+        for signal in self.signals:
+            self.assertDeadlines(signal)
+            self.assertNotEqual(signal.category_assignment_id, previous[signal.pk])
+            self.assertEqual(signal.category_assignment.category, self.category)
+            self.assertEqual(signal.category_assignment.text, 'Herberekend')
+            self.assertEqual(signal.category_assignment.stored_handling_message, self.category.handling_message)
+
+            log = Log.objects.get(_signal=signal, object_pk=str(signal.category_assignment_id))
+            self.assertEqual(log.what, 'UPDATE_CATEGORY_ASSIGNMENT')
+            self.assertEqual(log.extra, self.category.name)
+
+        # The Signal that was not selected is left alone
+        self.assertEqual(self.signal_without_slo.categories.count(), 1)
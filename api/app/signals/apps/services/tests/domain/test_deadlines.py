@@ -1,6 +1,6 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2021 Gemeente Amsterdam
-from datetime import datetime
+# Copyright (C) 2021 - 2022 Gemeente Amsterdam
+from datetime import datetime, timedelta
 
 from django.test import TestCase
 from django.utils import timezone
@@ -149,6 +149,32 @@ class TestDeadlineCalculationService(TestCase):
             self.assertEqual(calculated_deadline, deadline)
             self.assertTrue(is_aware(calculated_deadline))
 
+    def test_get_deadlines(self):
+        """
+        Batch deadline calculation gives the same deadlines as get_deadline.
+        """
+        tzinfo = timezone.get_default_timezone()
+
+        for created_at, n_days, use_calendar_days, factor, deadline in FULL_TEST_CASES:
+            created_at = created_at.replace(tzinfo=tzinfo)
+            deadline = deadline.replace(tzinfo=tzinfo)
+
+            calculated_deadlines = DeadlineCalculationService.get_deadlines(
+                [created_at, created_at], n_days, use_calendar_days, factor)
+            self.assertEqual(calculated_deadlines, [deadline, deadline])
+            self.assertTrue(all(is_aware(calculated_deadline) for calculated_deadline in calculated_deadlines))
+
+        # Every weekday for a range of Service Level Objectives
+        created_ats = [datetime(2021, 2, 15, 12, 0, 0, tzinfo=tzinfo) + timedelta(days=i, hours=i) for i in range(14)]
+        for n_days in range(12):
+            for use_calendar_days in (False, True):
+                for factor in (1, 3):
+                    self.assertEqual(
+                        DeadlineCalculationService.get_deadlines(created_ats, n_days, use_calendar_days, factor),
+                        [DeadlineCalculationService.get_deadline(created_at, n_days, use_calendar_days, factor)
+                         for created_at in created_ats]
+                    )
+
     def test_from_signal_and_category(self):
         """
         Call into the deadline calculation service using Django ORM objects.
@@ -170,6 +196,13 @@ class TestDeadlineCalculationService(TestCase):
         self.assertTrue(is_aware(deadline))
         self.assertTrue(is_aware(deadline_factor_3))
 
+    def test_from_signal_and_category_without_slo(self):
+        cat = CategoryFactory.create()
+        signal = SignalFactory(category_assignment__category=cat)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(DeadlineCalculationService.from_signal_and_category(signal, cat), (None, None))
+
     def test_category_assignment_model(self):
         """
         CategoryAssignmentFactory.save() calls the deadline calculations, check that mechanism here.
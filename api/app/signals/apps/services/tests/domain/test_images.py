@@ -1,7 +1,8 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2021 Gemeente Amsterdam
+# Copyright (C) 2021 - 2022 Gemeente Amsterdam
+import base64
 from io import BytesIO
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from PIL import Image
 
@@ -76,3 +77,32 @@ class TestImagesService(SIAReadWriteUserMixin, SignalsBaseApiTestCase):
         self.assertEqual(len(att_created_ats), 1)
         self.assertEqual(jpg_data_uris[0][:22], 'data:image/jpg;base64,')
         self.assertGreater(len(jpg_data_uris[0]), 22)
+
+    def test_get_context_data_images_cached(self):
+        image = Image.new("RGB", (1600, 800), (0, 0, 0))
+        buffer = BytesIO()
+        image.save(buffer, format='JPEG')
+        AttachmentFactory.create(_signal=self.signal, file__filename='blah.jpg', file__data=buffer.getvalue())
+
+        jpg_data_uris, _, _, _ = DataUriImageEncodeService.get_context_data_images(self.signal, 800)
+        self.assertEqual(len(jpg_data_uris), 1)
+
+        with patch.object(DataUriImageEncodeService, 'get_data_uri') as get_data_uri:
+            cached_data_uris, _, _, _ = DataUriImageEncodeService.get_context_data_images(self.signal, 800)
+        get_data_uri.assert_not_called()
+        self.assertEqual(cached_data_uris, jpg_data_uris)
+
+        # Another size is another image
+        other_data_uris, _, _, _ = DataUriImageEncodeService.get_context_data_images(self.signal, 400)
+        self.assertNotEqual(other_data_uris, jpg_data_uris)
+
+    def test_get_data_uri_resized(self):
+        image = Image.new("RGB", (1600, 800), (0, 0, 0))
+        buffer = BytesIO()
+        image.save(buffer, format='JPEG')
+        attachment = AttachmentFactory.create(_signal=self.signal, file__filename='blah.jpg',
+                                              file__data=buffer.getvalue())
+
+        data_uri = DataUriImageEncodeService.get_data_uri(attachment, 800)
+        resized = Image.open(BytesIO(base64.b64decode(data_uri[22:])))
+        self.assertEqual(resized.size, (800, 400))
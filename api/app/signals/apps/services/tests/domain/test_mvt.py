@@ -0,0 +1,27 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from django.test import SimpleTestCase
+
+from signals.apps.services.domain.mvt import MVTService
+from signals.apps.signals.tests.valid_locations import STADHUIS
+
+
+class TestMVTService(SimpleTestCase):
+    def test_tile_bounds(self):
+        self.assertEqual(MVTService.get_tile_bounds(0, 0, 0),
+                         (-20037508.342789244, -20037508.342789244, 20037508.342789244, 20037508.342789244))
+
+        tile = MVTService.get_tile_for_point(STADHUIS['lon'], STADHUIS['lat'], 15)
+        min_lon, min_lat, max_lon, max_lat = MVTService.get_tile_bbox(*tile)
+        self.assertTrue(min_lon < STADHUIS['lon'] < max_lon)
+        self.assertTrue(min_lat < STADHUIS['lat'] < max_lat)
+
+    def test_get_tile_for_point(self):
+        self.assertEqual(MVTService.get_tile_for_point(STADHUIS['lon'], STADHUIS['lat'], 0), (0, 0, 0))
+        self.assertEqual(MVTService.get_tile_for_point(STADHUIS['lon'], STADHUIS['lat'], 15), (15, 16830, 10769))
+
+    def test_is_valid_tile(self):
+        self.assertTrue(MVTService.is_valid_tile(0, 0, 0))
+        self.assertTrue(MVTService.is_valid_tile(2, 3, 3))
+        self.assertFalse(MVTService.is_valid_tile(2, 4, 0))
+        self.assertFalse(MVTService.is_valid_tile(30, 0, 0))
@@ -0,0 +1,54 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from signals.apps.services.domain.pdf_jobs import PDFSummaryJobService
+from signals.apps.signals.factories import SignalFactory
+from signals.apps.users.factories import SuperUserFactory, UserFactory
+
+
+class TestPDFSummaryJobService(TestCase):
+    def setUp(self):
+        self.user = SuperUserFactory.create()
+        self.signals = SignalFactory.create_batch(2)
+
+    def test_run(self):
+        job = PDFSummaryJobService.create([signal.pk for signal in self.signals], self.user)
+        self.assertEqual(job['status'], PDFSummaryJobService.PENDING)
+        self.assertEqual(PDFSummaryJobService.get(job['id'], self.user), job)
+
+        status = PDFSummaryJobService.run(job['id'], self.user.pk)
+        self.assertEqual(status, PDFSummaryJobService.DONE)
+        self.assertEqual(PDFSummaryJobService.get(job['id'], self.user)['status'], PDFSummaryJobService.DONE)
+
+        with PDFSummaryJobService.open_pdf(job['id'], self.user) as file:
+            self.assertTrue(file.read().startswith(b'%PDF'))
+
+    def test_job_of_other_user(self):
+        job = PDFSummaryJobService.create([self.signals[0].pk], self.user)
+        self.assertIsNone(PDFSummaryJobService.get(job['id'], UserFactory.create()))
+
+    @mock.patch('signals.apps.services.domain.pdf_jobs.PDFSummaryService.get_pdfs', side_effect=Exception('Failed'))
+    def test_run_failed(self, patched):
+        job = PDFSummaryJobService.create([self.signals[0].pk], self.user)
+
+        status = PDFSummaryJobService.run(job['id'], self.user.pk)
+        self.assertEqual(status, PDFSummaryJobService.FAILED)
+        self.assertEqual(PDFSummaryJobService.get(job['id'], self.user)['status'], PDFSummaryJobService.FAILED)
+
+    def test_delete_expired(self):
+        job = PDFSummaryJobService.create([self.signals[0].pk], self.user)
+        PDFSummaryJobService.run(job['id'], self.user.pk)
+
+        with override_settings(API_PDF_JOB_TIMEOUT=60 * 60):
+            self.assertEqual(PDFSummaryJobService.delete_expired(), 0)
+            self.assertIsNotNone(PDFSummaryJobService.get(job['id'], self.user))
+
+            with mock.patch('signals.apps.services.domain.pdf_jobs.timezone.now',
+                            return_value=timezone.now() + timedelta(hours=2)):
+                self.assertGreaterEqual(PDFSummaryJobService.delete_expired(), 2)  # The job and its PDF
+            self.assertIsNone(PDFSummaryJobService.get(job['id'], self.user))
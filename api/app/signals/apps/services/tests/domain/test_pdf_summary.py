@@ -263,6 +263,29 @@ class TestPDFSummaryService(TestCase):
         self.assertEqual(
             PDFSummaryService._get_logo_data('https://example.com/dit/is/een.png'), 'data:image/png;base64,PNG')
 
+    @mock.patch(
+         'signals.apps.services.domain.pdf_summary.PDFSummaryService._get_logo_data_from_remote_url', autospec=True)
+    def test_get_cached_logo_data(self, patched):
+        patched.return_value = 'PNG'
+        logo_url = f'https://example.com/{self.signal.pk}/logo.png'
+        self.assertEqual(PDFSummaryService._get_cached_logo_data(logo_url), 'data:image/png;base64,PNG')
+        self.assertEqual(PDFSummaryService._get_cached_logo_data(logo_url), 'data:image/png;base64,PNG')
+        patched.assert_called_once_with(logo_url)
+
+    @mock.patch(
+         'signals.apps.services.domain.pdf_summary.PDFSummaryService._get_logo_data_from_remote_url', autospec=True)
+    def test_get_cached_logo_data_missing_logo_not_cached(self, patched):
+        patched.return_value = ''
+        logo_url = f'https://example.com/{self.signal.pk}/missing.png'
+        self.assertEqual(PDFSummaryService._get_cached_logo_data(logo_url), '')
+        self.assertEqual(PDFSummaryService._get_cached_logo_data(logo_url), '')
+        self.assertEqual(patched.call_count, 2)
+
+    def test_get_pdfs(self):
+        other_signal = SignalFactoryWithImage.create()
+        pdf = PDFSummaryService.get_pdfs([self.signal, other_signal], self.user)
+        self.assertTrue(pdf.startswith(b'%PDF'))
+
     def test_logo_data_from_static_file_file_exists(self):
         # Use a known static file, the Amsterdan logo, for this test.
         svg = PDFSummaryService._get_logo_data_from_static_file('api/logo-gemeente-amsterdam.svg')
@@ -0,0 +1,132 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from io import StringIO
+from time import monotonic
+from unittest import mock
+
+from django.contrib.gis import geos
+from django.core.management import call_command
+from django.test import TestCase
+
+from signals.apps.services.domain.area_index import AreaIndexService
+from signals.apps.services.domain.routing import (
+    ROUTING_RULES_TIMEOUT,
+    BatchRoutingService,
+    RoutingResult
+)
+from signals.apps.signals.factories import (
+    AreaFactory,
+    DepartmentFactory,
+    ExpressionFactory,
+    ExpressionTypeFactory,
+    RoutingExpressionFactory,
+    SignalFactory
+)
+from signals.apps.signals.models import RoutingExpression
+from signals.apps.users.factories import UserFactory
+
+
+class TestBatchRoutingService(TestCase):
+    def setUp(self):
+        self.addCleanup(BatchRoutingService.invalidate)
+        self.addCleanup(AreaIndexService.invalidate)
+
+        # The Signals are created before the routing rule, so they are not routed yet
+        self.signal_inside = SignalFactory.create(location__geometrie=geos.Point(4.88, 52.36))
+        self.signal_outside = SignalFactory.create(location__geometrie=geos.Point(1.0, 1.0))
+
+        geometry = geos.MultiPolygon([geos.Polygon.from_bbox([4.877157, 52.357204, 4.929686, 52.385239])], srid=4326)
+        area = AreaFactory.create(geometry=geometry, name='centrum', code='centrum', _type__name='gebied',
+                                  _type__code='stadsdeel')
+
+        self.department = DepartmentFactory.create()
+        expression = ExpressionFactory.create(_type=ExpressionTypeFactory.create(name='routing'), name='centrum',
+                                              code=f'location in areas."{area._type.name}"."{area.code}"')
+        self.rule = RoutingExpressionFactory.create(_expression=expression, _department=self.department,
+                                                    is_active=True)
+
+    def _route(self, **kwargs):
+        results = BatchRoutingService.route([self.signal_inside.pk, self.signal_outside.pk], **kwargs)
+        return {result.signal_id: result for result in results}
+
+    def test_dry_run(self):
+        results = self._route(dry_run=True)
+
+        self.assertEqual(results[self.signal_inside.pk].outcome, RoutingResult.ROUTED)
+        self.assertEqual(results[self.signal_inside.pk].rule, self.rule)
+        self.assertEqual(results[self.signal_outside.pk].outcome, RoutingResult.NO_MATCH)
+
+        self.signal_inside.refresh_from_db()
+        self.assertIsNone(self.signal_inside.routing_assignment)
+
+    def test_route(self):
+        results = self._route()
+        self.assertEqual(results[self.signal_inside.pk].outcome, RoutingResult.ROUTED)
+
+        self.signal_inside.refresh_from_db()
+        self.assertEqual(list(self.signal_inside.routing_assignment.departments.all()), [self.department])
+        self.signal_outside.refresh_from_db()
+        self.assertIsNone(self.signal_outside.routing_assignment)
+
+        # Routing again does not change anything
+        results = self._route()
+        self.assertEqual(results[self.signal_inside.pk].outcome, RoutingResult.UNCHANGED)
+
+    def test_route_with_user(self):
+        user = UserFactory.create()
+        user.profile.departments.add(self.department)
+        self.rule._user = user
+        self.rule.save()
+
+        self._route()
+
+        self.signal_inside.refresh_from_db()
+        self.assertEqual(self.signal_inside.user_assignment.user, user)
+
+    def test_rule_with_inactive_user(self):
+        user = UserFactory.create()
+        user.profile.departments.add(self.department)
+        self.rule._user = user
+        self.rule.save()
+
+        user.is_active = False
+        user.save()
+
+        results = self._route(dry_run=True)
+        self.assertEqual(results[self.signal_inside.pk].outcome, RoutingResult.NO_MATCH)
+        self.rule.refresh_from_db()
+        self.assertTrue(self.rule.is_active)  # Nothing is changed in a dry-run
+
+        self._route()
+        self.rule.refresh_from_db()
+        self.assertFalse(self.rule.is_active)
+
+    def test_rules_cached(self):
+        BatchRoutingService.get_rules()
+        with self.assertNumQueries(0):
+            BatchRoutingService.get_rules()
+
+        self.rule.is_active = False
+        self.rule.save()
+        self.assertEqual(BatchRoutingService.get_rules(), [])
+
+    def test_rules_timeout(self):
+        self.assertEqual(len(BatchRoutingService.get_rules()), 1)
+
+        # Updated without sending signals, like a change made by another process that does not share the Django cache
+        RoutingExpression.objects.filter(pk=self.rule.pk).update(is_active=False)
+        self.assertEqual(len(BatchRoutingService.get_rules()), 1)
+
+        later = monotonic() + ROUTING_RULES_TIMEOUT + 1
+        with mock.patch('signals.apps.services.domain.routing.monotonic', return_value=later):
+            self.assertEqual(BatchRoutingService.get_rules(), [])
+
+    def test_command(self):
+        out = StringIO()
+        call_command('apply_routing_rules', '--dry-run', stdout=out)
+
+        self.assertIn(f'Signal #{self.signal_inside.pk}: routed by rule #{self.rule.pk}', out.getvalue())
+        self.assertIn('routed: 1, unchanged: 0, no_match: 1, locked: 0', out.getvalue())
+
+        self.signal_inside.refresh_from_db()
+        self.assertIsNone(self.signal_inside.routing_assignment)
@@ -0,0 +1,82 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from freezegun import freeze_time
+
+from signals.apps.feedback.factories import FeedbackFactory
+from signals.apps.services.domain.signal_context import SignalContextService
+from signals.apps.signals import workflow
+from signals.apps.signals.factories import SignalFactory
+from signals.apps.signals.models import Signal
+
+
+class TestSignalContextService(TestCase):
+    email = 'context-reporter@example.com'
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)  # The cached statistics outlive the rolled back test transaction
+
+        now = timezone.now()
+
+        self.signal = SignalFactory.create(reporter__email=self.email, status__state=workflow.BEHANDELING)
+        SignalFactory.create_batch(2, parent=self.signal, reporter__email=self.email)
+        FeedbackFactory.create(_signal=self.signal, submitted_at=now, is_satisfied=False)
+
+        closed = SignalFactory.create(reporter__email=self.email.upper(), status__state=workflow.AFGEHANDELD)
+        # The latest feedback has not been submitted yet
+        pending = SignalFactory.create(reporter__email=self.email, status__state=workflow.AFGEHANDELD)
+
+        with freeze_time(now - timedelta(days=2)):
+            FeedbackFactory.create(_signal=closed, submitted_at=now, is_satisfied=False)
+            FeedbackFactory.create(_signal=pending, submitted_at=now, is_satisfied=True)
+        with freeze_time(now - timedelta(days=1)):
+            FeedbackFactory.create(_signal=closed, submitted_at=now, is_satisfied=True)
+            FeedbackFactory.create(_signal=pending, submitted_at=None)
+
+        SignalFactory.create(reporter__email='other@example.com')
+
+    def test_get_reporter_statistics(self):
+        statistics = SignalContextService.get_reporter_statistics(self.email)
+
+        self.assertEqual(statistics, {
+            'signal_count': 3,
+            'open_count': 1,
+            'positive_count': Signal.objects.reporter_feedback_satisfied_count(email=self.email),
+            'negative_count': Signal.objects.reporter_feedback_not_satisfied_count(email=self.email),
+        })
+        self.assertEqual(statistics['positive_count'], 1)
+        self.assertEqual(statistics['negative_count'], 1)
+
+    def test_get_reporter_statistics_cached(self):
+        with self.assertNumQueries(1):
+            statistics = SignalContextService.get_reporter_statistics(self.email)
+        with self.assertNumQueries(0):
+            self.assertEqual(SignalContextService.get_reporter_statistics(self.email.upper()), statistics)
+
+    def test_invalidated_on_new_signal(self):
+        self.assertEqual(SignalContextService.get_reporter_statistics(self.email)['signal_count'], 3)
+
+        SignalFactory.create(reporter__email=self.email)
+        self.assertEqual(SignalContextService.get_reporter_statistics(self.email)['signal_count'], 4)
+
+    def test_invalidated_on_status_change(self):
+        self.assertEqual(SignalContextService.get_reporter_statistics(self.email)['open_count'], 1)
+
+        Signal.actions.update_status({'state': workflow.AFGEHANDELD, 'text': 'Afgehandeld'}, self.signal)
+        self.assertEqual(SignalContextService.get_reporter_statistics(self.email)['open_count'], 0)
+
+    def test_invalidated_on_feedback(self):
+        self.assertEqual(SignalContextService.get_reporter_statistics(self.email)['positive_count'], 1)
+
+        feedback = FeedbackFactory.create(_signal=self.signal, submitted_at=None)
+        self.assertEqual(SignalContextService.get_reporter_statistics(self.email)['negative_count'], 0)
+
+        feedback.submitted_at = timezone.now()
+        feedback.is_satisfied = True
+        feedback.save()
+        self.assertEqual(SignalContextService.get_reporter_statistics(self.email)['positive_count'], 2)
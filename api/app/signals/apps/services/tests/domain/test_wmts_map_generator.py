@@ -1,12 +1,55 @@
 # SPDX-License-Identifier: MPL-2.0
 # Copyright (C) 2020 - 2022 Vereniging van Nederlandse Gemeenten, Gemeente Amsterdam
 import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch
 
 from django.test import TestCase
 from PIL import Image
 
-from signals.apps.services.domain.wmts_map_generator import WMTSMapGenerator
+from signals.apps.services.domain.wmts_map_generator import WMTSMapGenerator, WMTSTileCache
+
+
+class TileServer:
+    """
+    Local stand-in for a WMTS tile server, serves a PNG for every /{z}/{x}/{y}.png and a 404 for tiles in `missing`.
+    """
+    def __init__(self, missing=None):
+        self.requests = []
+        self.missing = missing or set()
+
+        tile = io.BytesIO()
+        Image.new('RGBA', (256, 256), (255, 0, 0, 255)).save(tile, format='png')
+        tile_data = tile.getvalue()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append(self.path)
+                if self.path in server.missing:
+                    self.send_error(404)
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/png')
+                self.send_header('Content-Length', str(len(tile_data)))
+                self.end_headers()
+                self.wfile.write(tile_data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url_template = f'http://127.0.0.1:{self.httpd.server_port}/{{z}}/{{x}}/{{y}}.png'
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
 
 
 class WMTSMapGeneratorTest(TestCase):
@@ -41,3 +84,28 @@ class WMTSMapGeneratorTest(TestCase):
             self.assertEqual(map.size, (648, 250))
         except Exception:
             self.fail('Mapgenerator raised unexpected exception!')
+
+    def test_make_map_tile_server(self):
+        with TileServer() as server:
+            map = WMTSMapGenerator.make_map(url_template=server.url_template, lat=52.0870974, lon=4.3075533, zoom=17,
+                                            img_size=[648, 250])
+            self.assertEqual(map.size, (648, 250))
+            self.assertEqual(map.getpixel((324, 125)), (255, 0, 0, 255))
+            n_tiles = len(server.requests)
+            self.assertEqual(len(set(server.requests)), n_tiles)
+            self.assertGreater(n_tiles, 1)
+
+            # All tiles are cached
+            WMTSMapGenerator.make_map(url_template=server.url_template, lat=52.0870974, lon=4.3075533, zoom=17,
+                                      img_size=[648, 250])
+            self.assertEqual(len(server.requests), n_tiles)
+
+    def test_get_tiles_missing_tile(self):
+        with TileServer(missing={'/17/2/2.png'}) as server:
+            tiles = WMTSTileCache.get_tiles(server.url_template, 17, [(1, 1), (2, 2)])
+            self.assertIsNotNone(tiles[(1, 1)])
+            self.assertIsNone(tiles[(2, 2)])
+
+            # Tiles that could not be downloaded are not cached
+            tiles = WMTSTileCache.get_tiles(server.url_template, 17, [(1, 1), (2, 2)])
+            self.assertEqual(sorted(server.requests), ['/17/1/1.png', '/17/2/2.png', '/17/2/2.png'])
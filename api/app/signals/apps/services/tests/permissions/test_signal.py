@@ -1,11 +1,19 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2021 Gemeente Amsterdam
+# Copyright (C) 2021 - 2022 Gemeente Amsterdam
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
 from django.test import TestCase, override_settings
 
 from signals.apps.services.domain.permissions.signal import SignalPermissionService
-from signals.apps.signals.factories import SignalFactory
+from signals.apps.services.domain.permissions.visibility import SignalVisibilityService
+from signals.apps.signals.factories import (
+    CategoryFactory,
+    DepartmentFactory,
+    SignalDepartmentsFactory,
+    SignalFactory
+)
+from signals.apps.signals.factories.category_departments import CategoryDepartmentFactory
+from signals.apps.signals.models import CategoryDepartment, Signal, SignalDepartments
 
 
 class TestSignalPermissionService(TestCase):
@@ -72,3 +80,84 @@ class TestSignalPermissionService(TestCase):
         self.user.user_permissions.add(sia_read)
 
         self.assertTrue(SignalPermissionService.has_signal_permission(self.user, self.signal))
+
+
+class TestSignalPermissionServiceBatch(TestCase):
+    def setUp(self):
+        self.addCleanup(SignalVisibilityService.invalidate)
+
+        self.department = DepartmentFactory.create()
+        self.category = CategoryFactory.create()
+        CategoryDepartmentFactory.create(category=self.category, department=self.department, can_view=True)
+
+        self.user = get_user_model().objects.create(username='signals.batch@example.com')
+        self.user.profile.departments.add(self.department)
+        self.user.user_permissions.add(Permission.objects.get(codename='sia_read'))
+
+        self.visible_signals = SignalFactory.create_batch(3, category_assignment__category=self.category)
+        self.other_signals = SignalFactory.create_batch(3)
+
+        self.routed_signal = SignalFactory.create()
+        self.routed_signal.routing_assignment = SignalDepartmentsFactory.create(
+            _signal=self.routed_signal, relation_type=SignalDepartments.REL_ROUTING, departments=[self.department]
+        )
+        self.routed_signal.save()
+
+        self.signals = self.visible_signals + self.other_signals + [self.routed_signal]
+
+    def _get_user(self):
+        # Fresh instance, no cached permissions. Like the authenticated user (see JWTAuthBackend) with its profile.
+        return get_user_model().objects.select_related('profile').get(pk=self.user.pk)
+
+    def test_filter_visible(self):
+        visible = SignalPermissionService.filter_visible(self._get_user(), self.signals)
+
+        self.assertEqual(visible, self.visible_signals + [self.routed_signal])
+        self.assertEqual({signal.pk for signal in visible}, set(Signal.objects.filter_for_user(self._get_user()).filter(
+            pk__in=[signal.pk for signal in self.signals]
+        ).values_list('pk', flat=True)))
+
+    def test_filter_visible_can_view_all_categories(self):
+        self.user.user_permissions.add(Permission.objects.get(codename='sia_can_view_all_categories'))
+
+        self.assertEqual(SignalPermissionService.filter_visible(self._get_user(), self.signals), self.signals)
+
+    def test_filter_visible_empty(self):
+        user = self._get_user()
+        with self.assertNumQueries(0):
+            self.assertEqual(SignalPermissionService.filter_visible(user, []), [])
+
+    def test_cache_scope(self):
+        user = self._get_user()
+        SignalPermissionService.has_permission(user, 'signals.sia_read')  # Load the permissions of the user
+        signal = SignalFactory.create(category_assignment__category=self.category)
+
+        with SignalPermissionService.cache_scope():
+            self.assertTrue(SignalPermissionService.has_signal_permission(user, signal))
+            with self.assertNumQueries(0):
+                for visible_signal in self.visible_signals:
+                    self.assertTrue(SignalPermissionService.has_signal_permission(user, visible_signal))
+
+        with self.assertNumQueries(0):  # Outside the scope the department ids are read from the shared cache
+            self.assertTrue(SignalPermissionService.has_signal_permission(user, signal))
+
+        with self.assertNumQueries(1):  # The routing departments of a Signal are only memoized within the scope
+            self.assertTrue(SignalPermissionService.has_permission_via_department_routing(user, self.routed_signal))
+
+    def test_category_departments_changed(self):
+        user = self._get_user()
+        signal = self.visible_signals[0]
+        self.assertTrue(SignalPermissionService.has_permission_via_category(user, signal))
+
+        CategoryDepartment.objects.filter(category=self.category).update(can_view=False)
+        self.assertTrue(SignalPermissionService.has_permission_via_category(user, signal))  # Still cached
+
+        CategoryDepartment.objects.get(category=self.category).save()
+        self.assertFalse(SignalPermissionService.has_permission_via_category(user, signal))
+
+    def test_profile_departments_changed(self):
+        user = self._get_user()
+        self.assertTrue(SignalPermissionService.has_permission_via_category(user, self.visible_signals[0]))
+
+        self.user.profile.departments.clear()
+        self.assertFalse(SignalPermissionService.has_permission_via_category(user, self.visible_signals[0]))
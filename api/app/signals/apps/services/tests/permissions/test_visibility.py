@@ -0,0 +1,120 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from time import monotonic
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from signals.apps.services.domain.permissions.utils import make_permission_condition_for_user
+from signals.apps.services.domain.permissions.visibility import (
+    SIGNAL_VISIBILITY_INDEX_TIMEOUT,
+    SignalVisibilityService
+)
+from signals.apps.signals.factories import (
+    CategoryFactory,
+    DepartmentFactory,
+    SignalDepartmentsFactory,
+    SignalFactory
+)
+from signals.apps.signals.models import CategoryDepartment, Signal, SignalDepartments
+
+
+class TestSignalVisibilityService(TestCase):
+    def setUp(self):
+        self.addCleanup(SignalVisibilityService.invalidate)
+
+        self.department = DepartmentFactory.create()
+        self.other_department = DepartmentFactory.create()
+
+        self.visible_category = CategoryFactory.create()
+        self.visible_category.departments.add(self.department, through_defaults={'can_view': True})
+        self.responsible_category = CategoryFactory.create()
+        CategoryDepartment.objects.create(category=self.responsible_category, department=self.department,
+                                          is_responsible=True)
+        self.other_category = CategoryFactory.create()
+        self.other_category.departments.add(self.other_department, through_defaults={'can_view': True})
+
+        self.user = get_user_model().objects.create(username='signals.visibility@example.com')
+        self.user.profile.departments.add(self.department)
+
+        self.visible_signal = SignalFactory.create(category_assignment__category=self.visible_category)
+        self.responsible_signal = SignalFactory.create(category_assignment__category=self.responsible_category)
+        self.other_signal = SignalFactory.create(category_assignment__category=self.other_category)
+        self.routed_signal = SignalFactory.create(category_assignment__category=self.other_category)
+        self.routed_signal.routing_assignment = SignalDepartmentsFactory.create(
+            _signal=self.routed_signal, relation_type=SignalDepartments.REL_ROUTING,
+            departments=[self.department, self.other_department]
+        )
+        self.routed_signal.save()
+
+    def _visible_ids(self):
+        condition = SignalVisibilityService.make_condition(self.user)
+        return list(Signal.objects.filter(condition).values_list('id', flat=True))
+
+    def test_visible_signals(self):
+        ids = self._visible_ids()
+
+        self.assertEqual(sorted(ids), sorted([self.visible_signal.id, self.responsible_signal.id,
+                                              self.routed_signal.id]))
+
+    def test_viewing_department_ids(self):
+        self.assertEqual(SignalVisibilityService.get_viewing_department_ids(self.visible_category.pk),
+                         {self.department.pk})
+        self.assertEqual(SignalVisibilityService.get_viewing_department_ids(self.responsible_category.pk), set())
+        self.assertEqual(SignalVisibilityService.get_viewing_department_ids(self.other_category.pk),
+                         {self.other_department.pk})
+
+    def test_same_signals_as_subquery_plan(self):
+        condition = make_permission_condition_for_user(self.user)
+        subquery_ids = set(Signal.objects.filter(condition).values_list('id', flat=True))
+
+        self.assertEqual(set(self._visible_ids()), subquery_ids)
+
+    def test_filter_for_user(self):
+        ids = Signal.objects.filter_for_user(self.user).values_list('id', flat=True)
+
+        self.assertEqual(len(ids), 3)  # The routed Signal once, even though it is routed to two departments
+
+    def test_cached(self):
+        SignalVisibilityService.make_condition(self.user)
+
+        with self.assertNumQueries(0):
+            SignalVisibilityService.make_condition(self.user)
+
+    def test_index_timeout(self):
+        self.assertIn(self.visible_signal.id, self._visible_ids())
+
+        # Changed without sending signals, like a change made by another process that does not share the Django cache
+        CategoryDepartment.objects.filter(category=self.visible_category).update(can_view=False)
+        self.assertIn(self.visible_signal.id, self._visible_ids())
+
+        later = monotonic() + SIGNAL_VISIBILITY_INDEX_TIMEOUT + 1
+        with mock.patch('signals.apps.services.domain.permissions.visibility.monotonic', return_value=later):
+            self.assertNotIn(self.visible_signal.id, self._visible_ids())
+
+    def test_category_department_changes(self):
+        self.assertNotIn(self.other_signal.id, self._visible_ids())
+
+        self.other_category.departments.add(self.department, through_defaults={'can_view': True})
+        self.assertIn(self.other_signal.id, self._visible_ids())
+
+        self.other_category.departments.remove(self.department)
+        self.assertNotIn(self.other_signal.id, self._visible_ids())
+
+        CategoryDepartment.objects.filter(category=self.visible_category).delete()
+        self.assertNotIn(self.visible_signal.id, self._visible_ids())
+
+    def test_profile_department_changes(self):
+        self.assertNotIn(self.other_signal.id, self._visible_ids())
+
+        self.user.profile.departments.add(self.other_department)
+        self.assertIn(self.other_signal.id, self._visible_ids())
+
+        self.other_department.profile_set.clear()
+        self.assertNotIn(self.other_signal.id, self._visible_ids())
+
+    def test_user_without_departments(self):
+        self.user.profile.departments.clear()
+
+        self.assertEqual(self._visible_ids(), [])
@@ -0,0 +1,44 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+"""
+(Re-)apply the routing rules to the open Signals, for example after a bulk import or a change of the routing rules. Use
+--dry-run to see which rule would be applied to each Signal without changing anything.
+"""
+from collections import Counter
+
+from django.core.management import BaseCommand
+
+from signals.apps.services.domain.routing import BatchRoutingService, RoutingResult
+from signals.apps.signals import workflow
+from signals.apps.signals.models import Signal
+
+
+class Command(BaseCommand):
+    default_batch_size = 500
+
+    def add_arguments(self, parser):
+        parser.add_argument('--signal', type=int, action='append', dest='signal_ids', default=None,
+                            help='Id of a Signal to route, can be given multiple times (default: all open Signals)')
+        parser.add_argument('--dry-run', action='store_true', help='Only report which rule would be applied')
+        parser.add_argument('--batch-size', type=int, default=self.default_batch_size,
+                            help=f'Number of Signals per batch (default: {self.default_batch_size})')
+
+    def handle(self, *args, **options):
+        if options['signal_ids']:
+            signal_ids = options['signal_ids']
+        else:
+            signal_ids = list(Signal.objects.exclude(
+                status__state__in=[workflow.GESPLITST, workflow.AFGEHANDELD, workflow.GEANNULEERD]
+            ).values_list('pk', flat=True))
+
+        self.stdout.write(f'{"Evaluating" if options["dry_run"] else "Routing"} {len(signal_ids)} Signal(s) ...')
+        results = BatchRoutingService.route(signal_ids, dry_run=options['dry_run'], batch_size=options['batch_size'])
+
+        for result in results:
+            if options['dry_run'] or options['verbosity'] > 1 or result.outcome == RoutingResult.LOCKED:
+                self.stdout.write(str(result))
+
+        counts = Counter(result.outcome for result in results)
+        self.stdout.write(', '.join(f'{outcome}: {counts[outcome]}' for outcome in (
+            RoutingResult.ROUTED, RoutingResult.UNCHANGED, RoutingResult.NO_MATCH, RoutingResult.LOCKED
+        )))
@@ -5,7 +5,8 @@ Script to assign existing Signals to the areas specified by their AreaType.code
 """
 from django.core.management import BaseCommand
 
-from signals.apps.signals.models import Area, AreaType, Signal
+from signals.apps.services.domain.area_assignment import DEFAULT_BATCH_SIZE, AreaAssignmentService
+from signals.apps.signals.models import AreaType
 
 
 class Command(BaseCommand):
@@ -14,34 +15,26 @@ class Command(BaseCommand):
         # assign Signals to areas, hence the default.
         parser.add_argument(
             '--area_type_code', type=str, default='district', help='Area type code of areas to assign signals to.')
+        parser.add_argument(
+            '--batch_size', type=int, default=DEFAULT_BATCH_SIZE, help='Number of Signals assigned per transaction.')
+        parser.add_argument(
+            '--after_id', type=int, default=0, help='Resume an interrupted run after the given Signal id.')
 
     def handle(self, *args, **options):
         area_type = AreaType.objects.get(code=options['area_type_code'])
-        areas = Area.objects.filter(_type=area_type)
         n_assigned = 0
+        n_unchanged = 0
         n_unassigned = 0
 
         self.stdout.write(f'(Re-)assigning Signals to areas of {options["area_type_code"]} AreaType.')
-        for signal in Signal.objects.all().select_related('location').iterator(chunk_size=2000):
-            qs = areas.filter(geometry__contains=signal.location.geometrie)
-
-            if qs.exists():
-                area = qs.first()
-                new_location = signal.location
-                new_location.id = None
-
-                new_location.area_type_code = area_type.code
-                new_location.area_code = area.code
-                new_location.area_name = area.name
-                new_location.save()
-
-                signal.location = new_location
-                signal.save()
-
-                n_assigned += 1
-            else:
-                n_unassigned += 1
+        for result in AreaAssignmentService.assign(area_type, after_id=options['after_id'],
+                                                   batch_size=options['batch_size']):
+            n_assigned += result.assigned
+            n_unchanged += result.matched - result.assigned
+            n_unassigned += result.unmatched
+            self.stdout.write(f'Processed Signals up to id {result.last_signal_id}.')
 
         self.stdout.write(f'Updated area assignment for {n_assigned} Signals.')
+        self.stdout.write(f'{n_unchanged} Signals were already assigned to the right area.')
         self.stdout.write(f'There are still {n_unassigned} Signals without a matching area.')
         self.stdout.write('Done!')
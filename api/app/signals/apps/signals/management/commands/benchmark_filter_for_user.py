@@ -0,0 +1,113 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+import random
+from statistics import median
+from timeit import default_timer as timer
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from signals.apps.services.domain.permissions.utils import make_permission_condition_for_user
+from signals.apps.services.domain.permissions.visibility import SignalVisibilityService
+from signals.apps.signals.factories import (
+    CategoryFactory,
+    DepartmentFactory,
+    ParentCategoryFactory,
+    SignalDepartmentsFactory,
+    SignalFactory
+)
+from signals.apps.signals.models import CategoryDepartment, Signal, SignalDepartments
+
+
+class Command(BaseCommand):
+    """
+    Compare the plans used to select the Signals visible to a user (that cannot view all categories):
+
+    - subquery: the category and routing department subqueries (make_permission_condition_for_user)
+    - visibility: the precomputed visibility index (SignalVisibilityService), as used by `filter_for_user`
+
+    With --seed the dataset is created in a transaction that is rolled back afterwards.
+    """
+    default_repeat = 10
+    default_page_size = 100
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=str, help='Username of the user to benchmark, required without --seed')
+        parser.add_argument('--seed', type=int, default=0, help='Number of Signals to seed (rolled back afterwards)')
+        parser.add_argument('--repeat', type=int, default=self.default_repeat,
+                            help=f'Number of runs per plan (default: {self.default_repeat})')
+        parser.add_argument('--page-size', type=int, default=self.default_page_size,
+                            help=f'Size of the page selected per run (default: {self.default_page_size})')
+        parser.add_argument('--explain', action='store_true', help='Show the EXPLAIN ANALYZE output of both plans')
+
+    def handle(self, *args, **options):
+        if not options['seed'] and not options['user']:
+            raise CommandError('Provide a --user or --seed a dataset')
+
+        with transaction.atomic():
+            user = self._seed(options['seed']) if options['seed'] else self._get_user(options['user'])
+            self._benchmark(user, options)
+            transaction.set_rollback(True)
+
+        if options['seed']:
+            SignalVisibilityService.invalidate()  # The index could contain the rolled back departments
+
+    def _get_user(self, username):
+        try:
+            return get_user_model().objects.get(username=username)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'User "{username}" does not exist')
+
+    def _seed(self, n_signals, n_departments=10, n_categories=20):
+        self.stdout.write(f'Seeding {n_signals} Signal(s)')
+
+        departments = DepartmentFactory.create_batch(n_departments)
+        parent = ParentCategoryFactory.create()
+        categories = CategoryFactory.create_batch(n_categories, parent=parent)
+        CategoryDepartment.objects.bulk_create([
+            CategoryDepartment(category=category, department=department, is_responsible=False, can_view=True)
+            for category in categories for department in random.sample(departments, 2)
+        ])
+
+        user = get_user_model().objects.create(username='benchmark.filter_for_user@example.com')
+        user.profile.departments.add(*departments[:2])
+
+        for _ in range(n_signals):
+            signal = SignalFactory.create(category_assignment__category=random.choice(categories))
+            if random.random() < 0.2:
+                signal.routing_assignment = SignalDepartmentsFactory.create(
+                    _signal=signal, relation_type=SignalDepartments.REL_ROUTING,
+                    departments=random.sample(departments, 2)
+                )
+                signal.save()
+        return user
+
+    def _benchmark(self, user, options):
+        plans = {
+            'subquery': lambda: Signal.objects.filter(make_permission_condition_for_user(user)),
+            'visibility': lambda: Signal.objects.filter(SignalVisibilityService.make_condition(user)),
+        }
+
+        ids = {}
+        for name, make_queryset in plans.items():
+            count_timings, page_timings = [], []
+            for _ in range(options['repeat']):
+                start = timer()
+                make_queryset().count()
+                count_timings.append(timer() - start)
+
+                start = timer()
+                list(make_queryset().order_by('-created_at').values_list('id', flat=True)[:options['page_size']])
+                page_timings.append(timer() - start)
+
+            ids[name] = set(make_queryset().values_list('id', flat=True))
+            self.stdout.write(f'* {name}: {len(ids[name])} visible Signal(s), '
+                              f'count {median(count_timings) * 1000:.2f} ms, '
+                              f'page {median(page_timings) * 1000:.2f} ms (median of {options["repeat"]} runs)')
+
+            if options['explain']:
+                self.stdout.write(make_queryset().order_by('-created_at')[:options['page_size']].explain(analyze=True))
+
+        if ids['subquery'] != ids['visibility']:
+            self.stderr.write('The plans do not select the same Signals!')
@@ -1,5 +1,5 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2020 - 2021 Gemeente Amsterdam
+# Copyright (C) 2020 - 2022 Gemeente Amsterdam
 """
 This management command calculates deadlines for signals/complaints that have
 no deadline. We need this to fix a problem where existing old open
@@ -8,46 +8,70 @@ signals/complaints do not show up in the punctuality filter using the
 
 Deadlines are calculated when a category is assigned. This command goes through
 signals/complaints that are open that have no deadline. Each of these is
-re-assigned to its category, triggering the deadline calculation and solving
-the problem with the punctuality filter.
+re-assigned to its category in bulk, with the recalculated deadline (see
+DeadlineRecalculationService), which shows up in the history of the complaint.
+
+With `--category_id` the deadlines of all open signals/complaints in that
+category are recalculated, for example after its Service Level Objective
+changed. With `--no_history` the deadlines are updated in place, without
+re-assigning the category.
 """
 from django.core.management import BaseCommand
 
+from signals.apps.services.domain.deadline_recalculation import (
+    DEFAULT_BATCH_SIZE,
+    DeadlineRecalculationService
+)
 from signals.apps.signals import workflow
-from signals.apps.signals.models import CategoryAssignment, Signal
+from signals.apps.signals.models import Signal
 
 HISTORY_MESSAGE = 'Afhandeltermijn uitgerekend'
 
 
 class Command(BaseCommand):
-    def _set_deadlines(self):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--category_id', type=int, default=None,
+            help='Recalculate the deadlines of all open Signals in this category, not only the missing ones.')
+        parser.add_argument(
+            '--no_history', action='store_true', help='Update the deadlines in place, without history entries.')
+        parser.add_argument(
+            '--batch_size', type=int, default=DEFAULT_BATCH_SIZE, help='Number of Signals updated per transaction.')
+
+    @staticmethod
+    def _get_open_signals():
         # We only update the open complaints, as those are the ones that have to
         # be worked on and solved (and thus need to show up in the `punctuality`
         # filter).
-        no_deadlines = Signal.objects.filter(category_assignment__deadline__isnull=True).exclude(
+        return Signal.objects.exclude(
             status__state__in=[workflow.GESPLITST, workflow.AFGEHANDELD, workflow.GEANNULEERD]
         )
 
-        for signal in no_deadlines.iterator(chunk_size=1000):
-            if signal.category_assignment is None:
-                continue
-            category = signal.category_assignment.category
+    def _set_deadlines(self, category_id=None, history=True, batch_size=DEFAULT_BATCH_SIZE):
+        signals = self._get_open_signals()
+        if category_id is None:
+            signals = signals.filter(category_assignment__deadline__isnull=True)
+        else:
+            signals = signals.filter(category_assignment__category_id=category_id)
 
-            # We have to bypass the "Actions" manager here, because it will
-            # reject an update to and from the same category.
-            data = {'text': HISTORY_MESSAGE, 'category': category}
-            category_assignment = CategoryAssignment.objects.create(**data, _signal_id=signal.id)
-            signal.category_assignment = category_assignment
-            signal.save()
+        return DeadlineRecalculationService.recalculate(
+            signals, batch_size=batch_size, history_text=HISTORY_MESSAGE if history else None
+        )
 
     def handle(self, *args, **options):
-        self.stdout.write('Find open Signals without deadlines ...')
-        self.stdout.write('... re-assign category (triggering deadline calculation).')
+        if options['category_id'] is None:
+            self.stdout.write('Find open Signals without deadlines ...')
+        else:
+            self.stdout.write(f'Find open Signals in category {options["category_id"]} ...')
+        if options['no_history']:
+            self.stdout.write('... recalculate their deadlines.')
+        else:
+            self.stdout.write('... re-assign category (triggering deadline calculation).')
 
-        self._set_deadlines()
+        n_updated = self._set_deadlines(category_id=options['category_id'], history=not options['no_history'],
+                                        batch_size=options['batch_size'])
+        self.stdout.write(f'Number of signals updated {n_updated}')
 
-        no_deadlines = Signal.objects.filter(category_assignment__deadline__isnull=True).exclude(
-            status__state__in=[workflow.GESPLITST, workflow.AFGEHANDELD, workflow.GEANNULEERD]
-        )
+        no_deadlines = self._get_open_signals().filter(category_assignment__deadline__isnull=True)
         self.stdout.write(f'Number of signals without deadlines {no_deadlines.count()}')
         self.stdout.write('Done')
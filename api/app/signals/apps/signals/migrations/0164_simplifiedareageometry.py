@@ -0,0 +1,27 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+import django.contrib.gis.db.models.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('signals', '0163_addresscache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimplifiedAreaGeometry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tolerance', models.FloatField()),
+                ('geometry', django.contrib.gis.db.models.fields.MultiPolygonField(srid=4326)),
+                ('area', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='simplified_geometries', to='signals.area')),  # noqa
+            ],
+            options={
+                'unique_together': {('area', 'tolerance')},
+            },
+        ),
+    ]
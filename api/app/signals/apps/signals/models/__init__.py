@@ -1,6 +1,7 @@
 # SPDX-License-Identifier: MPL-2.0
 # Copyright (C) 2019 - 2022 Gemeente Amsterdam
-from signals.apps.signals.models.area import Area, AreaType
+from signals.apps.signals.models.address_cache import AddressCache
+from signals.apps.signals.models.area import Area, AreaType, SimplifiedAreaGeometry
 from signals.apps.signals.models.attachment import Attachment
 from signals.apps.signals.models.buurt import Buurt
 from signals.apps.signals.models.category import Category
@@ -43,8 +44,10 @@ from signals.apps.signals.models.type import Type
 
 # Satisfy Flake8 (otherwise complaints about unused imports):
 __all__ = [
+    'AddressCache',
     'Area',
     'AreaType',
+    'SimplifiedAreaGeometry',
     'Attachment',
     'Buurt',
     'Category',
@@ -0,0 +1,24 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from django.contrib.gis.db import models
+
+from signals.apps.signals.models.mixins import CreatedUpdatedModel
+
+
+class AddressCache(CreatedUpdatedModel):
+    """
+    Result of an address validation (geocoding) request, keyed on the normalized address.
+
+    An entry without a result is a negative entry, the address could not be found. See
+    signals.apps.api.validation.address.cache.AddressGeocodeService.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    address = models.JSONField()  # The normalized address
+    result = models.JSONField(null=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name_plural = 'Address cache'
+
+    def __str__(self):
+        return f'{self.key} ({"found" if self.result else "not found"})'
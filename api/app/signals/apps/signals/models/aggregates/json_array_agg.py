@@ -0,0 +1,15 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from django.contrib.postgres.aggregates.mixins import OrderableAggMixin
+from django.db.models import Aggregate, JSONField
+
+
+class JSONArrayAgg(OrderableAggMixin, Aggregate):
+    """
+    json_agg with an optional ordering, unlike JSONAgg the result is json so the keys of aggregated objects keep
+    their order (see JSONBuildObject).
+    """
+    function = 'json_agg'
+    template = '%(function)s(%(distinct)s%(expressions)s %(ordering)s)'
+    allow_distinct = True
+    output_field = JSONField()
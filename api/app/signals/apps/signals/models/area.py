@@ -1,5 +1,5 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2020 - 2021 Gemeente Amsterdam
+# Copyright (C) 2020 - 2022 Gemeente Amsterdam
 from django.contrib.gis.db import models
 
 
@@ -32,3 +32,16 @@ class Area(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class SimplifiedAreaGeometry(models.Model):
+    """
+    Geometry of an Area simplified at a given tolerance (in degrees), precomputed for drawing the Areas on a map at
+    lower zoom levels (see signals.apps.services.domain.area_geometry).
+    """
+    class Meta:
+        unique_together = ('area', 'tolerance')
+
+    area = models.ForeignKey(Area, on_delete=models.CASCADE, related_name='simplified_geometries')
+    tolerance = models.FloatField()
+    geometry = models.MultiPolygonField()
@@ -0,0 +1,36 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from django.db.models import CharField, Func
+
+
+class ISOFormat(Func):
+    """
+    The ISO 8601 representation of a datetime in the given time zone, the same as `datetime.isoformat()` of the
+    datetime converted to that time zone: the microseconds are left out when they are 0.
+
+    With `utc_z` an offset of "+00:00" is written as "Z", like the DateTimeField of Django REST framework does.
+    """
+    output_field = CharField()
+
+    def __init__(self, expression, tz_name, utc_z=False, **extra):
+        super().__init__(expression, **extra)
+        self.tz_name = tz_name
+        self.utc_z = utc_z
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+
+        local_sql, local_params = f'(({sql}) AT TIME ZONE %s)', [*params, self.tz_name]
+        offset_sql, offset_params = f"({local_sql} - (({sql}) AT TIME ZONE 'UTC'))", [*local_params, *params]
+
+        format_sql = (f"CASE WHEN (date_part('microseconds', {sql})::bigint %% 1000000) = 0 "
+                      """THEN 'YYYY-MM-DD"T"HH24:MI:SS' ELSE 'YYYY-MM-DD"T"HH24:MI:SS.US' END""")
+        zero = 'Z' if self.utc_z else '+00:00'
+        offset_format_sql = (f"CASE WHEN {offset_sql} = INTERVAL '0' THEN '{zero}' "
+                             f"WHEN {offset_sql} < INTERVAL '0' THEN '-' || to_char(-{offset_sql}, 'HH24:MI') "
+                             f"ELSE '+' || to_char({offset_sql}, 'HH24:MI') END")
+
+        return (
+            f'(to_char({local_sql}, {format_sql}) || {offset_format_sql})',
+            [*local_params, *params, *offset_params * 4]
+        )
@@ -0,0 +1,18 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from django.db.models import Func, JSONField, Value
+
+
+class JSONBuildObject(Func):
+    """
+    Like django.db.models.functions.JSONObject, but builds a json object instead of a jsonb object, so the keys keep
+    the given order.
+    """
+    function = 'json_build_object'
+    output_field = JSONField()
+
+    def __init__(self, /, **fields):  # Positional-only, "self" can be a key
+        expressions = []
+        for key, value in fields.items():
+            expressions.extend((Value(key), value))
+        super().__init__(*expressions)
@@ -164,6 +164,10 @@ class Signal(CreatedUpdatedModel):
         if not settings.FEATURE_FLAGS.get('REPORTER_MAIL_CONTACT_FEEDBACK_ALLOWS_CONTACT_ENABLED', True):
             return True
 
+        if hasattr(self, 'feedback_allows_contact'):
+            # Annotated, see SignalQuerySet.annotate_serializer_fields
+            return True if self.feedback_allows_contact is None else self.feedback_allows_contact
+
         try:
             return self.feedback.filter(submitted_at__isnull=False).order_by('submitted_at').last().allows_contact
         except AttributeError:
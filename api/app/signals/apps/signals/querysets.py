@@ -1,9 +1,9 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2019 - 2021 Gemeente Amsterdam
-from django.db.models import Count, F, Max, QuerySet
+# Copyright (C) 2019 - 2022 Gemeente Amsterdam
+from django.db.models import Count, Exists, F, Max, OuterRef, QuerySet, Subquery
 
 from signals.apps.services.domain.permissions.signal import SignalPermissionService
-from signals.apps.services.domain.permissions.utils import make_permission_condition_for_user
+from signals.apps.services.domain.permissions.visibility import SignalVisibilityService
 
 
 class SignalQuerySet(QuerySet):
@@ -12,10 +12,30 @@ class SignalQuerySet(QuerySet):
     def filter_for_user(self, user):
         if not self.permission_service.has_permission(user, 'signals.sia_can_view_all_categories'):
             # We are not a superuser and we do not have the "show all categories" permission
-            return self.filter(make_permission_condition_for_user(user))
+            return self.filter(SignalVisibilityService.make_condition(user))
 
         return self.all()
 
+    def annotate_serializer_fields(self):
+        """
+        Annotations used by the Signal serializers instead of a query per Signal:
+
+        - `attachments_exist`: the Signal has attachments (has_attachments)
+        - `children_exist`: the Signal has child Signals (has_children)
+        - `feedback_allows_contact`: allows_contact of the last submitted feedback, NULL without submitted feedback
+          (see Signal.allows_contact)
+        """
+        from signals.apps.feedback.models import Feedback  # noqa, circular import
+        from signals.apps.signals.models import Attachment, Signal  # noqa, circular import
+
+        return self.annotate(
+            attachments_exist=Exists(Attachment.objects.filter(_signal_id=OuterRef('pk'))),
+            children_exist=Exists(Signal.objects.filter(parent_id=OuterRef('pk'))),
+            feedback_allows_contact=Subquery(Feedback.objects.filter(
+                _signal_id=OuterRef('pk'), submitted_at__isnull=False
+            ).order_by('-submitted_at').values('allows_contact')[:1]),
+        )
+
     def filter_reporter(self, email=None, phone=None):
         if not email and not phone:
             raise Exception('')
@@ -1,9 +1,31 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2019 - 2021 Gemeente Amsterdam
+# Copyright (C) 2019 - 2022 Gemeente Amsterdam
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
+from signals.apps.feedback.models import Feedback
+from signals.apps.services.domain.area_geometry import AreaGeometryService
+from signals.apps.services.domain.area_index import AreaIndexService
+from signals.apps.services.domain.categories import CategoryResolverService
+from signals.apps.services.domain.permissions.visibility import SignalVisibilityService
+from signals.apps.services.domain.routing import BatchRoutingService
+from signals.apps.services.domain.signal_context import SignalContextService
 from signals.apps.signals import tasks
 from signals.apps.signals.managers import create_initial, update_status
+from signals.apps.signals.models import (
+    Area,
+    AreaType,
+    Category,
+    CategoryDepartment,
+    Department,
+    Expression,
+    Reporter,
+    RoutingExpression,
+    Signal,
+    Status
+)
+from signals.apps.users.models import Profile
 
 
 @receiver(create_initial, dispatch_uid='signals_create_initial')
@@ -15,3 +37,96 @@ def signals_create_initial_handler(sender, signal_obj, **kwargs):
 @receiver(update_status, dispatch_uid='signals_update_status')
 def update_status_handler(sender, signal_obj, status, prev_status, *args, **kwargs):
     tasks.update_status_children_based_on_parent(signal_id=signal_obj.pk)
+
+
+@receiver([post_save, post_delete], sender=Category, dispatch_uid='signals_category_changed')
+def category_changed_handler(sender, instance, **kwargs):
+    # Invalidate right away for this process and again after the commit, so other processes cannot rebuild their
+    # index from the uncommitted state
+    CategoryResolverService.invalidate()
+    transaction.on_commit(CategoryResolverService.invalidate)
+
+
+def _invalidate_signal_visibility():
+    SignalVisibilityService.invalidate()
+    transaction.on_commit(SignalVisibilityService.invalidate)
+
+
+@receiver([post_save, post_delete], sender=CategoryDepartment, dispatch_uid='signals_category_department_changed')
+@receiver(post_delete, sender=Department, dispatch_uid='signals_department_deleted')
+def signal_visibility_changed_handler(sender, instance, **kwargs):
+    _invalidate_signal_visibility()
+
+
+@receiver(m2m_changed, sender=CategoryDepartment, dispatch_uid='signals_category_departments_changed')
+def category_departments_changed_handler(sender, instance, action, **kwargs):
+    # Category.departments.add/remove/clear bulk create or delete the CategoryDepartment objects without sending their
+    # post_save and post_delete signals
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        _invalidate_signal_visibility()
+
+
+@receiver(m2m_changed, sender=Profile.departments.through, dispatch_uid='signals_profile_departments_changed')
+def profile_departments_changed_handler(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if reverse and action == 'post_clear':
+        # All profiles were removed from a department, which profiles were affected is no longer known
+        _invalidate_signal_visibility()
+        return
+
+    for profile_id in (pk_set if reverse else [instance.pk]):
+        SignalVisibilityService.invalidate_profile(profile_id)
+        transaction.on_commit(lambda pk=profile_id: SignalVisibilityService.invalidate_profile(pk))
+
+
+@receiver([post_save, post_delete], sender=Area, dispatch_uid='signals_area_changed')
+@receiver([post_save, post_delete], sender=AreaType, dispatch_uid='signals_area_type_changed')
+def area_changed_handler(sender, instance, **kwargs):
+    AreaIndexService.invalidate()
+    transaction.on_commit(AreaIndexService.invalidate)
+
+
+@receiver(post_save, sender=Area, dispatch_uid='signals_area_saved')
+def area_saved_handler(sender, instance, created, **kwargs):
+    # New Areas are simplified in bulk after loading them (see the load_areas management command)
+    if not created:
+        AreaGeometryService.generate([instance])
+
+
+@receiver([post_save, post_delete], sender=RoutingExpression, dispatch_uid='signals_routing_expression_changed')
+@receiver([post_save, post_delete], sender=Expression, dispatch_uid='signals_expression_changed')
+def routing_rules_changed_handler(sender, instance, **kwargs):
+    BatchRoutingService.invalidate()
+    transaction.on_commit(BatchRoutingService.invalidate)
+
+
+def _invalidate_reporter_context(email):
+    SignalContextService.invalidate_reporter(email)
+    transaction.on_commit(lambda: SignalContextService.invalidate_reporter(email))
+
+
+@receiver([post_save, post_delete], sender=Reporter, dispatch_uid='signals_reporter_changed')
+def reporter_context_reporter_changed_handler(sender, instance, **kwargs):
+    # A new Reporter is saved for every new Signal and for every change of the reporter of a Signal
+    if instance.email:
+        _invalidate_reporter_context(instance.email)
+
+
+def _invalidate_signal_reporter_context(signal_id):
+    email = Signal.objects.filter(pk=signal_id).values_list('reporter__email', flat=True).first()
+    if email:
+        _invalidate_reporter_context(email)
+
+
+@receiver(post_save, sender=Status, dispatch_uid='signals_reporter_context_status_created')
+def reporter_context_status_created_handler(sender, instance, created, **kwargs):
+    # The number of open Signals of the reporter
+    if created:
+        _invalidate_signal_reporter_context(instance._signal_id)
+
+
+@receiver(post_save, sender=Feedback, dispatch_uid='signals_reporter_context_feedback_saved')
+def reporter_context_feedback_saved_handler(sender, instance, **kwargs):
+    _invalidate_signal_reporter_context(instance._signal_id)
@@ -1,12 +1,15 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2018 - 2021 Gemeente Amsterdam
+# Copyright (C) 2018 - 2022 Gemeente Amsterdam
 import logging
+from collections import Counter
 
 from django.db.models import Q
 from django.utils import timezone
 
 from signals.apps.services.domain.auto_create_children.service import AutoCreateChildrenService
 from signals.apps.services.domain.dsl import SignalDslService
+from signals.apps.services.domain.pdf_jobs import PDFSummaryJobService
+from signals.apps.services.domain.routing import BatchRoutingService
 from signals.apps.signals.models import Reporter
 from signals.apps.signals.models.signal import Signal
 from signals.apps.signals.workflow import (
@@ -27,6 +30,17 @@ def apply_routing(signal_id):
     dsl_service.process_routing_rules(signal)
 
 
+@app.task
+def apply_routing_batch(signal_ids, dry_run=False):
+    """
+    Apply the routing rules to many Signals at once, see BatchRoutingService
+
+    :returns: number of Signals per outcome
+    """
+    results = BatchRoutingService.route(signal_ids, dry_run=dry_run)
+    return dict(Counter(result.outcome for result in results))
+
+
 @app.task
 def anonymize_reporters(days=365):
     created_before = (timezone.now() - timezone.timedelta(days=days))
@@ -101,3 +115,16 @@ def apply_auto_create_children(signal_id):
     :param signal_id:
     """
     AutoCreateChildrenService.run(signal_id=signal_id)
+
+
+@app.task
+def generate_pdf_summary(job_id, user_id):
+    """
+    Generate the PDF of a job registered with PDFSummaryJobService.create
+    """
+    return PDFSummaryJobService.run(job_id, user_id)
+
+
+@app.task
+def delete_expired_pdf_summaries():
+    return PDFSummaryJobService.delete_expired()
@@ -7,7 +7,7 @@ from django.core.management import call_command
 from django.test import TestCase
 
 from signals.apps.signals.factories import AreaFactory, AreaTypeFactory, SignalFactory
-from signals.apps.signals.models import Location
+from signals.apps.signals.models import Location, Signal
 
 # Fake rectangular Amsterdam:
 BBOX = [4.58565, 52.03560, 5.31360, 52.48769]
@@ -26,7 +26,8 @@ class TestAssignAreas(TestCase):
         w = Polygon.from_bbox((min_lon, min_lat, min_lon + extent_lon * 0.5, min_lat + extent_lat))
         e = Polygon.from_bbox((min_lon + extent_lon * 0.5, min_lat, min_lon + extent_lon, min_lat + extent_lat))
 
-        AreaFactory.create(name='west', code='west', _type=self.area_type_district, geometry=MultiPolygon([w]))
+        self.area_west = AreaFactory.create(name='west', code='west', _type=self.area_type_district,
+                                            geometry=MultiPolygon([w]))
         AreaFactory.create(name='east', code='east', _type=self.area_type_district, geometry=MultiPolygon([e]))
 
         center_w = Point((min_lon + 0.25 * extent_lon, min_lat + 0.5 * extent_lat))
@@ -74,3 +75,43 @@ class TestAssignAreas(TestCase):
         self.assertEqual(self.signal_north.location.area_type_code, None)
         self.assertEqual(self.signal_north.location.area_code, None)
         self.assertEqual(self.signal_north.location.area_name, None)
+
+    def test_assign_area_again(self):
+        call_command('assign_area', '--area_type_code=district', stdout=StringIO())
+        n_locations = Location.objects.count()
+
+        # Signals already assigned to the right area are left alone
+        buffer = StringIO()
+        call_command('assign_area', '--area_type_code=district', stdout=buffer)
+
+        output = buffer.getvalue()
+        self.assertIn('Updated area assignment for 0 Signals.', output)
+        self.assertIn('2 Signals were already assigned to the right area.', output)
+        self.assertEqual(Location.objects.count(), n_locations)
+
+        # Moving an area changes the assignment of the Signals within that area
+        self.area_west.code = 'west-2'
+        self.area_west.save()
+
+        buffer = StringIO()
+        call_command('assign_area', '--area_type_code=district', stdout=buffer)
+        self.assertIn('Updated area assignment for 1 Signals.', buffer.getvalue())
+
+        self.signal_west.refresh_from_db()
+        self.assertEqual(self.signal_west.location.area_code, 'west-2')
+
+    def test_assign_area_resume(self):
+        signal_ids = sorted([self.signal_west.pk, self.signal_east.pk, self.signal_north.pk])
+
+        buffer = StringIO()
+        call_command('assign_area', '--area_type_code=district', '--batch_size=1', f'--after_id={signal_ids[0]}',
+                     stdout=buffer)
+
+        output = buffer.getvalue()
+        for signal_id in signal_ids[1:]:
+            self.assertIn(f'Processed Signals up to id {signal_id}.', output)
+        self.assertNotIn(f'Processed Signals up to id {signal_ids[0]}.', output)
+
+        # The Signal before the resumed run is left alone
+        location = Signal.objects.get(pk=signal_ids[0]).location
+        self.assertIsNone(location.area_code)
@@ -0,0 +1,31 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from signals.apps.services.domain.permissions.visibility import SignalVisibilityService
+from signals.apps.signals.models import Signal
+
+
+class TestBenchmarkFilterForUser(TestCase):
+    def setUp(self):
+        self.addCleanup(SignalVisibilityService.invalidate)
+
+    def test_seeded_benchmark(self):
+        out, err = StringIO(), StringIO()
+        call_command('benchmark_filter_for_user', '--seed', '10', '--repeat', '1', stdout=out, stderr=err)
+
+        self.assertIn('* subquery:', out.getvalue())
+        self.assertIn('* visibility:', out.getvalue())
+        self.assertEqual(err.getvalue(), '')
+        self.assertEqual(Signal.objects.count(), 0)  # The seeded dataset is rolled back
+
+    def test_user_or_seed_required(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_filter_for_user')
+
+    def test_unknown_user(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_filter_for_user', '--user', 'unknown@example.com')
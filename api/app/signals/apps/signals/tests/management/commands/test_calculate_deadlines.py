@@ -1,5 +1,5 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2020 - 2021 Gemeente Amsterdam
+# Copyright (C) 2020 - 2022 Gemeente Amsterdam
 import datetime
 from io import StringIO
 
@@ -25,7 +25,7 @@ class TestCalculateDeadlines(APITestCase, SuperUserMixin):
     def setUp(self):
         # We use a category without no deadlines to create signals/complaints that
         # will have deadline set to None.
-        test_cat = CategoryFactory.create(name='testcategory')
+        test_cat = self.test_cat = CategoryFactory.create(name='testcategory')
 
         with freeze_time(self.NOW - datetime.timedelta(days=4*7)):
             self.signal_late_open = SignalFactory.create(
@@ -113,3 +113,42 @@ class TestCalculateDeadlines(APITestCase, SuperUserMixin):
         response_json = response.json()
         self.assertEqual(len(response_json), 2)
         self.assertEqual(response_json[0]['description'], HISTORY_MESSAGE)
+
+    def test_handle_no_history(self):
+        """
+        Test that the deadlines are updated in place with the `--no_history` option.
+        """
+        category_assignment_id = self.signal_late_open.category_assignment_id
+
+        buffer = StringIO()
+        call_command('calculate_deadlines', '--no_history', stdout=buffer)
+
+        self.signal_late_open.refresh_from_db()
+        self.assertEqual(self.signal_late_open.category_assignment_id, category_assignment_id)
+        self.assertIsNotNone(self.signal_late_open.category_assignment.deadline)
+        self.assertEqual(self.signal_late_open.categories.count(), 1)
+
+        output = buffer.getvalue()
+        self.assertIn('Number of signals updated 1', output)
+        self.assertIn('Number of signals without deadlines 0', output)
+
+    def test_handle_category(self):
+        """
+        Test that the deadlines of all open complaints in a category are recalculated after its Service Level Objective
+        changed.
+        """
+        ServiceLevelObjectiveFactory.create(category=self.test_cat, n_days=10, use_calendar_days=True)
+
+        buffer = StringIO()
+        call_command('calculate_deadlines', f'--category_id={self.test_cat.pk}', '--no_history', stdout=buffer)
+        self.assertIn('Number of signals updated 2', buffer.getvalue())
+
+        for signal in (self.signal_late_open, self.signal_punctual_open):
+            signal.refresh_from_db()
+            self.assertEqual(signal.category_assignment.deadline, signal.created_at + datetime.timedelta(days=10))
+            self.assertEqual(signal.category_assignment.deadline_factor_3,
+                             signal.created_at + datetime.timedelta(days=30))
+
+        # Closed complaints are left alone
+        self.signal_late_closed.refresh_from_db()
+        self.assertIsNone(self.signal_late_closed.category_assignment.deadline)
@@ -1,12 +1,14 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2020 - 2021 Gemeente Amsterdam
+# Copyright (C) 2020 - 2022 Gemeente Amsterdam
 import re
 from typing import Optional
 
 from django.conf import settings
 from django.contrib.gis.db.models import PointField
+from django.contrib.gis.geos import MultiPoint
 from django.db.models import Q
 
+from signals.apps.services.domain.area_index import AreaIndexService
 from signals.apps.signals.models import Area
 
 
@@ -19,12 +21,15 @@ def _get_area(geometry: PointField, area_type: Optional[str] = None) -> Optional
     :param area_type:
     :return: Area or None
     """
+    if geometry.geom_type == 'Point' and AreaIndexService.is_indexed(area_type):
+        # Looked up in the in-memory index of the Areas
+        return AreaIndexService.get_area(geometry, area_type)
+
     query = Q(geometry__contains=geometry)
     if area_type:
         query &= Q(_type__code=area_type)
 
-    areas = Area.objects.filter(query)
-    return areas.first() if areas.exists() else None
+    return Area.objects.filter(query).first()
 
 
 def _get_stadsdeel_code(geometry: PointField, default: Optional[str] = None) -> Optional[str]:
@@ -46,6 +51,48 @@ def _get_stadsdeel_code(geometry: PointField, default: Optional[str] = None) ->
     return code or default
 
 
+def _get_areas(geometries: list, area_type: Optional[str] = None) -> list:
+    """
+    Batch variant of `_get_area`, area types that are not indexed are retrieved for all given geometries in one query
+
+    :param geometries: list of points
+    :param area_type:
+    :return: list with an Area or None for every given geometry
+    """
+    if AreaIndexService.is_indexed(area_type):
+        return AreaIndexService.get_areas(geometries, area_type)
+
+    if not geometries:
+        return []
+
+    query = Q(geometry__intersects=MultiPoint(*geometries, srid=geometries[0].srid))
+    if area_type:
+        query &= Q(_type__code=area_type)
+
+    # Same ordering as `_get_area`, the first Area that contains a geometry wins
+    areas = list(Area.objects.filter(query))
+    return [next((area for area in areas if area.geometry.prepared.contains(geometry)), None)
+            for geometry in geometries]
+
+
+def _get_stadsdeel_codes(geometries: list, default: Optional[str] = None) -> list:
+    """
+    Batch variant of `_get_stadsdeel_code`
+
+    :param geometries: list of points
+    :param default:
+    :return: list with a str or None for every given geometry
+    """
+    if not settings.FEATURE_FLAGS.get('API_DETERMINE_STADSDEEL_ENABLED', False):
+        return [default] * len(geometries)
+
+    from signals.apps.signals.models.location import AREA_STADSDEEL_TRANSLATION
+
+    area_type = getattr(settings, 'API_DETERMINE_STADSDEEL_ENABLED_AREA_TYPE', 'sia-stadsdeel')
+    areas = _get_areas(geometries=geometries, area_type=area_type)
+    return [(AREA_STADSDEEL_TRANSLATION.get(area.code.lower(), None) if area else None) or default for area in areas]
+
+
 class AddressFormatter:
     """
     Based on the format classes found in django.utils.dateformat
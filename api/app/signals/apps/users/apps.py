@@ -11,6 +11,8 @@ class UsersConfig(AppConfig):
         from django.contrib.auth import get_user_model
         from django.contrib.contenttypes.fields import GenericRelation
 
+        import signals.apps.users.signal_receivers  # noqa, import Django signals to connect receiver functions
+
         # Adding History log to the User model
         user_model = get_user_model()
         user_model.add_to_class('track_fields', ('first_name', 'last_name', 'is_active', 'groups'))
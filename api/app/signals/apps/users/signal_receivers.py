@@ -0,0 +1,36 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from signals.apps.services.domain.permissions.visibility import SignalVisibilityService
+from signals.apps.users.models import Profile
+from signals.auth.backend import invalidate_user
+
+User = get_user_model()
+
+
+def _invalidate_user(username):
+    # Invalidate right away for this process and again after the commit, so other processes cannot cache the
+    # uncommitted state
+    invalidate_user(username)
+    transaction.on_commit(lambda: invalidate_user(username))
+
+
+@receiver([post_save, post_delete], sender=User, dispatch_uid='users_user_changed')
+def user_changed_handler(sender, instance, **kwargs):
+    _invalidate_user(instance.username)
+
+
+@receiver([post_save, post_delete], sender=Profile, dispatch_uid='users_profile_changed')
+def profile_changed_handler(sender, instance, **kwargs):
+    # The profile is cached with the user
+    _invalidate_user(instance.user.username)
+
+
+@receiver(post_delete, sender=Profile, dispatch_uid='users_profile_deleted')
+def profile_deleted_handler(sender, instance, **kwargs):
+    SignalVisibilityService.invalidate_profile(instance.pk)
+    transaction.on_commit(lambda: SignalVisibilityService.invalidate_profile(instance.pk))
@@ -1,5 +1,5 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2018 - 2021 Gemeente Amsterdam
+# Copyright (C) 2018 - 2022 Gemeente Amsterdam
 from unittest import mock, skip
 
 from django.conf import settings
@@ -46,11 +46,11 @@ class TestJWTAuthBackend(TestCase):
             with self.assertRaises(exceptions.AuthenticationFailed):
                 jwt_auth_backend.authenticate(mocked_request)
 
-            mocked_cache.get.assert_called_once_with('wrong_user@example.com')
+            mocked_cache.get.assert_called_once_with('signals.auth.user.wrong_user@example.com')
             mocked_cache.set.assert_called_once_with(
-                'wrong_user@example.com',
+                'signals.auth.user.wrong_user@example.com',
                 backend.USER_DOES_NOT_EXIST,
-                5 * 60
+                settings['USER_CACHE_TIMEOUT']
             )
             mocked_cache.reset_mock()
 
@@ -71,7 +71,7 @@ class TestJWTAuthBackend(TestCase):
 
             with self.assertRaises(exceptions.AuthenticationFailed):
                 jwt_auth_backend.authenticate(mocked_request)
-            mocked_cache.get.assert_called_once_with('wrong_user@example.com')
+            mocked_cache.get.assert_called_once_with('signals.auth.user.wrong_user@example.com')
             mocked_user_model.objects.get.assert_not_called()
             mocked_cache.reset_mock()
 
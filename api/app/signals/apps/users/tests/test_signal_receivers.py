@@ -0,0 +1,66 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import exceptions
+
+from signals.apps.signals.factories import DepartmentFactory
+from signals.apps.users.factories import UserFactory
+from signals.auth.backend import JWTAuthBackend
+
+
+class TestUserCacheInvalidation(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        self.user = UserFactory.create(username='signals.cached@example.com', email='signals.cached@example.com')
+
+    def test_cached_with_profile(self):
+        JWTAuthBackend.get_user('Signals.Cached@example.com')
+
+        with self.assertNumQueries(0):
+            user = JWTAuthBackend.get_user('signals.cached@example.com')
+            self.assertEqual(user.profile.pk, self.user.profile.pk)
+
+    def test_user_changed(self):
+        JWTAuthBackend.get_user(self.user.username)
+
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaisesMessage(exceptions.AuthenticationFailed, 'User inactive'):
+            JWTAuthBackend.get_user(self.user.username)
+
+    def test_user_deleted(self):
+        JWTAuthBackend.get_user(self.user.username)
+
+        self.user.delete()
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            JWTAuthBackend.get_user(self.user.username)
+
+    def test_user_created(self):
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            JWTAuthBackend.get_user('signals.new@example.com')
+
+        new_user = UserFactory.create(username='signals.new@example.com', email='signals.new@example.com')
+
+        self.assertEqual(JWTAuthBackend.get_user('signals.new@example.com'), new_user)
+
+    def test_profile_changed(self):
+        JWTAuthBackend.get_user(self.user.username)
+
+        self.user.profile.note = 'Changed'
+        self.user.profile.save()
+
+        self.assertEqual(JWTAuthBackend.get_user(self.user.username).profile.note, 'Changed')
+
+    def test_profile_departments_not_cached_with_user(self):
+        department = DepartmentFactory.create()
+        JWTAuthBackend.get_user(self.user.username)
+
+        self.user.profile.departments.add(department)
+
+        user = JWTAuthBackend.get_user(self.user.username)
+        self.assertEqual(list(user.profile.departments.all()), [department])
@@ -1,14 +1,28 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2018 - 2021 Gemeente Amsterdam
+# Copyright (C) 2018 - 2022 Gemeente Amsterdam
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.cache import cache
 from rest_framework import exceptions
 
+from .config import get_settings
+from .metrics import auth_cache_metrics
 from .tokens import JWTAccessToken
 
 USER_NOT_AUTHORIZED = "User {} is not authorized"
 USER_DOES_NOT_EXIST = -1
+USER_CACHE_KEY = 'signals.auth.user.{user_id}'
+
+
+def get_user_cache_key(user_id):
+    return USER_CACHE_KEY.format(user_id=user_id.lower())  # Users are looked up case insensitive
+
+
+def invalidate_user(user_id):
+    """
+    Drop the user from the cache, used when the user is changed (see signals.apps.users.signal_receivers)
+    """
+    cache.delete(get_user_cache_key(user_id))
 
 
 class JWTAuthBackend():
@@ -19,20 +33,28 @@ class JWTAuthBackend():
     def get_user(user_id):
         # Now we know we have a Amsterdam municipal employee (may or may not be allowed acceess)
         # or external user with access to the `signals` application, we retrieve the Django user.
-        user = cache.get(user_id)
+        key = get_user_cache_key(user_id)
+        user = cache.get(key)
 
         if user == USER_DOES_NOT_EXIST:
+            auth_cache_metrics.hit('user')
             raise exceptions.AuthenticationFailed(USER_NOT_AUTHORIZED.format(user_id))
 
-        # We hit the database max once per 5 minutes, and then cache the results.
+        # We hit the database once per USER_CACHE_TIMEOUT (or after the user changed), and then cache the results. The
+        # profile is cached with the user, the permission checks need its departments.
         if user is None:  # i.e. cache miss
+            auth_cache_metrics.miss('user')
+            timeout = get_settings()['USER_CACHE_TIMEOUT']
             try:
-                user = User.objects.get(username__iexact=user_id)  # insensitive match fixes log-in bug
+                # insensitive match fixes log-in bug
+                user = User.objects.select_related('profile').get(username__iexact=user_id)
             except User.DoesNotExist:
-                cache.set(user_id, USER_DOES_NOT_EXIST, 5 * 60)
+                cache.set(key, USER_DOES_NOT_EXIST, timeout)
                 raise exceptions.AuthenticationFailed(USER_NOT_AUTHORIZED.format(user_id))
             else:
-                cache.set(user_id, user, 5 * 60)
+                cache.set(key, user, timeout)
+        else:
+            auth_cache_metrics.hit('user')
 
         if not user.is_active:
             raise exceptions.AuthenticationFailed('User inactive')
@@ -1,5 +1,5 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2020 - 2021 Vereniging van Nederlandse Gemeenten, Gemeente Amsterdam
+# Copyright (C) 2020 - 2022 Vereniging van Nederlandse Gemeenten, Gemeente Amsterdam
 import types
 
 from django.conf import settings as django_settings
@@ -23,7 +23,10 @@ _available_settings = {
     ],
     'USER_ID_FIELDS': ''.split(','),  # fieldnames separated by comma's
     'ALWAYS_OK': False,
-    'MIN_INTERVAL_KEYSET_UPDATE': 30
+    'MIN_INTERVAL_KEYSET_UPDATE': 30,
+    'VERIFIED_TOKEN_CACHE_SIZE': 1024,  # Number of verified tokens cached per process
+    'VERIFIED_TOKEN_CACHE_MAX_TTL': 5 * 60,  # Maximum number of seconds a verified token is cached
+    'USER_CACHE_TIMEOUT': 5 * 60,  # Seconds a user is cached, changes to the user drop it from the (shared) cache
 }
 
 _settings = {}
@@ -1,5 +1,5 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2020 - 2021 Vereniging van Nederlandse Gemeenten, Gemeente Amsterdam
+# Copyright (C) 2020 - 2022 Vereniging van Nederlandse Gemeenten, Gemeente Amsterdam
 import time
 
 import requests
@@ -10,6 +10,11 @@ from .config import AuthConfigurationError, get_settings
 
 _keyset = None
 _keyset_last_update = 0
+_keyset_version = 0  # Incremented whenever the keyset is (re)loaded, see VerifiedTokenCache
+
+
+def get_keyset_version():
+    return _keyset_version
 
 
 def get_keyset():
@@ -35,9 +40,11 @@ def init_keyset():
     """
     Initialize keyset, by loading keyset from settings
     """
-    global _keyset
+    global _keyset, _keyset_last_update, _keyset_version
 
     _keyset = JWKSet()
+    _keyset_last_update = time.time()
+    _keyset_version += 1
     settings = get_settings()
 
     if settings.get('JWKS'):
@@ -0,0 +1,47 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+import threading
+
+
+class AuthCacheMetrics:
+    """
+    Hit and miss counters of the authentication caches of this process (see VerifiedTokenCache and
+    JWTAuthBackend.get_user).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def _count(self, name, index):
+        with self._lock:
+            counters = self._counters.setdefault(name, [0, 0])
+            counters[index] += 1
+
+    def hit(self, name):
+        self._count(name, 0)
+
+    def miss(self, name):
+        self._count(name, 1)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+    def as_dict(self):
+        with self._lock:
+            counters = {name: tuple(values) for name, values in self._counters.items()}
+
+        return {
+            name: {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / (hits + misses), 3) if hits + misses else None,
+            } for name, (hits, misses) in counters.items()
+        }
+
+    def __str__(self):
+        return ', '.join(f'{name}: {values["hits"]} hit(s), {values["misses"]} miss(es), '
+                         f'hit rate {values["hit_rate"]}' for name, values in self.as_dict().items())
+
+
+auth_cache_metrics = AuthCacheMetrics()
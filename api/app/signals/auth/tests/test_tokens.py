@@ -0,0 +1,86 @@
+# SPDX-License-Identifier: MPL-2.0
+# Copyright (C) 2022 Gemeente Amsterdam
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import RequestFactory
+from jwcrypto import jwt
+
+from signals.auth.backend import AuthBackend
+from signals.auth.config import get_settings
+from signals.auth.jwks import get_keyset, init_keyset
+from signals.auth.metrics import auth_cache_metrics
+from signals.auth.tokens import JWTAccessToken, VerifiedTokenCache
+from signals.test.utils import SignalsBaseApiTestCase
+
+
+class TestVerifiedTokenCache(SignalsBaseApiTestCase):
+    kid = '2aedafba-8170-4064-b704-ce92b7c89cc6'
+
+    def setUp(self):
+        self.addCleanup(VerifiedTokenCache.clear)
+        cache.clear()
+        self.addCleanup(cache.clear)
+        auth_cache_metrics.reset()
+        self.addCleanup(auth_cache_metrics.reset)
+
+    def _bearer(self, username='test@example.com', exp=None):
+        claims = {field: username for field in get_settings()['USER_ID_FIELDS']}
+        if exp:
+            claims['exp'] = exp
+        token = jwt.JWT(header={'kid': self.kid, 'alg': 'ES256'}, claims=claims)
+        token.make_signed_token(get_keyset().get_key(self.kid))
+        return 'Bearer {}'.format(token.serialize())
+
+    def test_verified_once(self):
+        bearer = self._bearer()
+
+        with mock.patch.object(JWTAccessToken, 'decode_token', wraps=JWTAccessToken.decode_token) as decode_token:
+            self.assertEqual(JWTAccessToken.token_data(bearer, True)[1], 'test@example.com')
+            self.assertEqual(JWTAccessToken.token_data(bearer, True)[1], 'test@example.com')
+
+        decode_token.assert_called_once()
+        self.assertEqual(auth_cache_metrics.as_dict()['token'], {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+    def test_expires_with_token(self):
+        exp = round(time.time()) + 60
+        bearer = self._bearer(exp=exp)
+        JWTAccessToken.token_data(bearer, True)
+
+        raw_jwt = bearer.split()[1]
+        self.assertIsNotNone(VerifiedTokenCache.get(raw_jwt))
+        with mock.patch('signals.auth.tokens.time.time', return_value=exp + 1):
+            self.assertIsNone(VerifiedTokenCache.get(raw_jwt))
+
+    def test_flushed_when_keyset_is_reloaded(self):
+        bearer = self._bearer()
+        JWTAccessToken.token_data(bearer, True)
+
+        init_keyset()
+        self.assertIsNone(VerifiedTokenCache.get(bearer.split()[1]))
+
+    def test_bounded(self):
+        settings = dict(get_settings(), VERIFIED_TOKEN_CACHE_SIZE=2)
+        with mock.patch('signals.auth.tokens.get_settings', return_value=settings):
+            bearers = [self._bearer(username=f'test{i}@example.com') for i in range(3)]
+            for bearer in bearers:
+                JWTAccessToken.token_data(bearer, True)
+
+        self.assertIsNone(VerifiedTokenCache.get(bearers[0].split()[1]))
+        self.assertIsNotNone(VerifiedTokenCache.get(bearers[2].split()[1]))
+
+    def test_authenticate_steady_state(self):
+        superuser = self.superuser
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=self._bearer(username=superuser.username))
+        settings = dict(get_settings(), ALWAYS_OK=False)
+        with mock.patch('signals.auth.tokens.get_settings', return_value=settings):
+            AuthBackend.authenticate(request)
+
+            with mock.patch.object(JWTAccessToken, 'decode_token') as decode_token, self.assertNumQueries(0):
+                user, _ = AuthBackend.authenticate(request)
+
+        decode_token.assert_not_called()
+        self.assertEqual(user.pk, superuser.pk)
+        self.assertEqual(auth_cache_metrics.as_dict()['token'], {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+        self.assertEqual(auth_cache_metrics.as_dict()['user'], {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
@@ -1,5 +1,9 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2020 - 2021 Vereniging van Nederlandse Gemeenten, Gemeente Amsterdam
+# Copyright (C) 2020 - 2022 Vereniging van Nederlandse Gemeenten, Gemeente Amsterdam
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from json import loads
 
 from django.core.exceptions import ValidationError
@@ -9,7 +13,63 @@ from jwcrypto.jwt import JWT, JWTExpired, JWTMissingKey
 from rest_framework.exceptions import AuthenticationFailed
 
 from .config import get_settings
-from .jwks import check_update_keyset, get_keyset
+from .jwks import check_update_keyset, get_keyset, get_keyset_version
+from .metrics import auth_cache_metrics
+
+
+class VerifiedTokenCache:
+    """
+    Bounded in-process cache of the claims and user id of verified tokens, keyed by a digest of the token.
+
+    A token is cached until it expires (its `exp` claim), but no longer than VERIFIED_TOKEN_CACHE_MAX_TTL seconds. The
+    cached tokens are dropped when the keyset is reloaded (see check_update_keyset), the key they were signed with
+    could be revoked.
+    """
+    _entries = OrderedDict()  # digest -> (expires at, keyset version, claims, user id)
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _digest(token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def get(cls, token):
+        """
+        :returns: tuple of the claims and user id, or None when the token is not cached
+        """
+        digest = cls._digest(token)
+        with cls._lock:
+            entry = cls._entries.get(digest)
+            if entry is None:
+                return None
+
+            expires_at, keyset_version, claims, user_id = entry
+            if expires_at <= time.time() or keyset_version != get_keyset_version():
+                del cls._entries[digest]
+                return None
+
+            cls._entries.move_to_end(digest)
+        return dict(claims), user_id
+
+    @classmethod
+    def set(cls, token, claims, user_id):
+        settings = get_settings()
+        expires_at = time.time() + settings['VERIFIED_TOKEN_CACHE_MAX_TTL']
+        if isinstance(claims.get('exp'), (int, float)):
+            expires_at = min(expires_at, claims['exp'])
+        if expires_at <= time.time():
+            return
+
+        with cls._lock:
+            cls._entries[cls._digest(token)] = (expires_at, get_keyset_version(), dict(claims), user_id)
+            cls._entries.move_to_end(cls._digest(token))
+            while len(cls._entries) > settings['VERIFIED_TOKEN_CACHE_SIZE']:
+                cls._entries.popitem(last=False)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
 
 
 class JWTAccessToken:
@@ -68,5 +128,13 @@ class JWTAccessToken:
         if prefix.lower() != 'bearer':
             raise AuthenticationFailed('invalid token format')
 
+        cached = VerifiedTokenCache.get(raw_jwt)
+        if cached is not None:
+            auth_cache_metrics.hit('token')
+            return cached
+        auth_cache_metrics.miss('token')
+
         jwt = JWTAccessToken.decode_token(token=raw_jwt)
-        return JWTAccessToken.decode_claims(jwt.claims)
+        claims, user_id = JWTAccessToken.decode_claims(jwt.claims)
+        VerifiedTokenCache.set(raw_jwt, claims, user_id)
+        return claims, user_id
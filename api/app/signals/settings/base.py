@@ -99,6 +99,7 @@ MIDDLEWARE = [
     'django.contrib.sites.middleware.CurrentSiteMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'signals.apps.api.middleware.APIVersionHeaderMiddleware',
+    'signals.apps.api.middleware.SignalPermissionCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'signals.urls'
@@ -133,9 +134,24 @@ DATABASE_PORT = os.getenv('DATABASE_PORT_OVERRIDE')
 
 
 # Django cache settings
+# By default every process has its own cache, use a shared cache (redis, or a database or file based cache) when
+# running more than one process. The cached users, department ids and version stamps of the in-memory indexes are then
+# shared by all processes, otherwise changes reach the other processes only when their cached copies expire. The default
+# redis location is the redis service of the docker-compose setup.
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', ''),
+    'redis': ('django_redis.cache.RedisCache', 'redis://redis:6379/0'),
+    'db': ('django.core.cache.backends.db.DatabaseCache', 'signals_cache'),  # Created by createcachetable
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', '/tmp/signals_cache'),
+}
+CACHE_BACKEND, CACHE_DEFAULT_LOCATION = CACHE_BACKENDS[os.getenv('CACHE_BACKEND', 'locmem')]
+# Errors of the cache are not ignored, a dropped invalidation would leave outdated users and version stamps in the
+# cache.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv('CACHE_LOCATION', CACHE_DEFAULT_LOCATION),
+        'KEY_PREFIX': os.getenv('CACHE_KEY_PREFIX', ''),
     }
 }
 
@@ -297,6 +313,27 @@ SWAGGER_SETTINGS = {
 }
 MSB_API_URL = os.getenv('MSB_API_URL', 'https://api.meldingen.rotterdam.nl')
 
+# Interval in seconds of the periodic MSB sync (see signals.apps.msb.tasks.sync_meldingen), 0 disables the schedule
+MSB_SYNC_INTERVAL = int(os.getenv('MSB_SYNC_INTERVAL', 5 * 60))
+if MSB_SYNC_INTERVAL:
+    CELERY_BEAT_SCHEDULE['msb-sync-meldingen'] = {
+        'task': 'signals.apps.msb.tasks.sync_meldingen',
+        'schedule': MSB_SYNC_INTERVAL,
+    }
+
+# Backstop for the Elasticsearch index queue, normally flushed within seconds after a change (see
+# signals.apps.search.tasks.queue_for_indexing)
+CELERY_BEAT_SCHEDULE['search-flush-index-queue'] = {
+    'task': 'signals.apps.search.tasks.flush_index_queue',
+    'schedule': 60,
+}
+
+# Clean up the PDFs generated in the background, see API_PDF_JOB_TIMEOUT
+CELERY_BEAT_SCHEDULE['signals-delete-expired-pdf-summaries'] = {
+    'task': 'signals.apps.signals.tasks.delete_expired_pdf_summaries',
+    'schedule': 60 * 60,
+}
+
 # Sigmax settings
 SIGMAX_AUTH_TOKEN = os.getenv('SIGMAX_AUTH_TOKEN', None)
 SIGMAX_SERVER = os.getenv('SIGMAX_SERVER', None)
@@ -312,6 +349,7 @@ ML_TOOL_ENDPOINT = os.getenv('SIGNALS_ML_TOOL_ENDPOINT', 'https://api.data.amste
 
 # Search settings
 SEARCH = {
+    'ENABLED': os.getenv('ELASTICSEARCH_ENABLED', True) in TRUE_VALUES,
     'PAGE_SIZE': 500,
     'CONNECTION': {
         'HOST': os.getenv('ELASTICSEARCH_HOST', 'elastic-index.service.consul:9200'),
@@ -336,6 +374,8 @@ API_TRANSFORM_SOURCE_OF_CHILD_SIGNAL_TO = os.getenv('API_TRANSFORM_SOURCE_OF_CHI
 # Default pdok municipalities
 DEFAULT_PDOK_MUNICIPALITIES = os.getenv('DEFAULT_PDOK_MUNICIPALITIES',
                                         'Amsterdam,Amstelveen,Weesp,Ouder-Amstel').split(',')
+# Base URL of the PDOK API, can be pointed at a local stand-in (the "msb" service serves the PDOK suggest endpoint)
+PDOK_API_URL = os.getenv('PDOK_API_URL', 'https://geodata.nationaalgeoregister.nl')
 
 # use dynamic map server for pdf, empty by default
 # example servers
@@ -356,6 +396,18 @@ API_PDF_LOGO_STATIC_FILE = os.getenv('API_PDF_LOGO_STATIC_FILE', 'api/logo-gemee
 # along the largest side, aspect ratio is maintained.
 API_PDF_RESIZE_IMAGES_TO = 100
 
+# Map tiles, resized images and the logo used in PDFs are kept in the cache (see CACHE_BACKEND), map tiles are
+# downloaded concurrently.
+API_PDF_MAP_TILE_CACHE_TIMEOUT = int(os.getenv('API_PDF_MAP_TILE_CACHE_TIMEOUT', 7 * 24 * 60 * 60))  # One week
+API_PDF_MAP_TILE_TIMEOUT = int(os.getenv('API_PDF_MAP_TILE_TIMEOUT', 10))  # Seconds per tile download
+API_PDF_MAP_TILE_WORKERS = int(os.getenv('API_PDF_MAP_TILE_WORKERS', 4))
+API_PDF_IMAGE_CACHE_TIMEOUT = int(os.getenv('API_PDF_IMAGE_CACHE_TIMEOUT', 24 * 60 * 60))  # One day
+API_PDF_LOGO_CACHE_TIMEOUT = int(os.getenv('API_PDF_LOGO_CACHE_TIMEOUT', 60 * 60))  # One hour
+
+# PDFs generated in the background (see PDFSummaryJobService) can be downloaded for `API_PDF_JOB_TIMEOUT` seconds
+API_PDF_JOB_TIMEOUT = int(os.getenv('API_PDF_JOB_TIMEOUT', 24 * 60 * 60))  # One day
+API_PDF_JOB_MAX_SIGNALS = int(os.getenv('API_PDF_JOB_MAX_SIGNALS', 100))
+
 # Maximum size for attachments
 API_MAX_UPLOAD_SIZE = os.getenv('API_MAX_UPLOAD_SIZE', 20*1024*1024)  # 20MB = 20*1024*1024
 
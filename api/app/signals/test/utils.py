@@ -1,8 +1,10 @@
 # SPDX-License-Identifier: MPL-2.0
-# Copyright (C) 2019 - 2021 Gemeente Amsterdam
+# Copyright (C) 2019 - 2022 Gemeente Amsterdam
 import json
 
 from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from jsonschema import validate
 from rest_framework.test import APITestCase
 
@@ -108,3 +110,38 @@ class SignalsBaseApiTestCase(SuperUserMixin, SimpleUserMixin, APITestCase):
     def load_json_schema(filename: str):
         with open(filename) as f:
             return json.load(f)
+
+
+class QueryBudgetMixin:
+    """
+    Assertions on the number of queries of an endpoint, to catch queries per object (N+1 queries).
+    """
+    def get_query_count(self, url, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, **kwargs)
+        self.assertEqual(response.status_code, 200, response.content)
+        return len(queries)
+
+    def assertQueryBudget(self, url, create_objects, sizes=(1, 10), budget=None, **kwargs):
+        """
+        Request the url after creating `sizes[0]` objects, and again after creating more objects up to every next size.
+        Fails when the number of queries changes with the number of objects, or when it exceeds the budget.
+
+        :param url: the url to request, should return all created objects on a single page
+        :param create_objects: callable creating the given number of objects
+        :param sizes: increasing numbers of objects
+        :param budget: maximum number of queries of a request, not checked when None
+        """
+        self.get_query_count(url, **kwargs)  # Warm up, the first request can fill caches
+
+        created, query_counts = 0, []
+        for size in sizes:
+            create_objects(size - created)
+            created = size
+            query_counts.append(self.get_query_count(url, **kwargs))
+
+        self.assertEqual(len(set(query_counts)), 1,
+                         f'Number of queries of {url} grows with the number of objects: '
+                         f'{dict(zip(sizes, query_counts))}')
+        if budget is not None:
+            self.assertLessEqual(query_counts[-1], budget, f'Number of queries of {url} exceeds the budget')
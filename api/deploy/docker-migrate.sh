@@ -8,3 +8,6 @@ cd /app/
 
 yes yes | python manage.py migrate --noinput
 
+# Only creates the table when the database cache is used (CACHE_BACKEND=db)
+python manage.py createcachetable
+
@@ -1,8 +1,14 @@
 from fastapi import FastAPI
 from data import meldingen
+from pdok import suggest
 app = FastAPI()
 
 
 @app.get("/api/")
 async def root():
-    return meldingen()
\ No newline at end of file
+    return meldingen()
+
+
+@app.get("/locatieserver/v3/suggest")
+async def locatieserver_suggest(q: str = ""):
+    return suggest(q)
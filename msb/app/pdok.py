@@ -0,0 +1,50 @@
+"""
+Stand-in for the PDOK locatieserver suggest endpoint, the addresses (and RD coordinates) of the MSB meldingen are
+used as the address register.
+"""
+from data import meldingen
+
+
+def rd_to_wgs84(x, y):
+    """
+    Approximate RD (EPSG:28992) to WGS84 conversion (F.H. Schreutelkamp, G.L. Strang van Hees), accurate to about a
+    meter which is plenty for a stand-in.
+    """
+    dx = (x - 155000) * 10 ** -5
+    dy = (y - 463000) * 10 ** -5
+    lat = (52.15517440 + (3235.65389 * dy - 32.58297 * dx ** 2 - 0.2475 * dy ** 2 - 0.84978 * dx ** 2 * dy
+                          - 0.0655 * dy ** 3 - 0.01709 * dx ** 2 * dy ** 2 - 0.00738 * dx + 0.0053 * dx ** 4) / 3600)
+    lon = (5.38720621 + (5260.52916 * dx + 105.94684 * dx * dy + 2.45656 * dx * dy ** 2 - 0.81885 * dx ** 3
+                         + 0.05594 * dx * dy ** 3 - 0.05607 * dx ** 3 * dy + 0.01199 * dy - 0.00256 * dx ** 3 * dy ** 2
+                         + 0.00128 * dx * dy ** 4) / 3600)
+    return lon, lat
+
+
+def addresses():
+    register = {}
+    for melding in meldingen():
+        adres = melding['locatie'].get('adres') or {}
+        if not adres.get('straatNaam') or not melding['locatie'].get('x'):
+            continue
+        x, y = melding['locatie']['x'], melding['locatie']['y']
+        lon, lat = rd_to_wgs84(x, y)
+        key = f'{adres["straatNaam"]} {adres["huisnummer"]}'.lower()
+        register.setdefault(key, {
+            'bron': 'BAG',
+            'type': 'adres',
+            'weergavenaam': f'{adres["straatNaam"].title()} {adres["huisnummer"]}, Rotterdam',
+            'straatnaam': adres['straatNaam'].title(),
+            'huisnummer': int(adres['huisnummer']) if adres['huisnummer'].isdigit() else adres['huisnummer'],
+            'postcode': '',
+            'woonplaatsnaam': 'Rotterdam',
+            'gemeentenaam': 'Rotterdam',
+            'centroide_ll': f'POINT({lon} {lat})',
+            'centroide_rd': f'POINT({x} {y})',
+        })
+    return register
+
+
+def suggest(q):
+    doc = addresses().get(' '.join(q.split()).lower())
+    docs = [doc] if doc else []
+    return {'response': {'numFound': len(docs), 'start': 0, 'maxScore': 1.0, 'docs': docs}}